@@ -19,6 +19,28 @@ labs_patterns = [
     path('<str:section>/<str:lab>/', views.lab_detail),
 ]
 
+# Серверные вычислительные движки
+api_patterns = [
+    path('graph/sweep/', views.graph_sweep),
+    path('dfa/minimize/', views.dfa_minimize),
+    path('nfa/determinize/', views.nfa_determinize),
+    path('automata/check/', views.automaton_check),
+    path('transducer/run/', views.transducer_run),
+    path('markov/analyze/', views.markov_analyze),
+    path('tm/run/', views.tm_run),
+    path('ntm/explore/', views.ntm_explore),
+    path('program/run/', views.program_run),
+    path('normal/run/', views.normal_run),
+    path('recursive/evaluate/', views.recursive_evaluate),
+    path('petri/analyze/', views.petri_analyze),
+    path('billiard/simulate/', views.billiard_simulate),
+    path('quantum/run/', views.quantum_run),
+    path('quantum/noise/', views.quantum_noise),
+    path('alife/run/', views.alife_run),
+    path('neural_tm/run/', views.neural_tm_run),
+    path('lsystem/segments/', views.lsystem_segments),
+]
+
 # Основные маршруты (с обёрткой и raw)
 url_other = [
     path('', views.index),
@@ -48,6 +70,7 @@ url_other = [
 
 urlpatterns = [
     path('labs/', include(labs_patterns)),
+    path('api/', include(api_patterns)),
     path('cellular/', include(url_kl)),
     path('labkib/', include(urls.urlpatterns)),
     path('', include(url_other))
@@ -0,0 +1,7 @@
+"""
+Серверные вычислительные движки для лабораторных работ ДМ-3.
+
+Браузерные лабы (static/labs/...) шагают модели поэлементно в JS.
+Здесь собраны их векторизованные аналоги на NumPy/SciPy для тяжёлых
+прогонов, пакетных экспериментов и аналитики.
+"""
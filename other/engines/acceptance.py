@@ -0,0 +1,194 @@
+"""
+Массовая проверка слов на ДКА/НКА и сравнение автоматов.
+
+Автомат компилируется в плотную таблицу NumPy с двумя служебными
+столбцами: «конец слова» (состояние не меняется, им добиваются короткие
+слова) и «чужой символ» (ведёт в сток). Пачка слов кодируется матрицей
+(m, L), и все m слов продвигаются одновременно, столбец за столбцом.
+
+Для проверки заданий есть два сравнения с эталоном:
+
+- bounded_diff - перебор всех слов длины до k уровнями: вектор состояний
+  для всех |Σ|^l слов длины l получается из предыдущего одной выборкой;
+- product_diff - обход в ширину произведения автоматов, дающий
+  кратчайший контрпример или доказательство эквивалентности.
+
+НКА перед компиляцией детерминизируется с лимитом состояний (nfa.py).
+"""
+
+import numpy as np
+
+from .automata import DFA
+from .nfa import NFA
+
+
+CHUNK = 1 << 20
+VISITED_LIMIT = 1 << 26
+
+
+def load_automaton(data, max_states=100000):
+    """ДКА из JSON любой лабы; НКА (ε-переходы, symbols) детерминизируется"""
+    transitions = data.get('transitions') or []
+    is_nfa = 'epsilonTransitions' in data or any(
+        isinstance(t, dict) and ('symbols' in t or t.get('epsilon')) for t in transitions)
+    if is_nfa:
+        return NFA.from_json(data).determinize(max_states=max_states)[0]
+    return DFA.from_json(data)
+
+
+class CompiledDFA:
+    """
+    ДКА, скомпилированный для пачек слов.
+
+    Таблица ext имеет строку стока (n) и столбцы: символы алфавита, затем
+    PAD = k (конец слова) и UNKNOWN = k + 1 (символ вне алфавита).
+    """
+
+    def __init__(self, dfa):
+        self.dfa = dfa
+        n, k = dfa.table.shape
+        self.sink = n
+        self.pad, self.unknown = k, k + 1
+        ext = np.full((n + 1, k + 2), n, dtype=np.int32)
+        ext[:n, :k] = np.where(dfa.table >= 0, dfa.table, n)
+        ext[:, self.pad] = np.arange(n + 1)
+        self.ext = ext
+        self.accepting = np.append(dfa.accepting, False)
+        self.column = {a: j for j, a in enumerate(dfa.alphabet)}
+
+    def encode(self, words):
+        """
+        Слова -> (m, L) номера столбцов. Строки из односимвольных символов
+        кодируются целиком через массив Unicode; слова-списки - поштучно.
+        """
+        words = list(words)
+        if not words:
+            return np.zeros((0, 0), dtype=np.int32)
+        single = all(len(a) == 1 for a in self.column)
+        if single and all(isinstance(w, str) for w in words):
+            width = max(1, max(len(w) for w in words))
+            points = np.array(words, dtype=f'U{width}').view(np.uint32).reshape(len(words), width)
+            top = max(int(points.max()), max(ord(a) for a in self.column) if self.column else 0)
+            lookup = np.full(top + 1, self.unknown, dtype=np.int32)
+            for a, j in self.column.items():
+                lookup[ord(a)] = j
+            # Код 0 - добивка numpy до ширины массива
+            lookup[0] = self.pad
+            return lookup[points]
+        width = max(1, max(len(w) for w in words))
+        codes = np.full((len(words), width), self.pad, dtype=np.int32)
+        for i, word in enumerate(words):
+            codes[i, :len(word)] = [self.column.get(a, self.unknown) for a in word]
+        return codes
+
+    def run_codes(self, codes):
+        """Конечные состояния для матрицы кодов (m, L)"""
+        states = np.full(codes.shape[0], self.dfa.start, dtype=np.int32)
+        for col in codes.T:
+            states = self.ext[states, col]
+        return states
+
+    def accepts(self, words):
+        """Массив bool - принимается ли каждое слово; идёт пачками по CHUNK слов"""
+        words = list(words)
+        out = np.zeros(len(words), dtype=bool)
+        for lo in range(0, len(words), CHUNK):
+            chunk = words[lo:lo + CHUNK]
+            out[lo:lo + len(chunk)] = self.accepting[self.run_codes(self.encode(chunk))]
+        return out
+
+    def columns_for(self, alphabet):
+        """Столбцы ext для символов общего алфавита (чужие - UNKNOWN)"""
+        return np.array([self.column.get(a, self.unknown) for a in alphabet], dtype=np.int32)
+
+
+def _word(digits, alphabet):
+    return ''.join(alphabet[d] for d in digits) if all(len(a) == 1 for a in alphabet) \
+        else [alphabet[d] for d in digits]
+
+
+def bounded_diff(a, b, max_length, limit=10, max_words=50_000_000):
+    """
+    Слова длины не больше max_length, на которых ДКА a и b расходятся
+    (не более limit штук, в порядке длины и лексикографически по алфавиту).
+    Возвращает список (слово, принимает_a, принимает_b).
+    """
+    ca, cb = CompiledDFA(a), CompiledDFA(b)
+    alphabet = sorted(set(a.alphabet) | set(b.alphabet))
+    k = len(alphabet)
+    total = sum(k ** length for length in range(max_length + 1))
+    if total > max_words:
+        raise ValueError(f"Слов длины до {max_length}: {total}, больше лимита {max_words}")
+    cols_a, cols_b = ca.columns_for(alphabet), cb.columns_for(alphabet)
+
+    found = []
+    va = np.array([a.start], dtype=np.int32)
+    vb = np.array([b.start], dtype=np.int32)
+    for length in range(max_length + 1):
+        diff = np.flatnonzero(ca.accepting[va] != cb.accepting[vb])
+        for index in diff[:limit - len(found)]:
+            digits = np.unravel_index(index, (k,) * length) if length else ()
+            found.append((_word([int(d) for d in digits], alphabet),
+                          bool(ca.accepting[va[index]]), bool(cb.accepting[vb[index]])))
+        if len(found) >= limit or length == max_length:
+            break
+        # Слово i длины l + 1 = слово i // k длины l плюс символ i % k
+        va = ca.ext[va][:, cols_a].ravel()
+        vb = cb.ext[vb][:, cols_b].ravel()
+    return found
+
+
+def product_diff(a, b):
+    """
+    Кратчайшее слово, различающее ДКА a и b, или None, если они эквивалентны.
+
+    Обход в ширину по парам состояний (p, q), закодированным числом
+    p * (nb + 1) + q; уровни обхода хранятся для восстановления слова.
+    """
+    ca, cb = CompiledDFA(a), CompiledDFA(b)
+    alphabet = sorted(set(a.alphabet) | set(b.alphabet))
+    cols_a, cols_b = ca.columns_for(alphabet), cb.columns_for(alphabet)
+    width = cb.ext.shape[0]
+
+    frontier = np.array([a.start * width + b.start], dtype=np.int64)
+    size = ca.ext.shape[0] * width
+    # Посещённые пары - битовой картой, если произведение не слишком велико,
+    # иначе множеством (достижимых пар обычно много меньше, чем всех)
+    visited = np.zeros(size, dtype=bool) if size <= VISITED_LIMIT else None
+    seen = set(frontier.tolist())
+    if visited is not None:
+        visited[frontier] = True
+    levels = []
+    while frontier.size:
+        p, q = np.divmod(frontier, width)
+        bad = np.flatnonzero(ca.accepting[p] != cb.accepting[q])
+        if bad.size:
+            return _trace(levels, frontier[bad[0]], alphabet)
+        nxt_p = ca.ext[p][:, cols_a]
+        nxt_q = cb.ext[q][:, cols_b]
+        pairs = (nxt_p.astype(np.int64) * width + nxt_q).ravel()
+        parents = np.repeat(frontier, len(alphabet))
+        symbols = np.tile(np.arange(len(alphabet)), frontier.size)
+        pairs, first = np.unique(pairs, return_index=True)
+        if visited is not None:
+            fresh = ~visited[pairs]
+        else:
+            fresh = np.fromiter((x not in seen for x in pairs.tolist()), dtype=bool, count=pairs.size)
+        pairs, first = pairs[fresh], first[fresh]
+        levels.append((pairs, parents[first], symbols[first]))
+        if visited is not None:
+            visited[pairs] = True
+        else:
+            seen.update(pairs.tolist())
+        frontier = pairs
+    return None
+
+
+def _trace(levels, pair, alphabet):
+    digits = []
+    for pairs, parents, symbols in reversed(levels):
+        i = np.searchsorted(pairs, pair)
+        if i < pairs.size and pairs[i] == pair:
+            digits.append(int(symbols[i]))
+            pair = parents[i]
+    return _word(digits[::-1], alphabet)
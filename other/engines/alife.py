@@ -0,0 +1,695 @@
+"""
+Векторная симуляция искусственной жизни.
+
+Лаба artificial_life (environment.js, agent.js) хранит агентов объектами
+Herbivore/Predator и на каждом кадре для каждого агента перебирает всех
+остальных в findNearest - O(N^2), что ограничивает популяцию десятками
+агентов. Здесь та же модель (поведение, энергия, размножение с мутациями,
+еда, яд, эллиптические препятствия), но:
+
+- агенты лежат в массивах структуры (structure of arrays) фиксированной
+  ёмкости: позиция, скорость, энергия, геном (maxSpeed, size,
+  poisonSensitivity), тип, состояние автомата, возраст и поколение. Живые
+  агенты занимают префикс [0, n);
+- соседи ищутся сеткой ячеек (cell list) со стороной, равной радиусу
+  запроса: точки сортируются по номеру ячейки, кандидаты для запроса -
+  содержимое соседних ячеек, пары собираются векторно через np.repeat;
+- гибель уплотняет массивы на месте: дыры в префиксе заполняются живыми
+  агентами из хвоста, перемещается O(погибших) строк. Потомки дописываются
+  в свободный хвост, массивы не перевыделяются;
+- обновление синхронное: все агенты видят состояние начала кадра (в лабе
+  агенты обновляются по очереди). Одну еду или жертву в кадре получает
+  один претендент, выбранный случайно.
+
+Кадр популяции 10^5 агентов занимает около четверти секунды на одном ядре
+(в лабе так шагают сотни агентов). run() гоняет симуляцию без отрисовки и
+собирает историю статистики.
+
+Конфигурация - вложенный словарь с ключами config.js лабы (DEFAULTS) и
+разделом limits с ограничениями популяции из handleReproduction.
+"""
+
+import copy
+import time
+
+import numpy as np
+
+
+HERBIVORE, PREDATOR = 0, 1
+KINDS = ('herbivore', 'predator')
+WANDER, SEEK_FOOD, AVOID_PREDATOR, HUNT = 0, 1, 2, 3
+STATES = ('WANDER', 'SEEK_FOOD', 'AVOID_PREDATOR', 'HUNT')
+GENES = ('maxSpeed', 'size', 'poisonSensitivity')
+SPEED, SIZE, SENSITIVITY = 0, 1, 2
+
+MAX_CAPACITY = 1_000_000
+MAX_CELLS = 1 << 24
+SPAWN_ATTEMPTS = 50
+# Кадров в секунде лабы (getStats делит время на 60)
+FPS = 60
+
+DEFAULTS = {
+    'canvas': {'width': 1200, 'height': 900},
+    'agents': {
+        'herbivore': {
+            'initialCount': 15, 'maxSpeed': 2.0, 'maxForce': 0.3, 'size': 10,
+            'initialEnergy': 300, 'maxEnergy': 500, 'reproductionThreshold': 300,
+            'metabolismCost': 0.15, 'movementCost': 0.05,
+            'forces': {'seek': 0.4, 'avoid': 1.2, 'wander': 0.1},
+            'vision': {'predator': 80, 'food': 70, 'poison': 35},
+            'poisonAvoid': 2.0, 'reproductionChance': 0.3,
+        },
+        'predator': {
+            'initialCount': 8, 'maxSpeed': 2.2, 'maxForce': 0.3, 'size': 12,
+            'initialEnergy': 300, 'maxEnergy': 500, 'reproductionThreshold': 400,
+            'metabolismCost': 0.15, 'movementCost': 0.05, 'huntForce': 0.6,
+            'wander': 0.08, 'preyEnergy': 0.6,
+            'vision': {'prey': 120, 'poison': 30},
+            'poisonAvoid': 1.5, 'reproductionChance': 0.2,
+        },
+    },
+    'food': {'maxCount': 80, 'size': 6, 'energy': 60, 'poisonMargin': 30, 'obstacleMargin': 20},
+    'obstacles': {'count': 10, 'minSize': 30, 'maxSize': 80, 'safeDistance': 40},
+    'poison': {'count': 8, 'size': 8, 'damage': 25},
+    'simulation': {'mutationRate': 0.05},
+    'environment': {'randomMovementInterval': 120},
+    # handleReproduction: размножение только пока популяция меньше порога,
+    # и не больше births потомков за кадр
+    'limits': {'herbivores': 30, 'predators': 15, 'herbivoreBirths': 5, 'predatorBirths': 2},
+}
+
+
+def merge_config(overrides=None, base=DEFAULTS):
+    """Копия base с рекурсивно наложенными overrides (ключи как в config.js)"""
+    result = copy.deepcopy(base)
+    for key, value in (overrides or {}).items():
+        if key not in result:
+            raise ValueError(f"Неизвестный параметр конфигурации: {key}")
+        if isinstance(result[key], dict):
+            if not isinstance(value, dict):
+                raise ValueError(f"Параметр {key} должен быть объектом")
+            result[key] = merge_config(value, result[key])
+        else:
+            result[key] = type(result[key])(value) if isinstance(result[key], (int, float)) else value
+    return result
+
+
+# ==========================================================
+# ВЕКТОРНЫЕ ОПЕРАЦИИ
+# ==========================================================
+
+def _limit(v, maximum):
+    """Vector2D.limit для строк v (maximum - число или столбец длин)"""
+    norm = np.sqrt(np.einsum('ij,ij->i', v, v))
+    scale = np.minimum(1.0, maximum / np.maximum(norm, 1e-300))
+    v *= scale[:, None]
+    return v
+
+
+def _unit(v):
+    """Vector2D.normalize: нулевые векторы остаются нулевыми"""
+    norm = np.sqrt(np.einsum('ij,ij->i', v, v))
+    return v / np.where(norm > 0, norm, 1.0)[:, None]
+
+
+def _steer(direction, vel, speed, force):
+    """seek/flee: (direction / |direction| * maxSpeed - velocity), ограниченное maxForce"""
+    desired = _unit(direction) * speed[:, None]
+    return _limit(desired - vel, force)
+
+
+def _random_units(rng, n):
+    angle = rng.random(n) * (2 * np.pi)
+    return np.column_stack((np.cos(angle), np.sin(angle)))
+
+
+# ==========================================================
+# СЕТКА ЯЧЕЕК
+# ==========================================================
+
+class CellGrid:
+    """
+    Сетка для поиска соседей: точки отсортированы по номеру ячейки,
+    start[c]:start[c + 1] - их диапазон в order. Точки вне мира
+    прижимаются к крайним ячейкам.
+    """
+
+    def __init__(self, points, cell, width, height):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.cell = float(cell)
+        if self.cell <= 0:
+            raise ValueError("Размер ячейки должен быть положительным")
+        self.cols = max(1, int(np.ceil(width / self.cell)))
+        self.rows = max(1, int(np.ceil(height / self.cell)))
+        if self.cols * self.rows > MAX_CELLS:
+            # Слишком мелкая сетка для большого мира - укрупняем ячейку
+            factor = np.sqrt(self.cols * self.rows / MAX_CELLS)
+            self.cell *= factor
+            self.cols = max(1, int(np.ceil(width / self.cell)))
+            self.rows = max(1, int(np.ceil(height / self.cell)))
+        cx, cy = self._coords(self.points)
+        ids = cy * self.cols + cx
+        self.order = np.argsort(ids, kind='stable')
+        # Координаты в порядке ячеек: кандидаты одной ячейки лежат подряд
+        self.xs = self.points[self.order, 0]
+        self.ys = self.points[self.order, 1]
+        # Лишняя ячейка cols * rows всегда пуста - в неё ведут соседи за краем сетки
+        counts = np.bincount(ids, minlength=self.cols * self.rows + 1)
+        self.start = np.concatenate(([0], np.cumsum(counts)))
+
+    def _coords(self, points):
+        cx = np.clip((points[:, 0] // self.cell).astype(np.int64), 0, self.cols - 1)
+        cy = np.clip((points[:, 1] // self.cell).astype(np.int64), 0, self.rows - 1)
+        return cx, cy
+
+    def _candidates(self, queries, radius):
+        """Пары (запрос, позиция в order) из ячеек, пересекающих круг радиуса radius; запросы по возрастанию"""
+        span = np.arange(-int(np.ceil(radius / self.cell)), int(np.ceil(radius / self.cell)) + 1)
+        cx, cy = self._coords(queries)
+        x = cx[:, None, None] + span[None, None, :]
+        y = cy[:, None, None] + span[None, :, None]
+        inside = (x >= 0) & (x < self.cols) & (y >= 0) & (y < self.rows)
+        cells = np.where(inside, y * self.cols + x, self.cols * self.rows).reshape(-1)
+        begin = self.start[cells]
+        counts = self.start[cells + 1] - begin
+        per_query = counts.reshape(len(queries), -1).sum(axis=1)
+        # Сквозной номер пары минус начало её группы плюс начало ячейки
+        shift = np.repeat(begin - (np.cumsum(counts) - counts), counts)
+        return np.repeat(np.arange(len(queries)), per_query), np.arange(len(shift)) + shift
+
+    def pairs(self, queries, radius):
+        """Пары (запрос, точка, квадрат расстояния) с расстоянием < radius; запросы по возрастанию"""
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        if not len(queries) or not len(self.points):
+            return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+        q, k = self._candidates(queries, radius)
+        dx = self.xs[k] - queries[q, 0]
+        dy = self.ys[k] - queries[q, 1]
+        d2 = dx * dx + dy * dy
+        keep = np.flatnonzero(d2 < radius * radius)
+        return q[keep], self.order[k[keep]], d2[keep]
+
+    def nearest(self, queries, radius):
+        """Ближайшая точка на расстоянии < radius для каждого запроса (-1 - нет) и квадрат расстояния"""
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        return nearest_pairs(len(queries), *self.pairs(queries, radius))
+
+
+def nearest_pairs(count, q, j, d2):
+    """Свёртка пар, отсортированных по запросу q, в ближайшую точку на запрос"""
+    best = np.full(count, np.inf)
+    index = np.full(count, -1, dtype=np.int64)
+    if not len(q):
+        return index, best
+    starts = np.flatnonzero(np.concatenate(([True], q[1:] != q[:-1])))
+    best[q[starts]] = np.minimum.reduceat(d2, starts)
+    hit = d2 == best[q]
+    index[q[hit]] = j[hit]
+    return index, best
+
+
+# ==========================================================
+# МИР
+# ==========================================================
+
+class World:
+    """
+    Популяция травоядных и хищников в буферах ёмкости capacity.
+    Ёмкость по умолчанию - максимум, который допускают limits, так что
+    потомки в лабовой конфигурации не теряются.
+    """
+
+    def __init__(self, config=None, capacity=None, seed=None):
+        self.config = merge_config(config)
+        self.rng = np.random.default_rng(seed)
+        limits = self.config['limits']
+        if capacity is None:
+            capacity = (limits['herbivores'] + limits['predators']
+                        + limits['herbivoreBirths'] + limits['predatorBirths'])
+        agents = self.config['agents']
+        capacity = max(int(capacity), agents['herbivore']['initialCount'] + agents['predator']['initialCount'])
+        if capacity > MAX_CAPACITY:
+            raise ValueError(f"Ёмкость больше {MAX_CAPACITY} агентов")
+        # Еда, яд и препятствия тоже живут в буферах по счётчикам из конфигурации
+        for section, key in (('food', 'maxCount'), ('obstacles', 'count'), ('poison', 'count')):
+            if not 0 <= int(self.config[section][key]) <= MAX_CAPACITY:
+                raise ValueError(f"{section}.{key} должно быть от 0 до {MAX_CAPACITY}")
+        self.width = float(self.config['canvas']['width'])
+        self.height = float(self.config['canvas']['height'])
+        if self.width <= 0 or self.height <= 0:
+            raise ValueError("Размеры мира должны быть положительными")
+
+        # ----- буферы агентов -----
+        self.capacity = capacity
+        self.n = 0
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.energy = np.zeros(capacity)
+        self.genome = np.zeros((capacity, len(GENES)))
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.state = np.zeros(capacity, dtype=np.int8)
+        self.age = np.zeros(capacity, dtype=np.int64)
+        self.generation = np.zeros(capacity, dtype=np.int64)
+        self.kick = np.zeros(capacity, dtype=np.int64)
+        self._buffers = (self.pos, self.vel, self.energy, self.genome, self.kind,
+                         self.state, self.age, self.generation, self.kick)
+
+        # ----- среда -----
+        food = self.config['food']
+        self.food_capacity = int(food['maxCount'])
+        self.food = np.zeros((self.food_capacity, 2))
+        self.food_unsafe = np.zeros(self.food_capacity, dtype=bool)
+        self.n_food = 0
+        self.frame = 0
+        self.births = 0
+        self.deaths = 0
+        self.eaten = 0
+        self._generate_obstacles()
+        self._generate_poison()
+        self._spawn_food()
+        for kind, name in enumerate(KINDS):
+            count = int(agents[name]['initialCount'])
+            points = np.column_stack((
+                self.rng.random(count) * (self.width - 40) + 20,
+                self.rng.random(count) * (self.height - 40) + 20,
+            ))
+            self._add(kind, points, self._random_genome(kind, count), np.ones(count, dtype=np.int64))
+
+    # ----- создание среды -----
+
+    def _generate_obstacles(self):
+        cfg = self.config['obstacles']
+        count = int(cfg['count'])
+        sizes = cfg['minSize'] + self.rng.random((count, 2)) * (cfg['maxSize'] - cfg['minSize'])
+        self.obstacle_radii = sizes / 2
+        self.obstacles = np.column_stack((
+            sizes[:, 0] / 2 + self.rng.random(count) * (self.width - sizes[:, 0]),
+            sizes[:, 1] / 2 + self.rng.random(count) * (self.height - sizes[:, 1]),
+        ))
+        # Агент взаимодействует с препятствием по кругу радиуса max(radiusX, radiusY)
+        self.obstacle_reach = self.obstacle_radii.max(axis=1) if count else np.empty(0)
+
+    def _obstacle_pairs(self, points, margin, grid=None):
+        """
+        Пары (точка, препятствие) с расстоянием до центра меньше
+        max(radiusX, radiusY) + margin (margin - число или массив по точкам);
+        возвращает ещё вектор от центра к точке и расстояние. Препятствий
+        мало, поэтому ищем от них по сетке точек (grid - уже построенная).
+        """
+        if not len(self.obstacles) or not len(points):
+            empty = np.empty(0, np.int64)
+            return empty, empty, np.empty((0, 2)), np.empty(0)
+        margin = np.broadcast_to(np.asarray(margin, dtype=np.float64), (len(points),))
+        radius = float(self.obstacle_reach.max() + margin.max())
+        if grid is None:
+            grid = CellGrid(points, radius, self.width, self.height)
+        j, q, d2 = grid.pairs(self.obstacles, radius)
+        dist = np.sqrt(d2)
+        keep = dist < self.obstacle_reach[j] + margin[q]
+        q, j, dist = q[keep], j[keep], dist[keep]
+        return q, j, points[q] - self.obstacles[j], dist
+
+    def _inside_obstacle(self, points):
+        inside = np.zeros(len(points), dtype=bool)
+        q, j, away, _ = self._obstacle_pairs(points, 0.0)
+        d = away / self.obstacle_radii[j]
+        inside[q[np.einsum('ij,ij->i', d, d) < 1]] = True
+        return inside
+
+    def _sample_free(self, count, margin):
+        """count точек вне препятствий (как в лабе: до 50 попыток, неудачные отбрасываются)"""
+        found, need = [], count
+        for _ in range(SPAWN_ATTEMPTS):
+            if need <= 0:
+                break
+            points = np.column_stack((
+                margin + self.rng.random(need) * (self.width - 2 * margin),
+                margin + self.rng.random(need) * (self.height - 2 * margin),
+            ))
+            points = points[~self._inside_obstacle(points)]
+            found.append(points)
+            need -= len(points)
+        return np.concatenate(found) if found else np.empty((0, 2))
+
+    def _generate_poison(self):
+        cfg = self.config['poison']
+        self.poison = self._sample_free(int(cfg['count']), float(cfg['size']))
+
+    def _spawn_food(self):
+        missing = self.food_capacity - self.n_food
+        if missing <= 0:
+            return
+        points = self._sample_free(missing, 0.0)
+        s = slice(self.n_food, self.n_food + len(points))
+        self.food[s] = points
+        # Яд и препятствия неподвижны - опасность еды считается один раз при появлении
+        self.food_unsafe[s] = self._unsafe_food(points)
+        self.n_food += len(points)
+
+    # ----- буферы -----
+
+    def _random_genome(self, kind, count):
+        cfg = self.config['agents'][KINDS[kind]]
+        genome = np.empty((count, len(GENES)))
+        genome[:, SPEED] = cfg['maxSpeed'] + (self.rng.random(count) - 0.5) * 0.4
+        genome[:, SIZE] = cfg['size'] + (self.rng.random(count) - 0.5) * 3
+        genome[:, SENSITIVITY] = self.rng.random(count)
+        return genome
+
+    def _add(self, kind, points, genome, generation):
+        """Дописывает агентов в свободный хвост; не поместившиеся отбрасываются"""
+        count = min(len(points), self.capacity - self.n)
+        if count <= 0:
+            return 0
+        cfg = self.config['agents'][KINDS[kind]]
+        s = slice(self.n, self.n + count)
+        self.pos[s] = points[:count]
+        self.vel[s] = _random_units(self.rng, count) * (self.rng.random(count) * 2)[:, None]
+        self.energy[s] = cfg['initialEnergy']
+        self.genome[s] = genome[:count]
+        self.kind[s] = kind
+        self.state[s] = WANDER
+        self.age[s] = 0
+        self.generation[s] = generation[:count]
+        self.kick[s] = self.frame
+        self.n += count
+        return count
+
+    def _compact(self, dead):
+        """
+        Убирает погибших (маска длины n) на месте: дыры в префиксе новой
+        длины заполняются живыми агентами из хвоста. Порядок агентов не
+        сохраняется.
+        """
+        alive = self.n - int(dead.sum())
+        holes = np.flatnonzero(dead[:alive])
+        movers = alive + np.flatnonzero(~dead[alive:])
+        if len(holes):
+            for buffer in self._buffers:
+                buffer[holes] = buffer[movers]
+        self.n = alive
+
+    # ----- шаг -----
+
+    def _per_kind(self, key, kind):
+        """Параметр конфигурации для каждого агента по его типу"""
+        agents = self.config['agents']
+        return np.where(kind == HERBIVORE, agents['herbivore'][key], agents['predator'][key])
+
+    @staticmethod
+    def _claim(rng, claimants, targets):
+        """Индексы claimants, получивших свою цель: одна цель - один случайный претендент"""
+        if not len(claimants):
+            return claimants
+        order = rng.permutation(len(claimants))
+        _, first = np.unique(targets[order], return_index=True)
+        return claimants[order[first]]
+
+    def step(self):
+        """Один кадр Environment.update"""
+        self.frame += 1
+        n = self.n
+        if not n:
+            self._spawn_food()
+            return
+        cfg = self.config
+        herb_cfg, pred_cfg = cfg['agents']['herbivore'], cfg['agents']['predator']
+        pos, vel, energy, genome = self.pos[:n], self.vel[:n], self.energy[:n], self.genome[:n]
+        kind, state = self.kind[:n], self.state[:n]
+        speed, size, sensitivity = genome[:, SPEED], genome[:, SIZE], genome[:, SENSITIVITY]
+        herbs = np.flatnonzero(kind == HERBIVORE)
+        preds = np.flatnonzero(kind == PREDATOR)
+        force = self._per_kind('maxForce', kind)
+        acc = np.zeros((n, 2))
+        dead = np.zeros(n, dtype=bool)
+
+        # 1. Обход препятствий по касательной (avoidObstacleSmart)
+        safe = cfg['obstacles']['safeDistance']
+        # Яда и препятствий обычно меньше, чем агентов: ищем от них по сетке агентов
+        agents = CellGrid(pos, max(herb_cfg['vision']['poison'], pred_cfg['vision']['poison'], 1.0),
+                          self.width, self.height)
+        q, j, away, dist = self._obstacle_pairs(pos, safe, agents)
+        near = dist > 0
+        q, j, away, dist = q[near], j[near], away[near], dist[near]
+        direction = -away / dist[:, None]
+        reach = self.obstacle_reach[j] + safe
+        strength = (reach - dist) / reach
+        tangent = np.column_stack((-direction[:, 1], direction[:, 0]))
+        tangent[np.einsum('ij,ij->i', vel[q], tangent) < 0] *= -1
+        np.add.at(acc, q, (tangent * 0.8 - direction * 1.5) * strength[:, None])
+
+        # 2. Яд: урон при касании и бегство, зависящее от poisonSensitivity
+        if len(self.poison):
+            poison_size = cfg['poison']['size']
+            vision = np.where(kind == HERBIVORE, herb_cfg['vision']['poison'], pred_cfg['vision']['poison'])
+            radius = max(float(vision.max()), float(size.max()) + poison_size)
+            j, q, d2 = agents.pairs(self.poison, radius)
+            dist = np.sqrt(d2)
+            touch = dist < size[q] + poison_size
+            np.subtract.at(energy, q[touch], cfg['poison']['damage'])
+            detection = vision[q] * sensitivity[q]
+            seen = np.flatnonzero(dist < detection)
+            if len(seen):
+                a = q[seen]
+                strength = (detection[seen] - dist[seen]) / detection[seen]
+                weight = self._per_kind('poisonAvoid', kind[a]) * sensitivity[a] * strength
+                flee = _steer(pos[a] - self.poison[j[seen]], vel[a], speed[a], force[a])
+                np.add.at(acc, a, flee * weight[:, None])
+
+        # 3. Травоядные: бегство от хищника, еда или блуждание. Пары
+        # (хищник, травоядное) в радиусе зрения хищника нужны и для охоты
+        state[:] = WANDER
+        prey = np.full(len(preds), -1, dtype=np.int64)
+        threat = np.full(len(herbs), -1, dtype=np.int64)
+        if len(herbs) and len(preds):
+            radius = max(pred_cfg['vision']['prey'], herb_cfg['vision']['predator'])
+            grid = CellGrid(pos[herbs], radius, self.width, self.height)
+            p, h, d2 = grid.pairs(pos[preds], radius)
+            seen = d2 < pred_cfg['vision']['prey'] ** 2
+            prey, _ = nearest_pairs(len(preds), p[seen], h[seen], d2[seen])
+            seen = np.flatnonzero(d2 < herb_cfg['vision']['predator'] ** 2)
+            order = np.argsort(h[seen], kind='stable')
+            seen = seen[order]
+            threat, _ = nearest_pairs(len(herbs), h[seen], p[seen], d2[seen])
+        if len(herbs):
+            hpos = pos[herbs]
+            fleeing = threat >= 0
+            if fleeing.any():
+                a = herbs[fleeing]
+                steer = _steer(pos[a] - pos[preds[threat[fleeing]]], vel[a], speed[a], force[a])
+                acc[a] += steer * herb_cfg['forces']['avoid']
+                state[a] = AVOID_PREDATOR
+
+            free = ~fleeing
+            target = np.full(len(herbs), -1, dtype=np.int64)
+            if self.n_food and free.any():
+                food = self.food[:self.n_food]
+                grid = CellGrid(food, herb_cfg['vision']['food'], self.width, self.height)
+                target[free], _ = grid.nearest(hpos[free], herb_cfg['vision']['food'])
+                seeking = target >= 0
+                seeking[seeking] = ~self.food_unsafe[target[seeking]]
+                if seeking.any():
+                    a = herbs[seeking]
+                    goal = food[target[seeking]]
+                    acc[a] += _steer(goal - pos[a], vel[a], speed[a], force[a]) * herb_cfg['forces']['seek']
+                    state[a] = SEEK_FOOD
+                    d = goal - pos[a]
+                    touch = np.einsum('ij,ij->i', d, d) < (size[a] + cfg['food']['size']) ** 2
+                    winners = self._claim(self.rng, np.flatnonzero(touch), target[seeking][touch])
+                    if len(winners):
+                        energy[a[winners]] += cfg['food']['energy']
+                        eaten = np.zeros(self.n_food, dtype=bool)
+                        eaten[target[seeking][winners]] = True
+                        kept = np.flatnonzero(~eaten)
+                        self.food[:len(kept)] = food[kept]
+                        self.food_unsafe[:len(kept)] = self.food_unsafe[kept]
+                        self.n_food = len(kept)
+            wandering = herbs[state[herbs] == WANDER]
+            acc[wandering] += _random_units(self.rng, len(wandering)) * herb_cfg['forces']['wander']
+
+        # 4. Хищники: охота на ближайшее травоядное или блуждание
+        if len(preds):
+            hunting = prey >= 0
+            a = preds[hunting]
+            victims = herbs[prey[hunting]]
+            acc[a] += _steer(pos[victims] - pos[a], vel[a], speed[a], force[a]) * pred_cfg['huntForce']
+            state[a] = HUNT
+            d = pos[victims] - pos[a]
+            touch = np.flatnonzero(np.einsum('ij,ij->i', d, d) < (size[a] + size[victims]) ** 2)
+            winners = self._claim(self.rng, touch, victims[touch])
+            energy[a[winners]] += energy[victims[winners]] * pred_cfg['preyEnergy']
+            dead[victims[winners]] = True
+            self.eaten += len(winners)
+            wandering = preds[~hunting]
+            acc[wandering] += _random_units(self.rng, len(wandering)) * pred_cfg['wander']
+
+        # 5. Физика (Agent.update): толчок раз в интервал, Эйлер, стенки, энергия
+        due = np.flatnonzero(self.frame - self.kick[:n] > cfg['environment']['randomMovementInterval'])
+        acc[due] += _random_units(self.rng, len(due)) * 0.1
+        self.kick[due] = self.frame
+        _limit(acc, force)
+        vel += acc
+        _limit(vel, speed)
+        pos += vel
+        bounced = np.zeros(n, dtype=bool)
+        for axis, extent in ((0, self.width), (1, self.height)):
+            low, high = pos[:, axis] <= size, pos[:, axis] >= extent - size
+            pos[:, axis] = np.where(low, size, np.where(high, extent - size, pos[:, axis]))
+            hit = low | high
+            vel[hit, axis] *= -1
+            bounced |= hit
+        vel[bounced] *= 0.5
+        self.age[:n] += 1
+        moved = np.sqrt(np.einsum('ij,ij->i', vel, vel))
+        energy -= self._per_kind('metabolismCost', kind) + self._per_kind('movementCost', kind) * moved
+        np.minimum(energy, self._per_kind('maxEnergy', kind), out=energy)
+
+        # 6. Выталкивание из препятствий (handleObstacleCollisions)
+        q, j, away, dist = self._obstacle_pairs(pos, size + 2)
+        near_any = np.zeros(n, dtype=bool)
+        near_any[q] = True
+        hit = dist > 0
+        q, j, away, dist = q[hit], j[hit], away[hit], dist[hit]
+        direction = away / dist[:, None]
+        np.add.at(pos, q, direction * (self.obstacle_reach[j] + size[q] + 3 - dist)[:, None])
+        inward = np.minimum(np.einsum('ij,ij->i', vel[q], direction), 0)
+        np.subtract.at(vel, q, direction * inward[:, None])
+        vel *= (0.3 ** np.bincount(q, minlength=n))[:, None]
+        vel[near_any] *= 0.7
+
+        # 7. Размножение и гибель
+        dead |= energy <= 0
+        offspring = [self._reproduce(k, dead) for k in (HERBIVORE, PREDATOR)]
+        self.deaths += int(dead.sum())
+        self._compact(dead)
+        for k, (points, child, generation) in enumerate(offspring):
+            self.births += self._add(k, points, child, generation)
+
+        # 8. Еда пополняется до максимума
+        self._spawn_food()
+
+    def _unsafe_food(self, food):
+        """Еда ближе poisonMargin к яду или рядом с препятствием (проверка foodSafe)"""
+        cfg = self.config['food']
+        unsafe = np.zeros(len(food), dtype=bool)
+        if len(self.poison) and len(food):
+            grid = CellGrid(food, max(cfg['poisonMargin'], 1.0), self.width, self.height)
+            _, q, _ = grid.pairs(self.poison, cfg['poisonMargin'])
+            unsafe[q] = True
+        q, _, _, _ = self._obstacle_pairs(food, cfg['obstacleMargin'])
+        unsafe[q] = True
+        return unsafe
+
+    def _reproduce(self, kind, dead):
+        """Потомки одного типа (handleReproduction, Agent.reproduce)"""
+        n = self.n
+        name = KINDS[kind]
+        cfg = self.config['agents'][name]
+        limits = self.config['limits']
+        members = (self.kind[:n] == kind) & ~dead
+        empty = (np.empty((0, 2)), np.empty((0, len(GENES))), np.empty(0, dtype=np.int64))
+        if members.sum() >= limits[name + 's']:
+            return empty
+        parents = np.flatnonzero(members & (self.rng.random(n) < cfg['reproductionChance'])
+                                 & (self.energy[:n] > cfg['reproductionThreshold']))
+        if not len(parents):
+            return empty
+        # Все родители тратят энергию, но в мир попадают лишь первые births потомков
+        self.energy[parents] *= 0.6
+        parents = parents[:limits[name + 'Births']]
+        count = len(parents)
+        rate = self.config['simulation']['mutationRate']
+        points = self.pos[parents] + self.rng.random((count, 2)) * 40 - 20
+        child = self.genome[parents].copy()
+        child[:, SPEED] += (self.rng.random(count) - 0.5) * 0.3 * rate
+        child[:, SIZE] = np.maximum(4, child[:, SIZE] + (self.rng.random(count) - 0.5) * 2 * rate)
+        child[:, SENSITIVITY] = np.clip(child[:, SENSITIVITY] + (self.rng.random(count) - 0.5) * 0.3 * rate, 0, 1)
+        return points, child, self.generation[parents] + 1
+
+    # ----- прогон и статистика -----
+
+    @property
+    def extinct(self):
+        return self.n == 0
+
+    def stats(self):
+        """getStats лабы плюс состояния автомата и средние гены по типам"""
+        n = self.n
+        kind, state, energy = self.kind[:n], self.state[:n], self.energy[:n]
+        result = {
+            'frame': self.frame,
+            'time': self.frame // FPS,
+            'generation': int(self.generation[:n].max()) if n else 0,
+            'food': self.n_food,
+            'obstacles': len(self.obstacles),
+            'poison': len(self.poison),
+            'births': self.births,
+            'deaths': self.deaths,
+            'eaten': self.eaten,
+            'states': dict(zip(STATES, np.bincount(state, minlength=len(STATES)).tolist())),
+            'avgEnergy': {},
+            'genome': {},
+        }
+        for k, name in enumerate(KINDS):
+            members = kind == k
+            count = int(members.sum())
+            result[name + 's'] = count
+            result['avgEnergy'][name + 's'] = round(float(energy[members].mean()), 2) if count else 0
+            result['genome'][name + 's'] = (
+                dict(zip(GENES, np.round(self.genome[:n][members].mean(axis=0), 4).tolist())) if count else None
+            )
+        return result
+
+    def snapshot(self, limit=None):
+        """Агенты и среда для отрисовки (limit - не больше стольких агентов)"""
+        n = self.n if limit is None else min(self.n, int(limit))
+        return {
+            'agents': {
+                'x': np.round(self.pos[:n, 0], 2).tolist(),
+                'y': np.round(self.pos[:n, 1], 2).tolist(),
+                'type': [KINDS[k] for k in self.kind[:n]],
+                'state': [STATES[s] for s in self.state[:n]],
+                'size': np.round(self.genome[:n, SIZE], 2).tolist(),
+                'energy': np.round(self.energy[:n], 1).tolist(),
+            },
+            'food': np.round(self.food[:self.n_food], 2).tolist(),
+            'poison': np.round(self.poison, 2).tolist(),
+            'obstacles': [
+                {'x': round(float(c[0]), 2), 'y': round(float(c[1]), 2),
+                 'width': round(float(2 * r[0]), 2), 'height': round(float(2 * r[1]), 2)}
+                for c, r in zip(self.obstacles, self.obstacle_radii)
+            ],
+        }
+
+    def run(self, steps, every=FPS, time_limit=None):
+        """
+        steps кадров без отрисовки; до вымирания или time_limit секунд.
+        history - статистика каждые every кадров.
+        """
+        started = time.perf_counter()
+        history = []
+        done = 0
+        stopped = None
+        while done < steps:
+            if self.extinct:
+                stopped = 'extinct'
+                break
+            if time_limit is not None and time.perf_counter() - started > time_limit:
+                stopped = 'time'
+                break
+            self.step()
+            done += 1
+            if every and self.frame % every == 0:
+                history.append(self.stats())
+        elapsed = time.perf_counter() - started
+        if stopped is None and self.extinct:
+            stopped = 'extinct'
+        return {
+            'steps': done,
+            'stopped': stopped,
+            'extinct': self.extinct,
+            'elapsed': round(elapsed, 4),
+            'stepsPerSecond': round(done / elapsed, 2) if elapsed > 0 else None,
+            'stats': self.stats(),
+            'history': history,
+        }
@@ -0,0 +1,326 @@
+"""
+Детерминированные конечные автоматы на массивах переходов.
+
+Функция переходов хранится плотной таблицей table[state, symbol] (int32,
+-1 - перехода нет), состояния и символы пронумерованы, имена хранятся
+отдельно. Этого достаточно для автоматов в сотни тысяч состояний, тогда
+как табличный алгоритм минимизации в лабах dfa_minimization и statecraft
+квадратичен по числу состояний.
+
+Минимизация - алгоритм Хопкрофта O(n·|Σ|·log n) на структуре
+уточняемого разбиения (Valmari, Lehtinen), с предварительным удалением
+недостижимых состояний. Каноническая нумерация (обход в ширину от
+начального состояния по символам в порядке сортировки) делает
+эквивалентные минимальные автоматы побайтно одинаковыми.
+
+Формат JSON - как у лабы dfa_minimization
+({states, alphabet, startState, finalStates, transitions: {q: {a: p}}});
+читаются также экспорт ДКА из nfa_to_dfa
+({states: [{id, start, final}], transitions: [{from, to, sym}]}) и toDict
+автомата из dfa_simulator ({states, transitions: [{from_state, to_state,
+symbol}], start_state, final_states}).
+"""
+
+import numpy as np
+
+
+class DFA:
+    """
+    ДКА: table (n, k), start, accepting (bool, n), alphabet - список
+    символов в порядке столбцов, names - имена состояний.
+    """
+
+    def __init__(self, table, start, accepting, alphabet, names=None):
+        self.table = np.asarray(table, dtype=np.int32).reshape(len(accepting), len(alphabet))
+        self.start = int(start)
+        self.accepting = np.asarray(accepting, dtype=bool)
+        self.alphabet = [str(a) for a in alphabet]
+        self.names = [str(i) for i in range(self.n)] if names is None else [str(s) for s in names]
+        if len(self.names) != self.n:
+            raise ValueError("Число имён не совпадает с числом состояний")
+        if not 0 <= self.start < self.n:
+            raise ValueError("Начальное состояние вне автомата")
+        if self.table.size and (self.table.min() < -1 or self.table.max() >= self.n):
+            raise ValueError("Переход ведёт в несуществующее состояние")
+
+    @property
+    def n(self):
+        return self.accepting.size
+
+    @property
+    def is_complete(self):
+        return not (self.table < 0).any()
+
+    # ----- JSON -----
+
+    @classmethod
+    def from_json(cls, data):
+        """ДКА из JSON лаб dfa_minimization, dfa_simulator или экспорта nfa_to_dfa"""
+        raw_states = data.get('states') or []
+        alphabet = [str(a) for a in data.get('alphabet') or []]
+        if 'start_state' in data:
+            # Формат toDict лабы dfa_simulator: алфавит - символы переходов
+            names = [str(s) for s in raw_states]
+            start = data.get('start_state')
+            finals = {str(s) for s in data.get('final_states') or []}
+            edges = [(str(t['from_state']), str(t['symbol']), str(t['to_state']))
+                     for t in data.get('transitions') or []]
+            alphabet = alphabet or sorted({a for _, a, _ in edges})
+            # Как fromDict: состояния из переходов добавляются, даже если их нет в списке
+            known = set(names)
+            names += sorted({x for q, _, p in edges for x in (q, p)} - known)
+        elif raw_states and isinstance(raw_states[0], dict):
+            names = [str(s['id']) for s in raw_states]
+            starts = [str(s['id']) for s in raw_states if s.get('start')]
+            start = starts[0] if starts else None
+            finals = {str(s['id']) for s in raw_states if s.get('final')}
+            edges = [(str(t['from']), str(t.get('sym', t.get('symbol'))), str(t['to']))
+                     for t in data.get('transitions') or []]
+        else:
+            names = [str(s) for s in raw_states]
+            start = data.get('startState')
+            finals = {str(s) for s in data.get('finalStates') or data.get('acceptStates') or []}
+            edges = [(str(q), str(a), str(p))
+                     for q, row in (data.get('transitions') or {}).items() for a, p in row.items()]
+
+        index = {name: i for i, name in enumerate(names)}
+        symbols = {a: j for j, a in enumerate(alphabet)}
+        if start is None or str(start) not in index:
+            raise ValueError("Не указано начальное состояние")
+        table = np.full((len(names), len(alphabet)), -1, dtype=np.int32)
+        for q, a, p in edges:
+            if q not in index or p not in index:
+                raise ValueError(f"Переход {q} --{a}--> {p} ссылается на неизвестное состояние")
+            if a not in symbols:
+                raise ValueError(f"Символ {a} не входит в алфавит")
+            table[index[q], symbols[a]] = index[p]
+        accepting = np.zeros(len(names), dtype=bool)
+        accepting[[index[f] for f in finals if f in index]] = True
+        return cls(table, index[str(start)], accepting, alphabet, names)
+
+    def to_json(self):
+        """JSON в формате лабы dfa_minimization"""
+        transitions = {}
+        for q, row in enumerate(self.table.tolist()):
+            transitions[self.names[q]] = {a: self.names[p] for a, p in zip(self.alphabet, row) if p >= 0}
+        return {
+            'states': list(self.names),
+            'alphabet': list(self.alphabet),
+            'startState': self.names[self.start],
+            'finalStates': [self.names[q] for q in np.flatnonzero(self.accepting)],
+            'transitions': transitions,
+        }
+
+    # ----- преобразования -----
+
+    def reachable(self):
+        """Маска состояний, достижимых из начального (обход фронтом)"""
+        seen = np.zeros(self.n, dtype=bool)
+        seen[self.start] = True
+        frontier = np.array([self.start])
+        while frontier.size:
+            nxt = self.table[frontier].ravel()
+            nxt = np.unique(nxt[nxt >= 0])
+            frontier = nxt[~seen[nxt]]
+            seen[frontier] = True
+        return seen
+
+    def subset(self, keep):
+        """Автомат на состояниях из маски keep (переходы наружу пропадают)"""
+        keep = np.asarray(keep, dtype=bool)
+        remap = np.full(self.n + 1, -1, dtype=np.int32)
+        remap[:-1][keep] = np.arange(int(keep.sum()), dtype=np.int32)
+        # remap[-1] == -1, так что отсутствующие переходы остаются -1
+        table = remap[self.table[keep]]
+        names = [name for name, k in zip(self.names, keep) if k]
+        return DFA(table, remap[self.start], self.accepting[keep], self.alphabet, names)
+
+    def prune(self):
+        """Удаляет недостижимые состояния"""
+        return self.subset(self.reachable())
+
+    def completed(self):
+        """
+        Полный автомат: недостающие переходы ведут в новое отвергающее
+        состояние-сток (последнее по номеру). Полный автомат возвращается как есть.
+        """
+        if self.is_complete:
+            return self
+        sink = self.n
+        table = np.vstack([self.table, np.full((1, len(self.alphabet)), sink, dtype=np.int32)])
+        table[table < 0] = sink
+        return DFA(table, self.start, np.append(self.accepting, False), self.alphabet, self.names + ['∅'])
+
+    def canonical(self):
+        """
+        Каноническая нумерация: столбцы по отсортированному алфавиту,
+        состояния - в порядке обхода в ширину от начального.
+        Недостижимые состояния отбрасываются.
+        """
+        order = sorted(range(len(self.alphabet)), key=lambda j: self.alphabet[j])
+        table = self.table[:, order]
+        rows = table.tolist()
+        number = {self.start: 0}
+        queue = [self.start]
+        for q in queue:
+            for p in rows[q]:
+                if p >= 0 and p not in number:
+                    number[p] = len(queue)
+                    queue.append(p)
+        remap = np.full(self.n + 1, -1, dtype=np.int32)
+        remap[queue] = np.arange(len(queue), dtype=np.int32)
+        return DFA(remap[table[queue]], 0, self.accepting[queue],
+                   [self.alphabet[j] for j in order], [self.names[q] for q in queue])
+
+    # ----- минимизация -----
+
+    def equivalence_classes(self):
+        """Номер класса эквивалентности (Хопкрофт) для каждого состояния полного автомата"""
+        if not self.is_complete:
+            raise ValueError("Разбиение на классы строится только для полного автомата")
+        return hopcroft(self.table, self.accepting)
+
+    def minimize(self):
+        """
+        Минимальный автомат и классы: (dfa, classes), где classes[i] -
+        список имён исходных состояний, слитых в состояние i.
+
+        Частичный автомат дополняется стоком, а класс стока после
+        минимизации снова убирается, так что частичность сохраняется.
+        """
+        pruned = self.prune()
+        full = pruned.completed()
+        # Классы нумеруются в порядке первых вхождений, чтобы результат не зависел от хода алгоритма
+        _, rep, block = np.unique(full.equivalence_classes(), return_index=True, return_inverse=True)
+        order = np.argsort(rep)
+        relabel = np.empty_like(order)
+        relabel[order] = np.arange(order.size)
+        block, rep = relabel[block.ravel()], rep[order]
+        blocks = rep.size
+        table = block[full.table[rep]]
+        accepting = full.accepting[rep]
+
+        members = [[] for _ in range(blocks)]
+        for q, b in enumerate(block[:pruned.n].tolist()):
+            members[b].append(pruned.names[q])
+        names = [m[0] if len(m) == 1 else '{' + ','.join(m) + '}' for m in members]
+        result = DFA(table, block[full.start], accepting, full.alphabet, names)
+
+        if full is not pruned:
+            dead = block[pruned.n]
+            result.table[result.table == dead] = -1
+            # Если язык пуст, сток - это само начальное состояние, его оставляем
+            if dead != result.start:
+                members = [m for b, m in enumerate(members) if b != dead]
+                result = result.subset(np.arange(blocks) != dead)
+        return result, members
+
+    def accepts(self, word):
+        q = self.start
+        column = {a: j for j, a in enumerate(self.alphabet)}
+        for symbol in word:
+            j = column.get(symbol)
+            if j is None:
+                return False
+            q = int(self.table[q, j])
+            if q < 0:
+                return False
+        return bool(self.accepting[q])
+
+
+def equivalent(a, b):
+    """Эквивалентность ДКА: совпадение канонических форм минимальных автоматов"""
+    if sorted(a.alphabet) != sorted(b.alphabet):
+        return False
+    # Сравниваются полные автоматы, иначе пустой язык со стоком и без него разойдутся
+    ma, mb = (d.completed().minimize()[0].canonical() for d in (a, b))
+    return (ma.n == mb.n and np.array_equal(ma.table, mb.table)
+            and np.array_equal(ma.accepting, mb.accepting))
+
+
+# =============================================================================
+# АЛГОРИТМ ХОПКРОФТА
+# =============================================================================
+
+def hopcroft(table, labels):
+    """
+    Разбиение состояний полного автомата на классы эквивалентности.
+
+    labels - начальная раскраска состояний: для ДКА это признак
+    допускающего состояния, для автоматов с выходом (transducer.py) -
+    номер выхода. Состояния разных цветов в один класс не попадают.
+
+    Разбиение хранится массивами: elems упорядочен по блокам, блок b
+    занимает elems[first[b]:end[b]], помеченные элементы собираются в
+    начале блока до mid[b]. При расщеплении новым блоком становится
+    меньшая часть, и в очередь достаточно положить только её по всем
+    символам - это и даёт оценку O(n·|Σ|·log n).
+    """
+    table = np.asarray(table)
+    n, k = table.shape
+    # Обратные переходы по каждому символу в виде CSR: pred[a][ptr[a][q]:ptr[a][q + 1]]
+    pred, ptr = [], []
+    for a in range(k):
+        column = table[:, a]
+        pred.append(np.argsort(column, kind='stable').tolist())
+        ptr.append(np.concatenate([[0], np.cumsum(np.bincount(column, minlength=n))]).tolist())
+
+    # Для bool-меток допускающие состояния идут первым блоком
+    labels = np.asarray(labels)
+    keys = ~labels if labels.dtype == bool else labels
+    elems = np.argsort(keys, kind='stable').tolist()
+    loc = [0] * n
+    for i, q in enumerate(elems):
+        loc[q] = i
+    bounds = np.flatnonzero(np.diff(keys[elems])) + 1 if n else np.zeros(0, dtype=np.int64)
+    first = [0] + bounds.tolist() if n else []
+    end = bounds.tolist() + [n] if n else []
+    sidx = [0] * n
+    for b in range(len(first)):
+        for i in range(first[b], end[b]):
+            sidx[elems[i]] = b
+    mid = list(first)
+
+    # В очередь - все начальные блоки, кроме самого большого
+    waiting = []
+    if len(first) > 1:
+        largest = max(range(len(first)), key=lambda b: end[b] - first[b])
+        waiting = [(b, a) for b in range(len(first)) if b != largest for a in range(k)]
+
+    while waiting:
+        splitter, a = waiting.pop()
+        pa, pp = pred[a], ptr[a]
+        touched = []
+        for q in elems[first[splitter]:end[splitter]]:
+            for p in pa[pp[q]:pp[q + 1]]:
+                b = sidx[p]
+                i, j = loc[p], mid[b]
+                if i >= j:
+                    if i != j:
+                        other = elems[j]
+                        elems[i], elems[j] = other, p
+                        loc[other], loc[p] = i, j
+                    if j == first[b]:
+                        touched.append(b)
+                    mid[b] = j + 1
+        for b in touched:
+            j = mid[b]
+            if j == end[b]:
+                mid[b] = first[b]
+                continue
+            z = len(first)
+            if j - first[b] <= end[b] - j:
+                first.append(first[b])
+                end.append(j)
+                first[b] = j
+            else:
+                first.append(j)
+                end.append(end[b])
+                end[b] = j
+            mid[b] = first[b]
+            mid.append(first[z])
+            for i in range(first[z], end[z]):
+                sidx[elems[i]] = z
+            waiting.extend((z, c) for c in range(k))
+
+    return np.asarray(sidx, dtype=np.int64)
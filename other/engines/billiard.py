@@ -0,0 +1,662 @@
+"""
+Событийная модель бильярдного компьютера.
+
+billiard_computer/js двигает шары фиксированными подшагами и на каждом
+проверяет шары и стены попарно. Здесь время идёт от события к событию:
+
+- очередь (heapq) предсказанных столкновений шар-шар, шар-стена и
+  пересечений клеток сетки. Событие хранит счётчики столкновений своих
+  шаров; если шар с тех пор сменил скорость, событие устарело и
+  выбрасывается при извлечении (ленивая инвалидация). Когда устаревших
+  становится слишком много, очередь чистится целиком;
+- шары не двигаются на каждом событии: у шара своё время t0, положение
+  на момент t - x + vx (t - t0). Событие затрагивает только свои шары;
+- равномерная сетка (spatial hash): шар предсказывает столкновения лишь с
+  шарами соседних 3x3 клеток и стенами своей клетки, а при переходе в
+  новую клетку - досчитывает новых соседей. Клетка не меньше диаметра
+  шара, поэтому сталкивающиеся шары всегда в соседних клетках.
+
+Стены - отрезки; прямоугольник (стена лабы) - четыре отрезка. Детектор
+(выход лабы) - прямоугольник, захватывающий шар, центр которого пересёк
+его границу.
+
+Поверх модели - компилятор схем бильярдной машины Фредкина-Тоффоли (BBM)
+на решётке: шары радиуса 1 движутся по диагоналям со скоростью (±1, ±1),
+вентиль взаимодействия - место встречи двух шаров, зеркала поворачивают
+траектории. Вентили задаются портами, порты сцепляются зеркалами, а
+таблица истинности снимается прогоном модели на всех входах.
+"""
+
+import heapq
+import itertools
+import math
+import time
+
+import numpy as np
+
+
+MAX_EVENTS = 50_000_000
+# Не больше клеток в сетке
+MAX_CELLS = 1 << 20
+EPS = 1e-9
+# Очередь чистится, когда в ней больше PURGE_FACTOR событий на шар и вдвое
+# больше, чем осталось после прошлой чистки
+PURGE_FACTOR = 16
+
+# Виды событий
+BALL, SEGMENT, CELL = 0, 1, 2
+# Назначение отрезка
+WALL, ESCAPE = -1, -2
+
+LAB_BOUNDS = (0.0, 0.0, 1280.0, 720.0)
+LAB_SPEED = 180.0
+LAB_RADIUS = 24.0
+
+
+class Scene:
+    """
+    Шары (x, y, vx, vy, r, m, метка), отрезки (ax, ay, bx, by, назначение:
+    WALL, ESCAPE или номер детектора) и имена детекторов.
+    """
+
+    def __init__(self, bounds=None, absorbing=False):
+        self.balls = []
+        self.segments = []
+        self.detectors = []
+        self.bounds = bounds
+        self.absorbing = absorbing
+
+    def add_ball(self, x, y, vx, vy, r=1.0, m=1.0, label=None):
+        if r <= 0 or m <= 0:
+            raise ValueError("Радиус и масса шара должны быть положительными")
+        self.balls.append((float(x), float(y), float(vx), float(vy), float(r), float(m),
+                           label if label is not None else f'b{len(self.balls) + 1}'))
+
+    def add_segment(self, ax, ay, bx, by, kind=WALL):
+        if ax == bx and ay == by:
+            raise ValueError("Отрезок нулевой длины")
+        self.segments.append((float(ax), float(ay), float(bx), float(by), kind))
+
+    def add_rect(self, cx, cy, width, height, angle=0.0, kind=WALL):
+        """Прямоугольник с центром (cx, cy), повёрнутый на angle"""
+        c, s = math.cos(angle), math.sin(angle)
+        hw, hh = width / 2, height / 2
+        corners = [(cx + c * dx - s * dy, cy + s * dx + c * dy)
+                   for dx, dy in ((-hw, -hh), (hw, -hh), (hw, hh), (-hw, hh))]
+        for (ax, ay), (bx, by) in zip(corners, corners[1:] + corners[:1]):
+            self.add_segment(ax, ay, bx, by, kind)
+
+    def add_detector(self, name, cx, cy, width, height, angle=0.0):
+        self.detectors.append(name)
+        self.add_rect(cx, cy, width, height, angle, kind=len(self.detectors) - 1)
+
+    @classmethod
+    def from_lab(cls, data, inputs=None):
+        """
+        Сцена из пресета лабы: стены и выходы - повёрнутые прямоугольники
+        (x, y - левый верхний угол до поворота), входы выпускают шары как
+        spawnBallAtInput. inputs - метки или id выбранных входов (None - все).
+        """
+        b = data.get('bounds') or {}
+        scene = cls(bounds=(float(b.get('x', LAB_BOUNDS[0])), float(b.get('y', LAB_BOUNDS[1])),
+                            float(b.get('width', LAB_BOUNDS[2])), float(b.get('height', LAB_BOUNDS[3]))))
+        chosen = None if inputs is None else {str(i) for i in inputs}
+        for obj in data.get('sceneObjects', []):
+            if obj.get('x') is None or obj.get('y') is None:
+                continue
+            w, h = float(obj.get('width', 40)), float(obj.get('height', 40))
+            cx, cy = obj['x'] + w / 2, obj['y'] + h / 2
+            angle = float(obj.get('rotation') or 0)
+            label = (obj.get('data') or {}).get('label', obj.get('id'))
+            kind = obj.get('type')
+            if kind == 'wall':
+                scene.add_rect(cx, cy, w, h, angle)
+            elif kind == 'output':
+                scene.add_detector(str(label), cx, cy, w, h, angle)
+            elif kind == 'input':
+                if chosen is None or str(label) in chosen or obj.get('id') in chosen:
+                    scene.add_ball(cx, cy, math.cos(angle) * LAB_SPEED, math.sin(angle) * LAB_SPEED,
+                                   r=LAB_RADIUS, label=str(label))
+        for ball in data.get('balls', []):
+            scene.add_ball(ball['x'], ball['y'], ball['vx'], ball['vy'],
+                           r=ball.get('r', 8), m=ball.get('m', 1), label=ball.get('id'))
+        return scene
+
+
+# =============================================================================
+# СОБЫТИЙНАЯ МОДЕЛЬ
+# =============================================================================
+
+class Simulator:
+    """
+    Упругие столкновения шаров друг с другом и со стенами. Границы сцены -
+    стены (или поглощающие отрезки при absorbing). cell - сторона клетки
+    сетки; по умолчанию подбирается по плотности шаров.
+    """
+
+    def __init__(self, scene, cell=None):
+        balls = scene.balls
+        n = len(balls)
+        self.n = n
+        self.labels = [b[6] for b in balls]
+        self.x = [b[0] for b in balls]
+        self.y = [b[1] for b in balls]
+        self.vx = [b[2] for b in balls]
+        self.vy = [b[3] for b in balls]
+        self.r = [b[4] for b in balls]
+        self.m = [b[5] for b in balls]
+        self.t0 = [0.0] * n
+        self.count = [0] * n
+        self.alive = [True] * n
+        self.detectors = list(scene.detectors)
+        self.now = 0.0
+
+        rmax = max(self.r, default=1.0)
+        if scene.bounds is not None:
+            ox, oy, width, height = scene.bounds
+        else:
+            xs = [b[0] for b in balls] + [s[0] for s in scene.segments] + [s[2] for s in scene.segments]
+            ys = [b[1] for b in balls] + [s[1] for s in scene.segments] + [s[3] for s in scene.segments]
+            if not xs:
+                raise ValueError("Пустая сцена")
+            margin = 4 * rmax
+            ox, oy = min(xs) - margin, min(ys) - margin
+            width, height = max(xs) + margin - ox, max(ys) + margin - oy
+        if width <= 0 or height <= 0:
+            raise ValueError("Границы сцены пусты")
+        edge = ESCAPE if scene.absorbing else WALL
+        segments = list(scene.segments) + [
+            (ox, oy, ox + width, oy, edge), (ox + width, oy, ox + width, oy + height, edge),
+            (ox + width, oy + height, ox, oy + height, edge), (ox, oy + height, ox, oy, edge)]
+
+        # Отрезок: концы, единичная нормаль, направление и длина
+        self.segments = []
+        for ax, ay, bx, by, kind in segments:
+            length = math.hypot(bx - ax, by - ay)
+            ux, uy = (bx - ax) / length, (by - ay) / length
+            self.segments.append((ax, ay, bx, by, -uy, ux, ux, uy, length, kind))
+
+        if cell is None:
+            cell = max(2 * rmax, math.sqrt(width * height / max(1, n)))
+        cell = max(cell, 2 * rmax, math.sqrt(width * height / MAX_CELLS))
+        self.cell = cell
+        self.ox, self.oy = ox, oy
+        self.nx = max(1, int(math.ceil(width / cell)))
+        self.ny = max(1, int(math.ceil(height / cell)))
+        self.members = [set() for _ in range(self.nx * self.ny)]
+        self.walls = [[] for _ in range(self.nx * self.ny)]
+        for index, (ax, ay, bx, by, *_rest) in enumerate(self.segments):
+            x0, x1 = self._column(min(ax, bx) - rmax), self._column(max(ax, bx) + rmax)
+            y0, y1 = self._row(min(ay, by) - rmax), self._row(max(ay, by) + rmax)
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    self.walls[cy * self.nx + cx].append(index)
+
+        self.where = [0] * n
+        for i in range(n):
+            c = self._row(self.y[i]) * self.nx + self._column(self.x[i])
+            self.where[i] = c
+            self.members[c].add(i)
+
+        self.queue = []
+        self.purge_at = PURGE_FACTOR * max(n, 64)
+        self.sequence = itertools.count()
+        self.stats = {"collisions": 0, "bounces": 0, "crossings": 0, "stale": 0, "purges": 0}
+        self.captures = []
+        self.escaped = []
+        for i in range(n):
+            self._predict(i, self._neighbours(i), partners_after=i)
+
+    def _column(self, x):
+        return min(self.nx - 1, max(0, int((x - self.ox) // self.cell)))
+
+    def _row(self, y):
+        return min(self.ny - 1, max(0, int((y - self.oy) // self.cell)))
+
+    def _neighbours(self, i):
+        c = self.where[i]
+        cx, cy = c % self.nx, c // self.nx
+        for row in range(max(0, cy - 1), min(self.ny, cy + 2)):
+            for column in range(max(0, cx - 1), min(self.nx, cx + 2)):
+                yield from self.members[row * self.nx + column]
+
+    def _entered(self, i, axis):
+        """Шары клеток, ставших соседними после перехода i через границу по оси axis"""
+        c = self.where[i]
+        cx, cy = c % self.nx, c // self.nx
+        if axis == 0:
+            column = cx + (1 if self.vx[i] > 0 else -1)
+            if 0 <= column < self.nx:
+                for row in range(max(0, cy - 1), min(self.ny, cy + 2)):
+                    yield from self.members[row * self.nx + column]
+        else:
+            row = cy + (1 if self.vy[i] > 0 else -1)
+            if 0 <= row < self.ny:
+                for column in range(max(0, cx - 1), min(self.nx, cx + 2)):
+                    yield from self.members[row * self.nx + column]
+
+    # ----- предсказание -----
+
+    def _push(self, when, kind, a, b):
+        count = self.count
+        heapq.heappush(self.queue, (when, next(self.sequence), kind, a, b,
+                                    count[a], count[b] if kind == BALL else 0))
+
+    def _predict(self, i, partners, partners_after=-1):
+        """
+        События шара i от текущего момента: с шарами partners (номера не
+        больше partners_after пропускаются - пары при старте считаются
+        один раз), со стенами клетки и выход из клетки.
+        """
+        now = self.now
+        X, Y, VX, VY, R, T0 = self.x, self.y, self.vx, self.vy, self.r, self.t0
+        dt = now - T0[i]
+        xi, yi, vxi, vyi, ri = X[i] + VX[i] * dt, Y[i] + VY[i] * dt, VX[i], VY[i], R[i]
+
+        for j in partners:
+            if j <= partners_after and partners_after >= 0 or j == i:
+                continue
+            dt = now - T0[j]
+            dx, dy = X[j] + VX[j] * dt - xi, Y[j] + VY[j] * dt - yi
+            dvx, dvy = VX[j] - vxi, VY[j] - vyi
+            b = dx * dvx + dy * dvy
+            if b >= 0:
+                continue
+            vv = dvx * dvx + dvy * dvy
+            sigma = ri + R[j]
+            c = dx * dx + dy * dy - sigma * sigma
+            disc = b * b - vv * c
+            if disc < 0:
+                continue
+            t = 0.0 if c <= 0 else c / (-b + math.sqrt(disc))
+            self._push(now + t, BALL, i, j)
+
+        for s in self.walls[self.where[i]]:
+            t = self._hit(xi, yi, vxi, vyi, 0.0 if self.segments[s][9] >= 0 else ri, s)
+            if t is not None:
+                self._push(now + t, SEGMENT, i, s)
+
+        c = self.where[i]
+        cx, cy = c % self.nx, c // self.nx
+        tx = ty = math.inf
+        if vxi > 0 and cx + 1 < self.nx:
+            tx = (self.ox + (cx + 1) * self.cell - xi) / vxi
+        elif vxi < 0 and cx > 0:
+            tx = (self.ox + cx * self.cell - xi) / vxi
+        if vyi > 0 and cy + 1 < self.ny:
+            ty = (self.oy + (cy + 1) * self.cell - yi) / vyi
+        elif vyi < 0 and cy > 0:
+            ty = (self.oy + cy * self.cell - yi) / vyi
+        if tx < math.inf or ty < math.inf:
+            self._push(now + max(0.0, min(tx, ty)), CELL, i, 0 if tx <= ty else 1)
+
+    def _hit(self, x, y, vx, vy, r, s):
+        """Время касания отрезка s шаром радиуса r (r = 0 - центром) или None"""
+        ax, ay, bx, by, nx, ny, ux, uy, length, _ = self.segments[s]
+        best = None
+        d = (x - ax) * nx + (y - ay) * ny
+        vn = vx * nx + vy * ny
+        if d < 0:
+            d, vn = -d, -vn
+        if vn < 0 and d >= r - EPS:
+            t = max(0.0, (d - r) / -vn)
+            along = (x + vx * t - ax) * ux + (y + vy * t - ay) * uy
+            if 0 <= along <= length:
+                best = t
+        if r > 0:
+            vv = vx * vx + vy * vy
+            for ex, ey in ((ax, ay), (bx, by)):
+                dx, dy = x - ex, y - ey
+                b = dx * vx + dy * vy
+                if b >= 0:
+                    continue
+                c = dx * dx + dy * dy - r * r
+                disc = b * b - vv * c
+                if disc < 0:
+                    continue
+                t = 0.0 if c <= 0 else c / (-b + math.sqrt(disc))
+                if best is None or t < best:
+                    best = t
+        return best
+
+    # ----- обработка событий -----
+
+    def _advance(self, i):
+        dt = self.now - self.t0[i]
+        self.x[i] += self.vx[i] * dt
+        self.y[i] += self.vy[i] * dt
+        self.t0[i] = self.now
+
+    def _collide(self, i, j):
+        self._advance(i)
+        self._advance(j)
+        dx, dy = self.x[j] - self.x[i], self.y[j] - self.y[i]
+        distance = math.hypot(dx, dy) or 1.0
+        nx, ny = dx / distance, dy / distance
+        vn = (self.vx[j] - self.vx[i]) * nx + (self.vy[j] - self.vy[i]) * ny
+        if vn < 0:
+            mi, mj = self.m[i], self.m[j]
+            impulse = 2 * vn / (mi + mj)
+            self.vx[i] += impulse * mj * nx
+            self.vy[i] += impulse * mj * ny
+            self.vx[j] -= impulse * mi * nx
+            self.vy[j] -= impulse * mi * ny
+        self.count[i] += 1
+        self.count[j] += 1
+        self.stats["collisions"] += 1
+        self._predict(i, self._neighbours(i))
+        self._predict(j, self._neighbours(j))
+
+    def _remove(self, i):
+        self._advance(i)
+        self.alive[i] = False
+        self.count[i] += 1
+        self.members[self.where[i]].discard(i)
+
+    def _bounce(self, i, s):
+        ax, ay, bx, by, nx, ny, ux, uy, length, kind = self.segments[s]
+        self._advance(i)
+        if kind >= 0:
+            self.captures.append({"detector": self.detectors[kind], "ball": self.labels[i], "time": self.now})
+            self._remove(i)
+            return
+        if kind == ESCAPE:
+            self.escaped.append({"ball": self.labels[i], "time": self.now})
+            self._remove(i)
+            return
+        x, y = self.x[i], self.y[i]
+        along = (x - ax) * ux + (y - ay) * uy
+        if along < 0 or along > length:
+            # Удар о конец отрезка: нормаль от конца к центру
+            ex, ey = (ax, ay) if along < 0 else (bx, by)
+            dx, dy = x - ex, y - ey
+            distance = math.hypot(dx, dy) or 1.0
+            nx, ny = dx / distance, dy / distance
+        vn = self.vx[i] * nx + self.vy[i] * ny
+        self.vx[i] -= 2 * vn * nx
+        self.vy[i] -= 2 * vn * ny
+        self.count[i] += 1
+        self.stats["bounces"] += 1
+        self._predict(i, self._neighbours(i))
+
+    def _cross(self, i, axis):
+        self._advance(i)
+        c = self.where[i]
+        self.members[c].discard(i)
+        if axis == 0:
+            c += 1 if self.vx[i] > 0 else -1
+        else:
+            c += self.nx if self.vy[i] > 0 else -self.nx
+        self.where[i] = c
+        self.members[c].add(i)
+        self.stats["crossings"] += 1
+        # Пары со старыми соседями уже предсказаны (скорость не менялась):
+        # шары ищутся только в трёх клетках, ставших соседними
+        self._predict(i, self._entered(i, axis))
+
+    def _purge(self):
+        count = self.count
+        self.queue = [e for e in self.queue
+                      if count[e[3]] == e[5] and (e[2] != BALL or count[e[4]] == e[6])]
+        heapq.heapify(self.queue)
+        self.purge_at = max(PURGE_FACTOR * max(self.n, 64), 2 * len(self.queue))
+        self.stats["purges"] += 1
+
+    def run(self, until=math.inf, max_events=MAX_EVENTS, time_limit=None):
+        """
+        События до момента until. status: done - событий больше нет, until,
+        events, time.
+        """
+        started = time.perf_counter()
+        count = self.count
+        processed = 0
+        status = 'done'
+        while self.queue:
+            if len(self.queue) > self.purge_at:
+                self._purge()
+            event = self.queue[0]
+            when = event[0]
+            if when > until:
+                status = 'until'
+                break
+            if processed >= max_events:
+                status = 'events'
+                break
+            if time_limit is not None and processed & 0x3FF == 0 and time.perf_counter() - started > time_limit:
+                status = 'time'
+                break
+            heapq.heappop(self.queue)
+            _, _, kind, a, b, ca, cb = event
+            if count[a] != ca or kind == BALL and count[b] != cb:
+                self.stats["stale"] += 1
+                continue
+            processed += 1
+            self.now = when
+            if kind == BALL:
+                self._collide(a, b)
+            elif kind == SEGMENT:
+                self._bounce(a, b)
+            else:
+                self._cross(a, b)
+        if status == 'until' or status == 'done' and until < math.inf:
+            self.now = max(self.now, until)
+        return {
+            "status": status,
+            "time": self.now,
+            "events": processed,
+            **self.stats,
+            "queue": len(self.queue),
+            "captures": self.captures,
+            "escaped": self.escaped,
+            "alive": sum(self.alive),
+            "seconds": time.perf_counter() - started,
+        }
+
+    def positions(self):
+        """Положения и скорости живых шаров на текущий момент (numpy)"""
+        alive = np.flatnonzero(self.alive)
+        dt = self.now - np.asarray(self.t0)[alive]
+        vx, vy = np.asarray(self.vx)[alive], np.asarray(self.vy)[alive]
+        x = np.asarray(self.x)[alive] + vx * dt
+        y = np.asarray(self.y)[alive] + vy * dt
+        return alive, np.stack([x, y, vx, vy], axis=1)
+
+    def energy(self):
+        m, vx, vy = (np.asarray(a) for a in (self.m, self.vx, self.vy))
+        alive = np.asarray(self.alive)
+        return float((0.5 * m * (vx * vx + vy * vy))[alive].sum())
+
+
+# =============================================================================
+# КОМПИЛЯТОР СХЕМ BBM
+# =============================================================================
+
+DIRECTIONS = {'ne': (1, 1), 'nw': (-1, 1), 'se': (1, -1), 'sw': (-1, -1)}
+
+
+class Circuit:
+    """
+    Схема на решётке (ось y вверх), по строке на элемент, # - комментарий.
+    Точка - либо "x y dir" (dir: ne, nw, se, sw), либо "порт шаги":
+    точка порта, сдвинутая на шаги по его направлению.
+
+        interaction G x y      вентиль: шар A по порту G.a (вверх-вправо через
+                               (x, y-1)) и шар B по G.b (вниз-вправо через
+                               (x, y+1)) встречаются в момент прихода в эти
+                               точки; G.a и G.b - продолжения одиночных
+                               шаров (A не B, B не A), G.ab и G.ba -
+                               отклонённые траектории при встрече (AB)
+        input NAME точка       входной шар (есть при значении 1)
+        ball точка             шар-константа 1
+        mirror точка h|v [P]   зеркало с поворотом в точке: h отражает
+                               вертикальную составляющую, v - горизонтальную;
+                               P - имя порта после поворота
+        output NAME точка      детектор в точке
+        wall x1 y1 x2 y2       стена
+
+    Все шары стартуют в момент 0 со скоростью (±1, ±1), поэтому шар,
+    поставленный за k шагов до точки, приходит в неё в момент k.
+    """
+
+    def __init__(self, text):
+        self.ports = {}
+        self.inputs = []
+        self.constants = []
+        self.mirrors = []
+        self.outputs = []
+        self.walls = []
+        for number, line in enumerate(text.splitlines(), 1):
+            words = line.split('#', 1)[0].split()
+            if not words:
+                continue
+            try:
+                self._statement(words)
+            except (ValueError, KeyError, IndexError) as e:
+                raise ValueError(f"Строка {number}: {e}") from None
+        if not self.outputs:
+            raise ValueError("В схеме нет детекторов")
+
+    def _point(self, words):
+        """(x, y, dx, dy) и число использованных слов"""
+        if words[0] in self.ports:
+            x, y, dx, dy = self.ports[words[0]]
+            steps = float(words[1]) if len(words) > 1 else 0.0
+            return (x + dx * steps, y + dy * steps, dx, dy), 2 if len(words) > 1 else 1
+        if '.' in words[0] or len(words) < 3 or words[2] not in DIRECTIONS:
+            raise ValueError(f"Неизвестный порт или точка: {' '.join(words[:3])}")
+        dx, dy = DIRECTIONS[words[2]]
+        return (float(words[0]), float(words[1]), dx, dy), 3
+
+    def _statement(self, words):
+        op, rest = words[0], words[1:]
+        if op == 'interaction':
+            name, x, y = rest[0], float(rest[1]), float(rest[2])
+            self.ports[f'{name}.a'] = (x, y - 1, 1, 1)
+            self.ports[f'{name}.b'] = (x, y + 1, 1, -1)
+            self.ports[f'{name}.ab'] = (x, y - 1, 1, -1)
+            self.ports[f'{name}.ba'] = (x, y + 1, 1, 1)
+        elif op == 'input':
+            point, _ = self._point(rest[1:])
+            self.inputs.append((rest[0], point))
+        elif op == 'ball':
+            point, _ = self._point(rest)
+            self.constants.append(point)
+        elif op == 'mirror':
+            (x, y, dx, dy), used = self._point(rest)
+            turn = rest[used]
+            if turn == 'h':
+                # Горизонтальная стена со стороны движения по y
+                self.mirrors.append((x - 1, y + dy, x + 1, y + dy))
+                out = (x, y, dx, -dy)
+            elif turn == 'v':
+                self.mirrors.append((x + dx, y - 1, x + dx, y + 1))
+                out = (x, y, -dx, dy)
+            else:
+                raise ValueError(f"Поворот зеркала - h или v, а не {turn}")
+            if len(rest) > used + 1:
+                self.ports[rest[used + 1]] = out
+        elif op == 'output':
+            point, _ = self._point(rest[1:])
+            self.outputs.append((rest[0], point))
+        elif op == 'wall':
+            self.walls.append(tuple(float(v) for v in rest[:4]))
+        else:
+            raise ValueError(f"Неизвестный элемент: {op}")
+
+    @property
+    def names(self):
+        return [name for name, _ in self.inputs]
+
+    def scene(self, values):
+        """Сцена для набора входов values: {имя: 0/1}"""
+        scene = Scene(absorbing=True)
+        for name, (x, y, dx, dy) in self.inputs:
+            if values.get(name):
+                scene.add_ball(x, y, dx, dy, label=name)
+        for x, y, dx, dy in self.constants:
+            scene.add_ball(x, y, dx, dy, label='1')
+        for ax, ay, bx, by in self.mirrors + self.walls:
+            scene.add_segment(ax, ay, bx, by)
+        for name, (x, y, _, _) in self.outputs:
+            scene.add_detector(name, x, y, 1.0, 1.0)
+        return scene
+
+    def horizon(self):
+        """Время, за которое шар пересекает всю схему"""
+        points = [p for _, p in self.inputs + self.outputs] + self.constants
+        xs = [p[0] for p in points] + [m[0] for m in self.mirrors] + [m[2] for m in self.mirrors]
+        ys = [p[1] for p in points] + [m[1] for m in self.mirrors] + [m[3] for m in self.mirrors]
+        return 2 * (max(xs) - min(xs) + max(ys) - min(ys)) + 8
+
+    def evaluate(self, values, until=None, max_events=MAX_EVENTS, time_limit=None):
+        """
+        Сработавшие детекторы: {имя: момент прихода}. Если бюджет событий
+        или времени кончился раньше until - ValueError: ответ был бы неполным
+        """
+        simulator = Simulator(self.scene(values))
+        report = simulator.run(until=self.horizon() if until is None else until,
+                               max_events=max_events, time_limit=time_limit)
+        if report["status"] in ('events', 'time'):
+            limit = 'событий' if report["status"] == 'events' else 'времени'
+            raise ValueError(f"Моделирование схемы упёрлось в лимит {limit}")
+        fired = {}
+        for capture in report["captures"]:
+            fired.setdefault(capture["detector"], capture["time"])
+        return fired
+
+    def truth_table(self, until=None, max_events=MAX_EVENTS, time_limit=None, max_inputs=None):
+        """
+        Все наборы входов: строки {inputs, outputs (0/1), times}. Бюджет
+        событий - на каждый набор, time_limit - на всю таблицу
+        """
+        rows = []
+        names = self.names
+        if max_inputs is not None and len(names) > max_inputs:
+            raise ValueError(f"Таблица истинности строится не больше чем для {max_inputs} входов")
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        for bits in itertools.product((0, 1), repeat=len(names)):
+            values = dict(zip(names, bits))
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            fired = self.evaluate(values, until, max_events=max_events, time_limit=remaining)
+            rows.append({
+                "inputs": values,
+                "outputs": {name: int(name in fired) for name, _ in self.outputs},
+                "times": fired,
+            })
+        return rows
+
+
+EXAMPLES = {
+    "interaction": """
+        interaction G 0 0
+        input A G.a -6
+        input B G.b -6
+        output AB G.ab 6
+        output BA G.ba 6
+        output A_notB G.a 6
+        output B_notA G.b 6
+    """,
+    # Вентиль взаимодействия с константой 1 на входе B: выход G.b - NOT A
+    "not": """
+        interaction G 0 0
+        input A G.a -6
+        ball G.b -6
+        output NOT_A G.b 6
+        output A G.ab 6
+    """,
+    # AB-выход первого вентиля зеркалом заводится во второй вентиль с C.
+    # Все шары стартуют с одного x и дальше идут с одинаковым x, поэтому
+    # пересечение траекторий - всегда встреча: лишние выходы G гасятся
+    # детекторами-стоками
+    "and3": """
+        interaction G 0 0
+        input A G.a -6
+        input B G.b -6
+        output sink_a G.a 2
+        output sink_ba G.ba 2
+        mirror G.ab 4 h P
+        interaction H 10 2
+        input C H.b -16
+        output ABC H.ab 6
+    """,
+}
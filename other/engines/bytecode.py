@@ -0,0 +1,396 @@
+"""
+Байткод-исполнитель программ RAM-машины и машины Поста.
+
+Лабы ram_machine (app.js) и post_machine (PostMachine.js) на каждом шаге
+заново разбирают строку команды и сравнивают её с образцами. Здесь
+программа один раз ассемблируется в целочисленный байткод - параллельные
+массивы кодов операций, режимов адресации и аргументов с уже разрешёнными
+метками и номерами строк, - и исполняется плотным циклом диспетчеризации:
+
+- RAM: регистры - растущий array('q') из int64, аккумулятор r0 держится
+  в локальной переменной цикла и после каждой арифметической команды
+  проверяется на диапазон int64 - выход за него останавливает программу
+  ошибкой. Число регистров ограничено max_registers. Семантика команд как
+  в app.js: SUB не уходит ниже нуля, DIV - деление с округлением вниз,
+  чтение незаданного регистра даёт 0; LSHIFT/RSHIFT из README сдвигают r0.
+- Post: лента разреженная - множество отмеченных ячеек, ячейки без метки
+  не хранятся. Строки нумеруются с 1 по порядку в тексте, пустая строка
+  занимает номер, переход на неё - ошибка, как в лабе.
+
+Для каждой команды считается число исполнений (профиль по строкам
+исходника), бюджет шагов останавливает зацикленные программы со статусом
+budget (лимит времени - со статусом time), а не ошибкой - так удобно сравнивать сложность программ.
+"""
+
+import re
+import time
+from array import array
+
+
+MAX_STEPS = 100_000_000
+MAX_REGISTERS = 1 << 20
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+# Часы проверяются раз в столько шагов: шаг RAM и Поста - O(1)
+TIME_CHECK = 1 << 16
+
+RAM_OPS = ('HALT', 'READ', 'WRITE', 'NEG', 'LOAD', 'ADD', 'SUB', 'MULT', 'DIV',
+           'LSHIFT', 'RSHIFT', 'STORE', 'JUMP', 'JZ', 'JG', 'JL')
+(HALT, READ, WRITE, NEG, LOAD, ADD, SUB, MULT, DIV,
+ LSHIFT, RSHIFT, STORE, JUMP, JZ, JG, JL) = range(len(RAM_OPS))
+# Команды, которым нужен операнд-значение, и команды перехода
+VALUE_OPS = frozenset((LOAD, ADD, SUB, MULT, DIV, LSHIFT, RSHIFT))
+JUMP_OPS = frozenset((JUMP, JZ, JG, JL))
+
+# Режимы адресации операнда
+NONE, IMMEDIATE, DIRECT, INDIRECT = range(4)
+
+POST_OPS = ('V', 'X', '<', '>', '?', '!')
+MISSING, MARK, ERASE, LEFT, RIGHT, CHECK, STOP = range(7)
+POST_PATTERN = re.compile(r'^(?:([VX<>])\s+(\d+)|\?\s+(\d+);\s*(\d+)|(!))$')
+
+
+def _profile(counts, lines, source):
+    """Ненулевые счётчики по строкам исходника"""
+    text = source.split('\n')
+    return [{"line": line, "text": text[line - 1].strip(), "count": count}
+            for count, line in zip(counts, lines) if count]
+
+
+# =============================================================================
+# RAM-МАШИНА
+# =============================================================================
+
+class RAMProgram:
+    """
+    Ассемблированная программа: ops, modes, args - массивы по командам,
+    lines - номер строки исходника каждой команды. Аргумент перехода -
+    индекс целевой команды.
+    """
+
+    def __init__(self, ops, modes, args, lines, source=''):
+        self.ops = array('b', ops)
+        self.modes = array('b', modes)
+        self.args = array('q', args)
+        self.lines = list(lines)
+        self.source = source
+
+    def __len__(self):
+        return len(self.ops)
+
+    @classmethod
+    def from_text(cls, source):
+        """Ассемблер: синтаксис RAMParser из app.js"""
+        ops, modes, args, lines = [], [], [], []
+        labels, pending = {}, []
+        for number, raw in enumerate(source.split('\n'), 1):
+            line = raw.split(';', 1)[0].strip()
+            if not line:
+                continue
+            if line.endswith(':'):
+                name = line[:-1].strip()
+                if name in labels:
+                    raise ValueError(f"Дублирование метки: {name} на строке {number}")
+                labels[name] = len(ops)
+                continue
+            parts = line.split()
+            command = parts[0].upper()
+            if command not in RAM_OPS:
+                raise ValueError(f"Неизвестная команда: {command} на строке {number}")
+            op = RAM_OPS.index(command)
+            mode, arg = NONE, 0
+            if len(parts) > 1:
+                mode, arg = _operand(parts[1], number)
+                if mode is None:
+                    pending.append((len(ops), arg, number))
+            if op in JUMP_OPS and mode is not None:
+                raise ValueError(f"Переход по метке ожидается на строке {number}")
+            if op in VALUE_OPS and mode == NONE:
+                raise ValueError(f"Команде {command} нужен операнд на строке {number}")
+            if op == STORE and mode not in (DIRECT, INDIRECT):
+                raise ValueError(f"Некорректный тип адресации для STORE на строке {number}")
+            ops.append(op)
+            modes.append(mode)
+            args.append(arg)
+            lines.append(number)
+
+        # Метки: у переходов - индекс команды, у прочих - константа
+        for index, name, number in pending:
+            if name not in labels:
+                raise ValueError(f"Неопределённая метка: {name} на строке {number}")
+            modes[index] = NONE if ops[index] in JUMP_OPS else IMMEDIATE
+            args[index] = labels[name]
+        return cls(ops, modes, args, lines, source)
+
+    def run(self, inputs=(), max_steps=MAX_STEPS, registers=None, max_registers=MAX_REGISTERS,
+            time_limit=None):
+        """
+        Исполнение до HALT, конца программы, ошибки, бюджета шагов или
+        времени. status: halted, budget, time, error. registers - начальные
+        значения регистров {адрес: значение}, адреса меньше max_registers.
+        """
+        ops, modes, args = self.ops, self.modes, self.args
+        registers = {int(a): int(v) for a, v in (registers or {}).items()}
+        for address, value in registers.items():
+            if not 0 <= address < max_registers:
+                raise ValueError(f"Адрес регистра {address} вне диапазона 0..{max_registers - 1}")
+            if not INT64_MIN <= value <= INT64_MAX:
+                raise ValueError(f"Значение регистра {address} не помещается в int64")
+        size = max([1] + [a + 1 for a in registers])
+        regs = array('q', bytes(8 * size))
+        for address, value in registers.items():
+            regs[address] = value
+        inputs = [int(x) for x in inputs]
+        if any(not INT64_MIN <= x <= INT64_MAX for x in inputs):
+            raise ValueError("Входное число не помещается в int64")
+        counts = array('q', bytes(8 * len(ops)))
+        output = []
+        n, pc, steps, pointer = len(ops), 0, 0, 0
+        status, error = 'halted', None
+        started = time.perf_counter()
+
+        # r0 живёт только в локальной переменной acc: регистр 0 массива не читается
+        acc = regs[0]
+        try:
+            while pc < n:
+                if steps >= max_steps:
+                    status = 'budget'
+                    break
+                if time_limit is not None and steps % TIME_CHECK == 0 and steps \
+                        and time.perf_counter() - started > time_limit:
+                    status = 'time'
+                    break
+                steps += 1
+                counts[pc] += 1
+                op = ops[pc]
+                mode = modes[pc]
+                arg = args[pc]
+                if mode == DIRECT:
+                    value = acc if arg == 0 else regs[arg] if arg < size else 0
+                elif mode == IMMEDIATE:
+                    value = arg
+                elif mode == INDIRECT:
+                    address = acc if arg == 0 else regs[arg] if arg < size else 0
+                    value = acc if address == 0 else regs[address] if 0 < address < size else 0
+
+                if op == LOAD:
+                    acc = value
+                elif op == STORE:
+                    if mode == INDIRECT:
+                        if address < 0:
+                            raise ValueError(f"Отрицательный адрес регистра: {address}")
+                    else:
+                        address = arg
+                    if address >= max_registers:
+                        raise ValueError(f"Адрес регистра {address} больше предела {max_registers - 1}")
+                    if address >= size:
+                        regs.frombytes(bytes(8 * (max(address + 1, 2 * size) - size)))
+                        size = len(regs)
+                    if address:
+                        regs[address] = acc
+                elif op == JZ:
+                    if acc == 0:
+                        pc = arg
+                        continue
+                elif op == JG:
+                    if acc > 0:
+                        pc = arg
+                        continue
+                elif op == JL:
+                    if acc < 0:
+                        pc = arg
+                        continue
+                elif op == JUMP:
+                    pc = arg
+                    continue
+                elif op == ADD:
+                    acc += value
+                    if not INT64_MIN <= acc <= INT64_MAX:
+                        raise OverflowError
+                elif op == SUB:
+                    acc = acc - value if acc > value else 0
+                    if acc > INT64_MAX:
+                        raise OverflowError
+                elif op == MULT:
+                    acc *= value
+                    if not INT64_MIN <= acc <= INT64_MAX:
+                        raise OverflowError
+                elif op == DIV:
+                    if value == 0:
+                        raise ValueError("Деление на ноль")
+                    acc //= value
+                    if acc > INT64_MAX:
+                        raise OverflowError
+                elif op == READ:
+                    if pointer >= len(inputs):
+                        raise ValueError("Попытка чтения за пределами входной ленты")
+                    acc = inputs[pointer]
+                    pointer += 1
+                elif op == WRITE:
+                    output.append(acc)
+                elif op == NEG:
+                    acc = -acc
+                    if acc > INT64_MAX:
+                        raise OverflowError
+                elif op == LSHIFT:
+                    if value < 0:
+                        raise ValueError(f"Отрицательный сдвиг: {value}")
+                    # Сдвиг ненулевого r0 на 64 и больше переполняет всегда - не строим огромное число
+                    if acc and value >= 64:
+                        raise OverflowError
+                    acc <<= value
+                    if not INT64_MIN <= acc <= INT64_MAX:
+                        raise OverflowError
+                elif op == RSHIFT:
+                    if value < 0:
+                        raise ValueError(f"Отрицательный сдвиг: {value}")
+                    acc >>= value
+                elif op == HALT:
+                    break
+                pc += 1
+        except OverflowError:
+            status, error = 'error', f"Переполнение int64 на строке {self.lines[pc]}"
+        except ValueError as e:
+            status, error = 'error', f"{e} на строке {self.lines[pc]}"
+
+        # Незаданные регистры не возвращаются, как в лабе
+        registers = {i: v for i, v in enumerate(regs) if i and v}
+        if acc:
+            registers[0] = acc
+        return {
+            "status": status,
+            "error": error,
+            "steps": steps,
+            "pc": pc,
+            "line": self.lines[pc] if pc < n else None,
+            "output": output,
+            "registers": dict(sorted(registers.items())),
+            "seconds": time.perf_counter() - started,
+            "profile": _profile(counts, self.lines, self.source),
+        }
+
+
+def _operand(text, number):
+    """(режим, аргумент); режим None - метка, аргумент - её имя"""
+    for prefix, mode in (('[[', INDIRECT), ('[', DIRECT)):
+        if text.startswith(prefix) and text.endswith(']' * len(prefix)):
+            value = text[len(prefix):-len(prefix)]
+            if not value.isdigit():
+                kind = 'косвенная' if mode == INDIRECT else 'прямая'
+                raise ValueError(f"Некорректная {kind} адресация: {text} на строке {number}")
+            return mode, int(value)
+    try:
+        value = int(float(text))
+    except ValueError:
+        pass
+    else:
+        if not -2 ** 63 <= value < 2 ** 63:
+            raise ValueError(f"Константа {text} не помещается в int64 на строке {number}")
+        return IMMEDIATE, value
+    if not re.fullmatch(r'[a-zA-Z_][a-zA-Z0-9_]*', text):
+        raise ValueError(f"Некорректное имя метки: {text} на строке {number}")
+    return None, text
+
+
+# =============================================================================
+# МАШИНА ПОСТА
+# =============================================================================
+
+class PostProgram:
+    """
+    Ассемблированная программа машины Поста: массивы индексируются прямо
+    номером строки (0 и пустые строки - MISSING), jump/alt - номера
+    следующих строк (alt - ветка «метка есть» команды ?).
+    """
+
+    def __init__(self, ops, jump, alt, source=''):
+        self.ops = array('b', ops)
+        self.jump = array('q', jump)
+        self.alt = array('q', alt)
+        self.source = source
+
+    @classmethod
+    def from_text(cls, source):
+        """Ассемблер: синтаксис parseProgram из PostMachine.js"""
+        lines = source.strip().split('\n')
+        ops = [MISSING] * (len(lines) + 1)
+        jump = [0] * (len(lines) + 1)
+        alt = [0] * (len(lines) + 1)
+        errors = []
+        for number, raw in enumerate(lines, 1):
+            line = raw.strip()
+            if not line:
+                continue
+            match = POST_PATTERN.match(line)
+            if not match:
+                errors.append(f'Строка {number}: Неверная команда "{line}"')
+                continue
+            command, target, empty, marked, stop = match.groups()
+            if stop:
+                ops[number] = STOP
+            elif command:
+                ops[number] = POST_OPS.index(command) + 1
+                jump[number] = int(target)
+            else:
+                ops[number] = CHECK
+                jump[number], alt[number] = int(empty), int(marked)
+        if errors:
+            raise ValueError('; '.join(errors))
+        # Лаба отсчитывает строки после trim() всего текста
+        return cls(ops, jump, alt, source.strip())
+
+    def run(self, marks=(), position=0, max_steps=MAX_STEPS, time_limit=None):
+        """
+        Исполнение с первой строки. marks - номера отмеченных ячеек или
+        строка из 0/1 (V - тоже метка) с ячейки 0. status: halted, budget,
+        time, error.
+        """
+        if isinstance(marks, str):
+            marks = [i for i, c in enumerate(marks) if c in '1Vv']
+        tape = set(int(m) for m in marks)
+        ops, jump, alt = self.ops, self.jump, self.alt
+        counts = array('q', bytes(8 * len(ops)))
+        n, line, steps, pos = len(ops), 1, 0, int(position)
+        status, error = 'halted', None
+        started = time.perf_counter()
+
+        while True:
+            if steps >= max_steps:
+                status = 'budget'
+                break
+            if time_limit is not None and steps % TIME_CHECK == 0 and steps \
+                    and time.perf_counter() - started > time_limit:
+                status = 'time'
+                break
+            op = ops[line] if 0 <= line < n else MISSING
+            if op == MISSING:
+                status, error = 'error', f"Строка {line} не найдена в программе"
+                break
+            steps += 1
+            counts[line] += 1
+            if op == CHECK:
+                line = alt[line] if pos in tape else jump[line]
+            elif op == RIGHT:
+                pos += 1
+                line = jump[line]
+            elif op == LEFT:
+                pos -= 1
+                line = jump[line]
+            elif op == MARK:
+                tape.add(pos)
+                line = jump[line]
+            elif op == ERASE:
+                tape.discard(pos)
+                line = jump[line]
+            else:
+                break
+
+        return {
+            "status": status,
+            "error": error,
+            "steps": steps,
+            "line": line,
+            "position": pos,
+            "marks": sorted(tape),
+            "seconds": time.perf_counter() - started,
+            "profile": _profile(counts[1:], range(1, n), self.source),
+        }
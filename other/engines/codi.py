@@ -0,0 +1,230 @@
+"""
+Нейронный клеточный автомат CoDi (Collect and Distribute) в 3-D.
+
+Работа идёт в две фазы, каждая шагает сразу всем объёмом через сдвиги
+массивов по шести направлениям:
+
+- рост: нейроны испускают сигналы роста аксонов (вдоль своей оси) и
+  дендритов (в остальные четыре стороны); пустая клетка, получившая
+  сигнал, становится аксоном или дендритом, запоминает в «воротах» (gate)
+  направление на источник и растёт дальше по битовой маске хромосомы;
+- сигнализация: дендриты собирают сигналы соседей и передают их через
+  ворота к нейрону, нейрон копит активность и при достижении порога
+  срабатывает, аксоны раздают импульс от ворот во все стороны.
+
+Все случайные решения берутся из numpy.random.Generator с заданным seed,
+так что прогоны воспроизводимы. Экспорт CSV повторяет формат
+codi_automata/scripts/csv-export.js, NPZ хранит полные массивы.
+"""
+
+import time
+
+import numpy as np
+
+
+BLANK, NEURON, AXON, DENDRITE = 0, 1, 2, 3
+TYPE_NAMES = ('blank', 'neuron', 'axon', 'dendrite')
+
+# Шесть направлений в порядке (z, y, x); противоположное к d - это d ^ 1
+DIRECTIONS = ((1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1))
+ALL_DIRECTIONS = 0b111111
+
+
+def neighbor(arr, d):
+    """Массив, где клетка c содержит значение arr в клетке c + DIRECTIONS[d] (вне поля - 0)"""
+    dz, dy, dx = DIRECTIONS[d]
+    out = np.zeros_like(arr)
+    src, dst = [], []
+    for delta, size in zip((dz, dy, dx), arr.shape):
+        src.append(slice(max(0, delta), size + min(0, delta)))
+        dst.append(slice(max(0, -delta), size - max(0, delta)))
+    out[tuple(dst)] = arr[tuple(src)]
+    return out
+
+
+class CoDi:
+    """
+    Сеть CoDi в объёме depth x height x width.
+
+    neuron_density - вероятность нейрона в клетке, branch_probability -
+    вероятность каждого бита хромосомы (направления ветвления),
+    threshold - порог срабатывания нейрона, input_rate - вероятность
+    внешнего импульса в дендритной клетке на каждом шаге.
+    """
+
+    def __init__(self, width, height, depth, neuron_density=0.01, branch_probability=0.3,
+                 threshold=4, input_rate=0.01, seed=None):
+        self.shape = (int(depth), int(height), int(width))
+        self.neuron_density = float(neuron_density)
+        self.branch_probability = float(branch_probability)
+        self.threshold = int(threshold)
+        self.input_rate = float(input_rate)
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        self.type = np.zeros(self.shape, dtype=np.uint8)
+        self.gate = np.zeros(self.shape, dtype=np.uint8)
+        self.chromosome = np.zeros(self.shape, dtype=np.uint8)
+        for d in range(6):
+            bits = self.rng.random(self.shape) < self.branch_probability
+            self.chromosome |= bits.astype(np.uint8) << d
+
+        self.signal = np.zeros(self.shape, dtype=np.int32)
+        self.accumulator = np.zeros(self.shape, dtype=np.int32)
+        self.growth_steps = 0
+        self.steps = 0
+        self.history = []
+        self._started = None
+
+    # ----- фаза роста -----
+
+    def seed_neurons(self):
+        """Расставляет нейроны и случайную ось аксонов каждого нейрона"""
+        neurons = self.rng.random(self.shape) < self.neuron_density
+        self.type[neurons] = NEURON
+        axis = self.rng.integers(0, 3, self.shape).astype(np.uint8)
+        axon_bits = (np.uint8(0b11) << (2 * axis)).astype(np.uint8)
+        self._axon_emit = np.where(neurons, axon_bits, 0).astype(np.uint8)
+        self._dendrite_emit = np.where(neurons, ALL_DIRECTIONS & ~axon_bits, 0).astype(np.uint8)
+        return int(neurons.sum())
+
+    def grow(self, max_steps=None):
+        """Выращивает аксоны и дендриты, пока фронт роста не опустеет"""
+        if not hasattr(self, '_axon_emit'):
+            self.seed_neurons()
+        axon_emit, dendrite_emit = self._axon_emit, self._dendrite_emit
+        while axon_emit.any() or dendrite_emit.any():
+            if max_steps is not None and self.growth_steps >= max_steps:
+                break
+            claimed = self.type != BLANK
+            new_type = np.zeros(self.shape, dtype=np.uint8)
+            new_gate = np.zeros(self.shape, dtype=np.uint8)
+            for d in range(6):
+                back = d ^ 1
+                # Сигнал, ушедший из соседа в направлении d, приходит со стороны back
+                for emit, kind in ((axon_emit, AXON), (dendrite_emit, DENDRITE)):
+                    sent = neighbor((emit >> d) & 1, back).astype(bool)
+                    take = sent & ~claimed
+                    new_type[take] = kind
+                    new_gate[take] = back
+                    claimed |= take
+            grown = new_type != BLANK
+            self.type[grown] = new_type[grown]
+            self.gate[grown] = new_gate[grown]
+            # Новые клетки растут дальше по хромосоме, но не назад в ворота
+            onward = self.chromosome & ~(np.uint8(1) << new_gate)
+            axon_emit = np.where(new_type == AXON, onward, 0).astype(np.uint8)
+            dendrite_emit = np.where(new_type == DENDRITE, onward, 0).astype(np.uint8)
+            self.growth_steps += 1
+        self._axon_emit, self._dendrite_emit = axon_emit, dendrite_emit
+        return self.growth_steps
+
+    # ----- фаза сигнализации -----
+
+    def step(self):
+        t, gate, out = self.type, self.gate, self.signal
+        is_axon, is_dendrite, is_neuron = t == AXON, t == DENDRITE, t == NEURON
+        collected = np.zeros(self.shape, dtype=np.int32)
+        from_gate = np.zeros(self.shape, dtype=np.int32)
+
+        for d in range(6):
+            back = d ^ 1
+            nb_type, nb_gate, nb_out = neighbor(t, d), neighbor(gate, d), neighbor(out, d)
+            # Дендрит-сосед, чьи ворота смотрят на нас, отдаёт нам собранное
+            collected += np.where((nb_type == DENDRITE) & (nb_gate == back), nb_out, 0)
+            # Аксон-сосед раздаёт импульс во все стороны, кроме своих ворот (синапс)
+            collected += np.where(is_dendrite & (nb_type == AXON) & (nb_gate != back), nb_out, 0)
+            # Аксон читает только клетку в направлении своих ворот
+            from_gate += np.where(is_axon & (gate == d) & ((nb_type == AXON) | (nb_type == NEURON)), nb_out, 0)
+
+        if self.input_rate > 0:
+            collected += (is_dendrite & (self.rng.random(self.shape) < self.input_rate)).astype(np.int32)
+
+        self.accumulator += np.where(is_neuron, collected, 0)
+        fired = is_neuron & (self.accumulator >= self.threshold)
+        self.accumulator[fired] = 0
+
+        new_out = np.zeros(self.shape, dtype=np.int32)
+        new_out[is_dendrite] = np.minimum(collected[is_dendrite], self.threshold)
+        new_out[is_axon] = from_gate[is_axon]
+        new_out[fired] = 1
+        self.signal = new_out
+        self.steps += 1
+        return fired
+
+    def run(self, steps):
+        """Прогон сигнальной фазы с записью метрик на каждом шаге"""
+        if self._started is None:
+            self._started = time.perf_counter()
+        neurons = max(1, int((self.type == NEURON).sum()))
+        for _ in range(steps):
+            fired = self.step()
+            active = int(np.count_nonzero(self.signal))
+            p = active / self.signal.size
+            entropy = 0.0 if p in (0.0, 1.0) else float(-(p * np.log2(p) + (1 - p) * np.log2(1 - p)))
+            self.history.append({
+                'step': self.steps,
+                'time': time.perf_counter() - self._started,
+                'entropy': entropy,
+                'orderParameter': int(fired.sum()) / neurons,
+                'activeCells': active,
+            })
+        return self
+
+    # ----- статистика и экспорт -----
+
+    def state_count(self):
+        return np.bincount(self.type.ravel(), minlength=len(TYPE_NAMES))
+
+    def export_csv(self, path):
+        """CSV в формате CSVExporter.exportToCSV лабы codi_automata"""
+        depth, height, width = self.shape
+        count = self.state_count()
+        total = self.type.size
+        elapsed = self.history[-1]['time'] if self.history else 0.0
+
+        lines = ['Стохастические клеточные автоматы - Результаты симуляции', '']
+        lines += [
+            'ОБЩИЕ ПАРАМЕТРЫ',
+            f'Время симуляции,{elapsed:.2f}с',
+            f'Количество шагов,{self.steps}',
+            f'Размер сетки,{width}x{height}x{depth}',
+            f'Количество состояний,{len(TYPE_NAMES)}',
+            'Правило,codi',
+            f'Параметр правила,{self.threshold}',
+            f'Начальное состояние,seed={self.seed}',
+            '',
+            'ФИНАЛЬНАЯ СТАТИСТИКА',
+            'Состояние,Количество клеток,Доля',
+        ]
+        lines += [f'{i},{c},{c / total:.4f}' for i, c in enumerate(count)]
+        lines.append('')
+        if self.history:
+            lines += ['ИСТОРИЯ МЕТРИК', 'Шаг,Время,Энтропия,Параметр порядка,Активные клетки']
+            lines += [
+                f"{e['step']},{e['time']:.2f},{e['entropy']:.4f},{e['orderParameter']:.4f},{e['activeCells']}"
+                for e in self.history
+            ]
+        if width <= 50 and height <= 50:
+            # В 2-D лабе выгружается вся сетка, здесь - средний слой по z
+            lines += ['', 'ФИНАЛЬНАЯ СЕТКА СОСТОЯНИЙ']
+            lines += [','.join(map(str, row)) for row in self.type[depth // 2]]
+        else:
+            lines += ['', 'Примечание: Сетка слишком большая для экспорта в CSV']
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def export_npz(self, path):
+        """Полное состояние сети и история метрик в сжатом NPZ"""
+        keys = ('step', 'time', 'entropy', 'orderParameter', 'activeCells')
+        history = {f'history_{k}': np.array([e[k] for e in self.history]) for k in keys}
+        np.savez_compressed(
+            path,
+            type=self.type, gate=self.gate, chromosome=self.chromosome,
+            signal=self.signal, accumulator=self.accumulator,
+            params=np.array([self.neuron_density, self.branch_probability,
+                             self.threshold, self.input_rate]),
+            seed=np.array(-1 if self.seed is None else self.seed),
+            **history,
+        )
@@ -0,0 +1,321 @@
+"""
+Граф-автоматы на разреженных матрицах смежности.
+
+Топология хранится как scipy.sparse CSR, поэтому агрегаты по соседям
+(число соседей в состоянии s, сумма значений, степень) для всех вершин
+сразу - это одно произведение матрицы на вектор.
+
+Чтобы не перестраивать CSR на каждое добавление или удаление ребра,
+изменения копятся в дельте (словарь (u, v) -> (новый вес, вес в CSR)) и учитываются как
+отдельная маленькая разреженная матрица. Когда дельта вырастает до
+заметной доли рёбер, она вливается в основную матрицу одним сложением.
+
+Формат JSON совместим с exportData лабы graph_automata
+({vertices: [{id, state}], edges: [{u, v}]}) и с экспортом dynamic_graph
+({nodes: [{id}], edges: [{from, to, weight}], directed}).
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+
+class SparseGraph:
+    """
+    Граф с состояниями вершин и инкрементально изменяемой топологией.
+
+    directed=False хранит каждое ребро в обе стороны. compact_ratio - доля
+    от числа рёбер, после которой дельта вливается в основную матрицу.
+    """
+
+    def __init__(self, n=0, states=None, directed=False, compact_ratio=0.05):
+        self.directed = bool(directed)
+        self.compact_ratio = float(compact_ratio)
+        self.n = int(n)
+        self.states = np.zeros(self.n, dtype=np.int64) if states is None else np.asarray(states, dtype=np.int64).copy()
+        if self.states.size != self.n:
+            raise ValueError("Длина states не совпадает с числом вершин")
+        self.base = sparse.csr_matrix((self.n, self.n), dtype=np.float64)
+        self.weighted = False
+        self._delta = {}
+        self._delta_matrix = None
+        self._structural_matrix = None
+
+    # ----- построение -----
+
+    @classmethod
+    def from_edges(cls, n, us, vs, weights=None, states=None, directed=False, **kwargs):
+        graph = cls(n, states=states, directed=directed, **kwargs)
+        graph.base = graph._build(us, vs, weights)
+        graph.weighted = weights is not None
+        return graph
+
+    def _build(self, us, vs, weights=None):
+        us = np.asarray(us, dtype=np.int64)
+        vs = np.asarray(vs, dtype=np.int64)
+        w = np.ones(us.size) if weights is None else np.asarray(weights, dtype=np.float64)
+        keep = us != vs
+        us, vs, w = us[keep], vs[keep], w[keep]
+        if not self.directed:
+            us, vs, w = np.concatenate([us, vs]), np.concatenate([vs, us]), np.concatenate([w, w])
+        # Повторные рёбра не суммируются: остаётся вес последнего упоминания
+        _, last = np.unique((us * self.n + vs)[::-1], return_index=True)
+        pick = us.size - 1 - last
+        m = sparse.csr_matrix((w[pick], (us[pick], vs[pick])), shape=(self.n, self.n))
+        m.sort_indices()
+        return m
+
+    @classmethod
+    def random(cls, n, mean_degree=4.0, seed=None, **kwargs):
+        """Случайный граф G(n, p) с p = mean_degree / (n - 1) без перебора всех пар"""
+        rng = np.random.default_rng(seed)
+        m = rng.poisson(mean_degree * n / 2)
+        us, vs = rng.integers(0, n, m), rng.integers(0, n, m)
+        return cls.from_edges(n, us, vs, **kwargs)
+
+    @classmethod
+    def grid(cls, rows, cols, **kwargs):
+        """Решётка rows x cols (как generateGridGraph)"""
+        ids = np.arange(rows * cols).reshape(rows, cols)
+        us = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+        vs = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+        return cls.from_edges(rows * cols, us, vs, **kwargs)
+
+    # ----- инкрементальные изменения -----
+
+    def _key(self, u, v):
+        return (u, v) if self.directed or u < v else (v, u)
+
+    def _base_weight(self, u, v):
+        start, end = self.base.indptr[u], self.base.indptr[u + 1]
+        row = self.base.indices[start:end]
+        pos = np.searchsorted(row, v)
+        if pos < row.size and row[pos] == v:
+            return float(self.base.data[start + pos])
+        return 0.0
+
+    def edge_weight(self, u, v):
+        key = self._key(u, v)
+        if key in self._delta:
+            return self._delta[key][0]
+        return self._base_weight(*key)
+
+    def has_edge(self, u, v):
+        return self.edge_weight(u, v) != 0.0
+
+    def add_vertex(self, state=0):
+        """Добавляет вершину; CSR расширяется на месте без перестройки"""
+        self.n += 1
+        self.states = np.append(self.states, state)
+        self.base.resize((self.n, self.n))
+        self._delta_matrix = None
+        self._structural_matrix = None
+        return self.n - 1
+
+    def add_edge(self, u, v, weight=1.0):
+        if u == v or not (0 <= u < self.n and 0 <= v < self.n):
+            return
+        if weight != 1.0:
+            self.weighted = True
+        self._set(u, v, float(weight))
+
+    def remove_edge(self, u, v):
+        if self.has_edge(u, v):
+            self._set(u, v, 0.0)
+
+    def _set(self, u, v, weight):
+        key = self._key(u, v)
+        old = self._base_weight(*key)
+        if old == weight:
+            self._delta.pop(key, None)
+        else:
+            self._delta[key] = (weight, old)
+        self._delta_matrix = None
+        self._structural_matrix = None
+        if len(self._delta) > self.compact_ratio * max(self.base.nnz, 1024):
+            self.compact()
+
+    def replace_edges(self, us, vs, weights=None):
+        """Заменяет всю топологию разом (массовые правки за один шаг)"""
+        self.base = self._build(us, vs, weights)
+        self.weighted = weights is not None
+        self._delta = {}
+        self._delta_matrix = None
+        self._structural_matrix = None
+
+    def copy(self):
+        us, vs, weights = self.edges()
+        return SparseGraph.from_edges(
+            self.n, us, vs, weights=weights if self.weighted else None, states=self.states,
+            directed=self.directed, compact_ratio=self.compact_ratio,
+        )
+
+    def compact(self):
+        """Вливает накопленную дельту в основную CSR-матрицу"""
+        if self._delta:
+            self.base = self.base + self._delta_csr()
+            self.base.eliminate_zeros()
+            self.base.sort_indices()
+        self._delta = {}
+        self._delta_matrix = None
+        self._structural_matrix = None
+
+    def _delta_csr(self):
+        """Разность «новый вес - вес в base» по всем изменённым рёбрам"""
+        if self._delta_matrix is None:
+            keys = np.array(list(self._delta), dtype=np.int64).reshape(-1, 2)
+            weights = np.array(list(self._delta.values()), dtype=np.float64).reshape(-1, 2)
+            us, vs, diff = keys[:, 0], keys[:, 1], weights[:, 0] - weights[:, 1]
+            if not self.directed:
+                us, vs, diff = np.concatenate([us, vs]), np.concatenate([vs, us]), np.concatenate([diff, diff])
+            self._delta_matrix = sparse.csr_matrix((diff, (us, vs)), shape=(self.n, self.n))
+        return self._delta_matrix
+
+    @property
+    def adjacency(self):
+        """Актуальная матрица смежности (с учётом дельты)"""
+        if not self._delta:
+            return self.base
+        adjacency = self.base + self._delta_csr()
+        adjacency.eliminate_zeros()
+        return adjacency
+
+    # ----- агрегаты по соседям -----
+
+    def matvec(self, x):
+        """A @ x: для каждой вершины - взвешенная сумма x по её соседям"""
+        x = np.asarray(x, dtype=np.float64)
+        y = self.base @ x
+        if self._delta:
+            y += self._delta_csr() @ x
+        return y
+
+    def _structural(self, x):
+        """A @ x без учёта весов: для счётчиков важен только факт ребра"""
+        if not self.weighted:
+            return self.matvec(x)
+        # 0/1-копия смежности живёт до следующей правки топологии
+        if self._structural_matrix is None:
+            a = self.adjacency.copy()
+            a.data[:] = 1.0
+            self._structural_matrix = a
+        return self._structural_matrix @ np.asarray(x, dtype=np.float64)
+
+    def count_state(self, state, states=None):
+        """
+        COUNT(state=s) для всех вершин сразу.
+
+        states формы (runs, n) считает счётчики для пачки прогонов на этой
+        же топологии одним произведением матрицы на матрицу.
+        """
+        states = self.states if states is None else np.asarray(states)
+        return np.rint(self._structural((states == state).T).T).astype(np.int64)
+
+    def degree(self):
+        return np.rint(self._structural(np.ones(self.n))).astype(np.int64)
+
+    def edges(self):
+        """Рёбра (us, vs, weights); в неориентированном графе каждое один раз, u < v"""
+        adjacency = self.adjacency
+        coo = (adjacency if self.directed else sparse.triu(adjacency, k=1)).tocoo()
+        return coo.row.astype(np.int64), coo.col.astype(np.int64), coo.data
+
+    def edge_count(self):
+        nnz = self.adjacency.nnz
+        return nnz if self.directed else nnz // 2
+
+    # ----- аналитика (как Analytics.compute в analytics.js) -----
+
+    def analytics(self):
+        adjacency = self.adjacency
+        states, state_counts = np.unique(self.states, return_counts=True)
+        degrees, degree_counts = np.unique(self.degree(), return_counts=True)
+        largest = 0
+        if self.n:
+            _, labels = connected_components(adjacency, directed=self.directed, connection='weak')
+            largest = int(np.bincount(labels).max())
+        return {
+            'vertexCount': self.n,
+            'edgeCount': self.edge_count(),
+            'stateDist': {int(s): int(c) for s, c in zip(states, state_counts)},
+            'degreeDist': {int(d): int(c) for d, c in zip(degrees, degree_counts)},
+            'largestComponent': largest,
+        }
+
+    # ----- JSON -----
+
+    @classmethod
+    def from_json(cls, data, **kwargs):
+        """Граф из экспорта graph_automata или dynamic_graph"""
+        if 'nodes' in data:
+            nodes = data.get('nodes') or []
+            index = {node['id']: i for i, node in enumerate(nodes)}
+            edges = [e for e in data.get('edges') or [] if e.get('from') in index and e.get('to') in index]
+            us = [index[e['from']] for e in edges]
+            vs = [index[e['to']] for e in edges]
+            # Как importData лабы dynamic_graph: без флага граф взвешенный
+            weights = [float(e.get('weight', 1)) for e in edges] if data.get('enableWeights', True) else None
+            states = [node.get('state', 0) for node in nodes]
+            directed = data.get('directed', True)
+        else:
+            vertices = data.get('vertices') or []
+            index = {v['id']: i for i, v in enumerate(vertices)}
+            edges = [e for e in data.get('edges') or [] if e.get('u') in index and e.get('v') in index]
+            us = [index[e['u']] for e in edges]
+            vs = [index[e['v']] for e in edges]
+            weights = None
+            states = [v.get('state', 0) for v in vertices]
+            directed = False
+        return cls.from_edges(len(states), us, vs, weights=weights, states=states, directed=directed, **kwargs)
+
+    def to_json(self):
+        """Экспорт в формате exportData лабы graph_automata"""
+        us, vs, _ = self.edges()
+        return {
+            'vertices': [{'id': i, 'state': int(s)} for i, s in enumerate(self.states)],
+            'edges': [{'u': int(u), 'v': int(v)} for u, v in zip(us, vs)],
+        }
+
+
+class GraphAutomaton:
+    """
+    Синхронный автомат на SparseGraph.
+
+    rule(graph) возвращает массив новых состояний для всех вершин; внутри
+    правило пользуется векторными агрегатами графа (count_state, matvec).
+    """
+
+    def __init__(self, graph, rule):
+        self.graph = graph
+        self.rule = rule
+        self.step_count = 0
+
+    def step(self):
+        new_states = np.asarray(self.rule(self.graph), dtype=np.int64)
+        changed = np.flatnonzero(new_states != self.graph.states)
+        self.graph.states = new_states
+        self.step_count += 1
+        return changed
+
+    def run(self, steps):
+        for _ in range(steps):
+            self.step()
+        return self.graph.states
+
+
+def outer_totalistic(signal, births, survives, alive=1, dead=0):
+    """
+    Правило вида «родиться при k соседях в состоянии signal, выжить при m»
+    для GraphAutomaton - аналог B/S-правил клеточных автоматов.
+    """
+    births = np.asarray(sorted(births), dtype=np.int64)
+    survives = np.asarray(sorted(survives), dtype=np.int64)
+
+    def rule(graph):
+        counts = graph.count_state(signal)
+        is_alive = graph.states == alive
+        born = ~is_alive & np.isin(counts, births)
+        stay = is_alive & np.isin(counts, survives)
+        return np.where(born | stay, alive, dead)
+
+    return rule
@@ -0,0 +1,628 @@
+"""
+Компилятор DSL правил граф-автоматов (graph_automata/dsl.js, rules.js).
+
+Текст правил разбирается один раз: условие превращается в дерево из
+кортежей, а дерево - в замыкание над массивами NumPy. Одно вычисление
+замыкания даёт ответ сразу для всех вершин (правила состояний) или для
+всех пар групп вершин (топологические правила), а не для одной вершины,
+как evaluateCondition в JS.
+
+Семантика повторяет rules.js и simulation.js: для состояния срабатывает
+первое подходящее правило; топологические правила смотрят на граф до
+шага, и из всех совпавших для пары побеждает последнее по порядку.
+
+batch_run прогоняет пачку вариантов правил и seed'ов. Прогоны без
+топологических правил делят одну матрицу смежности, поэтому их состояния
+складываются в матрицу (runs, n) и COUNT считается одним произведением
+на всю пачку. Результаты кешируются по хешу нормализованных правил.
+"""
+
+import hashlib
+import operator
+import re
+from collections import OrderedDict
+
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+
+# =============================================================================
+# РАЗБОР
+# =============================================================================
+
+TOKEN_SPEC = re.compile(r"""
+    (?P<WHITESPACE>\s+)
+  | (?P<NUMBER>\d+)
+  | (?P<OP>==|!=|<=|>=|<|>|=)
+  | (?P<LPAREN>\()
+  | (?P<RPAREN>\))
+  | (?P<COMMA>,)
+  | (?P<IDENT>[A-Za-z_][A-Za-z0-9_]*)
+""", re.VERBOSE)
+
+
+# Глубже рекурсивный спуск и замыкания compile_condition упираются в стек
+MAX_DEPTH = 100
+
+
+class NestingError(ValueError):
+    """Условие вложено глубже MAX_DEPTH: ошибка всего набора правил, а не строки"""
+
+
+def tokenize(text):
+    """Список пар (тип, значение); идентификаторы приводятся к верхнему регистру"""
+    tokens, pos = [], 0
+    while pos < len(text):
+        match = TOKEN_SPEC.match(text, pos)
+        if not match:
+            raise ValueError(f"Неожиданный символ: {text[pos]}")
+        kind = match.lastgroup
+        if kind != 'WHITESPACE':
+            value = match.group()
+            tokens.append((kind, value.upper() if kind == 'IDENT' else value))
+        pos = match.end()
+    tokens.append(('EOF', None))
+    return tokens
+
+
+class Parser:
+    """
+    Рекурсивный спуск по грамматике dsl.js. Узлы дерева - кортежи:
+    ('num', n), ('state', 'self' | 'u' | 'v'), ('count', s), ('edge',),
+    ('not', x), ('and', l, r), ('or', l, r), ('cmp', op, l, r).
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.depth = 0
+
+    def peek(self):
+        return self.tokens[self.pos]
+
+    def consume(self, kind, value=None):
+        token = self.peek()
+        if token[0] == 'EOF':
+            raise ValueError("Неожиданный конец условия")
+        if token[0] != kind or (value is not None and token[1] != value):
+            raise ValueError(f"Ожидалось {value or kind}, найдено {token[1] or token[0]}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek()[0] != 'EOF':
+            raise ValueError("Лишние токены после условия")
+        # Цепочки AND/OR разбираются циклом, но дают такое же глубокое дерево
+        if tree_depth(node) > MAX_DEPTH:
+            raise NestingError(f"Условие вложено глубже {MAX_DEPTH} уровней")
+        return node
+
+    def descend(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise NestingError(f"Условие вложено глубже {MAX_DEPTH} уровней")
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.peek() == ('IDENT', 'OR'):
+            self.pos += 1
+            node = ('or', node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.peek() == ('IDENT', 'AND'):
+            self.pos += 1
+            node = ('and', node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if self.peek() == ('IDENT', 'NOT'):
+            self.pos += 1
+            self.descend()
+            node = ('not', self.parse_not())
+            self.depth -= 1
+            return node
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        left = self.parse_primary()
+        if self.peek()[0] == 'OP':
+            op = self.consume('OP')[1]
+            # '=' и '==' в dsl.js равнозначны
+            return ('cmp', '==' if op == '=' else op, left, self.parse_primary())
+        return left
+
+    def parse_primary(self):
+        kind, value = self.peek()
+        if kind == 'NUMBER':
+            self.pos += 1
+            return ('num', int(value))
+        if kind == 'LPAREN':
+            self.pos += 1
+            self.descend()
+            node = self.parse_or()
+            self.consume('RPAREN')
+            self.depth -= 1
+            return node
+        if kind == 'IDENT' and value == 'STATE':
+            self.pos += 1
+            if self.peek()[0] != 'LPAREN':
+                return ('state', 'self')
+            self.consume('LPAREN')
+            target = self.consume('IDENT')[1]
+            if target not in ('U', 'V'):
+                raise ValueError(f"Неожиданный аргумент state(): {target}")
+            self.consume('RPAREN')
+            return ('state', target.lower())
+        if kind == 'IDENT' and value == 'COUNT':
+            self.pos += 1
+            self.consume('LPAREN')
+            self.consume('IDENT', 'STATE')
+            self.consume('OP', '=')
+            state = int(self.consume('NUMBER')[1])
+            self.consume('RPAREN')
+            return ('count', state)
+        if kind == 'IDENT' and value == 'EDGE':
+            self.pos += 1
+            self.consume('LPAREN')
+            self.consume('IDENT', 'U')
+            self.consume('COMMA')
+            self.consume('IDENT', 'V')
+            self.consume('RPAREN')
+            return ('edge',)
+        raise ValueError(f"Неожиданный токен: {kind} {value}")
+
+
+def parse_condition(text):
+    return Parser(tokenize(text)).parse()
+
+
+def parse_action(text, section):
+    """Действие правила как в parseAction: ('state', s), ('add_edge',), ('remove_edge',), ('new_vertex', s)"""
+    upper = text.strip().upper()
+    if section == 'state':
+        cleaned = re.sub(r'\s+', ' ', upper.replace('_', '')).strip()
+        match = re.match(r'^NEWSTATE\s*=\s*(\d+)$', cleaned) or re.match(r'^SET STATE TO\s*(\d+)$', cleaned)
+        if match:
+            return ('state', int(match.group(1)))
+        raise ValueError(f"Неверное действие состояния: {text}")
+    if re.match(r'^ADD\s+EDGE\s*\(\s*U\s*,\s*V\s*\)$', upper):
+        return ('add_edge',)
+    if re.match(r'^REMOVE\s+EDGE\s*\(\s*U\s*,\s*V\s*\)$', upper):
+        return ('remove_edge',)
+    match = re.match(r'^NEW\s+VERTEX(?:\s+STATE\s*=\s*(\d+))?$', upper)
+    if match:
+        return ('new_vertex', int(match.group(1) or 0))
+    raise ValueError(f"Неверное топологическое действие: {text}")
+
+
+def tree_depth(node):
+    """Глубина дерева условия без рекурсии"""
+    depth, stack = 0, [(node, 1)]
+    while stack:
+        node, level = stack.pop()
+        depth = max(depth, level)
+        stack.extend((child, level + 1) for child in node[1:] if isinstance(child, tuple))
+    return depth
+
+
+def action_states(node, action):
+    """Все состояния, которые упоминает правило: COUNT(state=s) и действие"""
+    used = count_states(node)
+    if action[0] in ('state', 'new_vertex'):
+        used.add(action[1])
+    return used
+
+
+def count_states(node):
+    """Состояния, на которые ссылаются COUNT(state=s) в дереве"""
+    if node[0] == 'count':
+        return {node[1]}
+    return set().union(*(count_states(child) for child in node[1:] if isinstance(child, tuple)))
+
+
+# =============================================================================
+# КОМПИЛЯЦИЯ
+# =============================================================================
+
+COMPARISONS = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+}
+
+
+def _truth(value):
+    return np.asarray(value) != 0
+
+
+def compile_condition(node):
+    """
+    Дерево условия -> функция env -> массив.
+
+    env - словарь с ключами state, u, v (состояния), count (словарь
+    состояние -> счётчики) и edge. Значения транслируются по правилам
+    NumPy, так что одно и то же условие работает и для вектора вершин,
+    и для сетки пар групп.
+    """
+    kind = node[0]
+    if kind == 'num':
+        value = node[1]
+        return lambda env: value
+    if kind == 'state':
+        key = node[1] if node[1] != 'self' else 'state'
+        return lambda env: env[key]
+    if kind == 'count':
+        state = node[1]
+        return lambda env: env['count'][state]
+    if kind == 'edge':
+        return lambda env: env['edge']
+    if kind == 'not':
+        inner = compile_condition(node[1])
+        return lambda env: ~_truth(inner(env))
+    if kind in ('and', 'or'):
+        left, right = compile_condition(node[1]), compile_condition(node[2])
+        combine = np.logical_and if kind == 'and' else np.logical_or
+        return lambda env: combine(_truth(left(env)), _truth(right(env)))
+    if kind == 'cmp':
+        compare = COMPARISONS[node[1]]
+        left, right = compile_condition(node[2]), compile_condition(node[3])
+        return lambda env: compare(left(env), right(env))
+    raise ValueError(f"Неизвестный узел: {kind}")
+
+
+class RuleSet:
+    """
+    Скомпилированный набор правил в формате rules.js (секции STATE_RULES: и
+    TOPOLOGY_RULES:). Ошибочные строки не прерывают разбор, а попадают в
+    errors, как в Rules.parse; при заданном states туда же идут правила с
+    состояниями вне 0..states-1. Слишком глубокое условие - NestingError.
+    """
+
+    def __init__(self, text='', states=None):
+        self.text = text
+        self.state_rules = []
+        self.topology_rules = []
+        self.errors = []
+        section = None
+        for line in (l.strip() for l in text.splitlines()):
+            if not line or line.startswith('#'):
+                continue
+            if re.match(r'^STATE_RULES:?$', line, re.I):
+                section = 'state'
+                continue
+            if re.match(r'^TOPOLOGY_RULES:?$', line, re.I):
+                section = 'topology'
+                continue
+            if section is None:
+                continue
+            match = re.match(r'^IF\s+(.+)\s+THEN\s+(.+)$', line, re.I)
+            if not match:
+                self.errors.append(f"Неверный синтаксис правила: {line}")
+                continue
+            try:
+                condition = parse_condition(match.group(1))
+                action = parse_action(match.group(2), section)
+            except NestingError:
+                raise
+            except ValueError as e:
+                self.errors.append(f"Ошибка в правиле: {line}\n  {e}")
+                continue
+            if states is not None:
+                outside = sorted(s for s in action_states(condition, action) if not 0 <= s < states)
+                if outside:
+                    self.errors.append(f"Ошибка в правиле: {line}\n  Состояние {outside[0]} вне 0..{states - 1}")
+                    continue
+            rules = self.state_rules if section == 'state' else self.topology_rules
+            rules.append((condition, action, compile_condition(condition)))
+
+        self.state_counts = sorted(set().union(*(count_states(c) for c, _, _ in self.state_rules)))
+        self.topology_counts = sorted(set().union(*(count_states(c) for c, _, _ in self.topology_rules)))
+        # Хеш от деревьев, а не от текста: пробелы, регистр и комментарии не важны
+        canonical = repr(([r[:2] for r in self.state_rules], [r[:2] for r in self.topology_rules]))
+        self.key = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def from_sections(cls, state_text, topology_text='', states=None):
+        """Правила из двух полей ввода, как parseRules(stateText, topoText) в script.js"""
+        return cls(f"STATE_RULES:\n{state_text}\nTOPOLOGY_RULES:\n{topology_text}", states=states)
+
+    @property
+    def has_topology(self):
+        return bool(self.topology_rules)
+
+    # ----- правила состояний -----
+
+    def next_states(self, states, counts):
+        """
+        Новые состояния для массива states любой формы; counts - словарь
+        s -> COUNT(state=s) той же формы для всех s из state_counts.
+        """
+        env = {'state': states, 'u': 0, 'v': 0, 'count': counts, 'edge': False}
+        result = states.copy()
+        undecided = np.ones(states.shape, dtype=bool)
+        for _, (_, new_state), condition in self.state_rules:
+            hit = undecided & _truth(condition(env))
+            result[hit] = new_state
+            undecided &= ~hit
+            if not undecided.any():
+                break
+        return result
+
+    # ----- топологические правила -----
+
+    def pair_table(self, signatures):
+        """
+        Итог топологических правил для пары групп вершин.
+
+        signatures[g] = (состояние, COUNT по topology_counts...) - всё, от чего
+        зависит условие для вершины u или v. Возвращает таблицу (K, K, 2):
+        [a, b, e] - будет ли ребро между u из группы a и v из группы b,
+        если до шага оно было (e = 1) или нет (e = 0).
+        """
+        k = len(signatures)
+        edge = np.array([False, True])
+        table = np.broadcast_to(edge, (k, k, 2)).copy()
+        su = signatures[:, 0].reshape(k, 1, 1)
+        sv = signatures[:, 0].reshape(1, k, 1)
+        counts = {s: signatures[:, i + 1].reshape(k, 1, 1) for i, s in enumerate(self.topology_counts)}
+        env = {'state': 0, 'u': su, 'v': sv, 'count': counts, 'edge': edge}
+        for _, action, condition in self.topology_rules:
+            if action[0] == 'new_vertex':
+                continue
+            hit = np.broadcast_to(_truth(condition(env)), table.shape)
+            table[hit] = action[0] == 'add_edge'
+        return table
+
+    def new_vertices(self, graph):
+        """Состояния новых вершин; условие смотрит на первую вершину, как в rules.js"""
+        if graph.n:
+            counts = {s: graph.count_state(s)[:1] for s in self.topology_counts}
+            env = {'state': graph.states[:1], 'u': 0, 'v': 0, 'count': counts, 'edge': False}
+        else:
+            env = {'state': 0, 'u': 0, 'v': 0, 'count': {s: 0 for s in self.topology_counts}, 'edge': False}
+        return [action[1] for _, action, condition in self.topology_rules
+                if action[0] == 'new_vertex' and bool(np.all(_truth(condition(env))))]
+
+
+# =============================================================================
+# АВТОМАТ
+# =============================================================================
+
+# Потолки рёбер топологических правил: IF NOT EDGE(u,v) THEN add edge(u,v)
+# за один шаг делает граф полным
+MAX_NEW_EDGES = 1_000_000
+MAX_EDGES = 5_000_000
+
+
+def _topology_step(graph, rules, max_new_edges=MAX_NEW_EDGES, max_edges=MAX_EDGES):
+    """
+    Рёбра после топологических правил (по графу до шага).
+
+    ValueError, если шаг добавил бы больше max_new_edges рёбер или граф
+    вырос бы больше max_edges; пары проверяются до того, как их перебирать.
+    """
+    n = graph.n
+    us, vs, weights = graph.edges()
+    if n == 0:
+        return us, vs, weights
+    # Вершины с одинаковой сигнатурой неразличимы для условий
+    signature = np.column_stack([graph.states] + [graph.count_state(s) for s in rules.topology_counts])
+    groups, group = np.unique(signature, axis=0, return_inverse=True)
+    group = group.ravel()
+    table = rules.pair_table(groups)
+
+    existing = us * n + vs
+    # Существующие рёбра: в ориентированном графе правила видят только пары u < v
+    keep = (us > vs) | table[group[us], group[vs], 1]
+    us, vs, weights = us[keep], vs[keep], weights[keep]
+
+    added_u, added_v, added = [], [], 0
+    for a in np.flatnonzero(table[:, :, 0].any(axis=1)):
+        members = np.flatnonzero(group == a)
+        targets = np.flatnonzero(table[a, group, 0])
+        # Пар u < v столько, а новых среди них не меньше, чем пар минус рёбра
+        pairs = int((targets.size - np.searchsorted(targets, members, side='right')).sum())
+        if added + pairs - existing.size > max_new_edges:
+            raise ValueError(f"Топологические правила добавляют больше {max_new_edges} рёбер за шаг")
+        uu, vv = np.repeat(members, targets.size), np.tile(targets, members.size)
+        ok = uu < vv
+        uu, vv = uu[ok], vv[ok]
+        fresh = ~np.isin(uu * n + vv, existing)
+        added_u.append(uu[fresh])
+        added_v.append(vv[fresh])
+        added += int(fresh.sum())
+        if added > max_new_edges:
+            raise ValueError(f"Топологические правила добавляют больше {max_new_edges} рёбер за шаг")
+    if us.size + added > max_edges:
+        raise ValueError(f"Топологические правила дают граф больше {max_edges} рёбер")
+    if added_u:
+        added_u, added_v = np.concatenate(added_u), np.concatenate(added_v)
+        us, vs = np.concatenate([us, added_u]), np.concatenate([vs, added_v])
+        weights = np.concatenate([weights, np.ones(added_u.size)])
+    return us, vs, weights
+
+
+class DSLAutomaton:
+    """
+    Граф-автомат на SparseGraph, управляемый RuleSet.
+
+    step повторяет Simulation.step: новые состояния и топологические
+    изменения вычисляются по графу до шага и применяются вместе.
+    max_new_edges и max_edges ограничивают рост графа (см. _topology_step).
+    """
+
+    def __init__(self, graph, rules, max_new_edges=MAX_NEW_EDGES, max_edges=MAX_EDGES):
+        self.graph = graph
+        self.rules = rules if isinstance(rules, RuleSet) else RuleSet(rules)
+        self.max_new_edges = max_new_edges
+        self.max_edges = max_edges
+        self.step_count = 0
+
+    def step(self):
+        graph, rules = self.graph, self.rules
+        counts = {s: graph.count_state(s) for s in rules.state_counts}
+        new_states = rules.next_states(graph.states, counts)
+        changed = np.flatnonzero(new_states != graph.states)
+        if rules.has_topology:
+            us, vs, weights = _topology_step(graph, rules, self.max_new_edges, self.max_edges)
+            spawned = rules.new_vertices(graph)
+            graph.replace_edges(us, vs, weights if graph.weighted else None)
+            graph.states = new_states
+            for state in spawned:
+                changed = np.append(changed, graph.add_vertex(state))
+        else:
+            graph.states = new_states
+        self.step_count += 1
+        return changed
+
+    def run(self, steps, record_every=0):
+        """Прогон; при record_every > 0 возвращает историю аналитики (как analytics.js)"""
+        history = []
+        for _ in range(steps):
+            self.step()
+            if record_every and self.step_count % record_every == 0:
+                history.append({'step': self.step_count, **self.graph.analytics()})
+        return history
+
+
+# =============================================================================
+# ПАКЕТНЫЕ ПРОГОНЫ
+# =============================================================================
+
+CACHE_SIZE = 256
+_results = OrderedDict()
+
+
+def graph_fingerprint(graph):
+    h = hashlib.sha256()
+    adjacency = graph.adjacency
+    for arr in (adjacency.indptr, adjacency.indices, adjacency.data, graph.states):
+        h.update(np.ascontiguousarray(arr).tobytes())
+    h.update(b'directed' if graph.directed else b'undirected')
+    return h.hexdigest()
+
+
+def _cache_get(key):
+    if key in _results:
+        _results.move_to_end(key)
+        return _results[key]
+    return None
+
+
+def _cache_put(key, value):
+    _results[key] = value
+    _results.move_to_end(key)
+    while len(_results) > CACHE_SIZE:
+        _results.popitem(last=False)
+
+
+def clear_cache():
+    _results.clear()
+
+
+def _state_dists(states):
+    """stateDist для каждой строки матрицы (runs, n) одним bincount"""
+    runs = states.shape[0]
+    width = int(states.max()) + 1 if states.size else 1
+    offsets = np.arange(runs)[:, None] * width
+    table = np.bincount((states + offsets).ravel(), minlength=runs * width).reshape(runs, width)
+    return [{int(s): int(c) for s, c in zip(np.flatnonzero(row), row[row > 0])} for row in table]
+
+
+def _static_analytics(graph):
+    """Часть аналитики, не зависящая от состояний"""
+    degrees, degree_counts = np.unique(graph.degree(), return_counts=True)
+    largest = 0
+    if graph.n:
+        _, labels = connected_components(graph.adjacency, directed=graph.directed, connection='weak')
+        largest = int(np.bincount(labels).max())
+    return {
+        'vertexCount': graph.n,
+        'edgeCount': graph.edge_count(),
+        'degreeDist': {int(d): int(c) for d, c in zip(degrees, degree_counts)},
+        'largestComponent': largest,
+    }
+
+
+def batch_run(graph, variants, seeds=(0,), steps=100, states=2, initial=None, record_every=1,
+              max_new_edges=MAX_NEW_EDGES, max_edges=MAX_EDGES):
+    """
+    Прогоняет каждый вариант правил с каждым seed'ом на копиях graph.
+
+    variants - тексты правил или RuleSet. Начальные состояния - initial,
+    если задан, иначе равномерно случайные из 0..states-1 по seed.
+    Возвращает список {'ruleHash', 'seed', 'errors', 'history'} в порядке
+    (вариант, seed); history - записи в формате Analytics.compute.
+    """
+    rule_sets = [v if isinstance(v, RuleSet) else RuleSet(v, states=states) for v in variants]
+    if initial is not None:
+        initial = [int(s) for s in initial]
+        if len(initial) != graph.n:
+            raise ValueError("initial должен задавать состояние каждой вершины")
+        if any(not 0 <= s < states for s in initial):
+            raise ValueError(f"Состояния initial вне 0..{states - 1}")
+        initial = np.array(initial, dtype=np.int64)
+    fingerprint = graph_fingerprint(graph)
+    init_key = 'random' if initial is None else hashlib.sha256(initial.tobytes()).hexdigest()
+
+    def run_key(rules, seed):
+        return f'{rules.key}:{fingerprint}:{seed}:{steps}:{states}:{init_key}:{record_every}'
+
+    def start_states(seed):
+        if initial is not None:
+            return initial.copy()
+        return np.random.default_rng(seed).integers(0, states, graph.n)
+
+    results = {}
+    stacked = []
+    for rules in rule_sets:
+        for seed in seeds:
+            key = run_key(rules, seed)
+            if key in results:
+                continue
+            results[key] = _cache_get(key)
+            if results[key] is not None:
+                continue
+            if rules.has_topology:
+                # Топология у каждого прогона своя - идём по одному
+                own = graph.copy()
+                own.states = start_states(seed)
+                history = DSLAutomaton(own, rules, max_new_edges, max_edges).run(steps, record_every)
+                results[key] = {'ruleHash': rules.key, 'seed': seed, 'errors': rules.errors, 'history': history}
+            else:
+                stacked.append((key, rules, seed))
+
+    if stacked:
+        results.update(_run_stacked(graph, stacked, start_states, steps, record_every))
+    for key, result in results.items():
+        _cache_put(key, result)
+    return [results[run_key(rules, seed)] for rules in rule_sets for seed in seeds]
+
+
+def _run_stacked(graph, stacked, start_states, steps, record_every):
+    """Прогоны без топологических правил: одна матрица состояний на всю пачку"""
+    matrix = np.stack([start_states(seed) for _, _, seed in stacked])
+    needed = sorted(set().union(*(rules.state_counts for _, rules, _ in stacked)))
+    static = _static_analytics(graph)
+    # Строки одного варианта правил обновляются одним вызовом next_states
+    variants = OrderedDict()
+    for row, (_, rules, _) in enumerate(stacked):
+        variants.setdefault(rules.key, (rules, []))[1].append(row)
+    variants = [(rules, np.array(rows)) for rules, rows in variants.values()]
+
+    histories = [[] for _ in stacked]
+    for step in range(1, steps + 1):
+        counts = {s: graph.count_state(s, matrix) for s in needed}
+        nxt = np.empty_like(matrix)
+        for rules, rows in variants:
+            nxt[rows] = rules.next_states(matrix[rows], {s: counts[s][rows] for s in rules.state_counts})
+        matrix = nxt
+        if record_every and step % record_every == 0:
+            for history, dist in zip(histories, _state_dists(matrix)):
+                history.append({'step': step, 'stateDist': dist, **static})
+    return {
+        key: {'ruleHash': rules.key, 'seed': seed, 'errors': rules.errors, 'history': history}
+        for (key, rules, seed), history in zip(stacked, histories)
+    }
@@ -0,0 +1,240 @@
+"""
+Клеточные автоматы на гексагональной и треугольной решётках.
+
+Повторяет геометрию лаб hexagonal_ca (js/grid.js) и triangular_ca
+(grid-tri.js), но считает соседей не поклеточно, а несколькими сдвигами
+всего массива. Смещения соседей зависят от чётности строки (гексы) или
+ориентации треугольника (up/down), поэтому для каждой из двух «фаз»
+считается своя сумма сдвигов и результат выбирается маской.
+
+Поля хранятся как uint8-массивы формы (h, w) или (runs, h, w) для пакетных
+прогонов - все функции работают по двум последним осям.
+"""
+
+import re
+
+import numpy as np
+
+
+# =============================================================================
+# ГЕОМЕТРИЯ РЕШЁТОК
+# =============================================================================
+
+# Смещения (dq, dr) гексагональной решётки из hexagonal_ca/js/grid.js:
+# чётные и нечётные строки сдвинуты друг относительно друга.
+HEX_EDGE = {
+    'even': [(1, 0), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1)],
+    'odd': [(1, 0), (1, 1), (0, 1), (-1, 0), (0, -1), (1, -1)],
+}
+HEX_VERTEX = {
+    'even': [(2, 0), (1, 1), (-1, 2), (-2, 0), (-1, -1), (1, -2)],
+    'odd': [(2, 0), (2, 1), (1, 2), (-2, 0), (-2, -1), (-1, -2)],
+}
+
+# Смещения (dr, dc) треугольной решётки из triangular_ca/grid-tri.js:
+# треугольник (row, col) смотрит вверх, если row + col чётно.
+TRI_EDGE = {
+    'up': [(0, -1), (0, 1), (1, 0)],
+    'down': [(0, -1), (0, 1), (-1, 0)],
+}
+TRI_MOORE = {
+    'up': [(0, -1), (0, 1), (1, 0),
+           (-1, -1), (-1, 0), (-1, 1),
+           (1, -1), (1, 1), (1, -2), (1, 2),
+           (0, -2), (0, 2)],
+    'down': [(0, -1), (0, 1), (-1, 0),
+             (1, -1), (1, 1),
+             (-1, -1), (-1, 1), (-1, -2), (-1, 2),
+             (0, -2), (0, 2),
+             (1, 0)],
+}
+
+
+def _hex_kernel(kernel):
+    """Возвращает {фаза: [(dr, dc, вес), ...]} для ядра 6 / 12 / 18"""
+    if kernel not in (6, 12, 18):
+        raise ValueError(f"Неизвестное ядро гексагональной решётки: {kernel}")
+    out = {}
+    for phase in ('even', 'odd'):
+        # В JS ядро 18 - это N6 + V6 + N6, т.е. соседи по ребру считаются дважды
+        edge_weight = 2 if kernel == 18 else 1
+        offsets = [(dr, dq, edge_weight) for dq, dr in HEX_EDGE[phase]]
+        if kernel != 6:
+            offsets += [(dr, dq, 1) for dq, dr in HEX_VERTEX[phase]]
+        out[phase] = offsets
+    return out
+
+
+def _tri_kernel(kernel):
+    """Возвращает {фаза: [(dr, dc, вес), ...]} для ядра edge-3 / moore-12"""
+    table = {'edge-3': TRI_EDGE, 'moore-12': TRI_MOORE}.get(kernel)
+    if table is None:
+        raise ValueError(f"Неизвестное ядро треугольной решётки: {kernel}")
+    return {phase: [(dr, dc, 1) for dr, dc in offsets] for phase, offsets in table.items()}
+
+
+class Lattice:
+    """
+    Решётка с фазозависимым соседством.
+
+    kind: 'hex' (ядра 6 / 12 / 18) или 'tri' (ядра 'edge-3' / 'moore-12').
+    wrap: True - тор, False - ограниченное поле (как 'limited' / 'bounded').
+    """
+
+    def __init__(self, kind, width, height, kernel=None, wrap=True):
+        if kind == 'hex':
+            kernel = 6 if kernel is None else int(kernel)
+            offsets = _hex_kernel(kernel)
+        elif kind == 'tri':
+            kernel = 'edge-3' if kernel is None else kernel
+            offsets = _tri_kernel(kernel)
+        else:
+            raise ValueError(f"Неизвестный тип решётки: {kind}")
+
+        self.kind = kind
+        self.width = int(width)
+        self.height = int(height)
+        self.kernel = kernel
+        self.wrap = bool(wrap)
+        self.offsets = offsets
+        self.max_neighbors = max(sum(w for _, _, w in o) for o in offsets.values())
+
+        rows = np.arange(self.height)[:, None]
+        cols = np.arange(self.width)[None, :]
+        if kind == 'hex':
+            # Маска строк, использующих смещения 'even'
+            self.phase_mask = np.broadcast_to(rows % 2 == 0, (self.height, self.width))
+        else:
+            # Маска треугольников, смотрящих вверх
+            self.phase_mask = (rows + cols) % 2 == 0
+        self._phases = ('even', 'odd') if kind == 'hex' else ('up', 'down')
+
+    @property
+    def shape(self):
+        return self.height, self.width
+
+    def _shifted(self, field, dr, dc):
+        """Поле, в котором клетка (r, c) содержит значение соседа (r + dr, c + dc)"""
+        if self.wrap:
+            return np.roll(field, (-dr, -dc), axis=(-2, -1))
+        out = np.zeros_like(field)
+        h, w = self.shape
+        dst_r = slice(max(0, -dr), min(h, h - dr))
+        dst_c = slice(max(0, -dc), min(w, w - dc))
+        src_r = slice(max(0, dr), min(h, h + dr))
+        src_c = slice(max(0, dc), min(w, w + dc))
+        out[..., dst_r, dst_c] = field[..., src_r, src_c]
+        return out
+
+    def neighbor_counts(self, field):
+        """Число живых соседей каждой клетки (работает и для пакета полей)"""
+        field = np.asarray(field, dtype=np.uint8)
+        first, second = self._phases
+        totals = {}
+        for phase in (first, second):
+            acc = np.zeros(field.shape, dtype=np.uint8)
+            for dr, dc, weight in self.offsets[phase]:
+                shifted = self._shifted(field, dr, dc)
+                acc += shifted if weight == 1 else shifted * np.uint8(weight)
+            totals[phase] = acc
+        return np.where(self.phase_mask, totals[first], totals[second])
+
+
+# =============================================================================
+# ВНЕШНЕ-ТОТАЛИСТИЧЕСКИЕ ПРАВИЛА
+# =============================================================================
+
+def parse_rule(dsl, kind='tri'):
+    """
+    Разбирает правило вида B2/S34 (как rules.js лабы решётки kind).
+
+    Слитные цифры трактуются поразрядно, многозначные числа задаются через
+    разделители: "B3,10,12/S2,12". Одиночные "10"/"11"/"12" треугольная
+    лаба читает как одно число, гексагональная - поразрядно ("B12" -> {1, 2}).
+    Возвращает (births, survives).
+    """
+    births, survives = set(), set()
+    found = False
+    for part in dsl.upper().split('/'):
+        part = part.strip()
+        if not part or part[0] not in 'BS':
+            continue
+        found = True
+        tail = re.sub(r'^\s*:\s*', '', part[1:])
+        if re.fullmatch(r'\d+', tail):
+            multi = kind == 'tri' and tail in ('10', '11', '12')
+            nums = [int(tail)] if multi else [int(ch) for ch in tail]
+        else:
+            nums = [int(x) for x in re.split(r'\D+', tail) if x]
+        (births if part[0] == 'B' else survives).update(nums)
+    if not found:
+        raise ValueError(f"Не удалось разобрать правило: {dsl!r}")
+    return births, survives
+
+
+def rule_table(dsl, max_neighbors, kind='tri'):
+    """Таблица переходов table[state, n] -> следующее состояние (uint8)"""
+    births, survives = parse_rule(dsl, kind)
+    table = np.zeros((2, max_neighbors + 1), dtype=np.uint8)
+    table[0, [n for n in births if n <= max_neighbors]] = 1
+    table[1, [n for n in survives if n <= max_neighbors]] = 1
+    return table
+
+
+class LatticeAutomaton:
+    """Жизнеподобный автомат на решётке Lattice с правилом B/S"""
+
+    def __init__(self, lattice, rule='B2/S34'):
+        self.lattice = lattice
+        self.rule = rule
+        self.table = rule_table(rule, lattice.max_neighbors, lattice.kind)
+
+    def step(self, field):
+        """Один шаг для поля (h, w) или пакета полей (runs, h, w)"""
+        field = np.asarray(field, dtype=np.uint8)
+        return self.table[field, self.lattice.neighbor_counts(field)]
+
+    def run(self, field, steps):
+        for _ in range(steps):
+            field = self.step(field)
+        return field
+
+    def random_fields(self, runs, density=0.3, seed=None):
+        """Пакет случайных начальных полей, воспроизводимый по seed"""
+        rng = np.random.default_rng(seed)
+        shape = (runs,) + self.lattice.shape
+        return (rng.random(shape) < density).astype(np.uint8)
+
+    def experiment(self, runs, steps, density=0.3, seed=None, initial=None):
+        """
+        Пакетный эксперимент: runs независимых прогонов за один проход.
+
+        Возвращает словарь массивов формы (runs, steps) с теми же колонками,
+        что и CSV аналитики лабы: liveNow, bornStep, diedStep, bornCum, diedCum.
+        """
+        if initial is None:
+            field = self.random_fields(runs, density, seed)
+        else:
+            field = np.array(initial, dtype=np.uint8, copy=True)
+            if field.ndim == 2:
+                field = np.broadcast_to(field, (runs,) + field.shape).copy()
+
+        live = np.empty((runs, steps), dtype=np.int64)
+        born = np.empty((runs, steps), dtype=np.int64)
+        died = np.empty((runs, steps), dtype=np.int64)
+        for t in range(steps):
+            nxt = self.step(field)
+            born[:, t] = np.count_nonzero(nxt > field, axis=(1, 2))
+            died[:, t] = np.count_nonzero(nxt < field, axis=(1, 2))
+            live[:, t] = np.count_nonzero(nxt, axis=(1, 2))
+            field = nxt
+
+        return {
+            'step': np.arange(1, steps + 1),
+            'liveNow': live,
+            'bornStep': born,
+            'diedStep': died,
+            'bornCum': np.cumsum(born, axis=1),
+            'diedCum': np.cumsum(died, axis=1),
+            'final': field,
+        }
@@ -0,0 +1,457 @@
+"""
+Потоковые L-системы и черепашья геометрия.
+
+Лаба zeno_machine (LSystem.js, Parser.js) строит строку итерации за
+итерацией целиком, затем превращает её в массив объектов-команд и только
+потом рисует. Для ветвящихся грамматик строка растёт экспоненциально,
+поэтому глубина упирается в память на 7-8 итерациях (и обрезается
+MAX_STRING_LENGTH). Здесь:
+
+- LSystem.expand() - генератор, раскрывающий аксиому в глубину: стек
+  итераторов по правым частям правил, по одному на уровень. Строка
+  итоговой итерации нигде не хранится, память - O(итераций). Символы без
+  правил не переписываются ни на каком уровне и выдаются сразу целыми
+  отрезками; правые части последнего уровня - тоже целиком;
+- Turtle.feed() интерпретирует кусок строки векторно. Углы в лабе
+  складываются (в 3D - три угла Эйлера независимо), поэтому состояние
+  черепахи - префиксные суммы приращений, а скобки - поправки,
+  возвращающие сумму к значению в момент '['. Позиции группируются
+  сортировкой по глубине вложенности: внутри группы значение - сумма
+  приращений от ближайшей открывающей позиции, так что весь кусок
+  считается одной префиксной суммой и проходом по уровням только для
+  открывающих скобок. Скобки, не закрытые в куске, переходят в стек
+  следующего куска;
+- stream() склеивает выход генератора в куски по chunk символов и
+  выдаёт отрезки кусками float32 - их можно сразу отдавать клиенту.
+
+Семантика символов и начальные направления - как в Parser.js:
+F G A 0 1 - шаг с рисованием, f - шаг без рисования, + - | - повороты
+(в 3D: + - рыскание, & ^ тангаж, \\ / крен), [ ] - стек. Лишняя ']'
+при пустом стеке игнорируется.
+
+Стохастические правила записываются как в лабе: "F[+F]F [33%] | F[-F]F [67%]".
+Случайный выбор делается при раскрытии в глубину, поэтому с тем же seed
+дерево отличается от построенного лабой (там выбор идёт по уровням).
+"""
+
+import random
+import re
+import time
+
+import numpy as np
+
+
+DRAW_SYMBOLS = 'FGA01'
+MOVE_SYMBOLS = 'f'
+MODES = ('2d', '3d')
+CHUNK_SYMBOLS = 1 << 16
+
+# Повороты 3D режима: символ -> (ось, знак); ось 0 - X (тангаж), 1 - Y (рыскание), 2 - Z (крен)
+TURNS_3D = {'+': (1, 1), '-': (1, -1), '&': (0, -1), '^': (0, 1), '\\': (2, 1), '/': (2, -1)}
+
+_PROBABILITY = re.compile(r'^(.*?)\[(\d+(?:\.\d+)?)%\]$')
+_ANNOTATION = re.compile(r'\[\d+%\][\s|]*')
+
+
+# =============================================================================
+# ПРАВИЛА
+# =============================================================================
+
+def is_stochastic(value):
+    """Та же эвристика, что в LSystem.parseRules"""
+    return isinstance(value, str) and '|' in value and '[' in value and '%' in value
+
+
+def parse_stochastic(predecessor, value):
+    """
+    "A [30%] | B [70%]" -> [(successor, probability), ...]. Варианты без
+    процента делят остаток поровну, сумма нормируется к 1 (parseStochasticRule)
+    """
+    variants = value.split('|')
+    result, total = [], 0.0
+    for variant in variants:
+        variant = variant.strip()
+        match = _PROBABILITY.match(variant)
+        if match:
+            probability = float(match.group(2)) / 100
+            variant = match.group(1).strip()
+        else:
+            probability = (1.0 - total) / (len(variants) - len(result))
+        result.append((variant, probability))
+        total += probability
+    if total <= 0:
+        raise ValueError(f"Нулевая сумма вероятностей для '{predecessor}'")
+    if abs(total - 1.0) > 0.001:
+        result = [(successor, probability / total) for successor, probability in result]
+    return result
+
+
+def parse_rules(rules):
+    """
+    Правила строкой ("F -> FF" по строкам) или словарём. Значение словаря -
+    правая часть, строка со стохастическими вариантами или список
+    {"successor", "probability"}. Возвращает (детерминированные, стохастические)
+    """
+    if rules is None:
+        rules = {}
+    if isinstance(rules, str):
+        pairs = []
+        for line in rules.split('\n'):
+            line = line.strip()
+            if '->' not in line:
+                continue
+            key, value = line.split('->')[:2]
+            if key.strip() and value.strip():
+                pairs.append((key.strip(), value.strip()))
+    elif isinstance(rules, dict):
+        pairs = list(rules.items())
+    else:
+        raise ValueError("Правила - строка или словарь")
+
+    deterministic, stochastic = {}, {}
+    for key, value in pairs:
+        if not isinstance(key, str) or len(key) != 1:
+            raise ValueError(f"Левая часть правила - один символ: {key!r}")
+        if isinstance(value, list):
+            variants = [(str(v['successor']), float(v['probability'])) for v in value]
+            total = sum(p for _, p in variants)
+            if total <= 0:
+                raise ValueError(f"Нулевая сумма вероятностей для '{key}'")
+            stochastic[key] = [(s, p / total) for s, p in variants]
+        elif is_stochastic(value):
+            stochastic[key] = parse_stochastic(key, value)
+        elif isinstance(value, str):
+            deterministic[key] = _ANNOTATION.sub('', value).strip()
+        else:
+            raise ValueError(f"Правая часть правила '{key}' - строка")
+    return deterministic, stochastic
+
+
+# =============================================================================
+# РАСКРЫТИЕ
+# =============================================================================
+
+class LSystem:
+    """L-система с ленивым раскрытием в глубину"""
+
+    def __init__(self, axiom='F', rules=None, iterations=4, seed=None):
+        if not isinstance(axiom, str) or not axiom:
+            raise ValueError("Аксиома должна быть непустой строкой")
+        iterations = int(iterations)
+        if iterations < 0:
+            raise ValueError("Число итераций не может быть отрицательным")
+        self.axiom = axiom
+        self.iterations = iterations
+        self.rules, self.stochastic = parse_rules(rules)
+        self.seed = seed
+        self._tokens_cache = {}
+
+    def _tokens(self, text):
+        """Разбиение строки на (отрезок, переписывается ли): подряд идущие символы без правил - один отрезок"""
+        tokens = self._tokens_cache.get(text)
+        if tokens is None:
+            tokens, start = [], 0
+            for i, ch in enumerate(text):
+                if ch in self.rules or ch in self.stochastic:
+                    if start < i:
+                        tokens.append((text[start:i], False))
+                    tokens.append((ch, True))
+                    start = i + 1
+            if start < len(text):
+                tokens.append((text[start:], False))
+            self._tokens_cache[text] = tokens
+        return tokens
+
+    def expand(self):
+        """
+        Генератор кусков строки итоговой итерации в порядке следования.
+        Каждый вызов начинает раскрытие заново с тем же seed
+        """
+        rng = random.Random(self.seed)
+        rules, stochastic = self.rules, self.stochastic
+
+        def successor(ch):
+            variants = stochastic.get(ch)
+            if variants is not None:
+                r, cumulative = rng.random(), 0.0
+                for text, probability in variants:
+                    cumulative += probability
+                    if r <= cumulative:
+                        return text
+            return rules.get(ch, ch)
+
+        last = self.iterations
+        if last == 0:
+            yield self.axiom
+            return
+        # stack[k] - итератор по токенам строки уровня k
+        stack = [iter(self._tokens(self.axiom))]
+        while stack:
+            for text, rewrite in stack[-1]:
+                if not rewrite:
+                    yield text
+                elif len(stack) == last:
+                    yield successor(text)
+                else:
+                    stack.append(iter(self._tokens(successor(text))))
+                    break
+            else:
+                stack.pop()
+
+    def count(self, symbols):
+        """
+        Сколько символов из symbols в строке итоговой итерации - без
+        раскрытия, динамикой по уровням. Для стохастических правил -
+        математическое ожидание (float), иначе точное целое
+        """
+        symbols = set(symbols)
+        rewritable = set(self.rules) | set(self.stochastic)
+        alphabet = set(self.axiom) | rewritable
+        for text in self.rules.values():
+            alphabet.update(text)
+        for variants in self.stochastic.values():
+            for text, _ in variants:
+                alphabet.update(text)
+
+        counts = {ch: int(ch in symbols) for ch in alphabet}
+        for _ in range(self.iterations):
+            new = dict(counts)
+            for ch in rewritable:
+                if ch in self.stochastic:
+                    new[ch] = sum(p * sum(counts[c] for c in text) for text, p in self.stochastic[ch])
+                else:
+                    new[ch] = sum(counts[c] for c in self.rules[ch])
+            counts = new
+        return sum(counts[ch] for ch in self.axiom)
+
+    def string(self, limit=None):
+        """Строка целиком (для проверки и маленьких систем); limit - обрезка"""
+        parts, size = [], 0
+        for piece in self.expand():
+            parts.append(piece)
+            size += len(piece)
+            if limit is not None and size >= limit:
+                break
+        text = ''.join(parts)
+        return text if limit is None else text[:limit]
+
+
+# =============================================================================
+# ЧЕРЕПАХА
+# =============================================================================
+
+class Turtle:
+    """
+    Векторная черепаха Parser.js. feed() принимает очередной кусок строки и
+    возвращает его отрезки массивом float32 формы (m, stride): 2D -
+    x0 y0 x1 y1 depth, 3D - x0 y0 z0 x1 y1 z1 depth. depth - глубина
+    ветвления, по ней лаба выбирает цвет и толщину
+    """
+
+    def __init__(self, angle=25, step=10, mode='2d'):
+        if mode not in MODES:
+            raise ValueError(f"Режим должен быть одним из {MODES}")
+        self.angle = float(angle)
+        self.step = float(step)
+        self.mode = mode
+        self.dims = 2 if mode == '2d' else 3
+        self.stride = 2 * self.dims + 1
+
+        # Таблицы по коду символа (latin-1); остальные символы игнорируются
+        self._turn = np.zeros((256, 3))
+        if mode == '2d':
+            self._turn[ord('+'), 1] = self.angle
+            self._turn[ord('-'), 1] = -self.angle
+        else:
+            for ch, (axis, sign) in TURNS_3D.items():
+                self._turn[ord(ch), axis] = sign * self.angle
+        self._turn[ord('|'), 1] = 180.0
+        self._draw = np.zeros(256, bool)
+        self._draw[[ord(c) for c in DRAW_SYMBOLS]] = True
+        self._move = self._draw.copy()
+        self._move[[ord(c) for c in MOVE_SYMBOLS]] = True
+        self._bracket = np.zeros(256, np.int64)
+        self._bracket[ord('[')] = 1
+        self._bracket[ord(']')] = -1
+        self.reset()
+
+    def reset(self):
+        """Начальное состояние: начало координат, взгляд вверх (-90 градусов)"""
+        self.position = np.zeros(3)
+        self.angles = np.array([0.0, -90.0, 0.0])
+        # Сохранённые '[' состояния: (позиция, углы)
+        self.stack = []
+        self.symbols = 0
+        self.segments = 0
+        self.max_depth = 0
+        self.bounds = None
+        self.truncated = False
+
+    # ----- разрешение скобок -----
+
+    def _plan(self, b):
+        """
+        Разбор скобок куска. Позиции (с фиктивной нулевой - началом куска)
+        группируются по глубине после символа. Внутри группы значение
+        равно значению предыдущего члена группы плюс приращение: всё, что
+        между ними глубже, - закрытые ветви, их вклад снимает ']'. Цепочка
+        рвётся только на "открывающих" позициях: '[' (значение как перед
+        ней), ']' без пары в куске (значение из унаследованного стека) и
+        начало куска
+        """
+        depth = np.concatenate(([0], np.cumsum(b)))
+        bracket = np.concatenate(([0], b))
+        # ']' без пары опускает глубину ниже всего, что было раньше
+        lowest = np.minimum.accumulate(depth)
+        popping = (bracket < 0) & (depth < np.concatenate(([0], lowest[:-1])))
+        opener = (bracket > 0) | popping
+        opener[0] = True
+        order = np.argsort(depth, kind='stable')
+        sorted_depth = depth[order]
+        levels, starts = np.unique(sorted_depth, return_index=True)
+        # '[' остаётся открытой, если дальше глубина не опускается ниже неё
+        after = np.minimum.accumulate(depth[::-1])[::-1]
+        after = np.concatenate((after[1:], [np.iinfo(np.int64).max]))
+        return {
+            'depth': depth[1:], 'order': order, 'popping': popping,
+            'segment': np.cumsum(opener[order]) - 1,
+            'opener_rank': np.flatnonzero(opener[order]),
+            'groups': list(zip(levels.tolist(), starts.tolist(), starts[1:].tolist() + [len(order)])),
+            'left_open': np.flatnonzero((bracket > 0) & (after >= depth)) - 1,
+            'popped': int(popping.sum()),
+        }
+
+    @staticmethod
+    def _resolve(inc, base, saved, plan):
+        """Значения после каждого символа для приращений inc (n x 3) при состоянии base и стеке saved"""
+        order, segment, ranks = plan['order'], plan['segment'], plan['opener_rank']
+        popping = plan['popping']
+        inc = np.concatenate((np.zeros((1, inc.shape[1])), inc))
+        total = np.cumsum(inc[order], axis=0)
+        values = np.empty_like(inc)
+        values[0] = base
+        # По группам от мелких к глубоким: значение '[' берётся из предыдущей позиции, она мельче
+        for level, lo, hi in plan['groups']:
+            opens = ranks[segment[lo]:segment[hi - 1] + 1]
+            positions = order[opens]
+            # values[0] - начало куска, для него же pos - 1 обрезается до 0
+            start = values[np.maximum(positions - 1, 0)]
+            pop = popping[positions]
+            if pop.any():
+                start[pop] = saved[len(saved) + level]
+            local = segment[lo:hi] - segment[lo]
+            values[order[lo:hi]] = start[local] + total[lo:hi] - total[opens][local]
+        return values[1:]
+
+    def feed(self, text):
+        """Отрезки куска строки; состояние и стек переходят к следующему куску"""
+        codes = np.frombuffer(text.encode('latin-1', 'replace'), np.uint8)
+        n = len(codes)
+        self.symbols += n
+        if n == 0:
+            return np.zeros((0, self.stride), np.float32)
+
+        # Скобки: ']' при пустом стеке (с учётом унаследованного) выбрасываем
+        b = self._bracket[codes]
+        floor = np.minimum.accumulate(np.minimum(len(self.stack) + np.cumsum(b), 0))
+        b[np.diff(floor, prepend=0) < 0] = 0
+
+        plan = self._plan(b)
+        depth = plan['depth']
+        angles = self._resolve(self._turn[codes], self.angles, [s[1] for s in self.stack], plan)
+        moving = self._move[codes]
+        rad = np.radians(angles[moving])
+        direction = np.zeros((len(rad), 3))
+        if self.mode == '2d':
+            direction[:, 0] = np.cos(rad[:, 1])
+            direction[:, 1] = np.sin(rad[:, 1])
+        else:
+            cos_x = np.cos(rad[:, 0])
+            direction[:, 0] = np.sin(rad[:, 1]) * cos_x
+            direction[:, 1] = np.sin(rad[:, 0])
+            direction[:, 2] = np.cos(rad[:, 1]) * cos_x
+        inc = np.zeros((n, 3))
+        inc[moving] = self.step * direction
+        positions = self._resolve(inc, self.position, [s[0] for s in self.stack], plan)
+
+        drawing = np.flatnonzero(self._draw[codes])
+        d = self.dims
+        out = np.empty((len(drawing), self.stride), np.float32)
+        out[:, d:2 * d] = positions[drawing, :d]
+        out[:, :d] = positions[drawing, :d] - inc[drawing, :d]
+        out[:, -1] = len(self.stack) + depth[drawing]
+
+        # Состояние к следующему куску
+        if plan['popped']:
+            del self.stack[-plan['popped']:]
+        for i in plan['left_open']:
+            self.stack.append((positions[i].copy(), angles[i] % 360))
+        self.position = positions[-1].copy()
+        self.angles = angles[-1] % 360
+
+        if len(out):
+            self.segments += len(out)
+            self.max_depth = max(self.max_depth, int(out[:, -1].max()))
+            points = out[:, :2 * d].reshape(-1, d)
+            low, high = points.min(axis=0), points.max(axis=0)
+            if self.bounds is not None:
+                low, high = np.minimum(low, self.bounds[0]), np.maximum(high, self.bounds[1])
+            self.bounds = (low, high)
+        return out
+
+    def stats(self):
+        return {
+            "symbols": self.symbols,
+            "segments": self.segments,
+            "maxDepth": self.max_depth,
+            "openBranches": len(self.stack),
+            "truncated": self.truncated,
+            "bounds": None if self.bounds is None else
+            {"min": self.bounds[0].tolist(), "max": self.bounds[1].tolist()},
+        }
+
+
+# =============================================================================
+# ПОТОК
+# =============================================================================
+
+def stream(system, turtle, chunk=CHUNK_SYMBOLS, max_segments=None, time_limit=None):
+    """
+    Генератор массивов отрезков float32: раскрытие system кусками по
+    chunk символов через turtle. Останавливается на max_segments отрезках
+    или через time_limit секунд; turtle.truncated сообщает, что строка не
+    дочитана
+    """
+    if chunk < 1:
+        raise ValueError("Размер куска должен быть положительным")
+    start = time.perf_counter()
+    turtle.truncated = False
+    pending, size = [], 0
+
+    def flush():
+        out = turtle.feed(''.join(pending))
+        pending.clear()
+        if max_segments is not None and turtle.segments >= max_segments:
+            out = out[:len(out) - (turtle.segments - max_segments)]
+            turtle.segments = max_segments
+            turtle.truncated = True
+        return out
+
+    for piece in system.expand():
+        pending.append(piece)
+        size += len(piece)
+        if size < chunk:
+            continue
+        size = 0
+        out = flush()
+        if len(out):
+            yield out
+        if turtle.truncated:
+            return
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            turtle.truncated = True
+            return
+    if pending:
+        out = flush()
+        if len(out):
+            yield out
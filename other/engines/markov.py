@@ -0,0 +1,521 @@
+"""
+Вероятностные автоматы и цепи Маркова на разреженных матрицах.
+
+Лаба probabilistic_automata моделирует автомат случайными прогонами по
+одному шагу. Здесь автомат - набор стохастических матриц M_a (scipy.sparse
+CSR, строка - откуда, столбец - куда), и вероятности считаются точно:
+
+- распределение после слова w = a1..am - это p0 · M_a1 · ... · M_am,
+  вероятность принятия - масса этого вектора на заключительных
+  состояниях; пачка слов продвигается одновременно, столбцами матрицы;
+- цепь Маркова P = Σ w_a · M_a (случайный вход с весами w_a) разбивается
+  на компоненты сильной связности: замкнутые классы и переходные
+  состояния. Для каждого замкнутого класса стационарное распределение
+  ищется прямым разреженным решателем или через eigs, для переходных
+  состояний - время и вероятности поглощения по фундаментальной
+  матрице (I - Q)^-1 (одно LU-разложение на все правые части);
+- для сравнения с точными числами есть векторный Монте-Карло: блуждания
+  идут пачками по SAMPLE_BATCH одновременно, следующее состояние для всех
+  выбирается одним searchsorted по накопленным вероятностям матрицы;
+  между пачками проверяется time_limit.
+
+Строка с суммой меньше 1 допустима в автомате: недостающая масса - это
+прогоны, которые «застряли» (в лабе - исключение «Нет переходов»).
+
+Формат JSON - toJSON лабы ({name, states: [{id, isInitial, isFinal}],
+alphabet, transitionMatrices: {a: {from: {to: p}}}, initialDistribution});
+цепь можно задать и одной матрицей {from: {to: p}}, как в ErgodicityAnalyzer.
+"""
+
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import ArpackNoConvergence, eigs, splu, spsolve
+
+
+TOLERANCE = 1e-9
+WALKS = 1_000_000
+# Больше - LU даёт сильное заполнение, method='auto' переходит на eigs
+DIRECT_LIMIT = 2000
+# С какого числа переходов запросы Sampler сортируются перед поиском
+SORTED_SEARCH = 1 << 16
+# Блужданий в одной пачке Монте-Карло
+SAMPLE_BATCH = 1 << 16
+
+
+def _matrix(rows, index):
+    """{from: {to: p}} -> CSR по нумерации index"""
+    us, vs, ps = [], [], []
+    for q, row in (rows or {}).items():
+        for p, prob in (row or {}).items():
+            if str(q) not in index or str(p) not in index:
+                raise ValueError(f"Переход {q} -> {p} ссылается на неизвестное состояние")
+            prob = float(prob)
+            if prob < 0 or prob > 1 + TOLERANCE:
+                raise ValueError(f"Вероятность {q} -> {p} вне диапазона [0, 1]: {prob}")
+            if prob > 0:
+                us.append(index[str(q)])
+                vs.append(index[str(p)])
+                ps.append(prob)
+    n = len(index)
+    m = sparse.csr_matrix((ps, (us, vs)), shape=(n, n), dtype=np.float64)
+    m.sum_duplicates()
+    return m
+
+
+def _row_sums(m):
+    return np.asarray(m.sum(axis=1)).ravel()
+
+
+class Sampler:
+    """
+    Выбор следующего состояния сразу для пачки блужданий по матрице m.
+
+    Все ненулевые элементы CSR идут подряд, поэтому общая накопленная
+    сумма data позволяет найти переход каждого блуждания одним
+    searchsorted: в строке s ищется base[s] + u, где u ~ U[0, 1).
+    Если u не меньше суммы строки, блуждание застревает (-1).
+    """
+
+    def __init__(self, m):
+        m = sparse.csr_matrix(m)
+        m.sort_indices()
+        self.indptr = m.indptr.astype(np.int64)
+        self.indices = m.indices.astype(np.int64)
+        self.cum = np.cumsum(m.data)
+        self.base = np.concatenate([[0.0], self.cum])[self.indptr[:-1]]
+        rowsum = _row_sums(m)
+        # Стохастические строки с погрешностью округления не должны «застревать»
+        self.rowsum = np.where(np.abs(rowsum - 1) < 1e-6, 1.0, rowsum)
+
+    def step(self, states, rng):
+        out = np.full(states.size, -1, dtype=np.int64)
+        alive = np.flatnonzero(states >= 0)
+        s = states[alive]
+        u = rng.random(s.size)
+        ok = u < self.rowsum[s]
+        s, u, alive = s[ok], u[ok], alive[ok]
+        target = self.base[s] + u
+        if self.cum.size > SORTED_SEARCH:
+            # Упорядоченные запросы обходят cum последовательно - меньше промахов кеша
+            order = np.argsort(target)
+            pos = np.empty(target.size, dtype=np.int64)
+            pos[order] = np.searchsorted(self.cum, target[order], side='right')
+        else:
+            pos = np.searchsorted(self.cum, target, side='right')
+        # Погрешность суммирования не должна выводить за пределы строки
+        pos = np.clip(pos, self.indptr[s], self.indptr[s + 1] - 1)
+        out[alive] = self.indices[pos]
+        return out
+
+
+def _batches(walks, deadline):
+    """Размеры пачек блужданий; после deadline новые пачки не начинаются (первая - всегда)"""
+    if walks < 1:
+        raise ValueError("Нужно хотя бы одно блуждание")
+    done = 0
+    while done < walks:
+        if done and deadline is not None and time.perf_counter() > deadline:
+            return
+        size = min(SAMPLE_BATCH, walks - done)
+        yield size
+        done += size
+
+
+def _deadline(time_limit):
+    return None if time_limit is None else time.perf_counter() + time_limit
+
+
+def _initial_states(p0, walks, rng):
+    cum = np.cumsum(p0)
+    states = np.searchsorted(cum, rng.random(walks) * cum[-1], side='right')
+    return np.minimum(states, p0.size - 1).astype(np.int64)
+
+
+# =============================================================================
+# ВЕРОЯТНОСТНЫЙ АВТОМАТ
+# =============================================================================
+
+class StochasticAutomaton:
+    """
+    Вероятностный автомат: matrices[a] - CSR (n, n) по символу a, initial -
+    начальное распределение, final - bool-маска заключительных состояний.
+    """
+
+    def __init__(self, matrices, initial, final, alphabet, names=None):
+        self.alphabet = [str(a) for a in alphabet]
+        self.initial = np.asarray(initial, dtype=np.float64).ravel()
+        self.final = np.asarray(final, dtype=bool).ravel()
+        self.names = [str(i) for i in range(self.n)] if names is None else [str(s) for s in names]
+        self.matrices = [sparse.csr_matrix(matrices[j], shape=(self.n, self.n), dtype=np.float64)
+                         for j in range(len(self.alphabet))]
+        self.column = {a: j for j, a in enumerate(self.alphabet)}
+        if len(self.names) != self.n or self.final.size != self.n:
+            raise ValueError("Размеры описания состояний не совпадают")
+        if self.n and abs(self.initial.sum() - 1) > 1e-6:
+            raise ValueError("Начальное распределение не нормировано")
+        for a, m in zip(self.alphabet, self.matrices):
+            over = np.flatnonzero(_row_sums(m) > 1 + 1e-6)
+            if over.size:
+                raise ValueError(f"Сумма вероятностей из {self.names[over[0]]} по символу {a} больше 1")
+        self._samplers = None
+
+    @property
+    def n(self):
+        return self.initial.size
+
+    # ----- JSON -----
+
+    @classmethod
+    def from_json(cls, data):
+        """Автомат из toJSON лабы probabilistic_automata"""
+        raw_states = data.get('states') or []
+        names = [str(s['id']) if isinstance(s, dict) else str(s) for s in raw_states]
+        if not names:
+            raise ValueError("Автомат не содержит состояний")
+        index = {name: i for i, name in enumerate(names)}
+        matrices_json = data.get('transitionMatrices') or {}
+        alphabet = [str(a) for a in data.get('alphabet') or matrices_json]
+        matrices = [_matrix(matrices_json.get(a), index) for a in alphabet]
+        final = [bool(s.get('isFinal')) if isinstance(s, dict) else False for s in raw_states]
+
+        initial = np.zeros(len(names))
+        for q, p in (data.get('initialDistribution') or {}).items():
+            if str(q) in index:
+                initial[index[str(q)]] = float(p)
+        if initial.sum() <= 0:
+            # Как updateInitialDistribution: равномерно по начальным состояниям
+            starts = [i for i, s in enumerate(raw_states) if isinstance(s, dict) and s.get('isInitial')]
+            if not starts:
+                raise ValueError("Не задано начальное распределение")
+            initial[starts] = 1.0
+        # StateVector нормирует распределение при создании
+        initial /= initial.sum()
+        return cls(matrices, initial, final, alphabet, names)
+
+    def _columns(self, word):
+        try:
+            return [self.column[a] for a in word]
+        except KeyError as e:
+            raise ValueError(f"Символ '{e.args[0]}' не в алфавите автомата") from None
+
+    # ----- точные вероятности -----
+
+    def distribution(self, word):
+        """Распределение по состояниям после слова (сумма < 1 - часть прогонов застряла)"""
+        v = self.initial.copy()
+        for j in self._columns(word):
+            v = self.matrices[j].T @ v
+        return v
+
+    def acceptance(self, word):
+        return float(self.distribution(word)[self.final].sum())
+
+    def acceptance_many(self, words):
+        """
+        Вероятности принятия пачки слов. Распределения хранятся столбцами
+        матрицы (n, m); на позиции i столбцы слов с символом a умножаются
+        на M_a^T одним произведением, закончившиеся слова не трогаются.
+        """
+        words = [self._columns(w) for w in words]
+        if not words:
+            return np.zeros(0)
+        codes = np.full((len(words), max(len(w) for w in words)), -1, dtype=np.int64)
+        for i, w in enumerate(words):
+            codes[i, :len(w)] = w
+        v = np.repeat(self.initial[:, None], len(words), axis=1)
+        transposed = [m.T.tocsr() for m in self.matrices]
+        for col in codes.T:
+            for j in np.unique(col[col >= 0]).tolist():
+                pick = np.flatnonzero(col == j)
+                v[:, pick] = transposed[j] @ v[:, pick]
+        return self.final.astype(np.float64) @ v
+
+    # ----- Монте-Карло -----
+
+    def sample(self, word, walks=WALKS, seed=None, time_limit=None):
+        """
+        walks случайных прогонов слова пачками, как multipleRuns лабы.
+        Возвращает долю принятых, распределение конечных состояний, долю
+        застрявших прогонов и число сделанных прогонов walks: после
+        time_limit секунд новые пачки не начинаются.
+        """
+        rng = np.random.default_rng(seed)
+        deadline = _deadline(time_limit)
+        if self._samplers is None:
+            self._samplers = [Sampler(m) for m in self.matrices]
+        columns = self._columns(word)
+        done, alive_count, distribution = 0, 0, np.zeros(self.n, dtype=np.int64)
+        for size in _batches(walks, deadline):
+            states = _initial_states(self.initial, size, rng)
+            for j in columns:
+                states = self._samplers[j].step(states, rng)
+            alive = states[states >= 0]
+            distribution += np.bincount(alive, minlength=self.n)
+            alive_count += alive.size
+            done += size
+        accepted = float(distribution[self.final].sum()) / done
+        return {
+            'acceptance': accepted,
+            'stderr': float(np.sqrt(accepted * (1 - accepted) / done)),
+            'distribution': distribution / done,
+            'blocked': 1.0 - alive_count / done,
+            'walks': done,
+        }
+
+    # ----- цепь Маркова -----
+
+    def chain(self, weights=None):
+        """
+        Цепь при случайном входе: P = Σ w_a · M_a. weights - {символ: вес},
+        по умолчанию символы равновероятны; веса нормируются. Если строки
+        P не добирают до 1, добавляется поглощающее состояние ⊥.
+        """
+        if weights:
+            w = np.array([float(weights.get(a, 0)) for a in self.alphabet])
+        else:
+            w = np.ones(len(self.alphabet))
+        if w.sum() <= 0:
+            raise ValueError("Сумма весов символов должна быть положительной")
+        w = w / w.sum()
+        p = sparse.csr_matrix((self.n, self.n), dtype=np.float64)
+        for weight, m in zip(w, self.matrices):
+            if weight:
+                p = p + weight * m
+        deficit = 1 - _row_sums(p)
+        if (deficit <= 1e-6).all():
+            return MarkovChain(p, self.names, initial=self.initial)
+        # Застрявшие прогоны уходят в поглощающее состояние ⊥
+        stuck = np.flatnonzero(deficit > 1e-6)
+        extra = sparse.csr_matrix((np.append(deficit[stuck], 1.0), (np.append(stuck, self.n), np.full(stuck.size + 1, self.n))),
+                                  shape=(self.n + 1, self.n + 1))
+        p = sparse.bmat([[p, None], [None, sparse.csr_matrix((1, 1))]]).tocsr() + extra
+        return MarkovChain(p, self.names + ['⊥'], initial=np.append(self.initial, 0.0))
+
+
+# =============================================================================
+# ЦЕПЬ МАРКОВА
+# =============================================================================
+
+class MarkovChain:
+    """
+    Однородная цепь Маркова: P - стохастическая CSR (n, n), names,
+    initial - начальное распределение (по умолчанию равномерное).
+
+    Структура (замкнутые классы, их периоды, переходные состояния)
+    вычисляется при создании.
+    """
+
+    def __init__(self, p, names=None, initial=None):
+        self.p = sparse.csr_matrix(p, dtype=np.float64)
+        self.p.eliminate_zeros()
+        n = self.p.shape[0]
+        self.names = [str(i) for i in range(n)] if names is None else [str(s) for s in names]
+        self.initial = np.full(n, 1.0 / max(n, 1)) if initial is None \
+            else np.asarray(initial, dtype=np.float64).ravel()
+        bad = np.flatnonzero(np.abs(_row_sums(self.p) - 1) > 1e-6)
+        if bad.size:
+            raise ValueError(f"Строка {self.names[bad[0]]} не стохастическая: сумма вероятностей не равна 1")
+        self._structure()
+
+    @property
+    def n(self):
+        return self.p.shape[0]
+
+    @classmethod
+    def from_json(cls, data, weights=None):
+        """Цепь из матрицы {from: {to: p}} или из автомата лабы (случайный вход)"""
+        if 'transitionMatrices' in data:
+            return StochasticAutomaton.from_json(data).chain(weights)
+        names = list(dict.fromkeys([str(q) for q in data] + [str(p) for row in data.values() for p in row]))
+        return cls(_matrix(data, {name: i for i, name in enumerate(names)}), names)
+
+    # ----- структура -----
+
+    def _structure(self):
+        count, comp = connected_components(self.p, directed=True, connection='strong')
+        coo = self.p.tocoo()
+        leaving = np.zeros(count, dtype=bool)
+        cross = comp[coo.row] != comp[coo.col]
+        leaving[comp[coo.row[cross]]] = True
+        closed = np.flatnonzero(~leaving)
+        self.classes = [np.flatnonzero(comp == c) for c in closed]
+        self.transient = np.flatnonzero(np.isin(comp, closed, invert=True))
+        self.class_of = np.full(self.n, -1, dtype=np.int64)
+        for i, members in enumerate(self.classes):
+            self.class_of[members] = i
+        self.periods = [self._period(members) for members in self.classes]
+
+    def _period(self, members):
+        """НОД длин циклов класса: по уровням обхода в ширину, gcd(level[u] + 1 - level[v])"""
+        sub = self.p[members][:, members].tocsr()
+        level = np.full(members.size, -1, dtype=np.int64)
+        level[0] = 0
+        frontier = np.array([0])
+        depth = 0
+        while frontier.size:
+            depth += 1
+            nxt = np.unique(sub[frontier].indices)
+            nxt = nxt[level[nxt] < 0]
+            level[nxt] = depth
+            frontier = nxt
+        coo = sub.tocoo()
+        return int(np.gcd.reduce(np.abs(level[coo.row] + 1 - level[coo.col]))) if coo.nnz else 1
+
+    @property
+    def irreducible(self):
+        return len(self.classes) == 1 and not self.transient.size
+
+    @property
+    def ergodic(self):
+        return self.irreducible and self.periods[0] == 1
+
+    # ----- стационарные распределения -----
+
+    def class_stationary(self, members, method='auto'):
+        """
+        Стационарное распределение неприводимого блока P[members].
+
+        direct - разреженный решатель для π(P - I) = 0 при π_last = 1 с
+        последующей нормировкой; eigs - собственный вектор P^T при
+        собственном числе 1 (для «ленивой» цепи (P + I) / 2, у которой оно
+        единственное по модулю даже при периодичном классе); auto выбирает
+        по размеру блока.
+        """
+        m = members.size
+        if m == 1:
+            return np.ones(1)
+        if method == 'auto':
+            method = 'direct' if m <= DIRECT_LIMIT else 'eigs'
+        sub = self.p[members][:, members]
+        if method == 'eigs' and m > 2:
+            lazy = (sub.T + sparse.identity(m)) / 2
+            try:
+                _, vectors = eigs(lazy, k=1, which='LM', tol=1e-12)
+                pi = np.abs(np.real(vectors[:, 0]))
+                return pi / pi.sum()
+            except ArpackNoConvergence:
+                # Медленная сходимость (длинный цикл) - решаем систему напрямую
+                method = 'direct'
+        if method in ('direct', 'eigs'):
+            # π_last = 1, остальные: π' (I - P'') = P[last, :-1]; блок I - P''
+            # неприводимой цепи невырожден, а плотной строки нормировки нет
+            sub = sub.tocsr()
+            a = (sparse.identity(m - 1) - sub[:-1][:, :-1]).T.tocsc()
+            b = sub[m - 1, :-1].toarray().ravel()
+            pi = np.append(spsolve(a, b), 1.0)
+        else:
+            raise ValueError(f"Неизвестный метод: {method}")
+        pi = np.maximum(pi, 0)
+        return pi / pi.sum()
+
+    def stationary(self, method='auto'):
+        """
+        Стационарное распределение цепи. Для неприводимой цепи оно
+        единственно; для приводимой возвращается предельное (в среднем по
+        Чезаро) распределение из initial: смесь стационарных распределений
+        замкнутых классов с весами - вероятностями попасть в класс.
+        """
+        weights = self.initial[self.transient] @ self.absorption()[1] if self.transient.size \
+            else np.zeros(len(self.classes))
+        pi = np.zeros(self.n)
+        for i, members in enumerate(self.classes):
+            weight = weights[i] + self.initial[members].sum()
+            if weight > 0:
+                pi[members] = weight * self.class_stationary(members, method)
+        return pi
+
+    # ----- поглощение -----
+
+    def absorption(self):
+        """
+        Для переходных состояний: (steps, probabilities), где steps[i] -
+        среднее число шагов до попадания в замкнутый класс, probabilities[i, c] -
+        вероятность оказаться в классе c. Решается (I - Q) x = b с одним
+        LU-разложением на все правые части.
+        """
+        t = self.transient
+        if not t.size:
+            return np.zeros(0), np.zeros((0, len(self.classes)))
+        q = self.p[t][:, t]
+        lu = splu((sparse.identity(t.size) - q).tocsc())
+        steps = lu.solve(np.ones(t.size))
+        # R - переходы из переходных состояний, сложенные по замкнутым классам
+        to_class = sparse.csr_matrix(
+            (np.ones(self.n - t.size), (np.flatnonzero(self.class_of >= 0), self.class_of[self.class_of >= 0])),
+            shape=(self.n, len(self.classes)))
+        r = (self.p[t] @ to_class).toarray()
+        probabilities = lu.solve(r) if r.size else r
+        return steps, probabilities
+
+    # ----- Монте-Карло -----
+
+    def sample_absorption(self, walks=WALKS, max_steps=10000, seed=None, time_limit=None):
+        """
+        Блуждания из initial до первого попадания в замкнутый класс.
+        Возвращает среднее число шагов, доли классов, долю блужданий, не
+        поглощённых за max_steps шагов или time_limit секунд, и число
+        сделанных блужданий walks (после time_limit новые пачки не начинаются).
+        """
+        rng = np.random.default_rng(seed)
+        deadline = _deadline(time_limit)
+        sampler = Sampler(self.p)
+        done, absorbed, total_steps = 0, 0, 0
+        classes = np.zeros(len(self.classes), dtype=np.int64)
+        for size in _batches(walks, deadline):
+            states = _initial_states(self.initial, size, rng)
+            steps = np.zeros(size, dtype=np.int64)
+            active = np.flatnonzero(self.class_of[states] < 0)
+            for _ in range(max_steps):
+                if not active.size or (deadline is not None and time.perf_counter() > deadline):
+                    break
+                states[active] = sampler.step(states[active], rng)
+                steps[active] += 1
+                active = active[self.class_of[states[active]] < 0]
+            finished = self.class_of[states] >= 0
+            classes += np.bincount(self.class_of[states[finished]], minlength=len(self.classes))
+            absorbed += int(finished.sum())
+            total_steps += int(steps[finished].sum())
+            done += size
+        return {
+            'steps': total_steps / absorbed if absorbed else None,
+            'classes': classes / done,
+            'unfinished': 1.0 - absorbed / done,
+            'walks': done,
+        }
+
+    def sample_distribution(self, steps, walks=WALKS, seed=None):
+        """Эмпирическое распределение через steps шагов по walks блужданиям"""
+        rng = np.random.default_rng(seed)
+        sampler = Sampler(self.p)
+        states = _initial_states(self.initial, walks, rng)
+        for _ in range(steps):
+            states = sampler.step(states, rng)
+        return np.bincount(states, minlength=self.n) / walks
+
+    def distribution(self, steps):
+        """Точное распределение через steps шагов: initial · P^steps"""
+        v = self.initial.copy()
+        transposed = self.p.T.tocsr()
+        for _ in range(steps):
+            v = transposed @ v
+        return v
+
+    def summary(self, method='auto'):
+        """Сводка для API: классы, периоды, стационарное распределение, поглощение"""
+        steps, probabilities = self.absorption()
+        return {
+            'states': list(self.names),
+            'irreducible': self.irreducible,
+            'ergodic': self.ergodic,
+            'classes': [{'states': [self.names[q] for q in members.tolist()], 'period': period}
+                        for members, period in zip(self.classes, self.periods)],
+            'transient': [self.names[q] for q in self.transient.tolist()],
+            'stationary': dict(zip(self.names, self.stationary(method).tolist())),
+            'absorption': {
+                self.names[q]: {'steps': float(s), 'classes': row.tolist()}
+                for q, s, row in zip(self.transient.tolist(), steps, probabilities)
+            },
+        }
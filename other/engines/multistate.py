@@ -0,0 +1,157 @@
+"""
+Многосостоянийные автоматы Wireworld и «Мозг Брайана».
+
+Оба правила устроены одинаково: следующее состояние клетки зависит от её
+состояния и числа «сигнальных» соседей в окрестности Мура (головы
+электронов в Wireworld, включённые клетки в «Мозге Брайана»). Поэтому
+они задаются таблицей table[state, count] и общим движком.
+
+Движок хранит фронт активности - индексы клеток в нестабильных
+состояниях (у которых table[s, 0] != s). Измениться на следующем шаге
+могут только они и соседи сигнальных клеток, так что шаг стоит
+O(размер фронта), а не O(размер поля). Когда фронт занимает заметную
+долю поля, шаг выполняется плотно, сдвигами всего массива.
+"""
+
+import numpy as np
+
+
+# Состояния как в wireworld/index.html и brian_brain/core/constants.js
+WW_EMPTY, WW_CONDUCTOR, WW_HEAD, WW_TAIL = 0, 1, 2, 3
+BB_OFF, BB_ON, BB_DYING = 0, 1, 2
+
+MOORE = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx]
+
+
+class MultiStateRule:
+    """Таблица переходов table[state, count] и номер сигнального состояния"""
+
+    def __init__(self, name, table, signal, random_birth=0.0):
+        self.name = name
+        self.table = np.asarray(table, dtype=np.uint8)
+        self.signal = signal
+        self.states = self.table.shape[0]
+        # Спонтанное рождение (randomChance в «Мозге Брайана»), доля 0..1
+        self.random_birth = float(random_birth)
+        self.stable = self.table[:, 0] == np.arange(self.states)
+
+
+def wireworld():
+    table = np.zeros((4, 9), dtype=np.uint8)
+    table[WW_CONDUCTOR, :] = WW_CONDUCTOR
+    table[WW_CONDUCTOR, [1, 2]] = WW_HEAD
+    table[WW_HEAD, :] = WW_TAIL
+    table[WW_TAIL, :] = WW_CONDUCTOR
+    return MultiStateRule('wireworld', table, signal=WW_HEAD)
+
+
+def brians_brain(birth_threshold=2, random_chance=0):
+    """Правило лабы brian_brain; random_chance - в процентах, как в DEFAULT_RULES"""
+    table = np.zeros((3, 9), dtype=np.uint8)
+    if 0 <= birth_threshold <= 8:
+        table[BB_OFF, birth_threshold] = BB_ON
+    table[BB_ON, :] = BB_DYING
+    table[BB_DYING, :] = BB_OFF
+    return MultiStateRule('brians_brain', table, signal=BB_ON, random_birth=random_chance / 100)
+
+
+class MultiStateAutomaton:
+    """
+    Автомат на поле (h, w) с шагом по фронту активности.
+
+    dense_threshold - доля поля, при превышении которой фронтом шагать
+    невыгодно и используется плотный шаг. seed задаёт генератор для
+    спонтанных рождений, чтобы прогоны были воспроизводимы.
+    """
+
+    def __init__(self, rule, field, wrap=True, dense_threshold=0.05, seed=None):
+        self.rule = rule
+        self.field = np.array(field, dtype=np.uint8)
+        self.height, self.width = self.field.shape
+        self.wrap = bool(wrap)
+        self.dense_threshold = float(dense_threshold)
+        self.rng = np.random.default_rng(seed)
+        self.generation = 0
+        self.last_mode = None
+        self._refresh_active()
+
+    def _refresh_active(self):
+        self.active = np.flatnonzero(~self.rule.stable[self.field.ravel()])
+
+    def set_cell(self, x, y, state):
+        self.field[y, x] = state
+        self._refresh_active()
+
+    # ----- шаги -----
+
+    def step(self):
+        rule = self.rule
+        if rule.random_birth > 0 or self.active.size > self.dense_threshold * self.field.size:
+            self._step_dense()
+        else:
+            self._step_sparse()
+        self.generation += 1
+        return self.field
+
+    def run(self, steps):
+        for _ in range(steps):
+            self.step()
+        return self.field
+
+    def _step_dense(self):
+        rule = self.rule
+        signal = (self.field == rule.signal).astype(np.uint8)
+        counts = np.zeros_like(signal)
+        for dy, dx in MOORE:
+            counts += self._shifted(signal, dy, dx)
+        nxt = rule.table[self.field, counts]
+        if rule.random_birth > 0:
+            spontaneous = (self.field == BB_OFF) & (self.rng.random(self.field.shape) < rule.random_birth)
+            nxt[spontaneous] = rule.signal
+        self.field = nxt
+        self._refresh_active()
+        self.last_mode = 'dense'
+
+    def _shifted(self, arr, dy, dx):
+        """Массив, где клетка (y, x) содержит значение соседа (y + dy, x + dx)"""
+        if self.wrap:
+            return np.roll(arr, (-dy, -dx), axis=(0, 1))
+        out = np.zeros_like(arr)
+        h, w = arr.shape
+        out[max(0, -dy):h - max(0, dy), max(0, -dx):w - max(0, dx)] = \
+            arr[max(0, dy):h - max(0, -dy), max(0, dx):w - max(0, -dx)]
+        return out
+
+    def _step_sparse(self):
+        rule, flat, w, h = self.rule, self.field.ravel(), self.width, self.height
+        active = self.active
+        signal = active[flat[active] == rule.signal]
+
+        ys, xs = np.divmod(signal, w)
+        neighbors = []
+        for dy, dx in MOORE:
+            ny, nx = ys + dy, xs + dx
+            if self.wrap:
+                neighbors.append((ny % h) * w + nx % w)
+            else:
+                ok = (ny >= 0) & (ny < h) & (nx >= 0) & (nx < w)
+                neighbors.append(ny[ok] * w + nx[ok])
+        cells, counts = np.unique(np.concatenate(neighbors), return_counts=True)
+
+        candidates = np.union1d(active, cells)
+        cand_counts = np.zeros(candidates.size, dtype=np.intp)
+        cand_counts[np.searchsorted(candidates, cells)] = counts
+        nxt = rule.table[flat[candidates], cand_counts]
+        flat[candidates] = nxt
+        self.active = candidates[~rule.stable[nxt]]
+        self.last_mode = 'sparse'
+
+    # ----- статистика (как getCounts / entropy в briansBrain.js) -----
+
+    def counts(self):
+        return np.bincount(self.field.ravel(), minlength=self.rule.states)
+
+    def entropy(self):
+        p = self.counts() / self.field.size
+        p = p[p > 0]
+        return float(-(p * np.log2(p)).sum())
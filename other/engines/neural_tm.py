@@ -0,0 +1,608 @@
+"""
+Нейронная машина Тьюринга на NumPy: обучение и исполнение.
+
+Лаба neural_tm (js/ntm/HabrMath.js) показывает один шаг NTM по статье
+Хабра: ключ - one-hot символа, параметры адресации (beta, g, gamma, shift)
+задаются ползунками, обучения нет. Здесь полная модель Грейвса:
+
+- контроллер LSTM получает вход и прочитанные на прошлом шаге векторы;
+  из его состояния линейный слой выдаёт параметры головок;
+- адресация головки - формулы (5)-(9) лабы: косинусная близость ключа к
+  строкам памяти с резкостью beta, интерполяция с прошлыми весами через
+  g, циклический сдвиг свёрткой с распределением shift, заострение gamma;
+- головки чтения читают память прошлого шага (2), головки записи затем
+  по очереди стирают и дописывают (3)-(4);
+- прямой и обратный проходы батчевые: тензоры (время, батч, ...),
+  градиенты считаются вручную обратным распространением во времени;
+- задачи копирования и ассоциативного вспоминания генерируют батчи;
+- контрольные точки - .npz с параметрами, состоянием Adam и историей.
+
+Обучение запускается scripts/train_neural_tm.py, лаба получает из
+контрольной точки выходы и веса головок (trace) - реальные картины
+обращения к памяти обученной сети.
+"""
+
+import json
+import time
+
+import numpy as np
+
+
+EPS = 1e-8
+# Норма ключа и строк памяти не делится на ноль
+TINY = 1e-12
+SHIFTS = (-1, 0, 1)
+CHECKPOINT_VERSION = 1
+
+
+def _sigmoid(x):
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def _softplus(x):
+    return np.logaddexp(0.0, x)
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+# ==========================================================
+# АДРЕСАЦИЯ
+# ==========================================================
+
+def address(memory, w_prev, key, beta, gate, shift, gamma, shifts=SHIFTS):
+    """
+    Веса головки (B, N) по памяти (B, N, W) и параметрам с контроллера:
+    контент (5)-(6), интерполяция (7), свёртка (8), заострение (9).
+    Возвращает веса и кэш для address_backward.
+    """
+    key_norm = np.sqrt((key * key).sum(axis=1, keepdims=True))
+    row_norm = np.sqrt((memory * memory).sum(axis=2))
+    a, b = key_norm + EPS, row_norm + EPS
+    similarity = np.einsum('bnw,bw->bn', memory, key) / (a * b)
+    content = _softmax(beta * similarity)
+    gated = gate * content + (1 - gate) * w_prev
+    shifted = np.zeros_like(gated)
+    for j, offset in enumerate(shifts):
+        shifted += shift[:, j:j + 1] * np.roll(gated, offset, axis=1)
+    powered = (shifted + EPS) ** gamma
+    w = powered / powered.sum(axis=1, keepdims=True)
+    cache = (memory, w_prev, key, beta, gate, shift, gamma, key_norm, row_norm, similarity,
+             content, gated, shifted, powered, w)
+    return w, cache
+
+
+def address_backward(dw, cache, shifts=SHIFTS):
+    """Градиенты по памяти, прошлым весам, ключу, beta, g, shift и gamma"""
+    (memory, w_prev, key, beta, gate, shift, gamma, key_norm, row_norm, similarity,
+     content, gated, shifted, powered, w) = cache
+    total = powered.sum(axis=1, keepdims=True)
+    dpowered = (dw - (dw * w).sum(axis=1, keepdims=True)) / total
+    base = shifted + EPS
+    dgamma = (dpowered * powered * np.log(base)).sum(axis=1, keepdims=True)
+    dshifted = dpowered * gamma * powered / base
+
+    dgated = np.zeros_like(gated)
+    dshift = np.empty_like(shift)
+    for j, offset in enumerate(shifts):
+        dgated += shift[:, j:j + 1] * np.roll(dshifted, -offset, axis=1)
+        dshift[:, j] = (dshifted * np.roll(gated, offset, axis=1)).sum(axis=1)
+
+    dgate = ((content - w_prev) * dgated).sum(axis=1, keepdims=True)
+    dcontent = gate * dgated
+    dw_prev = (1 - gate) * dgated
+
+    dz = content * (dcontent - (dcontent * content).sum(axis=1, keepdims=True))
+    dbeta = (dz * similarity).sum(axis=1, keepdims=True)
+    dsim = beta * dz
+    a, b = key_norm + EPS, row_norm + EPS
+    ddot = dsim / (a * b)
+    dkey = np.einsum('bn,bnw->bw', ddot, memory)
+    dmemory = ddot[:, :, None] * key[:, None, :]
+    # Производные через нормы: d|k|/dk = k/|k|, d|M_i|/dM_i = M_i/|M_i|
+    da = -(dsim * similarity).sum(axis=1, keepdims=True) / a
+    dkey += da * key / np.maximum(key_norm, TINY)
+    db = -dsim * similarity / b
+    dmemory += (db / np.maximum(row_norm, TINY))[:, :, None] * memory
+    return dmemory, dw_prev, dkey, dbeta, dgate, dshift, dgamma
+
+
+# ==========================================================
+# ЗАДАЧИ
+# ==========================================================
+
+def copy_task(rng, batch, min_len=1, max_len=20, width=8):
+    """
+    Копирование: width случайных битов min_len..max_len шагов, затем
+    разделитель (отдельный канал), затем столько же пустых шагов, на
+    которых сеть должна повторить последовательность.
+    Возвращает inputs (T, B, width + 1), targets (T, B, width), mask (T, B).
+    """
+    length = int(rng.integers(min_len, max_len + 1))
+    steps = 2 * length + 1
+    inputs = np.zeros((steps, batch, width + 1))
+    targets = np.zeros((steps, batch, width))
+    mask = np.zeros((steps, batch))
+    bits = rng.integers(0, 2, size=(length, batch, width)).astype(np.float64)
+    inputs[:length, :, :width] = bits
+    inputs[length, :, width] = 1
+    targets[length + 1:] = bits
+    mask[length + 1:] = 1
+    return inputs, targets, mask
+
+
+def recall_task(rng, batch, min_items=2, max_items=6, item_len=3, width=6):
+    """
+    Ассоциативное вспоминание: items элементов по item_len шагов, каждый
+    после разделителя (канал width); затем второй разделитель (канал
+    width + 1), один из элементов-запросов, снова второй разделитель и
+    item_len шагов ответа - элемент, шедший в списке за запросом.
+    """
+    items = int(rng.integers(min_items, max_items + 1))
+    block = item_len + 1
+    steps = items * block + 1 + item_len + 1 + item_len
+    inputs = np.zeros((steps, batch, width + 2))
+    targets = np.zeros((steps, batch, width))
+    mask = np.zeros((steps, batch))
+    bits = rng.integers(0, 2, size=(items, item_len, batch, width)).astype(np.float64)
+    for i in range(items):
+        inputs[i * block, :, width] = 1
+        inputs[i * block + 1:(i + 1) * block, :, :width] = bits[i]
+    query = rng.integers(0, items - 1, size=batch)
+    start = items * block
+    inputs[start, :, width + 1] = 1
+    columns = np.arange(batch)
+    inputs[start + 1:start + 1 + item_len, :, :width] = bits[query, :, columns].transpose(1, 0, 2)
+    inputs[start + 1 + item_len, :, width + 1] = 1
+    answer = start + 2 + item_len
+    targets[answer:] = bits[query + 1, :, columns].transpose(1, 0, 2)
+    mask[answer:] = 1
+    return inputs, targets, mask
+
+
+# Задача: генератор и размеры входа/выхода по ширине битов
+TASKS = {
+    'copy': (copy_task, lambda width: (width + 1, width)),
+    'recall': (recall_task, lambda width: (width + 2, width)),
+}
+
+
+def make_batch(task, rng, batch, **options):
+    if task not in TASKS:
+        raise ValueError(f"Неизвестная задача: {task}")
+    return TASKS[task][0](rng, batch, **options)
+
+
+# ==========================================================
+# МОДЕЛЬ
+# ==========================================================
+
+class NTM:
+    """
+    NTM с LSTM-контроллером. Параметры - словарь массивов:
+    Wg/bg - контроллер, Wh/bh - параметры всех головок, Wo/bo - выход.
+    """
+
+    def __init__(self, input_size, output_size, hidden=100, memory=128, width=20,
+                 read_heads=1, write_heads=1, shifts=SHIFTS, seed=None):
+        self.input_size, self.output_size = int(input_size), int(output_size)
+        self.hidden, self.memory, self.width = int(hidden), int(memory), int(width)
+        self.read_heads, self.write_heads = int(read_heads), int(write_heads)
+        self.shifts = tuple(int(s) for s in shifts)
+        if min(self.input_size, self.output_size, self.hidden, self.memory, self.width) < 1:
+            raise ValueError("Размеры модели должны быть положительными")
+        if self.read_heads < 1 or self.write_heads < 0:
+            raise ValueError("Нужна хотя бы одна головка чтения")
+        if not self.shifts or max(abs(s) for s in self.shifts) >= self.memory:
+            raise ValueError("Сдвиги должны быть меньше размера памяти")
+
+        # Раскладка выхода контроллера по головкам: ключ, beta, g, shift, gamma (+ e, a)
+        self.layout = []
+        offset = 0
+        for head in range(self.read_heads + self.write_heads):
+            sizes = [self.width, 1, 1, len(self.shifts), 1]
+            if head >= self.read_heads:
+                sizes += [self.width, self.width]
+            bounds = np.cumsum([offset] + sizes)
+            self.layout.append([slice(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])])
+            offset = int(bounds[-1])
+        self.head_size = offset
+
+        rng = np.random.default_rng(seed)
+        z = self.input_size + self.read_heads * self.width + self.hidden
+        out = self.hidden + self.read_heads * self.width
+
+        def init(fan_in, fan_out):
+            limit = np.sqrt(6.0 / (fan_in + fan_out))
+            return rng.uniform(-limit, limit, size=(fan_in, fan_out))
+
+        self.params = {
+            'Wg': init(z, 4 * self.hidden), 'bg': np.zeros(4 * self.hidden),
+            'Wh': init(self.hidden, self.head_size), 'bh': np.zeros(self.head_size),
+            'Wo': init(out, self.output_size), 'bo': np.zeros(self.output_size),
+        }
+        # Забывание открыто в начале обучения
+        self.params['bg'][self.hidden:2 * self.hidden] = 1.0
+
+    def config(self):
+        return {
+            'inputSize': self.input_size, 'outputSize': self.output_size, 'hidden': self.hidden,
+            'memory': self.memory, 'width': self.width, 'readHeads': self.read_heads,
+            'writeHeads': self.write_heads, 'shifts': list(self.shifts),
+        }
+
+    @classmethod
+    def from_config(cls, config, seed=None):
+        return cls(config['inputSize'], config['outputSize'], config.get('hidden', 100),
+                   config.get('memory', 128), config.get('width', 20), config.get('readHeads', 1),
+                   config.get('writeHeads', 1), config.get('shifts', SHIFTS), seed=seed)
+
+    # ----- прямой проход -----
+
+    def initial_state(self, batch):
+        """
+        M_0 - малая константа, головки стоят на ячейке 0. Равномерные
+        веса, как wprev в лабе, при одинаковых строках памяти не меняются
+        ни сдвигом, ни заострением - сеть не смогла бы выбрать ячейку.
+        """
+        heads = self.read_heads + self.write_heads
+        start = np.zeros((batch, self.memory))
+        start[:, 0] = 1.0
+        return {
+            'h': np.zeros((batch, self.hidden)),
+            'c': np.zeros((batch, self.hidden)),
+            'r': [np.zeros((batch, self.width)) for _ in range(self.read_heads)],
+            'w': [start.copy() for _ in range(heads)],
+            'M': np.full((batch, self.memory, self.width), 1e-6),
+        }
+
+    def _heads(self, raw, head):
+        """Параметры головки из выхода контроллера"""
+        parts = [raw[:, s] for s in self.layout[head]]
+        values = {
+            'key': parts[0],
+            'beta': _softplus(parts[1]),
+            'gate': _sigmoid(parts[2]),
+            'shift': _softmax(parts[3]),
+            'gamma': 1.0 + _softplus(parts[4]),
+        }
+        if head >= self.read_heads:
+            values['erase'] = _sigmoid(parts[5])
+            values['add'] = np.tanh(parts[6])
+        return parts, values
+
+    def step(self, x, state):
+        """Один шаг: контроллер, чтение с M_{t-1}, запись. Возвращает логиты, состояние и кэш"""
+        p, H = self.params, self.hidden
+        z = np.concatenate([x] + state['r'] + [state['h']], axis=1)
+        gates = z @ p['Wg'] + p['bg']
+        i, f, o = _sigmoid(gates[:, :H]), _sigmoid(gates[:, H:2 * H]), _sigmoid(gates[:, 2 * H:3 * H])
+        g = np.tanh(gates[:, 3 * H:])
+        c = f * state['c'] + i * g
+        tc = np.tanh(c)
+        h = o * tc
+        raw = h @ p['Wh'] + p['bh']
+
+        memory = state['M']
+        heads, weights, reads = [], [], []
+        for head in range(self.read_heads + self.write_heads):
+            parts, v = self._heads(raw, head)
+            w, address_cache = address(memory, state['w'][head], v['key'], v['beta'], v['gate'],
+                                       v['shift'], v['gamma'], self.shifts)
+            heads.append((parts, v, address_cache))
+            weights.append(w)
+            if head < self.read_heads:
+                reads.append(np.einsum('bn,bnw->bw', w, memory))
+        # Запись (3)-(4): головки записи по очереди
+        written = [memory]
+        for head in range(self.read_heads, self.read_heads + self.write_heads):
+            w, v = weights[head], heads[head][1]
+            current = written[-1]
+            written.append(current * (1 - w[:, :, None] * v['erase'][:, None, :])
+                           + w[:, :, None] * v['add'][:, None, :])
+
+        hr = np.concatenate([h] + reads, axis=1)
+        logits = hr @ p['Wo'] + p['bo']
+        new_state = {'h': h, 'c': c, 'r': reads, 'w': weights, 'M': written[-1]}
+        cache = (z, i, f, o, g, state['c'], tc, h, heads, written, reads, hr)
+        return logits, new_state, cache
+
+    def forward(self, inputs, state=None):
+        """inputs (T, B, X) -> логиты (T, B, Y), кэши шагов и конечное состояние"""
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if inputs.ndim != 3 or inputs.shape[2] != self.input_size:
+            raise ValueError(f"Ожидается вход (время, батч, {self.input_size})")
+        state = self.initial_state(inputs.shape[1]) if state is None else state
+        logits = np.empty((inputs.shape[0], inputs.shape[1], self.output_size))
+        caches = []
+        for t, x in enumerate(inputs):
+            logits[t], state, cache = self.step(x, state)
+            caches.append(cache)
+        return logits, caches, state
+
+    # ----- обратный проход -----
+
+    def backward(self, caches, dlogits):
+        """Градиенты параметров по dL/dлогиты (T, B, Y), обратное распространение во времени"""
+        p, H = self.params, self.hidden
+        grads = {name: np.zeros_like(value) for name, value in p.items()}
+        batch = dlogits.shape[1]
+        heads_total = self.read_heads + self.write_heads
+        dh_next = np.zeros((batch, H))
+        dc_next = np.zeros((batch, H))
+        dr_next = [np.zeros((batch, self.width)) for _ in range(self.read_heads)]
+        dw_next = [np.zeros((batch, self.memory)) for _ in range(heads_total)]
+        dM_next = np.zeros((batch, self.memory, self.width))
+
+        for t in range(len(caches) - 1, -1, -1):
+            z, i, f, o, g, c_prev, tc, h, heads, written, reads, hr = caches[t]
+            dout = dlogits[t]
+            grads['Wo'] += hr.T @ dout
+            grads['bo'] += dout.sum(axis=0)
+            dhr = dout @ p['Wo'].T
+            dh = dhr[:, :H] + dh_next
+            dreads = [dhr[:, H + k * self.width:H + (k + 1) * self.width] + dr_next[k]
+                      for k in range(self.read_heads)]
+
+            dweights = [dw.copy() for dw in dw_next]
+            draw = np.zeros((batch, self.head_size))
+            dM = dM_next
+            for head in range(heads_total - 1, self.read_heads - 1, -1):
+                k = head - self.read_heads
+                current = written[k]
+                w, v = heads[head][2][-1], heads[head][1]
+                e, a = v['erase'], v['add']
+                dweights[head] += np.einsum('bnw,bnw->bn', dM, a[:, None, :] - current * e[:, None, :])
+                de = -np.einsum('bnw,bnw,bn->bw', dM, current, w)
+                da = np.einsum('bnw,bn->bw', dM, w)
+                dM = dM * (1 - w[:, :, None] * e[:, None, :])
+                s = self.layout[head]
+                draw[:, s[5]] = de * e * (1 - e)
+                draw[:, s[6]] = da * (1 - a * a)
+            memory = written[0]
+            for head in range(self.read_heads):
+                w = heads[head][2][-1]
+                dweights[head] += np.einsum('bnw,bw->bn', memory, dreads[head])
+                dM = dM + w[:, :, None] * dreads[head][:, None, :]
+
+            for head in range(heads_total):
+                parts, v, address_cache = heads[head]
+                dmem, dw_prev, dkey, dbeta, dgate, dshift, dgamma = address_backward(
+                    dweights[head], address_cache, self.shifts)
+                dM = dM + dmem
+                dw_next[head] = dw_prev
+                s = self.layout[head]
+                draw[:, s[0]] = dkey
+                draw[:, s[1]] = dbeta * _sigmoid(parts[1])
+                draw[:, s[2]] = dgate * v['gate'] * (1 - v['gate'])
+                sh = v['shift']
+                draw[:, s[3]] = sh * (dshift - (dshift * sh).sum(axis=1, keepdims=True))
+                draw[:, s[4]] = dgamma * _sigmoid(parts[4])
+            dM_next = dM
+
+            grads['Wh'] += h.T @ draw
+            grads['bh'] += draw.sum(axis=0)
+            dh += draw @ p['Wh'].T
+
+            do = dh * tc
+            dc = dh * o * (1 - tc * tc) + dc_next
+            dgates = np.concatenate([
+                dc * g * i * (1 - i),
+                dc * c_prev * f * (1 - f),
+                do * o * (1 - o),
+                dc * i * (1 - g * g),
+            ], axis=1)
+            dc_next = dc * f
+            grads['Wg'] += z.T @ dgates
+            grads['bg'] += dgates.sum(axis=0)
+            dz = dgates @ p['Wg'].T
+            offset = self.input_size
+            for k in range(self.read_heads):
+                dr_next[k] = dz[:, offset:offset + self.width]
+                offset += self.width
+            dh_next = dz[:, offset:]
+        return grads
+
+    # ----- потери и обучение -----
+
+    @staticmethod
+    def loss(logits, targets, mask):
+        """
+        Двоичная кросс-энтропия (bce лабы) по шагам с mask = 1, средняя на
+        бит, и её градиент по логитам
+        """
+        mask = np.asarray(mask, dtype=np.float64)[:, :, None]
+        count = max(float(mask.sum()) * logits.shape[2], 1.0)
+        per_bit = np.logaddexp(0.0, logits) - targets * logits
+        loss = float((per_bit * mask).sum() / count)
+        return loss, (_sigmoid(logits) - targets) * mask / count
+
+    @staticmethod
+    def bit_errors(logits, targets, mask):
+        """Среднее число неверных битов на последовательность (метрика статьи Грейвса)"""
+        wrong = ((logits > 0) != (targets > 0.5)) * np.asarray(mask)[:, :, None]
+        return float(wrong.sum() / logits.shape[1])
+
+    def train_batch(self, inputs, targets, mask, optimizer):
+        logits, caches, _ = self.forward(inputs)
+        loss, dlogits = self.loss(logits, targets, mask)
+        optimizer.update(self.params, self.backward(caches, dlogits))
+        return loss, self.bit_errors(logits, targets, mask)
+
+    def trace(self, inputs):
+        """
+        Исполнение одного примера (T, X) с записью весов головок и памяти:
+        то, что показывает лаба - какие ячейки читаются и пишутся на каждом шаге
+        """
+        inputs = np.asarray(inputs, dtype=np.float64)[:, None, :]
+        state = self.initial_state(1)
+        outputs, reads, writes, params = [], [], [], []
+        for x in inputs:
+            logits, state, cache = self.step(x, state)
+            outputs.append(_sigmoid(logits[0]))
+            reads.append([w[0] for w in state['w'][:self.read_heads]])
+            writes.append([w[0] for w in state['w'][self.read_heads:]])
+            params.append([{name: float(np.ravel(v[name][0])[0]) for name in ('beta', 'gate', 'gamma')}
+                           for _, v, _ in cache[8]])
+        return {
+            'outputs': np.array(outputs),
+            'reads': np.array(reads),
+            'writes': np.array(writes),
+            'memory': state['M'][0],
+            'heads': params,
+        }
+
+    # ----- контрольные точки -----
+
+    def save(self, path, optimizer=None, meta=None):
+        """Параметры, конфигурация, состояние Adam и meta (JSON) в .npz"""
+        arrays = {'param_' + name: value for name, value in self.params.items()}
+        if optimizer is not None:
+            for name, (m, v) in optimizer.moments.items():
+                arrays['adam_m_' + name] = m
+                arrays['adam_v_' + name] = v
+            arrays['adam_step'] = np.array(optimizer.step)
+        header = {'version': CHECKPOINT_VERSION, 'config': self.config(), 'meta': meta or {}}
+        if optimizer is not None:
+            header['optimizer'] = optimizer.config()
+        arrays['header'] = np.array(json.dumps(header, ensure_ascii=False))
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """(модель, оптимизатор или None, meta) из контрольной точки"""
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data['header']))
+            if header.get('version') != CHECKPOINT_VERSION:
+                raise ValueError("Неподдерживаемая версия контрольной точки")
+            model = cls.from_config(header['config'])
+            for name in model.params:
+                value = data['param_' + name]
+                if value.shape != model.params[name].shape:
+                    raise ValueError(f"Параметр {name} не совпадает с конфигурацией")
+                model.params[name] = value.astype(np.float64)
+            optimizer = None
+            if 'optimizer' in header:
+                optimizer = Adam(**header['optimizer'])
+                optimizer.step = int(data['adam_step'])
+                optimizer.moments = {name: (data['adam_m_' + name], data['adam_v_' + name])
+                                     for name in model.params}
+        return model, optimizer, header['meta']
+
+
+def inference(model, meta, inputs=None, seed=None, task_options=None, max_steps=500):
+    """
+    Исполнение для лабы: свой вход inputs (шаги x каналы) или пример задачи
+    из meta контрольной точки (task_options переопределяют генератор).
+    Возвращает JSON-совместимый словарь с выходами, весами головок и памятью.
+    """
+    if inputs is not None:
+        inputs, targets, mask = np.asarray(inputs, dtype=np.float64), None, None
+    else:
+        options = dict(meta.get('taskOptions', {}), **(task_options or {}))
+        if any(int(value) > max_steps for value in options.values()):
+            raise ValueError(f"Параметры задачи больше {max_steps}")
+        inputs, targets, mask = make_batch(meta['task'], np.random.default_rng(seed), 1, **options)
+        inputs, targets, mask = inputs[:, 0], targets[:, 0], mask[:, 0]
+    if inputs.ndim != 2 or inputs.shape[1] != model.input_size:
+        raise ValueError(f"Вход должен быть шагами по {model.input_size} каналов")
+    if len(inputs) > max_steps:
+        raise ValueError(f"Больше {max_steps} шагов")
+
+    trace = model.trace(inputs)
+    result = {
+        'task': meta.get('task'),
+        'trainedSteps': meta.get('steps'),
+        'history': meta.get('history', []),
+        'inputs': inputs.tolist(),
+        'outputs': np.round(trace['outputs'], 4).tolist(),
+        'reads': np.round(trace['reads'], 4).tolist(),
+        'writes': np.round(trace['writes'], 4).tolist(),
+        'memory': np.round(trace['memory'], 4).tolist(),
+        'heads': trace['heads'],
+    }
+    if targets is not None:
+        result['targets'] = targets.tolist()
+        result['mask'] = mask.tolist()
+        wrong = ((trace['outputs'] > 0.5) != (targets > 0.5)) * mask[:, None]
+        result['bitErrors'] = int(wrong.sum())
+    return result
+
+
+class Adam:
+    """Adam с ограничением нормы градиента (clip), как обычно для NTM"""
+
+    def __init__(self, rate=1e-3, beta1=0.9, beta2=0.999, clip=10.0):
+        self.rate, self.beta1, self.beta2, self.clip = float(rate), float(beta1), float(beta2), float(clip)
+        self.step = 0
+        self.moments = {}
+
+    def config(self):
+        return {'rate': self.rate, 'beta1': self.beta1, 'beta2': self.beta2, 'clip': self.clip}
+
+    def update(self, params, grads):
+        norm = np.sqrt(sum(float((g * g).sum()) for g in grads.values()))
+        scale = self.clip / norm if self.clip and norm > self.clip else 1.0
+        self.step += 1
+        correction1 = 1 - self.beta1 ** self.step
+        correction2 = 1 - self.beta2 ** self.step
+        for name, grad in grads.items():
+            grad = grad * scale
+            m, v = self.moments.get(name) or (np.zeros_like(grad), np.zeros_like(grad))
+            m = self.beta1 * m + (1 - self.beta1) * grad
+            v = self.beta2 * v + (1 - self.beta2) * grad * grad
+            self.moments[name] = (m, v)
+            params[name] -= self.rate * (m / correction1) / (np.sqrt(v / correction2) + 1e-8)
+        return norm
+
+
+def train(model, task, steps, batch=16, optimizer=None, seed=None, time_limit=None,
+          log_every=100, checkpoint=None, checkpoint_every=1000, task_options=None, history=None,
+          callback=None):
+    """
+    Обучение на батчах задачи task. Каждые log_every шагов в историю
+    пишется средняя потеря и ошибка в битах (и передаётся в callback);
+    checkpoint - путь .npz, сохраняемый каждые checkpoint_every шагов и в конце.
+    """
+    optimizer = optimizer or Adam()
+    rng = np.random.default_rng(seed)
+    options = dict(task_options or {})
+    history = list(history or [])
+    started = time.perf_counter()
+    losses, errors = [], []
+    done = 0
+
+    def meta():
+        return {'task': task, 'taskOptions': options, 'steps': optimizer.step, 'history': history}
+
+    def log():
+        record = {
+            'step': optimizer.step,
+            'loss': round(float(np.mean(losses)), 6),
+            'bitErrors': round(float(np.mean(errors)), 4),
+            'elapsed': round(time.perf_counter() - started, 2),
+        }
+        history.append(record)
+        losses.clear()
+        errors.clear()
+        if callback is not None:
+            callback(record)
+
+    for done in range(1, steps + 1):
+        inputs, targets, mask = make_batch(task, rng, batch, **options)
+        loss, error = model.train_batch(inputs, targets, mask, optimizer)
+        losses.append(loss)
+        errors.append(error)
+        if done % log_every == 0:
+            log()
+        if checkpoint and done % checkpoint_every == 0:
+            model.save(checkpoint, optimizer, meta())
+        if time_limit is not None and time.perf_counter() - started > time_limit:
+            break
+    if losses:
+        log()
+    if checkpoint:
+        model.save(checkpoint, optimizer, meta())
+    return {'steps': done, 'history': history, 'elapsed': round(time.perf_counter() - started, 2)}
@@ -0,0 +1,259 @@
+"""
+НКА с ε-переходами: построение подмножеств на битовых масках.
+
+Множество состояний НКА - целое число, бит q которого означает
+состояние q. ε-замыкание каждого состояния вычисляется один раз
+(через компоненты сильной связности графа ε-переходов), и таблица
+post[a][q] сразу хранит замкнутое множество, куда ведёт символ a из q.
+Шаг подмножества по символу - OR масок post по битам текущего множества.
+
+Два режима:
+
+- determinize - полное построение ДКА, как buildDFA в nfa_to_dfa, но с
+  ограничением на число состояний: экспоненциальный взрыв
+  останавливается исключением BudgetExceeded, а не съедает память;
+- LazyDFA - состояния ДКА строятся по мере чтения входа, переходы
+  кешируются в LRU ограниченного размера; так nfa_simulator может
+  гнать длинные входы на больших НКА.
+
+Формат JSON - экспорт nfa_to_dfa ({alphabet, states: [{id, start, final}],
+transitions: [{from, to, symbols | epsilon}]}) или сохранение
+nfa_simulator ({states, alphabet, transitions: [["q,a", [..]]],
+epsilonTransitions, startState, acceptStates}).
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from .automata import DFA
+
+
+EPSILON = 'ε'
+
+
+class BudgetExceeded(ValueError):
+    """Построение подмножеств упёрлось в лимит состояний"""
+
+
+def bits(mask):
+    """Номера единичных битов маски по возрастанию"""
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
+
+
+class NFA:
+    """
+    НКА: n состояний, alphabet, moves[a] - список рёбер (q, p) по символу a,
+    epsilon - список ε-рёбер, start, accepting - множество номеров.
+    """
+
+    def __init__(self, n, alphabet, moves, epsilon, start, accepting, names=None):
+        self.n = int(n)
+        self.alphabet = [str(a) for a in alphabet]
+        self.start = int(start)
+        self.accepting_mask = sum(1 << q for q in set(accepting))
+        self.names = [str(i) for i in range(self.n)] if names is None else [str(s) for s in names]
+
+        self.closure = self._closures(epsilon)
+        # post[a][q] - ε-замыкание множества, куда ведёт a из q
+        self.post = []
+        for a in range(len(self.alphabet)):
+            row = [0] * self.n
+            for q, p in moves[a]:
+                row[q] |= self.closure[p]
+            self.post.append(row)
+        self.start_mask = self.closure[self.start]
+
+    def _closures(self, epsilon):
+        """ε-замыкания всех состояний: внутри компоненты сильной связности они общие"""
+        closure = [1 << q for q in range(self.n)]
+        if not epsilon:
+            return closure
+        us, vs = np.array(epsilon, dtype=np.int64).reshape(-1, 2).T
+        graph = sparse.csr_matrix((np.ones(us.size), (us, vs)), shape=(self.n, self.n))
+        count, comp = connected_components(graph, directed=True, connection='strong')
+
+        members = [0] * count
+        for q, c in enumerate(comp.tolist()):
+            members[c] |= 1 << q
+        succ = [set() for _ in range(count)]
+        indeg = [0] * count
+        for u, v in zip(comp[us].tolist(), comp[vs].tolist()):
+            if u != v and v not in succ[u]:
+                succ[u].add(v)
+                indeg[v] += 1
+        # Топологический порядок конденсации, замыкания собираются с конца
+        order = [c for c in range(count) if indeg[c] == 0]
+        for c in order:
+            for d in succ[c]:
+                indeg[d] -= 1
+                if indeg[d] == 0:
+                    order.append(d)
+        reach = members[:]
+        for c in reversed(order):
+            for d in succ[c]:
+                reach[c] |= reach[d]
+        return [reach[c] for c in comp.tolist()]
+
+    # ----- JSON -----
+
+    @classmethod
+    def from_json(cls, data):
+        """НКА из экспорта nfa_to_dfa или сохранения nfa_simulator"""
+        raw_states = data.get('states') or []
+        alphabet = [str(a) for a in data.get('alphabet') or []]
+        edges = []
+        if raw_states and isinstance(raw_states[0], dict):
+            names = [str(s['id']) for s in raw_states]
+            starts = [str(s['id']) for s in raw_states if s.get('start')]
+            start = starts[0] if starts else None
+            finals = [str(s['id']) for s in raw_states if s.get('final')]
+            for t in data.get('transitions') or []:
+                if t.get('epsilon'):
+                    edges.append((str(t['from']), EPSILON, str(t['to'])))
+                for a in t.get('symbols') or ([t['sym']] if 'sym' in t else []):
+                    edges.append((str(t['from']), str(a), str(t['to'])))
+        else:
+            names = [str(s) for s in raw_states]
+            start = data.get('startState')
+            finals = [str(s) for s in data.get('acceptStates') or data.get('finalStates') or []]
+            for key, targets in data.get('transitions') or []:
+                q, a = str(key).rsplit(',', 1)
+                edges.extend((q, a, str(p)) for p in targets)
+            for q, targets in data.get('epsilonTransitions') or []:
+                edges.extend((str(q), EPSILON, str(p)) for p in targets)
+
+        index = {name: i for i, name in enumerate(names)}
+        symbols = {a: j for j, a in enumerate(alphabet)}
+        if start is None or str(start) not in index:
+            raise ValueError("Не указано начальное состояние")
+        moves, epsilon = [[] for _ in alphabet], []
+        for q, a, p in edges:
+            if q not in index or p not in index:
+                raise ValueError(f"Переход {q} --{a}--> {p} ссылается на неизвестное состояние")
+            if a == EPSILON:
+                epsilon.append((index[q], index[p]))
+            elif a in symbols:
+                moves[symbols[a]].append((index[q], index[p]))
+            else:
+                raise ValueError(f"Символ {a} не входит в алфавит")
+        accepting = [index[f] for f in finals if f in index]
+        return cls(len(names), alphabet, moves, epsilon, index[str(start)], accepting, names)
+
+    # ----- подмножества -----
+
+    def step(self, mask, a):
+        """Множество после чтения символа номер a (уже ε-замкнутое)"""
+        post = self.post[a]
+        out = 0
+        while mask:
+            low = mask & -mask
+            out |= post[low.bit_length() - 1]
+            mask ^= low
+        return out
+
+    def is_accepting(self, mask):
+        return bool(mask & self.accepting_mask)
+
+    def subset_name(self, mask):
+        return '{' + ','.join(self.names[q] for q in bits(mask)) + '}'
+
+    def determinize(self, max_states=10000):
+        """
+        Полное построение подмножеств. Пустое множество, как в buildDFA,
+        не становится состоянием - такие переходы просто отсутствуют.
+        Возвращает (dfa, subsets), subsets[i] - маска состояния i.
+        """
+        ids = {self.start_mask: 0}
+        subsets = [self.start_mask]
+        rows = []
+        k = len(self.alphabet)
+        for mask in subsets:
+            row = []
+            for a in range(k):
+                target = self.step(mask, a)
+                if not target:
+                    row.append(-1)
+                    continue
+                j = ids.get(target)
+                if j is None:
+                    if len(subsets) >= max_states:
+                        raise BudgetExceeded(f"ДКА превысил лимит в {max_states} состояний")
+                    j = ids[target] = len(subsets)
+                    subsets.append(target)
+                row.append(j)
+            rows.append(row)
+        accepting = [self.is_accepting(m) for m in subsets]
+        dfa = DFA(np.array(rows, dtype=np.int32).reshape(len(subsets), k), 0, accepting,
+                  self.alphabet, [self.subset_name(m) for m in subsets])
+        return dfa, subsets
+
+    def accepts(self, word):
+        return LazyDFA(self, cache_size=0).accepts(word)
+
+
+class LazyDFA:
+    """
+    ДКА подмножеств, достраиваемый по требованию.
+
+    Кеш - OrderedDict маска -> список масок-переходов по символам
+    (None - ещё не вычислен). При переполнении вытесняется давно не
+    использованное состояние; cache_size=0 отключает кеш.
+    """
+
+    def __init__(self, nfa, cache_size=4096):
+        self.nfa = nfa
+        self.cache_size = int(cache_size)
+        self.cache = OrderedDict()
+        self.column = {a: j for j, a in enumerate(nfa.alphabet)}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def step(self, mask, a):
+        if not self.cache_size:
+            self.misses += 1
+            return self.nfa.step(mask, a)
+        row = self.cache.get(mask)
+        if row is None:
+            row = self.cache[mask] = [None] * len(self.nfa.alphabet)
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.cache.move_to_end(mask)
+        target = row[a]
+        if target is None:
+            self.misses += 1
+            target = row[a] = self.nfa.step(mask, a)
+        else:
+            self.hits += 1
+        return target
+
+    def run(self, symbols):
+        """
+        Читает символы (строку или любой итератор) и возвращает итоговую
+        маску; пустое множество означает, что автомат «застрял».
+        """
+        mask = self.nfa.start_mask
+        for symbol in symbols:
+            a = self.column.get(symbol)
+            if a is None:
+                raise ValueError(f"Символ {symbol} не входит в алфавит")
+            mask = self.step(mask, a)
+            if not mask:
+                break
+        return mask
+
+    def accepts(self, symbols):
+        return self.nfa.is_accepting(self.run(symbols))
+
+    def stats(self):
+        return {'cached': len(self.cache), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
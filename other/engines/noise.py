@@ -0,0 +1,392 @@
+"""
+Шумное исполнение квантовых схем.
+
+Модель шума (NoiseModel) действует после каждого вентиля лабы (слияние
+однокубитных вентилей отключено) на все его кубиты:
+
+- деполяризующий канал: с вероятностью p - случайная матрица Паули X, Y
+  или Z; для многокубитных вентилей своя вероятность p2 на каждый кубит;
+- затухание амплитуды с параметром gamma: Крауса K0 = diag(1, sqrt(1-g)),
+  K1 = sqrt(g) |0><1|;
+- ошибка считывания: измеренный бит 0 читается как 1 с вероятностью e0,
+  1 как 0 - с вероятностью e1.
+
+Два способа исполнения:
+
+- матрица плотности для малых регистров (до DENSITY_QUBITS): vec(rho) -
+  вектор состояния Statevector из 2n кубитов, вентиль U - это U на
+  строчных кубитах и conj(U) на столбцовых, канал - суперматрица
+  sum K (x) conj(K) на паре (q, n+q). Распределение исходов точное;
+- траектории Монте-Карло для больших регистров и схем с измерениями
+  посередине: каждая траектория - статевектор со случайными скачками
+  (Паули для деполяризации, K1/K0 с перенормировкой для затухания).
+  Траектории раздаются пачками в пул процессов. Каждая траектория
+  получает свою ветку SeedSequence(seed), поэтому counts не зависят от
+  числа процессов и порядка завершения.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .quantum import GATES, MEMORY_LIMIT, QuantumCircuit, Statevector
+
+
+DENSITY_QUBITS = 10
+TRAJECTORIES = 200
+# Траекторий в одной задаче пула
+BATCH = 8
+FIDELITY_QUBITS = 22
+COUNTS_LIMIT = 1024
+
+PAULIS = [GATES['X'], GATES['Y'], GATES['Z']]
+
+
+def _probability(value, name):
+    value = float(value)
+    if not 0 <= value <= 1:
+        raise ValueError(f"{name} должна быть в [0, 1]")
+    return value
+
+
+def _measures(ops):
+    return [op for op in ops if op[0] in ('measure', 'measure_all')]
+
+
+def _touched(op, qubits):
+    """(кубиты операции, многокубитная ли)"""
+    kind = op[0]
+    if kind == 'u':
+        return [op[2]], False
+    if kind == 'diag':
+        wires = [op[3], *op[4]]
+        return wires, len(wires) > 1
+    if kind == 'gate':
+        wires = [*op[2], *op[3]]
+        return wires, len(wires) > 1
+    if kind in ('phase', 'diffuse'):
+        return list(range(qubits)), qubits > 1
+    return [], False
+
+
+class NoiseModel:
+    """Параметры шума; readout - одно число или пара [e0, e1]"""
+
+    def __init__(self, depolarizing=0.0, depolarizing2=None, amplitude_damping=0.0, readout=0.0):
+        self.depolarizing = _probability(depolarizing, "Вероятность деполяризации")
+        self.depolarizing2 = self.depolarizing if depolarizing2 is None else \
+            _probability(depolarizing2, "Вероятность деполяризации")
+        self.gamma = _probability(amplitude_damping, "Параметр затухания")
+        if isinstance(readout, (list, tuple)):
+            e0, e1 = readout
+        else:
+            e0 = e1 = readout
+        self.readout = (_probability(e0, "Ошибка считывания"), _probability(e1, "Ошибка считывания"))
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data.get('depolarizing', 0), data.get('depolarizing2'),
+                   data.get('amplitudeDamping', 0), data.get('readout', 0))
+
+    def to_json(self):
+        return {"depolarizing": self.depolarizing, "depolarizing2": self.depolarizing2,
+                "amplitudeDamping": self.gamma, "readout": list(self.readout)}
+
+    def kraus(self, multi):
+        """Каналы на кубит: списки операторов Крауса"""
+        channels = []
+        p = self.depolarizing2 if multi else self.depolarizing
+        if p:
+            channels.append([math.sqrt(1 - p) * np.eye(2)] + [math.sqrt(p / 3) * m for m in PAULIS])
+        if self.gamma:
+            channels.append([np.diag([1, math.sqrt(1 - self.gamma)]),
+                             np.array([[0, math.sqrt(self.gamma)], [0, 0]])])
+        return channels
+
+    def confusion(self):
+        """C[прочитано, истинно]"""
+        e0, e1 = self.readout
+        return np.array([[1 - e0, e1], [e0, 1 - e1]])
+
+    # ----- траектории -----
+
+    def unravel(self, state, wires, multi, rng):
+        """Случайный скачок каналов на кубитах wires статевектора"""
+        p = self.depolarizing2 if multi else self.depolarizing
+        for q in wires:
+            if p and rng.random() < p:
+                k = int(rng.integers(3))
+                if k == 2:
+                    state.diagonal(1, -1, q)
+                else:
+                    state.apply1(PAULIS[k], q)
+            if self.gamma:
+                jump = self.gamma * state.probability_one(q)
+                if rng.random() < jump:
+                    for a, b in state._pairs(q):
+                        a[...] = b
+                        b[...] = 0
+                else:
+                    state.diagonal(1, math.sqrt(1 - self.gamma), q)
+                state.normalize()
+
+    def misread(self, bits, rng):
+        """Ошибка считывания по массиву бит (shots x k)"""
+        e0, e1 = self.readout
+        if not (e0 or e1):
+            return bits
+        flip = rng.random(bits.shape) < np.where(bits == 1, e1, e0)
+        return bits ^ flip
+
+
+# =============================================================================
+# МАТРИЦА ПЛОТНОСТИ
+# =============================================================================
+
+class DensityMatrix:
+    """rho регистра из qubits кубитов, хранимая как vec(rho) в Statevector(2n)"""
+
+    def __init__(self, qubits, memory_limit=MEMORY_LIMIT):
+        if qubits > DENSITY_QUBITS:
+            raise ValueError(f"Матрица плотности - не больше {DENSITY_QUBITS} кубитов")
+        self.qubits = qubits
+        self.vector = Statevector(2 * qubits, dtype=np.complex128, memory_limit=memory_limit)
+
+    @property
+    def matrix(self):
+        n = 1 << self.qubits
+        return self.vector.state.reshape(n, n)
+
+    def execute(self, op):
+        n, v = self.qubits, self.vector
+        kind = op[0]
+        if kind == 'u':
+            v.apply1(op[1], op[2])
+            v.apply1(np.conj(op[1]), op[2] + n)
+        elif kind == 'diag':
+            v.diagonal(op[1], op[2], op[3], op[4])
+            v.diagonal(np.conj(op[1]), np.conj(op[2]), op[3] + n, tuple(c + n for c in op[4]))
+        elif kind == 'gate':
+            v.apply(op[1], op[2], op[3])
+            v.apply(np.conj(op[1]), [t + n for t in op[2]], tuple(c + n for c in op[3]))
+        elif kind == 'phase':
+            marked = np.unique(np.asarray(op[1], dtype=np.int64))
+            self.matrix[marked, :] *= -1
+            self.matrix[:, marked] *= -1
+        elif kind == 'diffuse':
+            m = self.matrix
+            # D rho D, D = 2|s><s| - I: отражение столбцов, затем строк
+            mean = m.mean(axis=0)
+            m *= -1
+            m += 2 * mean[None, :]
+            mean = m.mean(axis=1)
+            m *= -1
+            m += 2 * mean[:, None]
+        else:
+            raise ValueError(f"Операция {kind} не поддерживается матрицей плотности")
+
+    def channel(self, kraus, qubit):
+        superoperator = sum(np.kron(k, np.conj(k)) for k in kraus)
+        self.vector.apply(superoperator, [qubit, qubit + self.qubits])
+
+    def probabilities(self):
+        return np.clip(self.matrix.diagonal().real, 0, None)
+
+    def purity(self):
+        return float(np.vdot(self.vector.state, self.vector.state).real)
+
+    def fidelity(self, psi):
+        """<psi|rho|psi> с чистым состоянием psi"""
+        return float(np.vdot(psi, self.matrix @ psi).real)
+
+
+# =============================================================================
+# ИСПОЛНЕНИЕ
+# =============================================================================
+
+def _register_distribution(probabilities, qubits, register):
+    """Распределение строк регистра (биты кубитов register) по базисному"""
+    indices = np.arange(probabilities.size, dtype=np.int64)
+    keys = np.zeros(probabilities.size, dtype=np.int64)
+    for q in register:
+        keys = (keys << 1) | ((indices >> (qubits - 1 - q)) & 1)
+    return np.bincount(keys, weights=probabilities, minlength=1 << len(register))
+
+
+def _apply_readout(distribution, k, confusion):
+    if k == 0:
+        return distribution
+    tensor = distribution.reshape((2,) * k)
+    for axis in range(k):
+        tensor = np.moveaxis(np.tensordot(confusion, tensor, axes=([1], [axis])), 0, axis)
+    return tensor.reshape(-1)
+
+
+def _density(circuit, noise, shots, rng, memory_limit):
+    n = circuit.qubits
+    rho = DensityMatrix(n, memory_limit)
+    ideal = Statevector(n)
+    tail = circuit.terminal()
+    for op in circuit.ops[:tail]:
+        rho.execute(op)
+        QuantumCircuit.execute(ideal, op, rng)
+        wires, multi = _touched(op, n)
+        for kraus in noise.kraus(multi):
+            for q in wires:
+                rho.channel(kraus, q)
+
+    register = circuit.register(circuit.ops[tail:])
+    distribution = _apply_readout(_register_distribution(rho.probabilities(), n, register),
+                                  len(register), noise.confusion())
+    distribution /= distribution.sum()
+    counts = {}
+    if register and shots:
+        numbers = rng.multinomial(shots, distribution)
+        counts = {format(k, f'0{len(register)}b'): int(c) for k, c in enumerate(numbers) if c}
+    top = np.argsort(distribution)[::-1][:COUNTS_LIMIT]
+    return {
+        "mode": "density",
+        "register": register,
+        "counts": counts,
+        "distribution": {format(int(k), f'0{len(register)}b'): float(distribution[k])
+                         for k in top if distribution[k] > 1e-12} if register else {},
+        "purity": rho.purity(),
+        "fidelity": rho.fidelity(ideal.state),
+    }
+
+
+_worker = {}
+
+
+def _init_worker(circuit_json, noise_json, dtype, memory_limit):
+    circuit = QuantumCircuit.from_json(circuit_json, fuse=False)
+    ideal = None
+    # Верность - с идеальным состоянием, если оно одно (нет измерений посередине)
+    if circuit.qubits <= FIDELITY_QUBITS and not _measures(circuit.ops[:circuit.terminal()]):
+        ideal = Statevector(circuit.qubits, dtype=dtype, memory_limit=memory_limit)
+        rng = np.random.default_rng(0)
+        for op in circuit.ops[:circuit.terminal()]:
+            QuantumCircuit.execute(ideal, op, rng)
+    _worker.update(circuit=circuit, noise=NoiseModel.from_json(noise_json), dtype=dtype,
+                   memory_limit=memory_limit, ideal=ideal)
+
+
+def _run_trajectories(batch):
+    """Пачка траекторий [(seed, shots)] в процессе пула: (counts, сумма верностей)"""
+    circuit, noise = _worker['circuit'], _worker['noise']
+    ideal = _worker['ideal']
+    n = circuit.qubits
+    tail = circuit.terminal()
+    register = circuit.register(circuit.ops[tail:])
+    shifts = np.array([n - 1 - q for q in register], dtype=np.int64)
+    counts = {}
+    fidelity = 0.0
+    for seed, shots in batch:
+        rng = np.random.default_rng(seed)
+        state = Statevector(n, dtype=_worker['dtype'], memory_limit=_worker['memory_limit'])
+        prefix = []
+        for op in circuit.ops[:tail]:
+            prefix.extend(QuantumCircuit.execute(state, op, rng))
+            wires, multi = _touched(op, n)
+            if wires:
+                noise.unravel(state, wires, multi, rng)
+        if ideal is not None:
+            fidelity += abs(np.vdot(ideal.state, state.state)) ** 2
+        if not shots or not (prefix or register):
+            continue
+        bits = np.empty((shots, 0), dtype=np.int64)
+        if prefix:
+            bits = np.repeat(np.array([prefix], dtype=np.int64), shots, axis=0)
+        if register:
+            indices = state.sample(shots, rng)
+            bits = np.concatenate([bits, (indices[:, None] >> shifts[None, :]) & 1], axis=1)
+        bits = noise.misread(bits, rng)
+        keys, numbers = np.unique(bits, axis=0, return_counts=True)
+        for key, number in zip(keys.tolist(), numbers.tolist()):
+            key = ''.join(map(str, key))
+            counts[key] = counts.get(key, 0) + number
+    return counts, fidelity
+
+
+def _trajectories(circuit_json, circuit, noise, shots, seed, trajectories, workers, time_limit,
+                  memory_limit, dtype, started):
+    trajectories = max(1, trajectories)
+    children = np.random.SeedSequence(seed).spawn(trajectories)
+    per, extra = divmod(shots, trajectories)
+    jobs = [(child, per + (i < extra)) for i, child in enumerate(children)]
+    batches = [jobs[i:i + BATCH] for i in range(0, len(jobs), BATCH)]
+    workers = (os.cpu_count() or 1) if workers is None else max(1, int(workers))
+    workers = min(workers, len(batches))
+    args = (circuit_json, noise.to_json(), dtype, memory_limit // workers)
+
+    counts, fidelity, done, status = {}, 0.0, 0, 'done'
+
+    def merge(part, size):
+        nonlocal fidelity, done
+        for key, number in part[0].items():
+            counts[key] = counts.get(key, 0) + number
+        fidelity += part[1]
+        done += size
+
+    if workers == 1:
+        _init_worker(*args)
+        for batch in batches:
+            if time_limit is not None and time.perf_counter() - started > time_limit:
+                status = 'time'
+                break
+            merge(_run_trajectories(batch), len(batch))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=args) as pool:
+            for start in range(0, len(batches), workers):
+                if time_limit is not None and time.perf_counter() - started > time_limit:
+                    status = 'time'
+                    break
+                round_ = batches[start:start + workers]
+                for batch, part in zip(round_, pool.map(_run_trajectories, round_)):
+                    merge(part, len(batch))
+
+    has_fidelity = circuit.qubits <= FIDELITY_QUBITS and not _measures(circuit.ops[:circuit.terminal()])
+    return {
+        "mode": "trajectories",
+        "status": status,
+        "trajectories": done,
+        "workers": workers,
+        "register": circuit.register(_measures(circuit.ops)),
+        "counts": dict(sorted(counts.items(), key=lambda kv: -kv[1])[:COUNTS_LIMIT]),
+        "fidelity": fidelity / done if has_fidelity and done else None,
+    }
+
+
+def simulate(circuit_json, noise, shots=1024, seed=None, mode='auto', trajectories=TRAJECTORIES,
+             workers=None, time_limit=None, memory_limit=MEMORY_LIMIT, dtype=None):
+    """
+    Шумное исполнение схемы лабы. mode: density, trajectories или auto -
+    матрица плотности, если регистр мал и измерений посередине нет. Схема
+    без измерений измеряется целиком в конце.
+    Возвращает отчёт с counts (и точным distribution для density).
+    """
+    started = time.perf_counter()
+    circuit = QuantumCircuit.from_json(circuit_json, fuse=False)
+    if not _measures(circuit.ops):
+        # Схема без измерений (пресеты лабы) измеряется целиком в конце
+        circuit_json = dict(circuit_json, layers=list(circuit_json.get('layers', [])) + [[{"type": "MEASURE-ALL"}]])
+        circuit = QuantumCircuit.from_json(circuit_json, fuse=False)
+    middle = bool(_measures(circuit.ops[:circuit.terminal()]))
+    if mode == 'auto':
+        mode = 'density' if circuit.qubits <= DENSITY_QUBITS and not middle else 'trajectories'
+    if mode == 'density':
+        if middle:
+            raise ValueError("Измерения посередине схемы - только в режиме траекторий")
+        result = _density(circuit, noise, shots, np.random.default_rng(seed), memory_limit)
+        result["status"] = 'done'
+    elif mode == 'trajectories':
+        result = _trajectories(circuit_json, circuit, noise, shots, seed, int(trajectories), workers,
+                               time_limit, memory_limit, dtype, started)
+    else:
+        raise ValueError(f"Неизвестный режим: {mode}")
+    result.update(qubits=circuit.qubits, gates=circuit.gates, noise=noise.to_json(),
+                  seconds=time.perf_counter() - started)
+    return result
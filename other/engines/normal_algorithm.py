@@ -0,0 +1,319 @@
+"""
+Исполнитель нормальных алгорифмов Маркова.
+
+MarkovEngine.js на каждом шаге ищет образцы правил по очереди через
+indexOf по всей строке: O(правил x длина) на шаг. Здесь:
+
+- образцы всех правил собраны в автомат Ахо-Корасик; один проход по
+  строке находит правило с наименьшим номером и его самое левое вхождение
+  (для одного образца вхождения по концу и по началу идут в одном порядке);
+- строка хранится в буфере с разрывом (gap buffer): подстановка - сдвиг
+  разрыва к месту замены и запись, без копирования всей строки;
+- проход не начинается с нуля на каждом шаге. Если на шаге применено
+  правило r в позиции p, правил с номером меньше r в строке не было,
+  а после замены они могут появиться только в окне вокруг p шириной
+  замена + 2(L-1), где L - длина самого длинного образца. Самое левое
+  вхождение r тоже не левее начала окна. Поэтому сначала сканируется
+  окно (правила до r), затем - от окна вправо до первого r, и лишь если
+  r исчезло - вся строка.
+
+Пустой образец (пример increment лабы) входит в позицию 0 всегда.
+Формат JSON - exportToJSON лабы: {alphabet, rules: [{pattern, replacement,
+isFinal}], inputString}.
+"""
+
+import time
+from array import array
+
+
+MAX_STEPS = 10_000_000
+MAX_LENGTH = 10_000_000
+# Часы при time_limit проверяются не реже, чем раз в столько просмотренных символов
+TIME_CHECK_SCANNED = 1 << 20
+TRACE_STRING = 200
+# Первый кусок прохода по строке
+SEGMENT = 64
+
+
+class GapBuffer:
+    """
+    Строка кодов символов в array('I') с разрывом [gap_start, gap_end):
+    логическая позиция i < gap_start лежит в i, остальные - сдвинуты на
+    ширину разрыва.
+    """
+
+    def __init__(self, codes):
+        self.buffer = array('I', codes)
+        self.buffer.extend(array('I', [0]) * max(16, len(codes) // 4))
+        self.gap_start = len(codes)
+        self.gap_end = len(self.buffer)
+
+    def __len__(self):
+        return len(self.buffer) - (self.gap_end - self.gap_start)
+
+    def segments(self, start, end):
+        """
+        Логический отрезок [start, end) кусками-копиями. Куски растут вдвое:
+        проход обычно останавливается рядом с началом, и копировать весь
+        хвост строки незачем.
+        """
+        gs, shift = self.gap_start, self.gap_end - self.gap_start
+        size = SEGMENT
+        while start < end:
+            stop = min(end, start + size)
+            if start < gs < stop:
+                stop = gs
+            offset = 0 if start < gs else shift
+            yield self.buffer[start + offset:stop + offset]
+            start = stop
+            size *= 2
+
+    def _move_gap(self, position):
+        buffer, gs, ge = self.buffer, self.gap_start, self.gap_end
+        if position < gs:
+            count = gs - position
+            buffer[ge - count:ge] = buffer[position:gs]
+            self.gap_start, self.gap_end = position, ge - count
+        elif position > gs:
+            count = position - gs
+            buffer[gs:position] = buffer[ge:ge + count]
+            self.gap_start, self.gap_end = position, ge + count
+
+    def replace(self, position, length, codes):
+        """Замена length символов с позиции position на codes"""
+        self._move_gap(position)
+        self.gap_end += length
+        need = len(codes) - (self.gap_end - self.gap_start)
+        if need > 0:
+            grow = max(need, len(self.buffer) // 2)
+            self.buffer[self.gap_start:self.gap_start] = array('I', [0]) * grow
+            self.gap_end += grow
+        self.buffer[self.gap_start:self.gap_start + len(codes)] = codes
+        self.gap_start += len(codes)
+
+    def codes(self):
+        return self.buffer[:self.gap_start] + self.buffer[self.gap_end:]
+
+
+class AhoCorasick:
+    """
+    Автомат по образцам: goto[state] - плотная строка переходов по всем
+    кодам символов, out[state] - номера правил, чей образец кончается в
+    этом состоянии (с учётом суффиксных ссылок), по возрастанию.
+    """
+
+    def __init__(self, patterns, size):
+        goto = [[0] * size]
+        out = [[]]
+        for rule, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for c in pattern:
+                if not goto[state][c]:
+                    goto[state][c] = len(goto)
+                    goto.append([0] * size)
+                    out.append([])
+                state = goto[state][c]
+            out[state].append(rule)
+
+        # Суффиксные ссылки в ширину; отсутствующие переходы достраиваются
+        fail = [0] * len(goto)
+        order = []
+        queue = []
+        for c, child in enumerate(goto[0]):
+            if child:
+                fail[child] = 0
+                queue.append(child)
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            order.append(state)
+            row, back = goto[state], goto[fail[state]]
+            for c in range(size):
+                child = row[c]
+                if child:
+                    fail[child] = back[c]
+                    queue.append(child)
+                else:
+                    row[c] = back[c]
+        for state in order:
+            out[state] = sorted(set(out[state]) | set(out[fail[state]]))
+
+        self.goto = goto
+        self.out = [tuple(o) for o in out]
+        self.lengths = [len(p) for p in patterns]
+
+    def scan(self, segments, start, low, cap, stop_after):
+        """
+        Проход от позиции start (автомат с корня). Ищется правило с
+        наименьшим номером из [low, cap] и его самое левое вхождение;
+        проход останавливается на правиле low или, если что-то найдено,
+        после позиции stop_after. Возвращает (правило, позиция или None,
+        число просмотренных символов).
+        """
+        goto, out, lengths = self.goto, self.out, self.lengths
+        best, where = None, None
+        state, position = 0, start
+        for segment in segments:
+            for c in segment:
+                state = goto[state][c]
+                position += 1
+                found = out[state]
+                if found and found[0] <= cap:
+                    for rule in found:
+                        if rule > cap or best is not None and rule >= best:
+                            break
+                        if rule >= low:
+                            best, where = rule, position - lengths[rule]
+                            break
+                    if best == low:
+                        return best, where, position - start
+                if best is not None and position >= stop_after:
+                    return best, where, position - start
+        return best, where, position - start
+
+
+# =============================================================================
+# АЛГОРИФМ
+# =============================================================================
+
+class NormalAlgorithm:
+    """Правила (образец, замена, заключительное) в порядке приоритета"""
+
+    def __init__(self, rules):
+        self.rules = [(str(p), str(r), bool(f)) for p, r, f in rules]
+        if not self.rules:
+            raise ValueError("Не задано ни одного правила")
+        chars = sorted({c for p, r, _ in self.rules for c in p + r})
+        self.chars = chars
+        self.code = {c: i for i, c in enumerate(chars)}
+        self.patterns = [array('I', (self.code[c] for c in p)) for p, _, _ in self.rules]
+        self.replacements = [array('I', (self.code[c] for c in r)) for _, r, _ in self.rules]
+        empty = [i for i, p in enumerate(self.patterns) if not p]
+        self.empty = empty[0] if empty else None
+        self.longest = max(len(p) for p in self.patterns)
+        self._automaton = None
+
+    @classmethod
+    def from_json(cls, data):
+        """Алгорифм из экспорта лабы"""
+        return cls([(r['pattern'], r.get('replacement', ''), r.get('isFinal', False))
+                    for r in data['rules']])
+
+    def automaton(self, size):
+        if self._automaton is None or len(self._automaton.goto[0]) < size:
+            self._automaton = AhoCorasick(self.patterns, size)
+        return self._automaton
+
+    def _encode(self, text):
+        # Символы строки, которых нет в правилах, получают новые коды
+        for c in text:
+            if c not in self.code:
+                self.code[c] = len(self.chars)
+                self.chars.append(c)
+        return array('I', (self.code[c] for c in text))
+
+    def _decode(self, codes):
+        chars = self.chars
+        return ''.join(chars[c] for c in codes)
+
+    # ----- исполнение -----
+
+    def _select(self, buffer, ac, rule, position, telemetry):
+        """
+        (правило, позиция) следующего шага или (None, None). rule и
+        position - предыдущий шаг: правил с номером меньше rule вне окна
+        вокруг position нет.
+        """
+        n = len(buffer)
+        empty = self.empty
+        # Правила после пустого образца не применятся никогда
+        cap = len(self.rules) - 1 if empty is None else empty - 1
+        low = 0
+        if rule is not None:
+            start = max(0, position - self.longest + 1)
+            end = min(n, position + len(self.replacements[rule]) + self.longest - 1)
+            if rule == empty:
+                best, where, work = ac.scan(buffer.segments(start, end), start, 0, rule - 1, end)
+                telemetry['scanned'] += work
+                return (rule, 0) if best is None else (best, where)
+            best, where, work = ac.scan(buffer.segments(start, n), start, 0, rule, end)
+            telemetry['scanned'] += work
+            if best is not None:
+                return best, where
+            low = rule + 1
+
+        # Полный проход: правил с номером меньше low в строке нет
+        best = where = None
+        if low <= cap:
+            best, where, work = ac.scan(buffer.segments(0, n), 0, low, cap, n)
+            telemetry['scanned'] += work
+            telemetry['rescans'] += 1
+        if empty is not None and best is None:
+            return empty, 0
+        return best, where
+
+    def run(self, text, max_steps=MAX_STEPS, max_length=MAX_LENGTH, time_limit=None, trace=0):
+        """
+        Исполнение до заключительного правила или до шага, на котором ни
+        одно правило не применимо. status: final, halted, steps, length,
+        time. Телеметрия: applied - применения по правилам, scanned -
+        просмотрено символов, rescans - полных проходов по строке; trace -
+        сколько первых шагов записать.
+        """
+        buffer = GapBuffer(self._encode(text))
+        ac = self.automaton(len(self.chars))
+        lengths = ac.lengths
+        applied = [0] * len(self.rules)
+        steps = 0
+        telemetry = {"scanned": 0, "rescans": 0}
+        history = []
+        status = 'halted'
+        started = time.perf_counter()
+        rule = position = None
+        checked = 0
+
+        while True:
+            best, where = self._select(buffer, ac, rule, position, telemetry)
+            if best is None:
+                break
+            if steps >= max_steps:
+                status = 'steps'
+                break
+            # Часы - раз в 4096 шагов или после TIME_CHECK_SCANNED просмотренных
+            # символов: один шаг с полным проходом стоит O(длины строки)
+            if time_limit is not None and (steps & 0xFFF == 0 or telemetry['scanned'] - checked >= TIME_CHECK_SCANNED):
+                checked = telemetry['scanned']
+                if time.perf_counter() - started > time_limit:
+                    status = 'time'
+                    break
+            replacement = self.replacements[best]
+            if len(buffer) - lengths[best] + len(replacement) > max_length:
+                status = 'length'
+                break
+            buffer.replace(where, lengths[best], replacement)
+            steps += 1
+            applied[best] += 1
+            if len(history) < trace:
+                entry = {"step": steps, "rule": best, "position": where}
+                if len(buffer) <= TRACE_STRING:
+                    entry["string"] = self._decode(buffer.codes())
+                history.append(entry)
+            if self.rules[best][2]:
+                status = 'final'
+                break
+            rule, position = best, where
+
+        return {
+            "status": status,
+            "steps": steps,
+            "string": self._decode(buffer.codes()),
+            "length": len(buffer),
+            "applied": applied,
+            "scanned": telemetry['scanned'],
+            "rescans": telemetry['rescans'],
+            "seconds": time.perf_counter() - started,
+            "trace": history,
+        }
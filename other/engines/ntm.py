@@ -0,0 +1,371 @@
+"""
+Поиск принимающего пути недетерминированной машины Тьюринга.
+
+Лаба nondeterministic_tm раскрывает дерево вычислений по одной
+конфигурации за шаг. Здесь дерево обходится целиком:
+
+- bfs - по уровням; кратчайший принимающий путь находится первым.
+  Большой уровень делится на пачки и раскрывается в пуле процессов,
+  дедупликация и построение дерева остаются в главном процессе;
+- iddfs - поиск в глубину с растущим ограничением глубины: памяти нужно
+  только на текущую ветку, путь тоже получается кратчайшим.
+
+Конфигурация (состояние, головка, лента) нормализуется: пустые символы по
+краям ленты отбрасываются, головка отсчитывается от первого непустого.
+Для дедупликации хранится упакованная конфигурация, а для длинных лент -
+её 16-байтовый blake2b: ключ одинаков во всех процессах пула, в отличие
+от hash(), и не растёт вместе с лентой.
+
+Дерево хранится компактно: для каждой найденной конфигурации только
+номер родителя и номер применённого правила. Сами ленты не хранятся -
+конфигурации пути восстанавливаются повторением правил от корня.
+
+Формат JSON - экспорт лабы ({alphabet, states, startState, acceptStates,
+transitions: [{from, symbol, action: "q,write,move"}], tape}); символ '*'
+в правиле подходит к любому символу ленты, пустой символ - '_'.
+"""
+
+import hashlib
+import os
+import struct
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+BLANK = '_'
+WILDCARD = '*'
+MAX_CONFIGS = 2_000_000
+# Уровень меньше этого раскрывается в главном процессе: пересылка дороже работы
+PARALLEL_MIN = 4096
+BATCH = 2048
+DIGEST_SIZE = 16
+
+
+def parse_tape(text):
+    """Как parseTape лабы: слова через пробел или одно слово посимвольно"""
+    tokens = (text or '').split()
+    if len(tokens) == 1 and len(tokens[0]) > 1 and ',' not in tokens[0]:
+        return list(tokens[0])
+    return tokens
+
+
+def _split(value):
+    if isinstance(value, str):
+        return [s.strip() for s in value.split(',') if s.strip()]
+    return [str(s) for s in value or []]
+
+
+class NTM:
+    """
+    Недетерминированная однолентная машина: choices[state * S + symbol] -
+    кортеж вариантов (правило, следующее состояние, запись, сдвиг) в
+    порядке правил, как их перебирает лаба.
+    """
+
+    def __init__(self, states, symbols, rules, start, accepting):
+        self.states = [str(s) for s in states]
+        self.symbols = [str(a) for a in symbols]
+        if len(self.symbols) > 256:
+            raise ValueError("Алфавит больше 256 символов")
+        self.start = int(start)
+        self.accepting = frozenset(accepting)
+        self.rules = list(rules)
+        base = len(self.symbols)
+        choices = {}
+        for r, (state, symbol, target, write, move) in enumerate(self.rules):
+            # symbol = None - правило '*', подходит ко всем символам
+            for c in range(base) if symbol is None else (symbol,):
+                choices.setdefault(state * base + c, []).append((r, target, write, move))
+        self.choices = {key: tuple(v) for key, v in choices.items()}
+
+    @classmethod
+    def from_json(cls, data):
+        """Машина из экспорта лабы nondeterministic_tm"""
+        raw = data.get('transitions') or []
+        parsed = []
+        for t in raw:
+            parts = [s.strip() for s in str(t.get('action', '')).split(',')]
+            # Лаба молча пропускает правила с неполным действием
+            if len(parts) < 3:
+                continue
+            target, write, move = parts[:3]
+            move = {'L': -1, 'R': 1}.get(move.upper(), 0)
+            parsed.append((str(t['from']), str(t['symbol']), target, write, move))
+
+        start = str(data.get('startState') or 'q0')
+        states = list(dict.fromkeys(_split(data.get('states')) + [start]
+                                    + [x for f, _, to, _, _ in parsed for x in (f, to)]))
+        tape = data.get('tape', '')
+        tape = parse_tape(tape) if isinstance(tape, str) else [str(a) for a in tape]
+        symbols = [BLANK] + [a for a in dict.fromkeys(
+            _split(data.get('alphabet')) + tape
+            + [x for _, s, _, w, _ in parsed for x in (s, w)]) if a not in (BLANK, WILDCARD)]
+        if WILDCARD in [w for *_, w, _ in parsed]:
+            symbols.append(WILDCARD)
+        index = {s: i for i, s in enumerate(states)}
+        code = {a: i for i, a in enumerate(symbols)}
+        rules = [(index[f], None if s == WILDCARD else code[s], index[to], code[w], m)
+                 for f, s, to, w, m in parsed]
+        accepting = {index[s] for s in _split(data.get('acceptStates')) if s in index}
+        return cls(states, symbols, rules, index[start], accepting)
+
+    def encode(self, tape):
+        code = {a: i for i, a in enumerate(self.symbols)}
+        try:
+            return bytes(code[str(a)] for a in tape)
+        except KeyError as e:
+            raise ValueError(f"Символ '{e.args[0]}' не входит в алфавит машины") from None
+
+    # ----- конфигурации -----
+
+    def root(self, tape):
+        return normalize(self.start, 0, self.encode(tape))
+
+    def successors(self, config):
+        """Дочерние конфигурации: список (правило, конфигурация)"""
+        state, head, tape = config
+        size = len(tape)
+        inside = 0 <= head < size
+        c = tape[head] if inside else 0
+        out = []
+        for r, target, write, move in self.choices.get(state * len(self.symbols) + c, ()):
+            if inside and 0 < head < size - 1:
+                # Запись внутри ленты: края не меняются, нормализация не нужна
+                cells = tape[:head] + bytes((write,)) + tape[head + 1:]
+                out.append((r, (target, head + move, cells)))
+            elif head < 0:
+                out.append((r, normalize(target, move, bytes((write,)) + bytes(-head - 1) + tape)))
+            elif head >= size:
+                out.append((r, normalize(target, head + move, tape + bytes(head - size) + bytes((write,)))))
+            else:
+                cells = tape[:head] + bytes((write,)) + tape[head + 1:]
+                out.append((r, normalize(target, head + move, cells)))
+        return out
+
+    def replay(self, tape, rules):
+        """Конфигурации пути из корня по номерам правил"""
+        config = self.root(tape)
+        path = [config]
+        for r in rules:
+            config = dict(self.successors(config))[r]
+            path.append(config)
+        return path
+
+    def describe(self, config):
+        state, head, tape = config
+        symbols = [self.symbols[c] for c in tape]
+        return {'state': self.states[state], 'head': head, 'tape': symbols}
+
+
+def normalize(state, head, cells):
+    """Лента без пустых краёв, головка - от первого непустого символа"""
+    stripped = cells.lstrip(b'\0')
+    return state, head - (len(cells) - len(stripped)), stripped.rstrip(b'\0')
+
+
+_PREFIX = struct.Struct('<iq')
+
+
+def digest(config):
+    """Ключ дедупликации: сама упакованная конфигурация или её blake2b, если она длиннее"""
+    state, head, tape = config
+    key = _PREFIX.pack(state, head) + tape
+    if len(key) <= DIGEST_SIZE * 2:
+        return key
+    return hashlib.blake2b(key, digest_size=DIGEST_SIZE).digest()
+
+
+# Машина рабочего процесса пула (задаётся инициализатором)
+_worker_machine = None
+
+
+def _init_worker(machine):
+    global _worker_machine
+    _worker_machine = machine
+
+
+def _expand_batch(batch):
+    """Раскрытие пачки конфигураций в процессе пула: для каждой - [(правило, конфигурация, хеш)]"""
+    machine = _worker_machine
+    return [[(r, child, digest(child)) for r, child in machine.successors(config)] for config in batch]
+
+
+# =============================================================================
+# ПОИСК
+# =============================================================================
+
+class Explorer:
+    """
+    Обход дерева вычислений. Узел i дерева: parent[i], rule[i] (-1 у
+    корня), state[i], depth[i]. Бюджеты: max_configs - число различных
+    конфигураций, max_depth, time_limit (секунды).
+    """
+
+    def __init__(self, machine, max_configs=MAX_CONFIGS, max_depth=None, time_limit=None, workers=None):
+        self.machine = machine
+        self.max_configs = int(max_configs)
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.workers = (os.cpu_count() or 1) if workers is None else int(workers)
+
+    def _reset(self):
+        self.parent, self.rule, self.state, self.depth = (array('i') for _ in range(4))
+        self.started = time.perf_counter()
+
+    def _add(self, parent, rule, state, depth):
+        self.parent.append(parent)
+        self.rule.append(rule)
+        self.state.append(state)
+        self.depth.append(depth)
+        return len(self.parent) - 1
+
+    def _out_of_time(self):
+        return self.time_limit is not None and time.perf_counter() - self.started > self.time_limit
+
+    def _path(self, node):
+        rules = []
+        while self.parent[node] >= 0:
+            rules.append(self.rule[node])
+            node = self.parent[node]
+        return rules[::-1]
+
+    def _result(self, status, tape, node=None, explored=0):
+        result = {
+            'status': status,
+            'configs': len(self.parent),
+            'explored': explored,
+            'depth': max(self.depth) if self.depth else 0,
+            'seconds': time.perf_counter() - self.started,
+            'path': None,
+        }
+        if node is not None:
+            rules = self._path(node)
+            configs = self.machine.replay(tape, rules)
+            result['path'] = [dict(self.machine.describe(c), rule=r)
+                              for c, r in zip(configs, [-1] + rules)]
+        return result
+
+    def tree(self, limit=None):
+        """Компактное дерево: массивы parent, rule, state (не больше limit узлов)"""
+        end = len(self.parent) if limit is None else min(limit, len(self.parent))
+        return {
+            'parent': np.frombuffer(self.parent, dtype=np.int32)[:end].copy(),
+            'rule': np.frombuffer(self.rule, dtype=np.int32)[:end].copy(),
+            'state': np.frombuffer(self.state, dtype=np.int32)[:end].copy(),
+        }
+
+    # ----- в ширину -----
+
+    def bfs(self, tape):
+        """
+        Обход по уровням до первой принимающей конфигурации. status:
+        accepted, rejected (дерево конечно и исчерпано), configs, depth, time.
+        """
+        machine = self.machine
+        self._reset()
+        root = machine.root(tape)
+        node = self._add(-1, -1, root[0], 0)
+        if root[0] in machine.accepting:
+            return self._result('accepted', tape, node)
+        seen = {digest(root)}
+        frontier, ids = [root], [node]
+        explored, depth, pool = 0, 0, None
+        try:
+            while frontier:
+                if self.max_depth is not None and depth >= self.max_depth:
+                    return self._result('depth', tape, explored=explored)
+                if self._out_of_time():
+                    return self._result('time', tape, explored=explored)
+                depth += 1
+                if self.workers > 1 and len(frontier) >= PARALLEL_MIN:
+                    if pool is None:
+                        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(machine,))
+                    batches = [frontier[i:i + BATCH] for i in range(0, len(frontier), BATCH)]
+                    expanded = [children for part in pool.map(_expand_batch, batches) for children in part]
+                else:
+                    expanded = [[(r, child, digest(child)) for r, child in machine.successors(config)]
+                                for config in frontier]
+                explored += len(frontier)
+                next_frontier, next_ids = [], []
+                for parent, children in zip(ids, expanded):
+                    for r, child, key in children:
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        node = self._add(parent, r, child[0], depth)
+                        if child[0] in machine.accepting:
+                            return self._result('accepted', tape, node, explored)
+                        if len(self.parent) >= self.max_configs:
+                            return self._result('configs', tape, explored=explored)
+                        next_frontier.append(child)
+                        next_ids.append(node)
+                frontier, ids = next_frontier, next_ids
+            return self._result('rejected', tape, explored=explored)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    # ----- итеративное углубление -----
+
+    def iddfs(self, tape, start_depth=1):
+        """
+        Поиск в глубину с лимитом глубины 1, 2, 4, ... (до max_depth).
+        Конфигурация пропускается, если уже встречалась на этой итерации
+        не глубже. Дерево - узлы последней итерации.
+        """
+        machine = self.machine
+        root = machine.root(tape)
+        limit = max(1, int(start_depth))
+        explored = 0
+        while True:
+            if self.max_depth is not None:
+                limit = min(limit, self.max_depth)
+            self._reset()
+            node = self._add(-1, -1, root[0], 0)
+            if root[0] in machine.accepting:
+                return self._result('accepted', tape, node)
+            best = {digest(root): 0}
+            stack = [(root, node, 0)]
+            # Ходы из листов на границе лимита
+            frontier = []
+            while stack:
+                config, parent, depth = stack.pop()
+                if depth >= limit:
+                    frontier.extend(digest(child) for _, child in machine.successors(config))
+                    continue
+                explored += 1
+                children = machine.successors(config)
+                # В стек в обратном порядке, чтобы правила перебирались как в лабе
+                for r, child in reversed(children):
+                    key = digest(child)
+                    if best.get(key, limit + 1) <= depth + 1:
+                        continue
+                    best[key] = depth + 1
+                    node = self._add(parent, r, child[0], depth + 1)
+                    if child[0] in machine.accepting:
+                        return self._result('accepted', tape, node, explored)
+                    if len(best) >= self.max_configs:
+                        return self._result('configs', tape, explored=explored)
+                    stack.append((child, node, depth + 1))
+                if self._out_of_time():
+                    return self._result('time', tape, explored=explored)
+            # Дерево исчерпано, если все ходы с границы ведут в уже пройденные
+            # в пределах лимита конфигурации
+            if all(key in best for key in frontier):
+                return self._result('rejected', tape, explored=explored)
+            if self.max_depth is not None and limit >= self.max_depth:
+                return self._result('depth', tape, explored=explored)
+            limit *= 2
+
+
+def explore(machine, tape, strategy='bfs', **budgets):
+    """Обход выбранной стратегией; возвращает (результат, explorer с деревом)"""
+    explorer = Explorer(machine, **budgets)
+    if strategy == 'bfs':
+        return explorer.bfs(tape), explorer
+    if strategy == 'iddfs':
+        return explorer.iddfs(tape), explorer
+    raise ValueError(f"Неизвестная стратегия: {strategy}")
@@ -0,0 +1,441 @@
+"""
+Анализ пространства состояний сетей Петри.
+
+Лаба petri_nets (script.js) срабатывает переходы по одному, а анализ
+делает обходом в ширину со словарём JSON-строк маркировок. Здесь сеть -
+матрицы pre, post и inhibit размера (переходы x позиции), C = post - pre:
+
+- разрешённость считается сразу для пачки маркировок: M[:, None, :] >= pre
+  (и M < inhibit для ингибиторных дуг, как canTransitionFireInMarking),
+  срабатывание - M[rows] + C[ts];
+- граф достижимости строится в ширину пачками; маркировки хранятся в
+  MarkingStore - плотном массиве и открытой хеш-таблице с линейным
+  пробированием, вставка которой тоже векторная. Словаря Python на
+  маркировку нет, поэтому граф на миллионы маркировок помещается в память;
+- по полному графу: ограниченность (максимум по позициям), тупики с
+  кратчайшим путём к первому, живость переходов через нижние сильно
+  связные компоненты: переход жив, если есть на рёбрах каждой нижней
+  компоненты, квазижив - если встречается хоть на одном ребре;
+- редукция упрямыми множествами (stubborn sets) сохраняет все достижимые
+  тупики, но не ограниченность и не живость - в этом режиме считаются
+  только тупики;
+- дерево покрываемости Карпа-Миллера с ω решает ограниченность для
+  бесконечных пространств. С ингибиторными дугами оно лишь приближение:
+  позиция ω считается не прошедшей проверку ингибитора.
+
+Формат JSON - сохранение лабы: {positions: {id: {name, tokens}},
+transitions: [{id, name, input: [arcId], output: [arcId]}], arcs: {id:
+{positionId, weight, isInhibitor}}}.
+"""
+
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+
+MAX_MARKINGS = 5_000_000
+MAX_NODES = 200_000
+# Элементов в промежуточном массиве (маркировки x переходы x позиции)
+BROADCAST_LIMIT = 1 << 24
+OMEGA = 1 << 62
+STUBBORN_TRIES = 4
+EXAMPLES_LIMIT = 10
+
+
+class PetriNet:
+    """Сеть с матрицами pre/post/inhibit (T x P); inhibit = 0 - дуги нет"""
+
+    def __init__(self, pre, post, inhibit, initial, places, transitions):
+        self.pre = np.asarray(pre, dtype=np.int64)
+        self.post = np.asarray(post, dtype=np.int64)
+        self.inhibit = np.asarray(inhibit, dtype=np.int64)
+        self.initial = np.asarray(initial, dtype=np.int64)
+        self.places = list(places)
+        self.transitions = list(transitions)
+        if self.pre.shape != self.post.shape or self.pre.shape != self.inhibit.shape:
+            raise ValueError("Матрицы pre, post и inhibit разного размера")
+        if self.pre.shape != (len(self.transitions), len(self.places)):
+            raise ValueError("Размер матриц не совпадает с числом переходов и позиций")
+        if (self.pre < 0).any() or (self.post < 0).any() or (self.initial < 0).any():
+            raise ValueError("Веса дуг и фишки не могут быть отрицательными")
+        self.incidence = self.post - self.pre
+        self.has_inhibitors = bool(self.inhibit.any())
+
+    @classmethod
+    def from_json(cls, data):
+        """Сеть из сохранения лабы"""
+        positions = data['positions']
+        place_ids = list(positions)
+        index = {p: i for i, p in enumerate(place_ids)}
+        arcs = data.get('arcs', {})
+        transitions = data.get('transitions', [])
+        shape = (len(transitions), len(place_ids))
+        pre, post, inhibit = np.zeros(shape, np.int64), np.zeros(shape, np.int64), np.zeros(shape, np.int64)
+        for t, transition in enumerate(transitions):
+            for arc_id in transition.get('input', []):
+                arc = arcs[arc_id]
+                p, weight = index[arc['positionId']], int(arc.get('weight', 1))
+                if arc.get('isInhibitor'):
+                    inhibit[t, p] = weight
+                else:
+                    pre[t, p] += weight
+            for arc_id in transition.get('output', []):
+                arc = arcs[arc_id]
+                post[t, index[arc['positionId']]] += int(arc.get('weight', 1))
+        initial = [int(positions[p].get('tokens', 0)) for p in place_ids]
+        places = [positions[p].get('name') or p for p in place_ids]
+        names = [t.get('name') or t.get('id') or f't{i}' for i, t in enumerate(transitions)]
+        return cls(pre, post, inhibit, initial, places, names)
+
+    # ----- векторные операции -----
+
+    def enabled(self, markings):
+        """Булева матрица (маркировки x переходы)"""
+        markings = np.asarray(markings)
+        size = max(1, self.pre.size)
+        step = max(1, BROADCAST_LIMIT // size)
+        out = np.empty((len(markings), len(self.transitions)), dtype=bool)
+        for start in range(0, len(markings), step):
+            block = markings[start:start + step, None, :]
+            ok = (block >= self.pre[None]).all(axis=2)
+            if self.has_inhibitors:
+                ok &= ((self.inhibit[None] == 0) | (block < self.inhibit[None])).all(axis=2)
+            out[start:start + step] = ok
+        return out
+
+    def fire(self, markings, rows, transitions):
+        """Маркировки после срабатывания transitions в строках rows"""
+        return markings[rows] + self.incidence[transitions]
+
+    def describe(self, marking):
+        return {p: ('ω' if v >= OMEGA else int(v)) for p, v in zip(self.places, marking)}
+
+    # ----- упрямые множества -----
+
+    def _prepare_stubborn(self):
+        if hasattr(self, '_conflicts'):
+            return
+        c = self.incidence
+        need = (self.pre > 0).astype(np.int64)
+        inhibited = (self.inhibit > 0).astype(np.int64)
+        decrease, increase = (c < 0).astype(np.int64), (c > 0).astype(np.int64)
+        # conflict[t, u]: u может запретить t (уменьшить вход или поднять ингибитор)
+        conflict = (need @ decrease.T > 0) | (inhibited @ increase.T > 0)
+        conflict |= conflict.T
+        np.fill_diagonal(conflict, False)
+        self._conflicts = [np.flatnonzero(row).tolist() for row in conflict]
+        self._increasers = [np.flatnonzero(col).tolist() for col in (c > 0).T]
+        self._decreasers = [np.flatnonzero(col).tolist() for col in (c < 0).T]
+
+    def stubborn(self, marking, enabled):
+        """
+        Разрешённые переходы упрямого множества: для разрешённого t в
+        множество входят все конфликтующие с ним, для запрещённого - все,
+        кто может исправить одну его «виноватую» позицию. Из нескольких
+        стартовых переходов берётся множество с наименьшим числом
+        разрешённых.
+        """
+        self._prepare_stubborn()
+        candidates = np.flatnonzero(enabled)
+        best = None
+        for start in candidates[:STUBBORN_TRIES]:
+            chosen, work = {int(start)}, [int(start)]
+            while work:
+                t = work.pop()
+                if enabled[t]:
+                    adds = self._conflicts[t]
+                else:
+                    short = np.flatnonzero(marking < self.pre[t])
+                    if short.size:
+                        adds = self._increasers[short[0]]
+                    else:
+                        blocked = np.flatnonzero((self.inhibit[t] > 0) & (marking >= self.inhibit[t]))
+                        adds = self._decreasers[blocked[0]]
+                for u in adds:
+                    if u not in chosen:
+                        chosen.add(u)
+                        work.append(u)
+            fired = sorted(t for t in chosen if enabled[t])
+            if best is None or len(fired) < len(best):
+                best = fired
+                if len(best) == 1:
+                    break
+        return best
+
+    # ----- граф достижимости -----
+
+    def reachability(self, max_markings=MAX_MARKINGS, reduce=False, batch=65536, time_limit=None):
+        """
+        Граф достижимости в ширину. reduce - редукция упрямыми
+        множествами (сохраняются только тупики). Возвращает (отчёт, граф);
+        граф - словарь массивов store, src, dst, transition.
+        """
+        started = time.perf_counter()
+        store = MarkingStore(len(self.places))
+        store.insert(self.initial[None])
+        frontier = np.array([0])
+        sources, targets, fired = [], [], []
+        deadlocks = []
+        levels = 0
+        complete = True
+        while frontier.size:
+            if store.count >= max_markings or (time_limit is not None and time.perf_counter() - started > time_limit):
+                complete = False
+                break
+            levels += 1
+            next_frontier = []
+            for start in range(0, frontier.size, batch):
+                ids = frontier[start:start + batch]
+                markings = store.markings[ids]
+                enabled = self.enabled(markings)
+                dead = ~enabled.any(axis=1)
+                if dead.any():
+                    deadlocks.append(ids[dead])
+                if reduce:
+                    rows, ts = [], []
+                    for i in np.flatnonzero(~dead):
+                        chosen = self.stubborn(markings[i], enabled[i])
+                        rows.extend([i] * len(chosen))
+                        ts.extend(chosen)
+                    rows, ts = np.asarray(rows, dtype=np.int64), np.asarray(ts, dtype=np.int64)
+                else:
+                    rows, ts = np.nonzero(enabled)
+                if not rows.size:
+                    continue
+                dst, new = store.insert(self.fire(markings, rows, ts), parents=ids[rows], via=ts)
+                sources.append(ids[rows])
+                targets.append(dst)
+                fired.append(ts)
+                next_frontier.append(dst[new])
+            frontier = np.concatenate(next_frontier) if next_frontier else np.array([], dtype=np.int64)
+
+        n = store.count
+        src = np.concatenate(sources) if sources else np.array([], dtype=np.int64)
+        dst = np.concatenate(targets) if targets else np.array([], dtype=np.int64)
+        via = np.concatenate(fired) if fired else np.array([], dtype=np.int64)
+        dead = np.sort(np.concatenate(deadlocks)) if deadlocks else np.array([], dtype=np.int64)
+        bounds = store.markings[:n].max(axis=0)
+
+        report = {
+            "markings": int(n),
+            "edges": int(src.size),
+            "levels": levels,
+            "complete": complete,
+            "reduced": bool(reduce),
+            "deadlocks": int(dead.size),
+            "deadlockExamples": [self.describe(store.markings[i]) for i in dead[:EXAMPLES_LIMIT]],
+            "deadlockPath": [self.transitions[t] for t in store.path(dead[0])] if dead.size else None,
+        }
+        if not reduce:
+            report["bounded"] = True if complete else None
+            report["bounds"] = {p: int(b) for p, b in zip(self.places, bounds)}
+            report["safe"] = bool(complete and (bounds <= 1).all())
+            if complete:
+                report.update(self._liveness(n, src, dst, via))
+        report["seconds"] = time.perf_counter() - started
+        return report, {"store": store, "src": src, "dst": dst, "transition": via}
+
+    def _liveness(self, n, src, dst, via):
+        """Живость по нижним сильно связным компонентам полного графа"""
+        graph = sparse.csr_matrix((np.ones(src.size, dtype=np.int8), (src, dst)), shape=(n, n))
+        count, labels = connected_components(graph, directed=True, connection='strong')
+        inner = labels[src] == labels[dst]
+        leaving = np.zeros(count, dtype=bool)
+        leaving[labels[src[~inner]]] = True
+        bottom = np.flatnonzero(~leaving)
+        # Пары (нижняя компонента, переход) на внутренних рёбрах
+        keep = inner & ~leaving[labels[src]]
+        pairs = np.unique(labels[src[keep]].astype(np.int64) * len(self.transitions) + via[keep])
+        per_transition = np.bincount(pairs % len(self.transitions), minlength=len(self.transitions)) \
+            if len(self.transitions) else np.array([], dtype=np.int64)
+        seen = np.zeros(len(self.transitions), dtype=bool)
+        seen[via] = True
+        status = {}
+        for t, name in enumerate(self.transitions):
+            status[name] = 'live' if per_transition[t] == bottom.size else 'quasi-live' if seen[t] else 'dead'
+        return {
+            "liveness": status,
+            "live": bool(status) and all(s == 'live' for s in status.values()),
+            "bottomComponents": int(bottom.size),
+            # Обратимость: начальная маркировка в единственной нижней компоненте
+            "reversible": bool(bottom.size == 1 and labels[0] == bottom[0]),
+        }
+
+    # ----- дерево покрываемости -----
+
+    def coverability(self, max_nodes=MAX_NODES, time_limit=None):
+        """
+        Дерево Карпа-Миллера обходом в глубину: новая маркировка, строго
+        покрывающая предка на своём пути, получает ω там, где она больше.
+        Узел, равный уже встреченному, не раскрывается.
+        """
+        started = time.perf_counter()
+        places = len(self.places)
+        seen = {}
+        path = np.empty((64, places), dtype=np.int64)
+        # Стек: (маркировка, глубина); path[:глубина] - предки
+        stack = [(self.initial.copy(), 0)]
+        nodes = 0
+        quasi = np.zeros(len(self.transitions), dtype=bool)
+        bounds = np.zeros(places, dtype=np.int64)
+        complete = True
+        while stack:
+            if nodes >= max_nodes or (time_limit is not None and nodes & 0x3FF == 0
+                                      and time.perf_counter() - started > time_limit):
+                complete = False
+                break
+            marking, depth = stack.pop()
+            nodes += 1
+            np.maximum(bounds, marking, out=bounds)
+            key = marking.tobytes()
+            if key in seen:
+                continue
+            seen[key] = nodes
+            if depth >= len(path):
+                path = np.concatenate([path, np.empty_like(path)])
+            path[depth] = marking
+            enabled = self.enabled(marking[None])[0]
+            if self.has_inhibitors:
+                # ω не проходит проверку ингибитора
+                enabled &= ~((self.inhibit > 0) & (marking[None] >= OMEGA)).any(axis=1)
+            quasi |= enabled
+            ts = np.flatnonzero(enabled)
+            if not ts.size:
+                continue
+            children = marking[None] + self.incidence[ts]
+            children[:, marking >= OMEGA] = OMEGA
+            ancestors = path[:depth + 1]
+            for child in children[::-1]:
+                covered = (ancestors <= child).all(axis=1) & (ancestors < child).any(axis=1)
+                if covered.any():
+                    grow = (ancestors[covered] < child).any(axis=0)
+                    child = child.copy()
+                    child[grow] = OMEGA
+                stack.append((child, depth + 1))
+
+        unbounded = [p for p, b in zip(self.places, bounds) if b >= OMEGA]
+        return {
+            "nodes": nodes,
+            "distinct": len(seen),
+            "complete": complete,
+            "bounded": not unbounded if complete or unbounded else None,
+            "unbounded": unbounded,
+            "bounds": self.describe(bounds),
+            "quasiLive": {name: bool(q) for name, q in zip(self.transitions, quasi)} if complete else None,
+            "seconds": time.perf_counter() - started,
+        }
+
+
+# =============================================================================
+# ХРАНИЛИЩЕ МАРКИРОВОК
+# =============================================================================
+
+class MarkingStore:
+    """
+    Маркировки в плотном массиве (count x P) и открытая хеш-таблица
+    номеров с линейным пробированием. Хеш - сумма произведений на
+    случайные нечётные 64-битные множители с перемешиванием.
+    """
+
+    def __init__(self, places, capacity=1024, seed=0x5EED):
+        self.places = places
+        self.count = 0
+        self.markings = np.empty((capacity, places), dtype=np.int64)
+        self.hashes = np.empty(capacity, dtype=np.uint64)
+        self.parent = np.empty(capacity, dtype=np.int64)
+        self.via = np.empty(capacity, dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        self.salt = rng.integers(0, 1 << 63, size=places, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.table = np.full(4 * capacity, -1, dtype=np.int64)
+
+    def hash(self, markings):
+        with np.errstate(over='ignore'):
+            h = (markings.astype(np.uint64) * self.salt).sum(axis=1, dtype=np.uint64)
+            h ^= h >> np.uint64(31)
+            h *= np.uint64(0x9E3779B97F4A7C15)
+            h ^= h >> np.uint64(29)
+        return h
+
+    def _grow(self, need):
+        capacity = len(self.markings)
+        if need > capacity:
+            size = max(need, 2 * capacity)
+            for name in ('markings', 'hashes', 'parent', 'via'):
+                old = getattr(self, name)
+                new = np.empty((size,) + old.shape[1:], dtype=old.dtype)
+                new[:self.count] = old[:self.count]
+                setattr(self, name, new)
+        # Заполнение таблицы не выше половины
+        if 2 * need > len(self.table):
+            size = len(self.table)
+            while 2 * need > size:
+                size *= 2
+            self.table = np.full(size, -1, dtype=np.int64)
+            ids = np.arange(self.count)
+            self._place(ids, self.hashes[:self.count])
+
+    def _place(self, ids, hashes):
+        """Размещение заведомо различных номеров в таблице"""
+        mask = np.uint64(len(self.table) - 1)
+        slots = (hashes & mask).astype(np.int64)
+        pending = np.arange(ids.size)
+        while pending.size:
+            s = slots[pending]
+            free = self.table[s] < 0
+            chosen, first = np.unique(s[free], return_index=True)
+            winners = pending[free][first]
+            self.table[chosen] = ids[winners]
+            rest = np.setdiff1d(pending, winners, assume_unique=True)
+            slots[rest] = (slots[rest] + 1) & (len(self.table) - 1)
+            pending = rest
+
+    def insert(self, markings, parents=None, via=None):
+        """
+        Вставка пачки. Возвращает (номера, новые): номер каждой маркировки
+        в хранилище и маску впервые встреченных.
+        """
+        markings = np.asarray(markings, dtype=np.int64)
+        k = len(markings)
+        self._grow(self.count + k)
+        hashes = self.hash(markings)
+        size = len(self.table) - 1
+        slots = (hashes & np.uint64(size)).astype(np.int64)
+        ids = np.full(k, -1, dtype=np.int64)
+        new = np.zeros(k, dtype=bool)
+        pending = np.arange(k)
+        while pending.size:
+            current = self.table[slots[pending]]
+            empty = current < 0
+            # Занятые ячейки: та же маркировка - дубликат, иначе следующая ячейка
+            busy, busy_ids = pending[~empty], current[~empty]
+            same = (self.hashes[busy_ids] == hashes[busy]) & \
+                (self.markings[busy_ids] == markings[busy]).all(axis=1)
+            ids[busy[same]] = busy_ids[same]
+            moved = busy[~same]
+            slots[moved] = (slots[moved] + 1) & size
+            # Пустые ячейки: первая претендентка занимает, остальные сравнятся в следующем круге
+            free = pending[empty]
+            chosen, first = np.unique(slots[free], return_index=True)
+            winners = free[first]
+            fresh = self.count + np.arange(winners.size)
+            self.markings[fresh] = markings[winners]
+            self.hashes[fresh] = hashes[winners]
+            self.parent[fresh] = -1 if parents is None else parents[winners]
+            self.via[fresh] = -1 if via is None else via[winners]
+            self.table[chosen] = fresh
+            self.count += winners.size
+            ids[winners] = fresh
+            new[winners] = True
+            losers = np.setdiff1d(free, winners, assume_unique=True)
+            pending = np.concatenate([moved, losers])
+        return ids, new
+
+    def path(self, index):
+        """Переходы от начальной маркировки до index по дереву обхода"""
+        out = []
+        while self.parent[index] >= 0:
+            out.append(int(self.via[index]))
+            index = self.parent[index]
+        return out[::-1]
@@ -0,0 +1,577 @@
+"""
+Статевекторный симулятор квантовых схем.
+
+Лаба quantum_computing (scripts/core) держит вектор массивом объектов
+{re, im} и на каждый вентиль строит новый массив; unitary.js собирает
+полную матрицу 2^n x 2^n. Здесь:
+
+- состояние - один массив numpy complex128 (или complex64, если так
+  влезает в бюджет памяти), вентиль не строит матриц 2^n x 2^n. Вектор
+  рассматривается как тензор ранга n с осью на кубит (кубит 0 - старший
+  бит, как в qstate.js), k-кубитный вентиль сворачивается (tensordot)
+  только по своим осям;
+- работа идёт кусками не больше CHUNK амплитуд, изменения пишутся на
+  место: временная память ограничена куском, а не размером вектора.
+  Поэтому 24-26 кубит помещаются в MEMORY_LIMIT;
+- диагональные вентили (Z, S, T, RZ, CZ, CP, оракул фазы) - умножение
+  срезов на фазу, управляющие кубиты - срез тензора с 1 на их осях;
+- подряд идущие однокубитные вентили на одном проводе перемножаются в
+  одну матрицу 2x2 (слияние), диагональный результат идёт по быстрому
+  пути;
+- конечные измерения не повторяют схему на каждый запуск: выборка shots
+  исходов делается пачкой двухуровневым поиском по накопленным
+  вероятностям кусков. Схема с измерением посередине прогоняется от
+  первого такого измерения отдельно на каждый запуск.
+
+Формат схемы - Circuit.toJSON лабы: {qubits, layers: [[{type, targets,
+control, U, marked}]]}.
+"""
+
+import itertools
+import math
+import time
+
+import numpy as np
+
+
+MAX_QUBITS = 30
+MEMORY_LIMIT = 2 << 30
+# Амплитуд в одном куске
+CHUNK = 1 << 18
+COUNTS_LIMIT = 1024
+PROBABILITIES_QUBITS = 10
+
+SQRT_HALF = 1 / math.sqrt(2)
+GATES = {
+    'I': np.eye(2),
+    'X': np.array([[0, 1], [1, 0]]),
+    'Y': np.array([[0, -1j], [1j, 0]]),
+    'Z': np.diag([1, -1]),
+    'H': np.array([[SQRT_HALF, SQRT_HALF], [SQRT_HALF, -SQRT_HALF]]),
+    'S': np.diag([1, 1j]),
+    'SDG': np.diag([1, -1j]),
+    'T': np.diag([1, np.exp(1j * math.pi / 4)]),
+    'TDG': np.diag([1, np.exp(-1j * math.pi / 4)]),
+}
+ROTATIONS = {
+    'RX': lambda t: np.array([[math.cos(t / 2), -1j * math.sin(t / 2)], [-1j * math.sin(t / 2), math.cos(t / 2)]]),
+    'RY': lambda t: np.array([[math.cos(t / 2), -math.sin(t / 2)], [math.sin(t / 2), math.cos(t / 2)]]),
+    'RZ': lambda t: np.diag([np.exp(-0.5j * t), np.exp(0.5j * t)]),
+    'P': lambda t: np.diag([1, np.exp(1j * t)]),
+}
+
+
+def complex_matrix(rows):
+    """Матрица из формата лабы: элементы {re, im}, [re, im] или числа"""
+    def value(v):
+        if isinstance(v, dict):
+            return complex(v.get('re', 0), v.get('im', 0))
+        if isinstance(v, (list, tuple)):
+            return complex(v[0], v[1])
+        return complex(v)
+    return np.array([[value(v) for v in row] for row in rows], dtype=complex)
+
+
+def state_bytes(qubits, dtype):
+    return (1 << qubits) * np.dtype(dtype).itemsize
+
+
+# =============================================================================
+# ВЕКТОР СОСТОЯНИЯ
+# =============================================================================
+
+class Statevector:
+    """Регистр из qubits кубитов в |0...0>"""
+
+    def __init__(self, qubits, dtype=None, memory_limit=MEMORY_LIMIT, copies=1):
+        if not 1 <= qubits <= MAX_QUBITS:
+            raise ValueError(f"Число кубитов должно быть от 1 до {MAX_QUBITS}")
+        workspace = 4 * CHUNK * 16
+        if dtype is None:
+            dtype = np.complex128
+            if copies * state_bytes(qubits, dtype) + workspace > memory_limit:
+                dtype = np.complex64
+        need = copies * state_bytes(qubits, dtype) + workspace
+        if need > memory_limit:
+            raise ValueError(f"Состояние из {qubits} кубитов требует {need >> 20} МиБ, "
+                             f"лимит {memory_limit >> 20} МиБ")
+        self.qubits = qubits
+        self.dtype = np.dtype(dtype)
+        self.state = np.zeros(1 << qubits, dtype=self.dtype)
+        self.state[0] = 1
+
+    def copy(self):
+        other = object.__new__(Statevector)
+        other.qubits, other.dtype, other.state = self.qubits, self.dtype, self.state.copy()
+        return other
+
+    @property
+    def tensor(self):
+        return self.state.reshape((2,) * self.qubits)
+
+    def _pairs(self, qubit):
+        """Куски (a, b) - виды амплитуд с 0 и 1 на кубите qubit"""
+        inner = 1 << (self.qubits - 1 - qubit)
+        view = self.state.reshape(-1, 2, inner)
+        if inner >= CHUNK:
+            for o in range(view.shape[0]):
+                for s in range(0, inner, CHUNK):
+                    yield view[o, 0, s:s + CHUNK], view[o, 1, s:s + CHUNK]
+        else:
+            rows = max(1, CHUNK // inner)
+            for o in range(0, view.shape[0], rows):
+                yield view[o:o + rows, 0], view[o:o + rows, 1]
+
+    def _controlled(self, controls):
+        """Вид тензора с 1 на управляющих кубитах и номера оставшихся осей"""
+        index = [slice(None)] * self.qubits
+        for c in controls:
+            index[c] = 1
+        return self.tensor[tuple(index)], [q for q in range(self.qubits) if q not in controls]
+
+    # ----- вентили -----
+
+    def apply1(self, u, qubit):
+        """Однокубитная матрица u на кубите qubit"""
+        u00, u01, u10, u11 = (self.dtype.type(v) for v in np.asarray(u).ravel())
+        for a, b in self._pairs(qubit):
+            top = u00 * a + u01 * b
+            b *= u11
+            b += u10 * a
+            a[...] = top
+
+    def diagonal(self, d0, d1, qubit, controls=()):
+        """diag(d0, d1) на кубите qubit при единицах на controls"""
+        if controls:
+            view, axes = self._controlled(controls)
+            index = [slice(None)] * view.ndim
+            position = axes.index(qubit)
+            for value, bit in ((d0, 0), (d1, 1)):
+                if value != 1:
+                    index[position] = bit
+                    part = view[tuple(index) + (Ellipsis,)]
+                    part *= self.dtype.type(value)
+            return
+        d0, d1 = self.dtype.type(d0), self.dtype.type(d1)
+        for a, b in self._pairs(qubit):
+            if d0 != 1:
+                a *= d0
+            b *= d1
+
+    def apply(self, matrix, targets, controls=()):
+        """
+        Матрица 2^k x 2^k на кубитах targets (первый - старший) при
+        единицах на controls: свёртка по осям targets кусками.
+        """
+        k = len(targets)
+        if len(set(targets) | set(controls)) != k + len(controls):
+            raise ValueError("Кубиты вентиля повторяются")
+        if k == 1 and not controls:
+            self.apply1(matrix, targets[0])
+            return
+        gate = np.asarray(matrix, dtype=self.dtype).reshape((2,) * (2 * k))
+        view, remaining = self._controlled(controls)
+        axes = [remaining.index(t) for t in targets]
+        # Ведущие свободные оси перебираются, чтобы кусок был не больше CHUNK
+        split, size = [], view.size
+        for axis in range(view.ndim):
+            if size <= CHUNK:
+                break
+            if axis not in axes:
+                split.append(axis)
+                size //= 2
+        local = [a - sum(1 for s in split if s < a) for a in axes]
+        for bits in itertools.product((0, 1), repeat=len(split)):
+            index = [slice(None)] * view.ndim
+            for axis, bit in zip(split, bits):
+                index[axis] = bit
+            sub = view[tuple(index)]
+            result = np.tensordot(gate, sub, axes=(list(range(k, 2 * k)), local))
+            sub[...] = np.moveaxis(result, list(range(k)), local)
+
+    def phase_flip(self, indices):
+        """-1 на базисных состояниях indices (U_FULL лабы)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        if ((indices < 0) | (indices >= self.state.size)).any():
+            raise ValueError("Отмеченное состояние вне регистра")
+        self.state[np.unique(indices)] *= -1
+
+    def diffuse(self):
+        """2|s><s| - I: отражение относительно среднего (DIFFUSER лабы)"""
+        mean = self.state.mean(dtype=np.complex128)
+        self.state *= -1
+        self.state += self.dtype.type(2 * mean)
+
+    # ----- измерения -----
+
+    def _weights(self):
+        state = self.state
+        return np.array([np.vdot(state[s:s + CHUNK], state[s:s + CHUNK]).real
+                         for s in range(0, state.size, CHUNK)])
+
+    def probability_one(self, qubit):
+        return float(sum(np.vdot(b, b).real for _, b in self._pairs(qubit)))
+
+    def measure(self, qubit, rng):
+        """Измерение кубита с коллапсом; возвращает бит"""
+        p1 = self.probability_one(qubit)
+        total = float(self._weights().sum())
+        bit = int(rng.random() * total < p1)
+        keep = p1 if bit else total - p1
+        scale = self.dtype.type(1 / math.sqrt(keep)) if keep > 0 else 0
+        for a, b in self._pairs(qubit):
+            kept, dropped = (b, a) if bit else (a, b)
+            kept *= scale
+            dropped[...] = 0
+        return bit
+
+    def sample(self, shots, rng):
+        """shots базисных индексов по |амплитуда|^2 без коллапса"""
+        weights = self._weights()
+        cumulative = np.cumsum(weights)
+        draws = np.sort(rng.random(shots) * cumulative[-1])
+        blocks = np.minimum(np.searchsorted(cumulative, draws, side='right'), weights.size - 1)
+        out = np.empty(shots, dtype=np.int64)
+        bounds = np.searchsorted(blocks, np.arange(weights.size + 1))
+        for block in np.unique(blocks):
+            lo, hi = bounds[block], bounds[block + 1]
+            start = block * CHUNK
+            chunk = self.state[start:start + CHUNK]
+            local = np.cumsum(chunk.real ** 2 + chunk.imag ** 2, dtype=np.float64)
+            offset = cumulative[block] - weights[block]
+            found = np.searchsorted(local, draws[lo:hi] - offset, side='right')
+            out[lo:hi] = start + np.minimum(found, local.size - 1)
+        rng.shuffle(out)
+        return out
+
+    def collapse(self, index):
+        self.state[...] = 0
+        self.state[index] = 1
+
+    def norm(self):
+        return math.sqrt(float(self._weights().sum()))
+
+    def normalize(self):
+        self.state *= self.dtype.type(1 / self.norm())
+
+    def top(self, count):
+        """count наибольших по модулю амплитуд: (индекс, амплитуда)"""
+        best = []
+        for s in range(0, self.state.size, CHUNK):
+            chunk = self.state[s:s + CHUNK]
+            p = chunk.real ** 2 + chunk.imag ** 2
+            take = min(count, p.size)
+            part = np.argpartition(p, p.size - take)[p.size - take:]
+            best.extend((float(p[i]), s + int(i), complex(chunk[i])) for i in part if p[i] > 0)
+            best = sorted(best, reverse=True)[:count]
+        return [(i, a) for _, i, a in best]
+
+
+# =============================================================================
+# СХЕМА
+# =============================================================================
+
+class QuantumCircuit:
+    """
+    Схема лабы, скомпилированная в список операций со слиянием
+    однокубитных вентилей (fuse=False - без слияния). Операции: (u, матрица, кубит), (diag, d0, d1,
+    кубит, controls), (gate, матрица, targets, controls), (phase,
+    индексы), (diffuse,), (measure, кубит), (measure_all,).
+    """
+
+    def __init__(self, qubits, layers, fuse=True):
+        self.qubits = int(qubits)
+        if not 1 <= self.qubits <= MAX_QUBITS:
+            raise ValueError(f"Число кубитов должно быть от 1 до {MAX_QUBITS}")
+        self.layers = layers
+        self.fuse = fuse
+        self.gates = 0
+        self.ops = self._compile(layers)
+
+    @classmethod
+    def from_json(cls, data, fuse=True):
+        return cls(data['qubits'], data.get('layers', []), fuse=fuse)
+
+    def _wires(self, element):
+        targets = [int(q) for q in element.get('targets', [])]
+        controls = element.get('controls')
+        if controls is None:
+            controls = [element['control']] if element.get('control') is not None else []
+        controls = [int(q) for q in controls]
+        for q in targets + controls:
+            if not 0 <= q < self.qubits:
+                raise ValueError(f"Кубит {q} вне регистра")
+        return targets, controls
+
+    def _compile(self, layers):
+        ops = []
+        pending = {}
+
+        def flush(qubits):
+            for q in sorted(qubits):
+                u = pending.pop(q, None)
+                if u is None or np.allclose(u, np.eye(2)):
+                    continue
+                if abs(u[0, 1]) < 1e-12 and abs(u[1, 0]) < 1e-12:
+                    ops.append(('diag', u[0, 0], u[1, 1], q, ()))
+                else:
+                    ops.append(('u', u, q))
+
+        for layer in layers:
+            for element in layer:
+                kind = str(element.get('type', '')).upper()
+                targets, controls = self._wires(element)
+                self.gates += 1
+                if kind in GATES or kind in ROTATIONS or kind in ('U', 'U1'):
+                    if kind in GATES:
+                        u = GATES[kind]
+                    elif kind in ROTATIONS:
+                        u = ROTATIONS[kind](float(element.get('theta', element.get('angle', 0))))
+                    else:
+                        u = complex_matrix(element['U'])
+                    if u.shape != (2, 2) or len(targets) != 1:
+                        raise ValueError(f"Вентиль {kind} - однокубитный")
+                    if controls:
+                        flush(targets + controls)
+                        if abs(u[0, 1]) < 1e-12 and abs(u[1, 0]) < 1e-12:
+                            ops.append(('diag', u[0, 0], u[1, 1], targets[0], tuple(controls)))
+                        else:
+                            ops.append(('gate', u, targets, tuple(controls)))
+                        continue
+                    q = targets[0]
+                    pending[q] = u @ pending.get(q, np.eye(2))
+                    if not self.fuse:
+                        flush([q])
+                elif kind in ('CNOT', 'CX', 'CZ', 'CP', 'CCX', 'TOFFOLI'):
+                    flush(targets + controls)
+                    if kind in ('CCX', 'TOFFOLI') and len(controls) < 2 and len(targets) == 3:
+                        controls, targets = targets[:2], targets[2:]
+                    if not controls or len(targets) != 1:
+                        raise ValueError(f"Вентилю {kind} нужны control и одна цель")
+                    if kind == 'CZ':
+                        ops.append(('diag', 1, -1, targets[0], tuple(controls)))
+                    elif kind == 'CP':
+                        phase = np.exp(1j * float(element.get('theta', element.get('angle', 0))))
+                        ops.append(('diag', 1, phase, targets[0], tuple(controls)))
+                    else:
+                        ops.append(('gate', GATES['X'], targets, tuple(controls)))
+                elif kind == 'SWAP':
+                    flush(targets)
+                    if len(targets) != 2:
+                        raise ValueError("SWAP - двухкубитный вентиль")
+                    swap = np.eye(4)[[0, 2, 1, 3]]
+                    ops.append(('gate', swap, targets, tuple(controls)))
+                elif kind == 'U2':
+                    flush(targets + controls)
+                    u = complex_matrix(element['U'])
+                    if u.shape != (1 << len(targets),) * 2:
+                        raise ValueError("Размер матрицы U2 не совпадает с числом кубитов")
+                    ops.append(('gate', u, targets, tuple(controls)))
+                elif kind == 'U_FULL':
+                    flush(range(self.qubits))
+                    ops.append(('phase', [int(i) for i in element.get('marked', [])]))
+                elif kind == 'DIFFUSER':
+                    flush(range(self.qubits))
+                    ops.append(('diffuse',))
+                elif kind == 'MEASURE':
+                    flush(targets)
+                    ops.extend(('measure', q) for q in targets)
+                elif kind == 'MEASURE-ALL':
+                    flush(range(self.qubits))
+                    ops.append(('measure_all',))
+                else:
+                    raise ValueError(f"Неизвестный вентиль: {kind}")
+        flush(list(pending))
+
+        # Измерения, после которых их кубиты не трогаются, переносятся в конец:
+        # с вентилями на других кубитах они коммутируют
+        touched, terminal, body = set(), [], []
+        for op in reversed(ops):
+            kind = op[0]
+            if kind == 'measure' and op[1] not in touched:
+                terminal.append(op)
+                continue
+            if kind == 'measure_all' and not touched:
+                terminal.append(op)
+                continue
+            body.append(op)
+            if kind == 'u':
+                touched.add(op[2])
+            elif kind == 'diag':
+                touched.update((op[3],) + tuple(op[4]))
+            elif kind == 'gate':
+                touched.update(tuple(op[2]) + tuple(op[3]))
+            else:
+                touched.update(range(self.qubits))
+        return body[::-1] + terminal[::-1]
+
+    # ----- исполнение -----
+
+    def terminal(self):
+        """Начало хвоста конечных измерений в ops"""
+        tail = len(self.ops)
+        while tail > 0 and self.ops[tail - 1][0] in ('measure', 'measure_all'):
+            tail -= 1
+        return tail
+
+    def register(self, ops):
+        """Кубиты классического регистра по порядку измерений; вентили в ops пропускаются"""
+        out = []
+        for op in ops:
+            if op[0] == 'measure_all':
+                out.extend(range(self.qubits))
+            elif op[0] == 'measure':
+                out.append(op[1])
+        return out
+
+    @staticmethod
+    def execute(state, op, rng):
+        """Одна операция; для измерений возвращает биты"""
+        kind = op[0]
+        if kind == 'u':
+            state.apply1(op[1], op[2])
+        elif kind == 'diag':
+            state.diagonal(op[1], op[2], op[3], op[4])
+        elif kind == 'gate':
+            state.apply(op[1], op[2], op[3])
+        elif kind == 'phase':
+            state.phase_flip(op[1])
+        elif kind == 'diffuse':
+            state.diffuse()
+        elif kind == 'measure':
+            return [state.measure(op[1], rng)]
+        elif kind == 'measure_all':
+            index = int(state.sample(1, rng)[0])
+            state.collapse(index)
+            return [(index >> (state.qubits - 1 - q)) & 1 for q in range(state.qubits)]
+        return []
+
+    def run(self, shots=0, seed=None, time_limit=None, memory_limit=MEMORY_LIMIT, dtype=None, top=16):
+        """
+        Исполнение схемы. Конечные измерения (после которых вентилей нет)
+        выбираются пачкой из итогового состояния; с измерениями посередине
+        хвост схемы от первого из них повторяется на каждый запуск. counts -
+        строки регистра (биты в порядке измерений) -> число запусков.
+        """
+        started = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        ops = self.ops
+        tail = self.terminal()
+        middle = next((i for i, op in enumerate(ops[:tail]) if op[0] in ('measure', 'measure_all')), tail)
+        repeated = middle < tail and shots > 0
+        state = Statevector(self.qubits, dtype=dtype, memory_limit=memory_limit, copies=2 if repeated else 1)
+
+        status = 'done'
+        for op in ops[:middle]:
+            if time_limit is not None and time.perf_counter() - started > time_limit:
+                status = 'time'
+                break
+            self.execute(state, op, rng)
+
+        register = self.register(ops[middle:])
+        counts = {}
+        runs = 0
+        if status == 'done' and shots > 0 and register:
+            if repeated:
+                prefix = state
+                for _ in range(shots):
+                    if time_limit is not None and time.perf_counter() - started > time_limit:
+                        status = 'time'
+                        break
+                    state = prefix.copy()
+                    bits = []
+                    for op in ops[middle:]:
+                        bits.extend(self.execute(state, op, rng))
+                    key = ''.join(map(str, bits))
+                    counts[key] = counts.get(key, 0) + 1
+                    runs += 1
+            else:
+                indices = state.sample(shots, rng)
+                shifts = np.array([self.qubits - 1 - q for q in register], dtype=np.int64)
+                bits = (indices[:, None] >> shifts[None, :]) & 1
+                keys, numbers = np.unique(bits, axis=0, return_counts=True)
+                counts = {''.join(map(str, k)): int(c) for k, c in zip(keys.tolist(), numbers.tolist())}
+                runs = shots
+
+        result = {
+            "status": status,
+            "qubits": self.qubits,
+            "dtype": state.dtype.name,
+            "memoryBytes": state.state.nbytes,
+            "gates": self.gates,
+            "ops": len(ops),
+            "shots": runs,
+            "register": register,
+            "counts": dict(sorted(counts.items(), key=lambda kv: -kv[1])[:COUNTS_LIMIT]),
+            "norm": state.norm(),
+            "amplitudes": [{"basis": format(i, f'0{self.qubits}b'), "re": a.real, "im": a.imag,
+                            "p": abs(a) ** 2} for i, a in state.top(top)],
+            "seconds": time.perf_counter() - started,
+        }
+        if self.qubits <= PROBABILITIES_QUBITS:
+            result["probabilities"] = (np.abs(state.state) ** 2).tolist()
+        return result, state
+
+
+# =============================================================================
+# СХЕМЫ ЛАБЫ
+# =============================================================================
+
+def grover_circuit(n=2, marked=('11',)):
+    """Как buildGroverCircuit: H^n, k итераций оракула и диффузора, измерение"""
+    layers = [[{"type": "H", "targets": [q]} for q in range(n)]]
+    k = max(1, int(math.pi / 4 * math.sqrt((1 << n) / len(marked))))
+    indices = [int(m, 2) for m in marked]
+    for _ in range(k):
+        layers.append([{"type": "U_FULL", "marked": indices}])
+        layers.append([{"type": "DIFFUSER"}])
+    layers.append([{"type": "MEASURE-ALL"}])
+    return {"qubits": n, "layers": layers}
+
+
+def deutsch_circuit(kind='balanced'):
+    """Как buildDeutschCircuit: |01>, H на оба, оракул, H на q0, измерение q0"""
+    oracle = {
+        'balanced': [{"type": "CNOT", "control": 0, "targets": [1]}],
+        'constant-1': [{"type": "X", "targets": [1]}],
+        'constant-0': [],
+    }
+    if kind not in oracle:
+        raise ValueError(f"Неизвестный оракул Дойча: {kind}")
+    return {"qubits": 2, "layers": [
+        [{"type": "X", "targets": [1]}],
+        [{"type": "H", "targets": [0]}, {"type": "H", "targets": [1]}],
+        oracle[kind],
+        [{"type": "H", "targets": [0]}],
+        [{"type": "MEASURE", "targets": [0]}],
+    ]}
+
+
+def ghz_circuit(n):
+    layers = [[{"type": "H", "targets": [0]}]]
+    layers += [[{"type": "CNOT", "control": q, "targets": [q + 1]}] for q in range(n - 1)]
+    layers.append([{"type": "MEASURE-ALL"}])
+    return {"qubits": n, "layers": layers}
+
+
+def qft_circuit(n, initial=0):
+    """Квантовое преобразование Фурье базисного состояния initial"""
+    layers = [[{"type": "X", "targets": [q]} for q in range(n) if (initial >> (n - 1 - q)) & 1]]
+    for q in range(n):
+        layers.append([{"type": "H", "targets": [q]}])
+        for j in range(q + 1, n):
+            layers.append([{"type": "CP", "control": j, "targets": [q], "theta": math.pi / (1 << (j - q))}])
+    for q in range(n // 2):
+        layers.append([{"type": "SWAP", "targets": [q, n - 1 - q]}])
+    return {"qubits": n, "layers": layers}
+
+
+PRESETS = {
+    'h-on-zero': lambda: {"qubits": 1, "layers": [[{"type": "H", "targets": [0]}]]},
+    'bell': lambda: {"qubits": 2, "layers": [[{"type": "H", "targets": [0]}],
+                                             [{"type": "CNOT", "control": 0, "targets": [1]}]]},
+    'deutsch-balanced': lambda: deutsch_circuit('balanced'),
+    'deutsch-const0': lambda: deutsch_circuit('constant-0'),
+    'deutsch-const1': lambda: deutsch_circuit('constant-1'),
+    'grover-n4': lambda: grover_circuit(2, ['11']),
+}
@@ -0,0 +1,748 @@
+"""
+Вычислитель рекурсивных функций Гёделя-Клини.
+
+Лаба godel_functions угадывает функцию по ключевым словам и считает её
+наивной рекурсией JS - Аккерман и всё, что строится через примитивную
+рекурсию, быстро упираются в глубину стека. Здесь определения честно
+разбираются в дерево и компилируются в байткод небольшой стековой машины:
+
+- операторная форма: базисные Z (нуль), S (следование), I(m,n) (проекция),
+  C(k) (константа) и операторы суперпозиции f(g1, ..., gk), примитивной
+  рекурсии R(f, g) и минимизации M(f) (или μ(f)). Рекурсия - по
+  последнему аргументу, как в primitiveRecursion лабы:
+  h(x.., 0) = f(x..), h(x.., y+1) = g(x.., y, h(x.., y)); M(f)(x..) -
+  наименьшее y с f(x.., y) = 0. R и M превращаются в циклы внутри кадра,
+  а не в цепочку вызовов;
+- уравнения Эрбрана-Гёделя для общерекурсивных функций:
+  ack(m+1, n+1) = ack(m, ack(m+1, n)). Образцы - числа, переменные и x+k,
+  в правой части - вызовы, +, * и - (усечённое вычитание). Уравнения
+  пробуются по порядку.
+
+Вызовы функций не используют стек Python: машина держит свой список
+кадров, поэтому глубина ограничена только бюджетом. У каждой именованной
+функции есть таблица мемоизации по кортежу аргументов, ограниченная
+memo_limit записями: при переполнении выбрасываются самые старые.
+
+Гёделевы номера - произведения степеней простых с большими целыми:
+последовательность (a1, .., ak) -> p1^(a1+1) ... pk^(ak+1), текст
+определения - посимвольно по алфавиту GODEL_ALPHABET. Таблица простых
+растёт решетом и кешируется на уровне модуля.
+"""
+
+import math
+import re
+import time
+
+
+MAX_STEPS = 50_000_000
+MAX_DEPTH = 1_000_000
+MEMO_LIMIT = 100_000
+BASIS = ('Z', 'S', 'I', 'C', 'R', 'M')
+
+# Библиотека примеров: операторная форма и уравнения вперемешку
+LIBRARY = """
+# Примитивно рекурсивные функции в операторной форме
+add = R(I(1,1), S(I(3,3)))
+mult = R(Z, add(I(3,3), I(1,3)))
+pred = R(Z, I(1,2))
+monus = R(I(1,1), pred(I(3,3)))
+sg = R(Z, C(1))
+nsg = R(C(1), Z)
+fact = R(C(1), mult(S(I(1,2)), I(2,2)))
+# remr(y, x) = x mod y; ndiv(n, k) - число делителей n среди 1..k
+remr = R(Z, mult(S(I(3,3)), sg(monus(I(1,3), S(I(3,3))))))
+ndiv = R(Z, add(I(3,3), nsg(remr(S(I(2,3)), I(1,3)))))
+isprime = nsg(add(monus(ndiv(I(1,1), I(1,1)), C(2)), monus(C(2), ndiv(I(1,1), I(1,1)))))
+primepi = R(Z, add(I(2,2), isprime(S(I(1,2)))))
+# μ-рекурсия: целый квадратный корень
+isqrt = M(monus(S(I(1,2)), mult(S(I(2,2)), S(I(2,2)))))
+# Общерекурсивные функции уравнениями
+ack(0, n) = n + 1
+ack(m+1, 0) = ack(m, 1)
+ack(m+1, n+1) = ack(m, ack(m+1, n))
+fib(0) = 0
+fib(1) = 1
+fib(n+2) = fib(n+1) + fib(n)
+branch(0, y) = 1
+branch(x, 0) = 1
+branch(x+1, y+1) = branch(x, y+1) + branch(x+1, y)
+"""
+
+
+class LimitExceeded(ValueError):
+    """Вычисление упёрлось в бюджет шагов, глубины или времени"""
+
+
+# =============================================================================
+# РАЗБОР
+# =============================================================================
+
+TOKEN_SPEC = re.compile(r"""
+    (?P<WHITESPACE>[ \t]+)
+  | (?P<NUMBER>\d+)
+  | (?P<OP>[+*\-=∸])
+  | (?P<LPAREN>\()
+  | (?P<RPAREN>\))
+  | (?P<COMMA>,)
+  | (?P<IDENT>[A-Za-z_μ][A-Za-z0-9_']*)
+""", re.VERBOSE)
+
+
+def tokenize(text):
+    """Список пар (тип, значение) одной строки определения"""
+    tokens, pos = [], 0
+    while pos < len(text):
+        match = TOKEN_SPEC.match(text, pos)
+        if not match:
+            raise ValueError(f"Неожиданный символ: {text[pos]}")
+        kind = match.lastgroup
+        if kind != 'WHITESPACE':
+            value = match.group()
+            tokens.append((kind, 'M' if value == 'μ' else '-' if value == '∸' else value))
+        pos = match.end()
+    tokens.append(('EOF', None))
+    return tokens
+
+
+class Parser:
+    """
+    Рекурсивный спуск по строке определения. Узлы - кортежи.
+    Операторная форма: ('zero',), ('succ',), ('proj', m, n), ('const', k),
+    ('name', f), ('compose', f, [g..]), ('rec', f, g), ('mu', f).
+    Уравнения: образцы ('num', k), ('var', v), ('plus', v, k); термы
+    ('num', k), ('var', v), ('call', f, [t..]), ('+' | '*' | '-', l, r).
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos]
+
+    def consume(self, kind, value=None):
+        token = self.peek()
+        if token[0] == 'EOF':
+            raise ValueError("Неожиданный конец определения")
+        if token[0] != kind or (value is not None and token[1] != value):
+            raise ValueError(f"Ожидалось {value or kind}, найдено {token[1] or token[0]}")
+        self.pos += 1
+        return token
+
+    def number(self):
+        return int(self.consume('NUMBER')[1])
+
+    def parse(self):
+        """(имя, 'op', узел) или (имя, 'eq', (образцы, терм))"""
+        name = self.consume('IDENT')[1]
+        if name in BASIS:
+            raise ValueError(f"Имя {name} зарезервировано за базисом")
+        if self.peek() == ('OP', '='):
+            self.pos += 1
+            result = (name, 'op', self.parse_function())
+        else:
+            self.consume('LPAREN')
+            patterns = [self.parse_pattern()]
+            while self.peek()[0] == 'COMMA':
+                self.pos += 1
+                patterns.append(self.parse_pattern())
+            self.consume('RPAREN')
+            self.consume('OP', '=')
+            result = (name, 'eq', (patterns, self.parse_sum()))
+        if self.peek()[0] != 'EOF':
+            raise ValueError("Лишние токены после определения")
+        return result
+
+    # ----- операторная форма -----
+
+    def parse_function(self):
+        name = self.consume('IDENT')[1]
+        if name == 'Z':
+            node = ('zero',)
+        elif name == 'S':
+            node = ('succ',)
+        elif name == 'I':
+            self.consume('LPAREN')
+            m = self.number()
+            self.consume('COMMA')
+            n = self.number()
+            self.consume('RPAREN')
+            if not 1 <= m <= n:
+                raise ValueError(f"Неверный индекс проекции I({m},{n})")
+            node = ('proj', m, n)
+        elif name == 'C':
+            self.consume('LPAREN')
+            node = ('const', self.number())
+            self.consume('RPAREN')
+        elif name in ('R', 'M'):
+            self.consume('LPAREN')
+            f = self.parse_function()
+            if name == 'M':
+                self.consume('RPAREN')
+                return ('mu', f)
+            self.consume('COMMA')
+            g = self.parse_function()
+            self.consume('RPAREN')
+            return ('rec', f, g)
+        else:
+            node = ('name', name)
+        # Суперпозиция: f(g1, ..., gk)
+        while self.peek()[0] == 'LPAREN':
+            self.pos += 1
+            inner = [self.parse_function()]
+            while self.peek()[0] == 'COMMA':
+                self.pos += 1
+                inner.append(self.parse_function())
+            self.consume('RPAREN')
+            node = ('compose', node, inner)
+        return node
+
+    # ----- уравнения -----
+
+    def parse_pattern(self):
+        kind, value = self.peek()
+        if kind == 'NUMBER':
+            return ('num', self.number())
+        name = self.consume('IDENT')[1]
+        if self.peek() == ('OP', '+'):
+            self.pos += 1
+            return ('plus', name, self.number())
+        return ('var', name)
+
+    def parse_sum(self):
+        node = self.parse_product()
+        while self.peek() in (('OP', '+'), ('OP', '-')):
+            op = self.consume('OP')[1]
+            node = (op, node, self.parse_product())
+        return node
+
+    def parse_product(self):
+        node = self.parse_atom()
+        while self.peek() == ('OP', '*'):
+            self.pos += 1
+            node = ('*', node, self.parse_atom())
+        return node
+
+    def parse_atom(self):
+        kind, value = self.peek()
+        if kind == 'NUMBER':
+            return ('num', self.number())
+        if kind == 'LPAREN':
+            self.pos += 1
+            node = self.parse_sum()
+            self.consume('RPAREN')
+            return node
+        name = self.consume('IDENT')[1]
+        if self.peek()[0] != 'LPAREN':
+            return ('var', name)
+        self.pos += 1
+        args = []
+        if self.peek()[0] != 'RPAREN':
+            args.append(self.parse_sum())
+            while self.peek()[0] == 'COMMA':
+                self.pos += 1
+                args.append(self.parse_sum())
+        self.consume('RPAREN')
+        return ('call', name, args)
+
+
+def parse_program(text):
+    """{имя: ('op', узел) | ('eq', [(образцы, терм), ...])} в порядке текста"""
+    definitions = {}
+    for number, raw in enumerate(text.split('\n'), 1):
+        line = raw.split('#', 1)[0].strip()
+        if not line:
+            continue
+        try:
+            name, kind, body = Parser(tokenize(line)).parse()
+        except ValueError as e:
+            raise ValueError(f"Строка {number}: {e}") from None
+        if kind == 'eq' and definitions.get(name, ('eq',))[0] == 'eq':
+            definitions.setdefault(name, ('eq', []))[1].append(body)
+        elif name in definitions:
+            raise ValueError(f"Строка {number}: повторное определение {name}")
+        else:
+            definitions[name] = (kind, body)
+    return definitions
+
+
+# =============================================================================
+# КОМПИЛЯЦИЯ
+# =============================================================================
+
+(CONST, LOAD, STORE, ADD, MUL, MONUS, SUCC, CALL,
+ JUMP, JGE, JLT, JNE, JZ, RET, FAIL) = range(15)
+
+
+class Function:
+    """Скомпилированная функция: code - список (op, a, b), slots - число ячеек кадра"""
+
+    def __init__(self, name, arity):
+        self.name = name
+        self.arity = arity
+        self.code = []
+        self.slots = arity
+        self.memo = {}
+
+    def emit(self, op, a=0, b=0):
+        self.code.append([op, a, b])
+        return len(self.code) - 1
+
+    def slot(self):
+        self.slots += 1
+        return self.slots - 1
+
+
+class Compiler:
+    """Определения -> функции с байткодом; арности выводятся по дереву"""
+
+    def __init__(self, definitions):
+        self.definitions = definitions
+        self.arities = {}
+        self.index = {name: i for i, name in enumerate(definitions)}
+        self.functions = []
+
+    def compile(self):
+        for name in self.definitions:
+            self.arity_of(name, ())
+        for name, (kind, body) in self.definitions.items():
+            function = Function(name, self.arities[name])
+            if kind == 'op':
+                self.body(function, body, list(range(function.arity)))
+                function.emit(RET)
+            else:
+                self.equations(function, body)
+            self.functions.append(function)
+        return self.functions
+
+    # ----- арности -----
+
+    def arity_of(self, name, chain):
+        if name in self.arities:
+            return self.arities[name]
+        if name not in self.definitions:
+            raise ValueError(f"Неизвестная функция {name}")
+        if name in chain:
+            raise ValueError(f"Циклическое определение {name}: рекурсия возможна только в уравнениях")
+        kind, body = self.definitions[name]
+        if kind == 'eq':
+            sizes = {len(patterns) for patterns, _ in body}
+            if len(sizes) != 1:
+                raise ValueError(f"Уравнения {name} с разным числом аргументов")
+            arity = sizes.pop()
+        else:
+            # Функция из одних Z и C без аргументов - константа арности 0
+            arity = self.node_arity(body, chain + (name,)) or 0
+        self.arities[name] = arity
+        return arity
+
+    def node_arity(self, node, chain, expected=None):
+        """Арность узла; None - любая (Z, C). expected - требуемая извне"""
+        kind = node[0]
+        if kind in ('zero', 'const'):
+            arity = None
+        elif kind == 'succ':
+            arity = 1
+        elif kind == 'proj':
+            arity = node[2]
+        elif kind == 'name':
+            arity = self.arity_of(node[1], chain)
+        elif kind == 'compose':
+            inner = {self.node_arity(g, chain, expected) for g in node[2]} - {None}
+            if len(inner) > 1:
+                raise ValueError("Аргументы суперпозиции разной арности")
+            outer = self.node_arity(node[1], chain, len(node[2]))
+            if outer is not None and outer != len(node[2]):
+                raise ValueError(f"Суперпозиция: функции арности {outer} передано {len(node[2])} аргументов")
+            arity = inner.pop() if inner else None
+        elif kind == 'rec':
+            f = self.node_arity(node[1], chain, None if expected is None else expected - 1)
+            g = self.node_arity(node[2], chain, None if expected is None else expected + 1)
+            if f is not None and g is not None and g != f + 2:
+                raise ValueError(f"R(f, g): арность g должна быть {f + 2}, а не {g}")
+            # R(Z, C(k)) и подобные без подсказки - наименьшая арность 1
+            arity = f + 1 if f is not None else g - 1 if g is not None else expected or 1
+        else:
+            f = self.node_arity(node[1], chain, None if expected is None else expected + 1)
+            arity = None if f is None else f - 1
+        if arity is None:
+            arity = expected
+        if arity is not None and expected is not None and arity != expected:
+            raise ValueError(f"Ожидалась функция арности {expected}, а не {arity}")
+        if arity is not None and arity < 0:
+            raise ValueError("Отрицательная арность")
+        return arity
+
+    # ----- операторная форма -----
+
+    def body(self, function, node, argv):
+        """Код, кладущий на стек node(ячейки argv)"""
+        emit = function.emit
+        kind = node[0]
+        if kind == 'zero':
+            emit(CONST, 0)
+        elif kind == 'const':
+            emit(CONST, node[1])
+        elif kind == 'succ':
+            emit(LOAD, argv[0])
+            emit(SUCC)
+        elif kind == 'proj':
+            emit(LOAD, argv[node[1] - 1])
+        elif kind == 'name':
+            for slot in argv:
+                emit(LOAD, slot)
+            emit(CALL, self.index[node[1]], len(argv))
+        elif kind == 'compose':
+            for g in node[2]:
+                self.body(function, g, argv)
+            self.apply(function, node[1], len(node[2]))
+        elif kind == 'rec':
+            # h(x.., y): acc = f(x..); for i in range(y): acc = g(x.., i, acc)
+            xs, y = argv[:-1], argv[-1]
+            acc, i = function.slot(), function.slot()
+            self.body(function, node[1], xs)
+            emit(STORE, acc)
+            emit(CONST, 0)
+            emit(STORE, i)
+            top = emit(LOAD, i)
+            emit(LOAD, y)
+            exit_jump = emit(JGE)
+            self.body(function, node[2], xs + [i, acc])
+            emit(STORE, acc)
+            emit(LOAD, i)
+            emit(SUCC)
+            emit(STORE, i)
+            emit(JUMP, top)
+            function.code[exit_jump][1] = len(function.code)
+            emit(LOAD, acc)
+        else:
+            # μy: f(x.., y) = 0
+            y = function.slot()
+            emit(CONST, 0)
+            emit(STORE, y)
+            top = len(function.code)
+            self.body(function, node[1], argv + [y])
+            exit_jump = emit(JZ)
+            emit(LOAD, y)
+            emit(SUCC)
+            emit(STORE, y)
+            emit(JUMP, top)
+            function.code[exit_jump][1] = len(function.code)
+            emit(LOAD, y)
+
+    def apply(self, function, node, count):
+        """Код, применяющий node к count значениям на вершине стека"""
+        if node[0] == 'name':
+            function.emit(CALL, self.index[node[1]], count)
+            return
+        slots = [function.slot() for _ in range(count)]
+        for slot in reversed(slots):
+            function.emit(STORE, slot)
+        self.body(function, node, slots)
+
+    # ----- уравнения -----
+
+    def equations(self, function, cases):
+        emit = function.emit
+        for patterns, term in cases:
+            bound, checks = {}, []
+            for i, pattern in enumerate(patterns):
+                if pattern[0] == 'num':
+                    emit(LOAD, i)
+                    emit(CONST, pattern[1])
+                    checks.append(emit(JNE))
+                    continue
+                source = i
+                if pattern[0] == 'plus':
+                    emit(LOAD, i)
+                    emit(CONST, pattern[2])
+                    checks.append(emit(JLT))
+                    source = function.slot()
+                    emit(LOAD, i)
+                    emit(CONST, pattern[2])
+                    emit(MONUS)
+                    emit(STORE, source)
+                name = pattern[1]
+                if name in bound:
+                    # Повтор переменной в образце - проверка на равенство
+                    emit(LOAD, bound[name])
+                    emit(LOAD, source)
+                    checks.append(emit(JNE))
+                else:
+                    bound[name] = source
+            self.term(function, term, bound)
+            emit(RET)
+            for check in checks:
+                function.code[check][1] = len(function.code)
+        emit(FAIL)
+
+    def term(self, function, node, bound):
+        emit = function.emit
+        kind = node[0]
+        if kind == 'num':
+            emit(CONST, node[1])
+        elif kind == 'var':
+            if node[1] not in bound:
+                raise ValueError(f"{function.name}: переменная {node[1]} не связана образцом")
+            emit(LOAD, bound[node[1]])
+        elif kind == 'call':
+            name, args = node[1], node[2]
+            for arg in args:
+                self.term(function, arg, bound)
+            if name in ('S', 'Z') and len(args) == 1:
+                if name == 'S':
+                    emit(SUCC)
+                else:
+                    emit(STORE, function.slot())
+                    emit(CONST, 0)
+                return
+            if self.arity_of(name, ()) != len(args):
+                raise ValueError(f"{name} ожидает {self.arities[name]} аргументов, передано {len(args)}")
+            emit(CALL, self.index[name], len(args))
+        else:
+            self.term(function, node[1], bound)
+            self.term(function, node[2], bound)
+            emit({'+': ADD, '*': MUL, '-': MONUS}[kind])
+
+
+# =============================================================================
+# ИСПОЛНЕНИЕ
+# =============================================================================
+
+class Program:
+    """
+    Набор определений. library=True добавляет LIBRARY; определения из
+    текста перекрывают одноимённые библиотечные.
+    """
+
+    def __init__(self, text, library=False, memo_limit=MEMO_LIMIT):
+        definitions = parse_program(LIBRARY) if library else {}
+        for name, definition in parse_program(text).items():
+            definitions.pop(name, None)
+            definitions[name] = definition
+        self.text = text
+        self.functions = Compiler(definitions).compile()
+        self.index = {f.name: i for i, f in enumerate(self.functions)}
+        self.memo_limit = int(memo_limit)
+
+    def arity(self, name):
+        return self.functions[self._find(name)].arity
+
+    def _find(self, name):
+        if name not in self.index:
+            raise ValueError(f"Неизвестная функция {name}")
+        return self.index[name]
+
+    def clear(self):
+        for function in self.functions:
+            function.memo.clear()
+
+    def evaluate(self, name, args, max_steps=MAX_STEPS, max_depth=MAX_DEPTH, time_limit=None):
+        """
+        Значение name(args). status: done, steps, depth, time, undefined
+        (ни одно уравнение не подошло). Телеметрия: steps - инструкции
+        машины, calls, hits - попадания в таблицы, depth - наибольшая
+        глубина кадров.
+        """
+        function = self.functions[self._find(name)]
+        args = tuple(int(a) for a in args)
+        if len(args) != function.arity:
+            raise ValueError(f"{name} ожидает {function.arity} аргументов, передано {len(args)}")
+        if any(a < 0 for a in args):
+            raise ValueError("Аргументы - натуральные числа")
+        stats = {"steps": 0, "calls": 0, "hits": 0, "depth": 0}
+        started = time.perf_counter()
+        status, value, error = 'done', None, None
+        try:
+            value = self._run(function, args, stats, max_steps, max_depth, time_limit, started)
+        except LimitExceeded as e:
+            status, error = e.args[1], e.args[0]
+        except ArithmeticError as e:
+            status, error = 'undefined', str(e)
+        return dict(status=status, value=value, error=error,
+                    seconds=time.perf_counter() - started, **stats)
+
+    def _run(self, function, args, stats, max_steps, max_depth, time_limit, started):
+        functions, limit = self.functions, self.memo_limit
+        frames = []
+        code, key = function.code, args
+        slots = list(args) + [0] * (function.slots - len(args))
+        stack = []
+        pc = steps = calls = hits = depth = 0
+        # Бюджеты проверяются раз в 0xFFFF шагов и точно на max_steps
+        check = min(0xFFFF, max_steps)
+
+        try:
+            while True:
+                op, a, b = code[pc]
+                pc += 1
+                steps += 1
+                if op == LOAD:
+                    stack.append(slots[a])
+                elif op == CONST:
+                    stack.append(a)
+                elif op == STORE:
+                    slots[a] = stack.pop()
+                elif op == SUCC:
+                    stack[-1] += 1
+                elif op == JGE:
+                    y = stack.pop()
+                    if stack.pop() >= y:
+                        pc = a
+                elif op == JUMP:
+                    pc = a
+                elif op == CALL:
+                    callee_args = tuple(stack[-b:]) if b else ()
+                    if b:
+                        del stack[-b:]
+                    target = functions[a]
+                    cached = target.memo.get(callee_args)
+                    calls += 1
+                    if cached is not None:
+                        hits += 1
+                        stack.append(cached)
+                        continue
+                    if len(frames) >= max_depth:
+                        raise LimitExceeded(f"Глубина вызовов превысила {max_depth}", 'depth')
+                    frames.append((function, pc, slots, stack, key))
+                    depth = max(depth, len(frames))
+                    function, code, key = target, target.code, callee_args
+                    slots = list(callee_args) + [0] * (target.slots - b)
+                    stack = []
+                    pc = 0
+                elif op == RET:
+                    value = stack[-1]
+                    memo = function.memo
+                    # memo_limit=0 выключает мемоизацию
+                    if limit:
+                        if len(memo) >= limit:
+                            # Выбрасывается самая старая запись
+                            del memo[next(iter(memo))]
+                        memo[key] = value
+                    if not frames:
+                        return value
+                    function, pc, slots, stack, key = frames.pop()
+                    code = function.code
+                    stack.append(value)
+                elif op == ADD:
+                    y = stack.pop()
+                    stack[-1] += y
+                elif op == MUL:
+                    y = stack.pop()
+                    stack[-1] *= y
+                elif op == MONUS:
+                    y = stack.pop()
+                    stack[-1] = stack[-1] - y if stack[-1] > y else 0
+                elif op == JZ:
+                    if stack.pop() == 0:
+                        pc = a
+                elif op == JNE:
+                    y = stack.pop()
+                    if stack.pop() != y:
+                        pc = a
+                elif op == JLT:
+                    y = stack.pop()
+                    if stack.pop() < y:
+                        pc = a
+                elif op == FAIL:
+                    raise ArithmeticError(f"{function.name}({', '.join(map(str, key))}): "
+                                          f"ни одно уравнение не подходит")
+
+                if steps >= check:
+                    if steps >= max_steps:
+                        raise LimitExceeded(f"Превышен бюджет шагов ({max_steps})", 'steps')
+                    if time_limit is not None and time.perf_counter() - started > time_limit:
+                        raise LimitExceeded(f"Превышен лимит времени ({time_limit} с)", 'time')
+                    check = min(steps + 0xFFFF, max_steps)
+        finally:
+            stats.update(steps=steps, calls=calls, hits=hits, depth=depth)
+
+
+# =============================================================================
+# ГЁДЕЛЕВА НУМЕРАЦИЯ
+# =============================================================================
+
+GODEL_ALPHABET = " ()=,+-*0123456789" + "".join(map(chr, range(65, 91))) + "".join(map(chr, range(97, 123))) + "_'"
+
+_primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+
+
+def primes(count):
+    """Первые count простых; таблица растёт решетом и кешируется"""
+    global _primes
+    if count > len(_primes):
+        # p_n < n (ln n + ln ln n) при n >= 6
+        bound = max(30, int(count * (math.log(count) + math.log(math.log(count)))) + 1)
+        sieve = bytearray([1]) * (bound + 1)
+        sieve[:2] = b'\0\0'
+        for p in range(2, int(bound ** 0.5) + 1):
+            if sieve[p]:
+                sieve[p * p::p] = bytes(len(range(p * p, bound + 1, p)))
+        _primes = [i for i, flag in enumerate(sieve) if flag]
+    return _primes[:count]
+
+
+def valuation(number, p):
+    """Показатель p в number: деление на p^(2^j) от больших степеней к меньшим"""
+    if number % p:
+        return 0
+    powers = [p]
+    while number % (powers[-1] * powers[-1]) == 0:
+        powers.append(powers[-1] * powers[-1])
+    exponent = 0
+    for j in range(len(powers) - 1, -1, -1):
+        if number % powers[j] == 0:
+            number //= powers[j]
+            exponent += 1 << j
+    return exponent
+
+
+def encode(values, max_digits=None):
+    """
+    <a1, .., ak> = p1^(a1+1) ... pk^(ak+1): нули в хвосте не теряются.
+    max_digits - предел десятичной длины номера, проверяется до возведения
+    в степень
+    """
+    values = [int(a) for a in values]
+    if any(a < 0 for a in values):
+        raise ValueError("Кодируются натуральные числа")
+    ps = primes(len(values))
+    if max_digits is not None:
+        digits = sum((a + 1) * math.log10(p) for p, a in zip(ps, values))
+        if digits > max_digits:
+            raise ValueError(f"Номер длиннее {max_digits} цифр")
+    number = 1
+    for p, a in zip(ps, values):
+        number *= p ** (a + 1)
+    return number
+
+
+def decode(number):
+    """Последовательность по номеру encode"""
+    if number < 1:
+        raise ValueError("Гёделев номер - положительное число")
+    values, index = [], 0
+    while number > 1:
+        index += 1
+        p = primes(index)[-1]
+        exponent = valuation(number, p)
+        if exponent == 0:
+            raise ValueError("Число не является номером последовательности")
+        values.append(exponent - 1)
+        number //= p ** exponent
+    return values
+
+
+def godel_number(text):
+    """Номер текста определения: символ с кодом c на месте i даёт p_i^c"""
+    symbols = ' '.join(text.split())
+    codes = []
+    for c in symbols:
+        if c not in GODEL_ALPHABET:
+            raise ValueError(f"Символ '{c}' вне алфавита нумерации")
+        codes.append(GODEL_ALPHABET.index(c))
+    return encode(codes)
+
+
+def godel_text(number):
+    return ''.join(GODEL_ALPHABET[c] for c in decode(number))
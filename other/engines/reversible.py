@@ -0,0 +1,197 @@
+"""
+Обратимые клеточные автоматы с окрестностью Марголуса.
+
+Аналог reversible_ca/engine.js: поле делится на блоки 2x2, на чётных шагах
+разбиение начинается с (0, 0), на нечётных - с (1, 1). Блок кодируется
+четырьмя битами a | b << 1 | c << 2 | d << 3 (a, b - верхняя строка,
+c, d - нижняя) и заменяется по перестановке map16.
+
+Всё поле обновляется за один проход на фазу через reshape и таблицы
+упаковки/распаковки, обратный шаг применяет обратную перестановку.
+Периодические контрольные точки позволяют быстро перематывать прогон
+в любую сторону.
+"""
+
+import numpy as np
+
+
+# =============================================================================
+# ПРАВИЛА
+# =============================================================================
+
+def _rotate180(code):
+    a, b, c, d = code & 1, (code >> 1) & 1, (code >> 2) & 1, (code >> 3) & 1
+    return d | (c << 1) | (b << 2) | (a << 3)
+
+
+def build_critters():
+    """Правило Critters (как buildCritters в engine.js)"""
+    rule = []
+    for code in range(16):
+        ones = bin(code).count('1')
+        out = code
+        if ones != 2:
+            out = ~out & 0b1111
+        if ones == 3:
+            out = _rotate180(out)
+        rule.append(out)
+    return rule
+
+
+def build_billiard_ball():
+    """
+    Правило бильярдных шаров (BBM): одиночный шар проходит блок по
+    диагонали, два шара на диагонали разлетаются по другой диагонали.
+    """
+    rule = list(range(16))
+    for a, b in ((0b0001, 0b1000), (0b0010, 0b0100), (0b1001, 0b0110)):
+        rule[a], rule[b] = b, a
+    return rule
+
+
+IDENTITY = list(range(16))
+ROTATIONS = [0, 2, 8, 12, 1, 10, 9, 11, 4, 6, 5, 14, 3, 7, 13, 15]
+CRITTERS = build_critters()
+BILLIARD_BALL = build_billiard_ball()
+
+RULES = {
+    'identity': IDENTITY,
+    'rotations': ROTATIONS,
+    'critters': CRITTERS,
+    'billiard': BILLIARD_BALL,
+}
+
+# Распаковка кода блока в 2x2 клетки: UNPACK[code] = [[a, b], [c, d]]
+UNPACK = np.array(
+    [[[code & 1, (code >> 1) & 1], [(code >> 2) & 1, (code >> 3) & 1]] for code in range(16)],
+    dtype=np.uint8,
+)
+
+
+def validate_rule(map16):
+    """Проверяет, что правило - перестановка 0..15, и возвращает её и обратную"""
+    if isinstance(map16, str):
+        if map16 not in RULES:
+            raise ValueError(f"Неизвестное правило: {map16}")
+        map16 = RULES[map16]
+    table = np.asarray(map16, dtype=np.uint8)
+    if table.shape != (16,) or sorted(table.tolist()) != IDENTITY:
+        raise ValueError("Нужна перестановка 0..15, все значения уникальны")
+    inverse = np.empty(16, dtype=np.uint8)
+    inverse[table] = np.arange(16, dtype=np.uint8)
+    return table, inverse
+
+
+# =============================================================================
+# ДВИЖОК
+# =============================================================================
+
+def apply_blocks(field, table, partition):
+    """
+    Применяет таблицу ко всем блокам разбиения partition (0 или 1).
+
+    Поле тороидальное, размеры чётные. Возвращает новый массив.
+    """
+    if partition:
+        field = np.roll(field, (-1, -1), axis=(0, 1))
+    h, w = field.shape
+    blocks = field.reshape(h // 2, 2, w // 2, 2)
+    codes = (blocks[:, 0, :, 0]
+             | (blocks[:, 0, :, 1] << 1)
+             | (blocks[:, 1, :, 0] << 2)
+             | (blocks[:, 1, :, 1] << 3))
+    out = UNPACK[table[codes]].transpose(0, 2, 1, 3).reshape(h, w)
+    if partition:
+        out = np.roll(out, (1, 1), axis=(0, 1))
+    return out
+
+
+class MargolusEngine:
+    """
+    Обратимый автомат Марголуса с перемоткой по контрольным точкам.
+
+    Время t может уходить и в отрицательную сторону: правило обратимо,
+    поэтому прошлое начального поля тоже определено. Контрольная точка
+    сохраняется каждые checkpoint_interval шагов в упакованном виде; если
+    их становится больше max_checkpoints, каждая вторая отбрасывается,
+    а интервал удваивается.
+    """
+
+    def __init__(self, field, rule='critters', checkpoint_interval=1024, max_checkpoints=4096):
+        self.table, self.inverse = validate_rule(rule)
+        self.checkpoint_interval = int(checkpoint_interval)
+        self.max_checkpoints = int(max_checkpoints)
+        self.reset(field)
+
+    # ----- состояние -----
+
+    def reset(self, field):
+        """Задаёт новое поле и сбрасывает время и контрольные точки"""
+        field = np.asarray(field, dtype=np.uint8) & 1
+        h, w = field.shape
+        # Как Grid.resize в engine.js: нечётные размеры усекаются
+        self.field = np.ascontiguousarray(field[:h - h % 2, :w - w % 2])
+        self.t = 0
+        self.checkpoints = {}
+        self._save_checkpoint()
+
+    def set_rule(self, rule):
+        """Меняет правило; прежняя история становится недействительной"""
+        self.table, self.inverse = validate_rule(rule)
+        self.reset(self.field)
+
+    @property
+    def partition(self):
+        return self.t % 2
+
+    def _save_checkpoint(self):
+        self.checkpoints[self.t] = np.packbits(self.field)
+        if len(self.checkpoints) > self.max_checkpoints:
+            self.checkpoint_interval *= 2
+            self.checkpoints = {
+                t: data for t, data in self.checkpoints.items()
+                if t % self.checkpoint_interval == 0
+            }
+
+    def _load_checkpoint(self, t):
+        data = self.checkpoints[t]
+        self.field = np.unpackbits(data, count=self.field.size).reshape(self.field.shape)
+        self.t = t
+
+    # ----- шаги -----
+
+    def step_forward(self, steps=1):
+        for _ in range(steps):
+            self.field = apply_blocks(self.field, self.table, self.partition)
+            self.t += 1
+            if self.t % self.checkpoint_interval == 0 and self.t not in self.checkpoints:
+                self._save_checkpoint()
+        return self.field
+
+    def step_backward(self, steps=1):
+        for _ in range(steps):
+            self.t -= 1
+            self.field = apply_blocks(self.field, self.inverse, self.partition)
+            if self.t % self.checkpoint_interval == 0 and self.t not in self.checkpoints:
+                self._save_checkpoint()
+        return self.field
+
+    def seek(self, t):
+        """Переходит к моменту t от ближайшей известной точки"""
+        candidates = list(self.checkpoints) + [self.t]
+        start = min(candidates, key=lambda c: abs(c - t))
+        if start != self.t:
+            self._load_checkpoint(start)
+        if t > self.t:
+            self.step_forward(t - self.t)
+        elif t < self.t:
+            self.step_backward(self.t - t)
+        return self.field
+
+    # ----- метрики (как Grid в engine.js) -----
+
+    def density(self):
+        return float(self.field.mean())
+
+    def hamming(self, other):
+        return int(np.count_nonzero(self.field != np.asarray(other)))
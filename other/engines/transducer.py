@@ -0,0 +1,544 @@
+"""
+Автоматы с выходом (Мили и Мура) на таблицах переходов.
+
+Автомат компилируется в две плотные таблицы (n, k): table[q, a] -
+следующее состояние (-1 - перехода нет), emit[q, a] - номер выходного
+символа. У автомата Мура emit получается из выходов состояний:
+emit[q, a] = output[table[q, a]], поэтому прогон у обоих один.
+
+Прогон потоковый: Runner принимает вход кусками (строками или списками
+символов), хранит только текущее состояние и возвращает выход куска,
+так что сигнал любой длины - генератор или файл - обрабатывается в
+постоянной памяти. Кусок кодируется в номера столбцов одной выборкой
+NumPy, а сам проход по кодам идёт по плоским спискам table/emit.
+
+Преобразования:
+
+- Мур -> Мили: выход перехода - выход состояния, куда он ведёт;
+- Мили -> Мур: состояния - пары (q, выход), достижимые из начального;
+- минимизация обоих - алгоритм Хопкрофта из automata.py, где начальное
+  разбиение задаётся выходами (строка emit у Мили, выход состояния у Мура).
+
+Форматы - как в лабах finite_automata: текст правил mealy_machine
+("state,input -> nextState,output", разбор повторяет automatonParser.js)
+и JSON moore_machine (пресеты {states: [{name, output, isInitial}],
+transitions: [{from, to, input}]} и сохранение с fromId/toId).
+"""
+
+import math
+import re
+from itertools import islice
+
+import numpy as np
+
+from .automata import hopcroft
+
+
+CHUNK = 1 << 16
+# Разделители, которые пропускаются во входе, если не входят в алфавит
+SEPARATORS = ' \t\r\n,'
+
+
+def parse_mealy(text):
+    """
+    Разбор правил автомата Мили, как parseMealyAutomaton: результат
+    {ok, errors: [{line, message}], states, inputs, outputs, transitions}.
+    """
+    states, inputs, outputs = {}, {}, {}
+    transitions = {}
+    errors = []
+    for number, raw in enumerate(re.split(r'\r?\n', text or ''), start=1):
+        line = raw.strip()
+        if not line:
+            continue
+        parts = [s.strip() for s in line.split('->')]
+        if len(parts) != 2:
+            errors.append({'line': number, 'message': 'Ошибка синтаксиса: отсутствует стрелка "->"'})
+            continue
+        left = [s.strip() for s in parts[0].split(',')]
+        right = [s.strip() for s in parts[1].split(',')]
+        if len(left) != 2 or len(right) != 2:
+            errors.append({'line': number,
+                           'message': 'Ошибка формата: ожидается "state,input -> nextState,output"'})
+            continue
+        (state, symbol), (target, out) = left, right
+        if not (state and symbol and target and out):
+            errors.append({'line': number, 'message': 'Ошибка: некоторые элементы правила пусты'})
+            continue
+        # dict вместо Set из JS - порядок первых вхождений тот же
+        states.setdefault(state, None)
+        states.setdefault(target, None)
+        inputs.setdefault(symbol, None)
+        outputs.setdefault(out, None)
+        row = transitions.setdefault(state, {})
+        if symbol in row:
+            errors.append({'line': number, 'message': f'Ошибка: переход {state},{symbol} уже определён'})
+            continue
+        row[symbol] = {'to': target, 'out': out, 'raw': line}
+    return {
+        'ok': not errors,
+        'errors': errors,
+        'states': list(states),
+        'inputs': list(inputs),
+        'outputs': list(outputs),
+        'transitions': transitions,
+    }
+
+
+# =============================================================================
+# АВТОМАТ МИЛИ
+# =============================================================================
+
+class MealyMachine:
+    """
+    Автомат Мили: table и emit (n, k), start, inputs - входной алфавит в
+    порядке столбцов, outputs - выходной алфавит, names - имена состояний.
+    """
+
+    def __init__(self, table, emit, start, inputs, outputs, names=None):
+        self.inputs = [str(a) for a in inputs]
+        self.outputs = [str(b) for b in outputs]
+        self.table = np.asarray(table, dtype=np.int32).reshape(-1, len(self.inputs))
+        self.emit = np.asarray(emit, dtype=np.int32).reshape(self.table.shape)
+        self.start = int(start)
+        self.names = [str(i) for i in range(self.n)] if names is None else [str(s) for s in names]
+        _check(self)
+        if ((self.table >= 0) != (self.emit >= 0)).any() or self.emit.max(initial=-1) >= len(self.outputs):
+            raise ValueError("Выходы переходов не согласованы с таблицей переходов")
+
+    @property
+    def n(self):
+        return self.table.shape[0]
+
+    # ----- текст и JSON -----
+
+    @classmethod
+    def from_parsed(cls, parsed, start=None):
+        """Автомат из результата parse_mealy; по умолчанию начальное - первое состояние"""
+        if parsed.get('errors'):
+            first = parsed['errors'][0]
+            raise ValueError(f"Строка {first['line']}: {first['message']}")
+        names = [str(s) for s in parsed.get('states') or []]
+        inputs = [str(a) for a in parsed.get('inputs') or []]
+        outputs = [str(b) for b in parsed.get('outputs') or []]
+        if not names:
+            raise ValueError("Автомат не содержит состояний")
+        index = {name: i for i, name in enumerate(names)}
+        column = {a: j for j, a in enumerate(inputs)}
+        out_index = {b: j for j, b in enumerate(outputs)}
+        table = np.full((len(names), len(inputs)), -1, dtype=np.int32)
+        emit = np.full_like(table, -1)
+        for q, row in (parsed.get('transitions') or {}).items():
+            for a, t in row.items():
+                if str(q) not in index or str(t['to']) not in index:
+                    raise ValueError(f"Переход {q},{a} ссылается на неизвестное состояние")
+                if str(a) not in column or str(t['out']) not in out_index:
+                    raise ValueError(f"Символ перехода {q},{a} не входит в алфавит")
+                table[index[str(q)], column[str(a)]] = index[str(t['to'])]
+                emit[index[str(q)], column[str(a)]] = out_index[str(t['out'])]
+        start = names[0] if start in (None, '') else str(start)
+        if start not in index:
+            raise ValueError(f"Начальное состояние {start} не найдено")
+        return cls(table, emit, index[start], inputs, outputs, names)
+
+    @classmethod
+    def from_text(cls, text, start=None):
+        return cls.from_parsed(parse_mealy(text), start)
+
+    @classmethod
+    def from_json(cls, data):
+        """Автомат из разобранного вида {states, inputs, outputs, transitions} или из {rules | text, start}"""
+        if isinstance(data, str):
+            return cls.from_text(data)
+        start = data.get('start', data.get('startState'))
+        if 'transitions' in data:
+            return cls.from_parsed(data, start)
+        return cls.from_text(data.get('rules', data.get('text', '')), start)
+
+    def to_text(self):
+        lines = []
+        for q, (row, out) in enumerate(zip(self.table.tolist(), self.emit.tolist())):
+            for a, p, b in zip(self.inputs, row, out):
+                if p >= 0:
+                    lines.append(f"{self.names[q]},{a} -> {self.names[p]},{self.outputs[b]}")
+        return '\n'.join(lines)
+
+    def to_json(self):
+        """Разобранный вид, как у parseMealyAutomaton, плюс начальное состояние и текст правил"""
+        transitions = {}
+        for q, (row, out) in enumerate(zip(self.table.tolist(), self.emit.tolist())):
+            cells = {a: {'to': self.names[p], 'out': self.outputs[b]}
+                     for a, p, b in zip(self.inputs, row, out) if p >= 0}
+            if cells:
+                transitions[self.names[q]] = cells
+        return {
+            'states': list(self.names),
+            'inputs': list(self.inputs),
+            'outputs': list(self.outputs),
+            'transitions': transitions,
+            'start': self.names[self.start],
+            'rules': self.to_text(),
+        }
+
+    # ----- прогон -----
+
+    def initial_output(self):
+        """Выход до чтения входа: у Мили его нет"""
+        return []
+
+    def runner(self, state=None):
+        return Runner(self, state)
+
+    def run(self, symbols):
+        """Генератор выходных символов для любого итератора входных"""
+        yield from _run(self, symbols)
+
+    def transduce(self, word):
+        """Выход на всём слове (строке или списке символов) одним списком"""
+        return self.initial_output() + Runner(self).feed(word)
+
+    # ----- преобразования -----
+
+    def to_moore(self, initial_output=None):
+        """
+        Эквивалентный автомат Мура: состояние (q, b) - «пришли в q, выдав b».
+        Начальное состояние получает выход initial_output (по умолчанию
+        первый выходной символ); после каждого входного символа автомат Мура
+        выдаёт то же, что автомат Мили.
+        """
+        if not self.outputs:
+            raise ValueError("У автомата нет выходных символов")
+        init = 0 if initial_output is None else self.outputs.index(str(initial_output))
+        rows, emits = self.table.tolist(), self.emit.tolist()
+        ids = {(self.start, init): 0}
+        pairs = [(self.start, init)]
+        table = []
+        for q, _ in pairs:
+            row = []
+            for p, b in zip(rows[q], emits[q]):
+                if p < 0:
+                    row.append(-1)
+                    continue
+                j = ids.get((p, b))
+                if j is None:
+                    j = ids[(p, b)] = len(pairs)
+                    pairs.append((p, b))
+                row.append(j)
+            table.append(row)
+        names = [f"{self.names[q]}/{self.outputs[b]}" for q, b in pairs]
+        return MooreMachine(np.array(table, dtype=np.int32).reshape(len(pairs), len(self.inputs)),
+                            [b for _, b in pairs], 0, self.inputs, self.outputs, names)
+
+    def minimize(self):
+        """
+        Минимальный автомат Мили и классы: (machine, classes), classes[i] -
+        имена исходных состояний, слитых в состояние i. Недостижимые
+        состояния удаляются, отсутствующие переходы остаются отсутствующими.
+        """
+        # Начальная раскраска - строка выходов (-1 там, где перехода нет)
+        _, labels = np.unique(self.emit, axis=0, return_inverse=True)
+        table, rep, start, names, members = _quotient(self, labels.ravel())
+        return MealyMachine(table, self.emit[rep], start, self.inputs, self.outputs, names), members
+
+
+# =============================================================================
+# АВТОМАТ МУРА
+# =============================================================================
+
+class MooreMachine:
+    """
+    Автомат Мура: table (n, k), output[q] - номер выходного символа
+    состояния q, start, inputs, outputs, names.
+    """
+
+    def __init__(self, table, output, start, inputs, outputs, names=None):
+        self.inputs = [str(a) for a in inputs]
+        self.outputs = [str(b) for b in outputs]
+        self.output = np.asarray(output, dtype=np.int32).ravel()
+        self.table = np.asarray(table, dtype=np.int32).reshape(self.output.size, len(self.inputs))
+        self.start = int(start)
+        self.names = [str(i) for i in range(self.n)] if names is None else [str(s) for s in names]
+        _check(self)
+        if self.output.size and (self.output.min() < 0 or self.output.max() >= len(self.outputs)):
+            raise ValueError("Выход состояния не входит в выходной алфавит")
+
+    @property
+    def n(self):
+        return self.output.size
+
+    @property
+    def emit(self):
+        """Выходы переходов: выход состояния, в которое ведёт переход"""
+        return np.where(self.table >= 0, self.output[np.maximum(self.table, 0)], -1) \
+            if self.n else np.zeros(self.table.shape, dtype=np.int32)
+
+    # ----- JSON -----
+
+    @classmethod
+    def from_json(cls, data):
+        """Автомат из пресета или сохранения лабы moore_machine"""
+        raw_states = data.get('states') or []
+        if not raw_states:
+            raise ValueError("Автомат не содержит состояний")
+        names = [str(s.get('name', s.get('id'))) for s in raw_states]
+        if len(set(names)) != len(names):
+            raise ValueError("Имена состояний повторяются")
+        index = {name: i for i, name in enumerate(names)}
+        by_id = {str(s['id']): i for i, s in enumerate(raw_states) if 'id' in s}
+        outputs = {}
+        for s in raw_states:
+            outputs.setdefault(str(s.get('output', '')), None)
+        outputs = list(outputs)
+        out_index = {b: j for j, b in enumerate(outputs)}
+
+        edges = []
+        for t in data.get('transitions') or []:
+            if 'fromId' in t:
+                q, p = by_id.get(str(t['fromId'])), by_id.get(str(t['toId']))
+            else:
+                q, p = index.get(str(t.get('from'))), index.get(str(t.get('to')))
+            if q is None or p is None:
+                raise ValueError(f"Переход по входу {t.get('input')} ссылается на неизвестное состояние")
+            edges.append((q, str(t.get('input', '')), p))
+        inputs = list(dict.fromkeys(a for _, a, _ in edges))
+        column = {a: j for j, a in enumerate(inputs)}
+        table = np.full((len(names), len(inputs)), -1, dtype=np.int32)
+        for q, a, p in edges:
+            # Лаба берёт первый подходящий переход (transitions.find)
+            if table[q, column[a]] < 0:
+                table[q, column[a]] = p
+
+        starts = [i for i, s in enumerate(raw_states) if s.get('isInitial')]
+        start = data.get('start')
+        start = index[str(start)] if start is not None and str(start) in index else (starts[0] if starts else 0)
+        output = [out_index[str(s.get('output', ''))] for s in raw_states]
+        return cls(table, output, start, inputs, outputs, names)
+
+    def to_json(self):
+        """Формат сохранения moore_machine; состояния раскладываются по окружности"""
+        radius = max(120, 40 * self.n / math.pi)
+        states = []
+        for q in range(self.n):
+            angle = 2 * math.pi * q / max(self.n, 1)
+            states.append({
+                'x': round(400 + radius * math.cos(angle)), 'y': round(300 + radius * math.sin(angle)),
+                'id': q + 1, 'name': self.names[q], 'output': self.outputs[self.output[q]],
+                'isInitial': q == self.start,
+            })
+        transitions = []
+        for q, row in enumerate(self.table.tolist()):
+            for a, p in zip(self.inputs, row):
+                if p >= 0:
+                    transitions.append({'fromId': q + 1, 'toId': p + 1, 'input': a, 'id': len(transitions) + 1})
+        return {'states': states, 'transitions': transitions}
+
+    # ----- прогон -----
+
+    def initial_output(self):
+        """Выход начального состояния - первый символ выхода, как в runSimulation"""
+        return [self.outputs[self.output[self.start]]]
+
+    def runner(self, state=None):
+        return Runner(self, state)
+
+    def run(self, symbols):
+        """Генератор выходных символов: выход начального состояния, затем по символу на вход"""
+        yield from self.initial_output()
+        yield from _run(self, symbols)
+
+    def transduce(self, word):
+        return self.initial_output() + Runner(self).feed(word)
+
+    # ----- преобразования -----
+
+    def to_mealy(self):
+        """Эквивалентный автомат Мили (без выхода начального состояния)"""
+        return MealyMachine(self.table, self.emit, self.start, self.inputs, self.outputs, self.names)
+
+    def minimize(self):
+        """Минимальный автомат Мура и классы, как MealyMachine.minimize"""
+        table, rep, start, names, members = _quotient(self, self.output)
+        return MooreMachine(table, self.output[rep], start, self.inputs, self.outputs, names), members
+
+
+def _check(machine):
+    if len(machine.names) != machine.n:
+        raise ValueError("Число имён не совпадает с числом состояний")
+    if not 0 <= machine.start < machine.n:
+        raise ValueError("Начальное состояние вне автомата")
+    if machine.table.size and (machine.table.min() < -1 or machine.table.max() >= machine.n):
+        raise ValueError("Переход ведёт в несуществующее состояние")
+
+
+def _quotient(machine, labels):
+    """
+    Факторизация по классам Хопкрофта. Достижимые состояния дополняются
+    стоком с собственной меткой, классы нумеруются в порядке первых
+    вхождений, класс стока затем убирается. Возвращает (table, rep, start,
+    names, members): rep[i] - представитель класса i среди исходных состояний.
+    """
+    table = machine.table
+    seen = np.zeros(machine.n, dtype=bool)
+    seen[machine.start] = True
+    frontier = np.array([machine.start])
+    while frontier.size:
+        nxt = table[frontier].ravel()
+        nxt = np.unique(nxt[nxt >= 0])
+        frontier = nxt[~seen[nxt]]
+        seen[frontier] = True
+    keep = np.flatnonzero(seen)
+    remap = np.full(machine.n + 1, -1, dtype=np.int64)
+    remap[keep] = np.arange(keep.size)
+
+    m = keep.size
+    full = remap[table[keep]]
+    full = np.vstack([full, np.full((1, full.shape[1]), m, dtype=np.int64)])
+    full[full < 0] = m
+    labels = np.asarray(labels, dtype=np.int64)[keep]
+    labels = np.append(labels, labels.min(initial=0) - 1)
+
+    _, first, block = np.unique(hopcroft(full, labels), return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    relabel = np.empty_like(order)
+    relabel[order] = np.arange(order.size)
+    block, first = relabel[block.ravel()], first[order]
+    # Сток - последний по первому вхождению и всегда один в своём классе
+    first = first[:-1]
+    quotient = block[full[first]]
+    quotient[quotient == block[m]] = -1
+
+    members = [[] for _ in range(first.size)]
+    for q, b in zip(keep.tolist(), block[:m].tolist()):
+        members[b].append(machine.names[q])
+    # Запятая в имени сломала бы текст правил mealy_machine
+    names = [g[0] if len(g) == 1 else '{' + ';'.join(g) + '}' for g in members]
+    return quotient, keep[first], int(block[remap[machine.start]]), names, members
+
+
+# =============================================================================
+# ПОТОКОВЫЙ ПРОГОН
+# =============================================================================
+
+class Runner:
+    """
+    Прогон автомата с выходом по кускам входа.
+
+    feed(chunk) принимает строку (при односимвольном входном алфавите
+    каждый символ строки - входной символ, иначе символы разделяются
+    запятыми или пробелами, и незаконченный символ переносится в следующий
+    кусок) или список символов и возвращает список выходных символов.
+    state и steps - текущее состояние и число прочитанных символов.
+    """
+
+    def __init__(self, machine, state=None):
+        self.machine = machine
+        self.state = machine.start if state is None else int(state)
+        self.steps = 0
+        k = len(machine.inputs)
+        self.k = k
+        self.skip, self.unknown = k, k + 1
+        self.next = machine.table.ravel().tolist()
+        self.out = [machine.outputs[b] if b >= 0 else None for b in machine.emit.ravel().tolist()]
+        self.column = {a: j for j, a in enumerate(machine.inputs)}
+        self.single = all(len(a) == 1 for a in machine.inputs)
+        self._carry = ''
+        if self.single:
+            top = max([ord(a) for a in machine.inputs] + [ord(c) for c in SEPARATORS])
+            self.lookup = np.full(top + 1, self.unknown, dtype=np.int32)
+            for c in SEPARATORS:
+                self.lookup[ord(c)] = self.skip
+            for a, j in self.column.items():
+                self.lookup[ord(a)] = j
+
+    def encode(self, chunk):
+        """Кусок входа -> массив номеров столбцов (разделители отброшены)"""
+        if isinstance(chunk, str) and self.single:
+            points = np.frombuffer(chunk.encode('utf-32-le'), dtype=np.uint32)
+            codes = self.lookup[np.minimum(points, self.lookup.size - 1)]
+            codes[points >= self.lookup.size] = self.unknown
+        else:
+            if isinstance(chunk, str):
+                tokens = re.split(r'[\s,]+', self._carry + chunk)
+                self._carry = tokens.pop()
+                chunk = [t for t in tokens if t]
+            codes = np.fromiter((self.column.get(str(a), self.unknown) for a in chunk),
+                                dtype=np.int32, count=len(chunk))
+        bad = np.flatnonzero(codes == self.unknown)
+        if bad.size:
+            raise ValueError(f"Символ на позиции {self.steps + int(bad[0])} не входит во входной алфавит")
+        return codes[codes != self.skip]
+
+    def feed(self, chunk):
+        k, nxt, out = self.k, self.next, self.out
+        s = self.state
+        result = []
+        append = result.append
+        try:
+            for c in self.encode(chunk).tolist():
+                i = s * k + c
+                t = nxt[i]
+                if t < 0:
+                    raise ValueError(f"Нет перехода из состояния {self.machine.names[s]} "
+                                     f"по входу {self.machine.inputs[c]}")
+                append(out[i])
+                s = t
+        finally:
+            self.state = s
+            self.steps += len(result)
+        return result
+
+    def finish(self):
+        """Дочитывает символ, оставшийся от последнего куска"""
+        carry, self._carry = self._carry, ''
+        return self.feed([carry]) if carry else []
+
+
+def _run(machine, symbols):
+    """Вход из итератора читается пачками по CHUNK символов"""
+    runner = Runner(machine)
+    symbols = iter(symbols)
+    while True:
+        batch = list(islice(symbols, CHUNK))
+        if not batch:
+            return
+        yield from runner.feed(batch)
+
+
+def transduce_stream(machine, source, target=None, chunk_size=CHUNK, separator=None):
+    """
+    Прогон по файлу или итератору кусков в постоянной памяти.
+
+    source - текстовый файл (читается кусками chunk_size) или итератор
+    строк/списков символов. Если задан target, выход пишется в
+    target.write и возвращается Runner (итоговое состояние и число шагов),
+    иначе возвращается генератор строк выхода по куску. separator по
+    умолчанию пустой, если все выходные символы односимвольные, иначе ','.
+    """
+    if separator is None:
+        separator = '' if all(len(b) == 1 for b in machine.outputs) else ','
+    chunks = iter(lambda: source.read(chunk_size), '') if hasattr(source, 'read') else source
+    runner = Runner(machine)
+    pieces = _stream(machine, runner, chunks, separator)
+    if target is None:
+        return pieces
+    for piece in pieces:
+        target.write(piece)
+    return runner
+
+
+def _stream(machine, runner, chunks, separator):
+    def outputs():
+        yield machine.initial_output()
+        for chunk in chunks:
+            yield runner.feed(chunk)
+        yield runner.finish()
+
+    leading = True
+    for symbols in outputs():
+        if not symbols:
+            continue
+        text = separator.join(symbols)
+        if separator and not leading:
+            text = separator + text
+        leading = False
+        yield text
@@ -0,0 +1,407 @@
+"""
+Многоленточная машина Тьюринга на байтовых лентах.
+
+Лента - bytearray с началом offset: ячейка с логическим номером i лежит в
+cells[i + offset]. При выходе головки за край массив удваивается (влево -
+вставкой пустых байтов в начало и сдвигом offset), так что лента
+неограничена в обе стороны, а память растёт только по мере работы.
+Символы нумеруются байтами, пустой символ - 0.
+
+Переходы компилируются в плоскую таблицу: ключ конфигурации
+((s·S + c1)·S + c2)·S + ... (S - размер алфавита) указывает номер
+правила, а правило - это элементы списков next_state, write, move. Если
+таблица S^k·n слишком велика, вместо списка берётся словарь.
+
+Макрошаги. Правило «остаться в s, прочитав c, записать w и уйти в
+сторону d» применяется подряд, пока головка идёт по отрезку из c. Длина
+отрезка ищется на уровне NumPy, отрезок переписывается одним
+присваиванием среза, счётчик шагов растёт сразу на длину. Если такой
+отрезок - бесконечная пустая часть ленты на всех движущихся головках,
+машина заведомо не остановится (статус loop). Для «бобров» основная
+часть из десятков миллионов шагов - именно такие проходы.
+
+Бюджеты: max_steps - число шагов, max_memory - суммарный размер лент в
+байтах, time_limit - секунды; при исчерпании прогон останавливается со
+статусом steps/memory/time.
+
+Форматы: пример лабы multitape_tm ({tapeCount, states, initialState,
+finalStates, transitions: [{from, read, to, write, move}], initialTapes},
+пустой символ '_'), exportConfiguration лабы universal_tm ({alphabet,
+states, initialState, finalStates, transitions: [{currentState,
+readSymbol, newState, writeSymbol, direction}], tape}, пустой ' ') и
+стандартная запись «бобров» ("1RB1LB_1LA1RZ").
+"""
+
+import time
+
+import numpy as np
+
+
+TABLE_LIMIT = 1 << 22
+MAX_STEPS = 10_000_000
+MAX_MEMORY = 64 * 1024 * 1024
+MAX_TAPES = 16
+# Время проверяется раз в столько итераций цикла прогона
+TIME_CHECK = 1 << 16
+MOVES = {'L': -1, 'R': 1, 'S': 0, 'N': 0}
+# Стандартная запись: состояния A, B, ..., Z - останов
+HALT = 'Z'
+
+
+class Tape:
+    """Лента: cells (bytearray), offset - индекс логической ячейки 0, head - индекс в cells"""
+
+    def __init__(self, codes=(), head=0):
+        self.cells = bytearray(codes) or bytearray(1)
+        self.offset = 0
+        self.head = int(head)
+        self.ensure(self.head)
+
+    def ensure(self, index):
+        """Достраивает массив, чтобы индекс index был внутри; возвращает новый индекс"""
+        cells = self.cells
+        if index < 0:
+            grow = max(len(cells), -index)
+            cells[0:0] = bytes(grow)
+            self.offset += grow
+            self.head += grow
+            return index + grow
+        if index >= len(cells):
+            cells.extend(bytes(max(len(cells), index + 1 - len(cells))))
+        return index
+
+    def run_length(self, symbol, direction):
+        """
+        Сколько ячеек подряд, начиная с головки, содержат symbol в
+        направлении direction; вторым значением - дошёл ли отрезок до края массива.
+        """
+        view = np.frombuffer(self.cells, dtype=np.uint8)
+        segment = view[self.head:] if direction > 0 else view[self.head::-1]
+        other = np.flatnonzero(segment != symbol)
+        del view, segment
+        if other.size:
+            return int(other[0]), False
+        return (len(self.cells) - self.head if direction > 0 else self.head + 1), True
+
+    def fill(self, symbol, direction, count):
+        """Записывает symbol в count ячеек от головки и сдвигает головку на count"""
+        if direction > 0:
+            self.ensure(self.head + count)
+            self.cells[self.head:self.head + count] = bytes([symbol]) * count
+            self.head += count
+        else:
+            self.ensure(self.head - count)
+            self.cells[self.head - count + 1:self.head + 1] = bytes([symbol]) * count
+            self.head -= count
+
+    @property
+    def position(self):
+        """Логическая позиция головки"""
+        return self.head - self.offset
+
+    def content(self):
+        """(первая логическая позиция, байты) без пустых краёв"""
+        raw = bytes(self.cells)
+        left = len(raw) - len(raw.lstrip(b'\0'))
+        return left - self.offset, raw.strip(b'\0')
+
+
+# =============================================================================
+# МАШИНА
+# =============================================================================
+
+class TuringMachine:
+    """
+    Детерминированная k-ленточная машина: states, symbols (symbols[0] -
+    пустой), rules - список (state, reads, next_state, writes, moves) с
+    номерами вместо имён, start, accepting - множество номеров состояний.
+    """
+
+    def __init__(self, states, symbols, rules, start, accepting=(), tapes=1):
+        self.states = [str(s) for s in states]
+        self.symbols = [str(a) for a in symbols]
+        self.k = int(tapes)
+        self.start = int(start)
+        self.accepting = set(accepting)
+        if len(self.symbols) > 256:
+            raise ValueError("Алфавит больше 256 символов")
+        if not 1 <= self.k <= MAX_TAPES:
+            raise ValueError(f"Число лент должно быть от 1 до {MAX_TAPES}")
+        self.code = {a: i for i, a in enumerate(self.symbols)}
+        self._compile(rules)
+
+    def _compile(self, rules):
+        n, base, k = len(self.states), len(self.symbols), self.k
+        size = n * base ** k
+        self.table = [-1] * size if size <= TABLE_LIMIT else {}
+        self.next_state, self.write, self.move, self.sweep = [], [], [], []
+        for state, reads, target, writes, moves in rules:
+            key = self.key(state, reads)
+            if (self.table.get(key, -1) if isinstance(self.table, dict) else self.table[key]) >= 0:
+                raise ValueError(f"Для {self.states[state]} и {self.describe(reads)} несколько правил")
+            self.table[key] = len(self.next_state)
+            self.next_state.append(int(target))
+            self.write.append(tuple(writes))
+            self.move.append(tuple(moves))
+            # Правило-проход: состояние не меняется, стоящие головки не меняют ленту
+            self.sweep.append(target == state and any(moves) and all(
+                m or w == r for r, w, m in zip(reads, writes, moves)))
+
+    def key(self, state, reads):
+        key = state
+        for c in reads:
+            key = key * len(self.symbols) + c
+        return key
+
+    def rule(self, key):
+        if isinstance(self.table, dict):
+            return self.table.get(key, -1)
+        return self.table[key]
+
+    def describe(self, codes):
+        return '[' + ', '.join(self.symbols[c] for c in codes) + ']'
+
+    # ----- JSON -----
+
+    @classmethod
+    def from_json(cls, data):
+        """Машина из примера multitape_tm или экспорта universal_tm"""
+        if 'standard' in data:
+            return cls.from_standard(data['standard'])
+        raw = data.get('transitions') or []
+        if raw and 'currentState' in raw[0]:
+            blank = ' '
+            raw = [{'from': t['currentState'], 'read': [t['readSymbol']], 'to': t['newState'],
+                    'write': [t['writeSymbol']], 'move': [t['direction']]} for t in raw]
+            k = 1
+        else:
+            blank = data.get('blank', '_')
+            k = int(data.get('tapeCount') or (len(raw[0]['read']) if raw else 1))
+
+        states = list(dict.fromkeys([str(s) for s in data.get('states') or []]
+                                    + [str(x) for t in raw for x in (t['from'], t['to'])]))
+        start = str(data.get('initialState') or (states[0] if states else ''))
+        if start not in states:
+            raise ValueError("Не указано начальное состояние")
+        symbols = [blank] + [a for a in dict.fromkeys(
+            [str(a) for a in data.get('alphabet') or []]
+            + [str(a) for t in raw for a in list(t['read']) + list(t['write'])]) if a != blank]
+        index = {s: i for i, s in enumerate(states)}
+        code = {a: i for i, a in enumerate(symbols)}
+
+        rules = []
+        for t in raw:
+            if len(t['read']) != k or len(t['write']) != k or len(t['move']) != k:
+                raise ValueError(f"Правило из {t['from']}: ожидается {k} символов и сдвигов")
+            try:
+                moves = tuple(MOVES[str(m).upper()] for m in t['move'])
+            except KeyError as e:
+                raise ValueError(f"Неизвестный сдвиг: {e.args[0]}") from None
+            rules.append((index[str(t['from'])], tuple(code[str(a)] for a in t['read']),
+                          index[str(t['to'])], tuple(code[str(a)] for a in t['write']), moves))
+        accepting = {index[str(s)] for s in data.get('finalStates') or [] if str(s) in index}
+        return cls(states, symbols, rules, index[start], accepting, k)
+
+    @classmethod
+    def from_standard(cls, text):
+        """
+        Однолентная машина в стандартной записи: состояния A, B, ...
+        разделены '_', для каждого символа 0, 1, ... тройка «запись, сдвиг,
+        состояние» ('---' - перехода нет), Z - останов.
+        """
+        rows = text.strip().split('_')
+        width = len(rows[0])
+        if width % 3 or any(len(r) != width for r in rows):
+            raise ValueError("Неверная стандартная запись машины")
+        base = width // 3
+        states = [chr(ord('A') + i) for i in range(len(rows))] + [HALT]
+        symbols = [str(i) for i in range(base)]
+        rules = []
+        for q, row in enumerate(rows):
+            for c in range(base):
+                w, m, target = row[3 * c:3 * c + 3]
+                if target == '-':
+                    continue
+                t = len(rows) if target == HALT else ord(target) - ord('A')
+                if not 0 <= t <= len(rows) or m not in MOVES:
+                    raise ValueError(f"Неверный переход {row[3 * c:3 * c + 3]}")
+                rules.append((q, (c,), t, (int(w),), (MOVES[m],)))
+        return cls(states, symbols, rules, 0, {len(rows)}, 1)
+
+    @staticmethod
+    def tapes_from_json(data):
+        """Начальные ленты из JSON лабы: initialTapes (multitape_tm) или tape [[позиция, символ]] (universal_tm)"""
+        if 'initialTapes' in data:
+            return data['initialTapes']
+        if 'tape' in data:
+            return [[symbol for _, symbol in data['tape']]]
+        return []
+
+    def encode_tapes(self, tapes):
+        """Строки (посимвольно) или списки символов -> ленты"""
+        tapes = list(tapes or [])
+        tapes += [[]] * (self.k - len(tapes))
+        if len(tapes) != self.k:
+            raise ValueError(f"Машина работает с {self.k} лентами")
+        result = []
+        for tape in tapes:
+            try:
+                result.append(Tape([self.code[str(a)] for a in tape]))
+            except KeyError as e:
+                raise ValueError(f"Символ '{e.args[0]}' не входит в алфавит машины") from None
+        return result
+
+    # ----- прогон -----
+
+    def run(self, tapes=None, max_steps=MAX_STEPS, max_memory=MAX_MEMORY, macro=True, time_limit=None):
+        """
+        Прогон до останова или исчерпания бюджета. Возвращает словарь
+        {status: halted | loop | steps | memory | time, state, accepted,
+        steps, macroSteps, tapes, heads, memory, seconds}.
+        """
+        if not tapes or not isinstance(tapes[0], Tape):
+            tapes = self.encode_tapes(tapes)
+        started = time.perf_counter()
+        state, steps, macros, status = self.start, 0, 0, 'halted'
+        iterations = 0
+        table, dict_table = self.table, isinstance(self.table, dict)
+        nxt, write, move, sweep = self.next_state, self.write, self.move, self.sweep
+        base, k = len(self.symbols), self.k
+        memory = sum(len(t.cells) for t in tapes)
+
+        while True:
+            key = state
+            for t in tapes:
+                key = key * base + t.cells[t.head]
+            r = table.get(key, -1) if dict_table else table[key]
+            if r < 0:
+                break
+            if steps >= max_steps:
+                status = 'steps'
+                break
+            iterations += 1
+            if time_limit is not None and iterations % TIME_CHECK == 0 \
+                    and time.perf_counter() - started > time_limit:
+                status = 'time'
+                break
+            if macro and sweep[r]:
+                count, infinite = self._sweep_length(tapes, key, r, max_steps - steps)
+                if infinite:
+                    status = 'loop'
+                    break
+                if count > 1:
+                    for t, w, m in zip(tapes, write[r], move[r]):
+                        if m:
+                            t.fill(w, m, count)
+                    steps += count
+                    macros += 1
+                    for t in tapes:
+                        t.head = t.ensure(t.head)
+                    memory = sum(len(t.cells) for t in tapes)
+                    if memory > max_memory:
+                        status = 'memory'
+                        break
+                    continue
+            state = nxt[r]
+            for t, w, m in zip(tapes, write[r], move[r]):
+                t.cells[t.head] = w
+                if m:
+                    h = t.head + m
+                    if 0 <= h < len(t.cells):
+                        t.head = h
+                    else:
+                        t.head = t.ensure(h)
+                        memory = sum(len(x.cells) for x in tapes)
+            steps += 1
+            if memory > max_memory:
+                status = 'memory'
+                break
+
+        return {
+            'status': status,
+            'state': self.states[state],
+            'accepted': status == 'halted' and state in self.accepting,
+            'steps': steps,
+            'macroSteps': macros,
+            'tapes': [self._tape_json(t) for t in tapes],
+            'heads': [t.position for t in tapes],
+            'memory': memory,
+            'seconds': time.perf_counter() - started,
+        }
+
+    def _sweep_length(self, tapes, key, r, budget):
+        """
+        Сколько раз подряд применится правило-проход r (не больше budget)
+        и не уходит ли проход в бесконечную пустую часть ленты.
+        """
+        reads = []
+        for _ in range(self.k):
+            key, c = divmod(key, len(self.symbols))
+            reads.append(c)
+        reads.reverse()
+        count, bounded = None, False
+        for t, c, m in zip(tapes, reads, self.move[r]):
+            if not m:
+                continue
+            # Быстрая проверка соседней ячейки, чтобы не сканировать ради одного шага
+            h = t.head + m
+            if 0 <= h < len(t.cells) and t.cells[h] != c:
+                return 1, False
+            length, open_end = t.run_length(c, m)
+            if open_end and c == 0:
+                continue
+            bounded = True
+            count = length if count is None else min(count, length)
+        if not bounded:
+            return 0, True
+        return min(count, budget), False
+
+    def _tape_json(self, tape):
+        start, raw = tape.content()
+        return {'start': start, 'symbols': [self.symbols[c] for c in raw]}
+
+    def ones(self, result):
+        """Число непустых символов на лентах после прогона (Σ для «бобров»)"""
+        return sum(sum(1 for a in t['symbols'] if a != self.symbols[0]) for t in result['tapes'])
+
+
+# =============================================================================
+# ЭТАЛОННЫЕ ДОЛГИЕ МАШИНЫ
+# =============================================================================
+
+# Чемпионы «усердного бобра» по числу шагов S и символов Σ: (запись, шаги, непустые символы)
+BENCHMARKS = {
+    'bb2': ('1RB1LB_1LA1RZ', 6, 4),
+    'bb3': ('1RB1RZ_1LB0RC_1LC1LA', 21, 5),
+    'sigma3': ('1RB1RZ_0RC1RB_1LC1LA', 14, 6),
+    'bb4': ('1RB1LB_1LA0LC_1RZ1LD_1RD0RA', 107, 13),
+    'bb2x3': ('1RB2LB1RZ_2LA2RB1LB', 38, 9),
+    'bb5': ('1RB1LC_1RC1RB_1RD0LE_1LA1LD_1RZ0LA', 47_176_870, 4098),
+}
+
+
+def benchmark(names=None, macro=True, max_steps=100_000_000, time_limit=None):
+    """
+    Прогоняет эталонные машины и сверяет число шагов и символов;
+    time_limit - на все машины вместе.
+    """
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    results = []
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Неизвестная эталонная машина: {name}")
+        text, steps, ones = BENCHMARKS[name]
+        machine = TuringMachine.from_standard(text)
+        remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        result = machine.run(max_steps=max_steps, macro=macro, time_limit=remaining)
+        results.append({
+            'name': name,
+            'machine': text,
+            'status': result['status'],
+            'steps': result['steps'],
+            'ones': machine.ones(result),
+            'macroSteps': result['macroSteps'],
+            'seconds': result['seconds'],
+            'ok': result['status'] == 'halted' and result['steps'] == steps and machine.ones(result) == ones,
+        })
+    return results
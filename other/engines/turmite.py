@@ -0,0 +1,384 @@
+"""
+Турмиты и муравьи Лэнгтона на неограниченном поле.
+
+В отличие от лабы turmites (js/core), поле не тороидальное: оно хранится
+разреженно - словарём тайлов 64x64, которые создаются по мере того, как
+муравей до них добирается. Правило компилируется в плоские массивы
+write / turn / next_state с индексом state * colors + color.
+
+Для одиночного муравья включено обнаружение «шоссе» и циклов. По следу
+последних шагов ищется кандидат в период P, затем он проверяется точно:
+окно поля вокруг муравья через P шагов должно совпасть с исходным окном,
+сдвинутым на смещение D. Если впереди пусто, движок перепрыгивает сразу
+k периодов, а оставленный след запоминает лениво (штамп + сдвиг) и
+дорисовывает только в те тайлы, которые потом понадобятся.
+"""
+
+import numpy as np
+
+
+# Направления как в ant.js: 0=↑, 1=→, 2=↓, 3=←
+DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+TURNS = {'L': 3, 'R': 1, 'F': 0, 'N': 0, 'U': 2}
+
+TILE_BITS = 6
+TILE = 1 << TILE_BITS
+TILE_MASK = TILE - 1
+
+
+# =============================================================================
+# ПРАВИЛО
+# =============================================================================
+
+class TurmiteRule:
+    """
+    Правило турмита, скомпилированное в плоские массивы.
+
+    table[state][color] = (write, turn, next_state), где turn - буква
+    L / R / F / U (N - синоним F) или приращение направления 0..3.
+    """
+
+    def __init__(self, table):
+        if not table or not table[0]:
+            raise ValueError("Пустая таблица правила")
+        self.states = len(table)
+        self.colors = len(table[0])
+        self.write, self.turn, self.next_state = [], [], []
+        for state, row in enumerate(table):
+            if len(row) != self.colors:
+                raise ValueError(f"Состояние {state}: ожидалось {self.colors} цветов")
+            for write, turn, nxt in row:
+                if isinstance(turn, str):
+                    if turn.upper() not in TURNS:
+                        raise ValueError(f"Неизвестное действие: {turn}")
+                    turn = TURNS[turn.upper()]
+                if not (0 <= write < self.colors and 0 <= nxt < self.states):
+                    raise ValueError(f"Состояние {state}: переход вне таблицы")
+                self.write.append(int(write))
+                self.turn.append(int(turn) & 3)
+                self.next_state.append(int(nxt))
+
+    @classmethod
+    def from_string(cls, rule='RL'):
+        """Правило лабы: строка L/R/F/U, цвет клетки c перекрашивается в c + 1"""
+        clean = ''.join(ch for ch in (rule or 'RL').upper() if ch in 'LRFU') or 'RL'
+        n = len(clean)
+        return cls([[((c + 1) % n, ch, 0) for c, ch in enumerate(clean)]])
+
+
+# =============================================================================
+# РАЗРЕЖЕННОЕ ПОЛЕ
+# =============================================================================
+
+class Highway:
+    """
+    Ленивый след шоссе: клетки stamp + i * (dx, dy) для i = 1..count.
+
+    Хранятся только относительный штамп одного периода и число повторов,
+    так что след длиной в миллиарды шагов занимает константную память.
+    """
+
+    def __init__(self, xs, ys, values, dx, dy, count):
+        self.xs, self.ys, self.values = xs, ys, values
+        self.dx, self.dy, self.count = dx, dy, count
+        nz = values != 0
+        if nz.any():
+            xs_nz, ys_nz = xs[nz], ys[nz]
+            ends_x = (xs_nz.min() + min(dx, dx * count), xs_nz.max() + max(dx, dx * count))
+            ends_y = (ys_nz.min() + min(dy, dy * count), ys_nz.max() + max(dy, dy * count))
+            self.bbox = (ends_x[0], ends_x[1], ends_y[0], ends_y[1])
+        else:
+            self.bbox = None
+
+    def paint(self, tile, tx, ty):
+        """Дорисовывает в тайл (tx, ty) все попадающие в него клетки следа"""
+        x0, y0 = tx << TILE_BITS, ty << TILE_BITS
+        lo = np.ones_like(self.xs)
+        hi = np.full_like(self.xs, self.count)
+        for base, step, start in ((self.xs, self.dx, x0), (self.ys, self.dy, y0)):
+            if step == 0:
+                inside = (base >= start) & (base < start + TILE)
+                hi = np.where(inside, hi, 0)
+                continue
+            a = -((base - start) // step) if step > 0 else -((start + TILE - 1 - base) // -step)
+            b = (start + TILE - 1 - base) // step if step > 0 else (start - base) // step
+            lo = np.maximum(lo, a)
+            hi = np.minimum(hi, b)
+        for k in np.nonzero(lo <= hi)[0]:
+            for i in range(lo[k], hi[k] + 1):
+                x = self.xs[k] + i * self.dx
+                y = self.ys[k] + i * self.dy
+                tile[((y & TILE_MASK) << TILE_BITS) | (x & TILE_MASK)] = self.values[k]
+
+
+class SparseGrid:
+    """Неограниченное поле из тайлов TILE x TILE (bytearray), цвет по умолчанию 0"""
+
+    def __init__(self):
+        self.tiles = {}
+        self.highways = []
+
+    def _fresh_tile(self, tx, ty):
+        tile = bytearray(TILE * TILE)
+        for highway in self.highways:
+            highway.paint(tile, tx, ty)
+        return tile
+
+    def tile(self, tx, ty):
+        """Тайл (tx, ty); отсутствующий создаётся с учётом ленивых следов"""
+        tile = self.tiles.get((tx, ty))
+        if tile is None:
+            tile = self.tiles[(tx, ty)] = self._fresh_tile(tx, ty)
+        return tile
+
+    def get(self, x, y):
+        return self.tile(x >> TILE_BITS, y >> TILE_BITS)[((y & TILE_MASK) << TILE_BITS) | (x & TILE_MASK)]
+
+    def set(self, x, y, value):
+        self.tile(x >> TILE_BITS, y >> TILE_BITS)[((y & TILE_MASK) << TILE_BITS) | (x & TILE_MASK)] = value
+
+    def window(self, cx, cy, r):
+        """Квадрат (2r+1) x (2r+1) с центром (cx, cy), индексация [y][x]"""
+        return self.to_array(cx - r, cy - r, 2 * r + 1, 2 * r + 1, materialize=True)
+
+    def to_array(self, x0, y0, width, height, materialize=False):
+        """Прямоугольный фрагмент поля (например, для отрисовки)"""
+        out = np.zeros((height, width), dtype=np.uint8)
+        for ty in range(y0 >> TILE_BITS, ((y0 + height - 1) >> TILE_BITS) + 1):
+            for tx in range(x0 >> TILE_BITS, ((x0 + width - 1) >> TILE_BITS) + 1):
+                if materialize:
+                    tile = self.tile(tx, ty)
+                else:
+                    tile = self.tiles.get((tx, ty))
+                    if tile is None:
+                        if not self.highways:
+                            continue
+                        tile = self._fresh_tile(tx, ty)
+                arr = np.frombuffer(tile, dtype=np.uint8).reshape(TILE, TILE)
+                gx0, gy0 = tx << TILE_BITS, ty << TILE_BITS
+                sx0, sy0 = max(x0, gx0), max(y0, gy0)
+                sx1, sy1 = min(x0 + width, gx0 + TILE), min(y0 + height, gy0 + TILE)
+                out[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0] = arr[sy0 - gy0:sy1 - gy0, sx0 - gx0:sx1 - gx0]
+        return out
+
+    def paint_array(self, x0, y0, arr):
+        for (dy, dx), value in np.ndenumerate(arr):
+            self.set(x0 + dx, y0 + dy, int(value))
+
+    def nonzero_cells(self):
+        """Координаты всех ненулевых клеток материализованных тайлов"""
+        xs, ys = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        for (tx, ty), tile in self.tiles.items():
+            idx = np.flatnonzero(np.frombuffer(tile, dtype=np.uint8))
+            if idx.size:
+                xs.append((tx << TILE_BITS) + (idx & TILE_MASK))
+                ys.append((ty << TILE_BITS) + (idx >> TILE_BITS))
+        return np.concatenate(xs), np.concatenate(ys)
+
+    def add_highway(self, highway):
+        for (tx, ty), tile in self.tiles.items():
+            highway.paint(tile, tx, ty)
+        self.highways.append(highway)
+
+
+# =============================================================================
+# СИМУЛЯТОР
+# =============================================================================
+
+class Ant:
+    def __init__(self, x=0, y=0, direction=0, state=0):
+        self.x, self.y, self.dir, self.state = int(x), int(y), int(direction) & 3, int(state)
+
+
+def _first_hit(lo_x, hi_x, lo_y, hi_y, ax, ay, dx, dy, r):
+    """
+    Для прямоугольников [lo_x, hi_x] x [lo_y, hi_y] - наименьший номер i >= 1
+    окна с центром (ax + i*dx, ay + i*dy) и радиусом r, которое их задевает.
+    """
+    lo = np.ones(lo_x.shape, dtype=np.int64)
+    hi = np.full(lo_x.shape, np.iinfo(np.int64).max // 4)
+    for a0, a1, c, d in ((lo_x, hi_x, ax, dx), (lo_y, hi_y, ay, dy)):
+        if d == 0:
+            hit = (a0 <= c + r) & (a1 >= c - r)
+            hi = np.where(hit, hi, 0)
+        elif d > 0:
+            lo = np.maximum(lo, -((c + r - a0) // d))
+            hi = np.minimum(hi, (a1 + r - c) // d)
+        else:
+            lo = np.maximum(lo, -((a1 + r - c) // -d))
+            hi = np.minimum(hi, (c + r - a0) // -d)
+    hits = lo[lo <= hi]
+    return int(hits.min()) if hits.size else None
+
+
+class TurmiteSimulator:
+    """
+    Турмиты на разреженном поле.
+
+    detect=True включает поиск шоссе/циклов (только для одного муравья):
+    check_every - как часто искать период, max_period - наибольший период.
+    Обнаруженные шоссе и циклы записываются в self.events.
+    """
+
+    def __init__(self, rule='RL', ants=None, detect=True, check_every=2048, max_period=4096):
+        self.rule = rule if isinstance(rule, TurmiteRule) else TurmiteRule.from_string(rule)
+        self.grid = SparseGrid()
+        self.ants = ants if ants is not None else [Ant()]
+        self.steps = 0
+        self.detect = detect
+        self.check_every = int(check_every)
+        self.max_period = int(max_period)
+        self.events = []
+        self._trace = bytearray()
+
+    # ----- шаги -----
+
+    def _advance(self, n, trace=None, undo=None, path=None):
+        """Делает n шагов одиночного муравья с локальным кэшем тайла"""
+        grid, rule, ant = self.grid, self.rule, self.ants[0]
+        write, turn, next_state, colors = rule.write, rule.turn, rule.next_state, rule.colors
+        x, y, d, s = ant.x, ant.y, ant.dir, ant.state
+        key = (x >> TILE_BITS, y >> TILE_BITS)
+        tile = grid.tile(*key)
+        for _ in range(n):
+            k = (x >> TILE_BITS, y >> TILE_BITS)
+            if k != key:
+                key = k
+                tile = grid.tile(*k)
+            i = ((y & TILE_MASK) << TILE_BITS) | (x & TILE_MASK)
+            c = tile[i]
+            j = s * colors + c
+            if trace is not None:
+                trace.append((j * 4 + d) & 0xFF)
+            if undo is not None:
+                undo.setdefault((x, y), c)
+                path.append((x, y))
+            tile[i] = write[j]
+            d = (d + turn[j]) & 3
+            s = next_state[j]
+            step = DIRECTIONS[d]
+            x += step[0]
+            y += step[1]
+        ant.x, ant.y, ant.dir, ant.state = x, y, d, s
+        self.steps += n
+
+    def step(self):
+        """Один шаг всех муравьёв (порядок как в Simulator.step)"""
+        rule, grid = self.rule, self.grid
+        for ant in self.ants:
+            c = grid.get(ant.x, ant.y)
+            j = ant.state * rule.colors + c
+            grid.set(ant.x, ant.y, rule.write[j])
+            ant.dir = (ant.dir + rule.turn[j]) & 3
+            ant.state = rule.next_state[j]
+            dx, dy = DIRECTIONS[ant.dir]
+            ant.x += dx
+            ant.y += dy
+        self.steps += 1
+
+    def run(self, steps):
+        """Продвигает симуляцию на steps шагов, по возможности перепрыгивая шоссе"""
+        target = self.steps + int(steps)
+        if len(self.ants) != 1:
+            while self.steps < target:
+                self.step()
+            return self
+        while self.steps < target:
+            chunk = min(self.check_every, target - self.steps)
+            if not self.detect:
+                self._advance(chunk)
+                continue
+            self._advance(chunk, trace=self._trace)
+            history = 4 * self.max_period
+            if len(self._trace) > history:
+                del self._trace[:-history]
+            period = self._find_period()
+            if period and target - self.steps >= period:
+                self._try_jump(period, target)
+        return self
+
+    # ----- обнаружение шоссе -----
+
+    def _find_period(self):
+        trace = self._trace
+        k = min(64, len(trace) // 4)
+        if k < 8:
+            return None
+        pos = trace.rfind(trace[-k:], 0, len(trace) - 1)
+        if pos < 0:
+            return None
+        period = len(trace) - k - pos
+        if period > self.max_period or trace[-2 * period:-period] != trace[-period:]:
+            return None
+        return period
+
+    def _try_jump(self, period, target):
+        ant, grid = self.ants[0], self.grid
+        ax, ay, d0, s0 = ant.x, ant.y, ant.dir, ant.state
+        undo, path = {}, []
+        self._advance(period, undo=undo, path=path)
+        self._trace.clear()
+        if (ant.dir, ant.state) != (d0, s0):
+            return
+        dx, dy = ant.x - ax, ant.y - ay
+        r = max(max(abs(x - ax), abs(y - ay)) for x, y in path) + 1
+
+        # Окно до периода восстанавливается из журнала перезаписанных клеток
+        before = grid.window(ax, ay, r)
+        for (x, y), old in undo.items():
+            before[y - ay + r, x - ax + r] = old
+        after = grid.window(ant.x, ant.y, r)
+        if not np.array_equal(before, after):
+            return
+
+        remaining = (target - self.steps) // period
+        if dx == 0 and dy == 0:
+            # Точный цикл: конфигурация повторяется, менять нечего
+            self.steps += remaining * period
+            self.events.append({'type': 'cycle', 'step': self.steps, 'period': period})
+            return
+
+        # Сколько периодов можно пройти, не задев ничего впереди
+        xs, ys = grid.nonzero_cells()
+        outside = (np.abs(xs - ax) > r) | (np.abs(ys - ay) > r)
+        xs, ys = xs[outside], ys[outside]
+        rects = [(xs, xs, ys, ys)]
+        for hw in grid.highways:
+            if hw.bbox is not None:
+                rects.append(tuple(np.array([v]) for v in hw.bbox))
+        first = None
+        for lo_x, hi_x, lo_y, hi_y in rects:
+            hit = _first_hit(lo_x, hi_x, lo_y, hi_y, ax, ay, dx, dy, r)
+            if hit is not None:
+                first = hit if first is None else min(first, hit)
+        count = remaining if first is None else min(remaining, first - 2)
+        if count <= 0:
+            return
+
+        # Штамп - клетки окна 0, которые окно 1 уже не накрывает
+        yy, xx = np.mgrid[-r:r + 1, -r:r + 1]
+        gx, gy = xx + ax, yy + ay
+        left = (np.abs(gx - ant.x) > r) | (np.abs(gy - ant.y) > r)
+        current = grid.window(ax, ay, r)
+        highway = Highway(gx[left].astype(np.int64), gy[left].astype(np.int64),
+                          current[left], dx, dy, count)
+        grid.add_highway(highway)
+        grid.paint_array(ant.x + count * dx - r, ant.y + count * dy - r, after)
+
+        ant.x += count * dx
+        ant.y += count * dy
+        self.steps += count * period
+        self.events.append({
+            'type': 'highway', 'step': self.steps, 'period': period,
+            'dx': dx, 'dy': dy, 'periods': count,
+        })
+
+    # ----- снимок -----
+
+    def snapshot(self, x0, y0, width, height):
+        """Фрагмент поля и муравьи в формате, близком к Simulator.snapshot"""
+        return {
+            'grid': self.grid.to_array(x0, y0, width, height),
+            'ants': [{'x': a.x, 'y': a.y, 'dir': a.dir, 'state': a.state} for a in self.ants],
+            'steps': self.steps,
+        }
@@ -0,0 +1,1514 @@
+import errno
+import functools
+import gzip
+import http.client
+import http.server
+import importlib.util
+import io
+import json
+import math
+import os
+import tempfile
+import threading
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.test import RequestFactory, SimpleTestCase
+
+from . import views
+from .engines import ntm as ntm_engine
+from .engines.acceptance import CompiledDFA, bounded_diff, load_automaton, product_diff
+from .engines.alife import DEFAULTS, MAX_CAPACITY as ALIFE_MAX, World as AlifeWorld, merge_config
+from .engines.automata import DFA, equivalent
+from .engines.billiard import EXAMPLES as BBM_EXAMPLES, Circuit, Scene, Simulator
+from .engines.bytecode import TIME_CHECK, PostProgram, RAMProgram
+from .engines.codi import AXON, BLANK, DIRECTIONS as CODI_DIRECTIONS, CoDi, neighbor as codi_neighbor
+from .engines.graph import GraphAutomaton, SparseGraph, outer_totalistic
+from .engines.graph_dsl import DSLAutomaton, NestingError, RuleSet, batch_run
+from .engines.lattice import Lattice, LatticeAutomaton, parse_rule
+from .engines.lsystem import DRAW_SYMBOLS as LSYSTEM_DRAW, LSystem, Turtle, stream as lsystem_stream
+from .engines.markov import SAMPLE_BATCH, MarkovChain, StochasticAutomaton
+from .engines.multistate import (
+    BB_DYING, BB_OFF, BB_ON, WW_CONDUCTOR, WW_HEAD, WW_TAIL, MultiStateAutomaton, brians_brain, wireworld,
+)
+from .engines.neural_tm import (
+    NTM as NeuralTM, address as neural_tm_address, make_batch as neural_tm_batch, train as neural_tm_train,
+)
+from .engines.nfa import NFA, BudgetExceeded, LazyDFA, bits
+from .engines.noise import NoiseModel, simulate as simulate_noise
+from .engines.normal_algorithm import NormalAlgorithm
+from .engines.ntm import NTM, explore
+from .engines.petri import PetriNet
+from .engines.quantum import (
+    MAX_QUBITS as QUANTUM_MAX_QUBITS, QuantumCircuit, Statevector, ghz_circuit, grover_circuit, qft_circuit,
+)
+from .engines.recursive import Program, decode, encode, godel_number, godel_text
+from .engines.reversible import CRITTERS, RULES as REVERSIBLE_RULES, MargolusEngine, validate_rule
+from .engines.transducer import MealyMachine, MooreMachine, transduce_stream
+from .engines.turing import BENCHMARKS, MAX_TAPES, TuringMachine, benchmark
+from .engines.turmite import Ant, TurmiteRule, TurmiteSimulator
+
+
+def post(view, data):
+    """(код ответа, JSON ответа) для POST с телом data"""
+    response = view(RequestFactory().post('/', json.dumps(data), content_type='application/json'))
+    return response.status_code, json.loads(response.content)
+
+
+# =============================================================================
+# user-026: гексагональные и треугольные решётки
+# =============================================================================
+
+class LatticeTests(SimpleTestCase):
+    def test_rule_digits_follow_lab_kind(self):
+        self.assertEqual(parse_rule('B12/S34', 'hex'), ({1, 2}, {3, 4}))
+        self.assertEqual(parse_rule('B12/S34', 'tri'), ({12}, {3, 4}))
+        self.assertEqual(parse_rule('B3,10,12/S2,12', 'hex'), ({3, 10, 12}, {2, 12}))
+        with self.assertRaises(ValueError):
+            parse_rule('X1', 'hex')
+
+    def test_hex_rule_keeps_births_on_wide_kernels(self):
+        for kernel in (12, 18):
+            automaton = LatticeAutomaton(Lattice('hex', 8, 8, kernel=kernel), 'B12/S34')
+            self.assertEqual(automaton.table[0].nonzero()[0].tolist(), [1, 2])
+
+    def test_single_cell_neighbour_counts(self):
+        for kind, kernel, expected in (('hex', 6, 6), ('hex', 12, 12), ('hex', 18, 18),
+                                       ('tri', 'edge-3', 3), ('tri', 'moore-12', 12)):
+            lattice = Lattice(kind, 10, 10, kernel=kernel)
+            for r, c in ((4, 4), (5, 4), (4, 5)):
+                field = np.zeros((10, 10), dtype=np.uint8)
+                field[r, c] = 1
+                counts = lattice.neighbor_counts(field)
+                self.assertEqual(int(counts.sum()), expected)
+                self.assertEqual(lattice.max_neighbors, expected)
+
+    def test_batch_experiment_matches_single_runs(self):
+        automaton = LatticeAutomaton(Lattice('hex', 12, 10), 'B2/S34')
+        initial = automaton.random_fields(3, seed=1)
+        result = automaton.experiment(3, 5, initial=initial)
+        for run in range(3):
+            final = automaton.run(initial[run], 5)
+            np.testing.assert_array_equal(result['final'][run], final)
+            self.assertEqual(result['liveNow'][run, -1], final.sum())
+
+
+# =============================================================================
+# user-027: обратимые автоматы Марголуса
+# =============================================================================
+
+class MargolusTests(SimpleTestCase):
+    def test_rules_are_permutations(self):
+        for name in REVERSIBLE_RULES:
+            table, inverse = validate_rule(name)
+            np.testing.assert_array_equal(inverse[table], np.arange(16))
+        self.assertEqual((CRITTERS[0], CRITTERS[15], CRITTERS[0b0011]), (15, 0, 0b0011))
+        with self.assertRaises(ValueError):
+            validate_rule([0] * 16)
+        with self.assertRaises(ValueError):
+            validate_rule('life')
+
+    def test_billiard_ball_travels_diagonally(self):
+        field = np.zeros((8, 8), dtype=np.uint8)
+        field[0, 0] = 1
+        engine = MargolusEngine(field, 'billiard')
+        engine.step_forward(4)
+        self.assertEqual(np.argwhere(engine.field).tolist(), [[4, 4]])
+
+    def test_backward_steps_restore_the_field(self):
+        field = (np.random.default_rng(0).random((32, 33)) < 0.4).astype(np.uint8)
+        for rule in ('critters', 'rotations', 'billiard'):
+            engine = MargolusEngine(field, rule)
+            self.assertEqual(engine.field.shape, (32, 32))
+            start = engine.field.copy()
+            engine.step_forward(25)
+            self.assertGreater(engine.hamming(start), 0)
+            engine.step_backward(25)
+            np.testing.assert_array_equal(engine.field, start)
+
+    def test_seek_through_checkpoints_matches_plain_stepping(self):
+        field = (np.random.default_rng(1).random((16, 16)) < 0.5).astype(np.uint8)
+        engine = MargolusEngine(field, checkpoint_interval=4, max_checkpoints=4)
+        engine.step_forward(40)
+        self.assertLessEqual(len(engine.checkpoints), 4)
+        self.assertGreater(engine.checkpoint_interval, 4)
+        for t in (7, 33, -5, 0):
+            reference = MargolusEngine(field)
+            if t >= 0:
+                reference.step_forward(t)
+            else:
+                reference.step_backward(-t)
+            np.testing.assert_array_equal(engine.seek(t), reference.field)
+            self.assertEqual(engine.t, t)
+
+
+# =============================================================================
+# user-028: турмиты на неограниченном поле
+# =============================================================================
+
+class TurmiteTests(SimpleTestCase):
+    def test_highway_jump_matches_plain_stepping(self):
+        fast, plain = TurmiteSimulator('RL'), TurmiteSimulator('RL', detect=False)
+        fast.run(30000)
+        plain.run(30000)
+        self.assertEqual(vars(fast.ants[0]), vars(plain.ants[0]))
+        np.testing.assert_array_equal(fast.snapshot(-450, -450, 900, 900)['grid'],
+                                      plain.snapshot(-450, -450, 900, 900)['grid'])
+        # Шоссе Лэнгтона: 104 шага на сдвиг в две клетки по диагонали
+        highway = fast.events[0]
+        self.assertEqual((highway['type'], highway['period']), ('highway', 104))
+        self.assertEqual((abs(highway['dx']), abs(highway['dy'])), (2, 2))
+
+    def test_long_run_extrapolates_the_highway(self):
+        ant = TurmiteSimulator('RL')
+        ant.run(30000)
+        x, y = ant.ants[0].x, ant.ants[0].y
+        dx, dy = ant.events[0]['dx'], ant.events[0]['dy']
+        ant.run(104 * 10 ** 6)
+        self.assertEqual((ant.ants[0].x, ant.ants[0].y), (x + 10 ** 6 * dx, y + 10 ** 6 * dy))
+        self.assertEqual(ant.steps, 30000 + 104 * 10 ** 6)
+
+    def test_cycle_is_detected_and_skipped(self):
+        ant = TurmiteSimulator('U')
+        ant.run(10 ** 9)
+        self.assertEqual(ant.events[-1]['type'], 'cycle')
+        self.assertEqual((ant.steps, ant.ants[0].x, ant.ants[0].y), (10 ** 9, 0, 0))
+
+    def test_rule_table_and_several_ants(self):
+        with self.assertRaises(ValueError):
+            TurmiteRule([[(0, 'X', 0)]])
+        with self.assertRaises(ValueError):
+            TurmiteRule([[(2, 'L', 0), (0, 'R', 0)]])
+        sim = TurmiteSimulator('RL', ants=[Ant(0, 0), Ant(5, 0, direction=2)])
+        sim.run(3)
+        snap = sim.snapshot(-5, -5, 15, 10)
+        self.assertEqual(snap['steps'], 3)
+        self.assertEqual(int(snap['grid'].sum()), 6)
+        self.assertEqual([(a['x'], a['y']) for a in snap['ants']], [(0, 1), (5, -1)])
+
+
+# =============================================================================
+# user-029: Wireworld и «Мозг Брайана»
+# =============================================================================
+
+class MultiStateTests(SimpleTestCase):
+    def test_electron_runs_along_a_wire(self):
+        field = np.zeros((3, 20), dtype=np.uint8)
+        field[1, 1:19] = WW_CONDUCTOR
+        field[1, 1], field[1, 2] = WW_TAIL, WW_HEAD
+        automaton = MultiStateAutomaton(wireworld(), field, wrap=False)
+        automaton.run(10)
+        self.assertEqual(np.flatnonzero(automaton.field[1] == WW_HEAD).tolist(), [12])
+        self.assertEqual(np.flatnonzero(automaton.field[1] == WW_TAIL).tolist(), [11])
+        self.assertEqual(automaton.last_mode, 'sparse')
+        self.assertEqual(automaton.active.size, 2)
+
+    def test_sparse_and_dense_steps_agree(self):
+        field = np.random.default_rng(4).integers(0, 3, (48, 40)).astype(np.uint8)
+        field[field == BB_DYING] = BB_OFF
+        for wrap in (True, False):
+            sparse_run = MultiStateAutomaton(brians_brain(), field, wrap=wrap, dense_threshold=1.0)
+            dense_run = MultiStateAutomaton(brians_brain(), field, wrap=wrap, dense_threshold=0.0)
+            for _ in range(20):
+                sparse_run.step()
+                dense_run.step()
+                np.testing.assert_array_equal(sparse_run.field, dense_run.field)
+            self.assertEqual((sparse_run.last_mode, dense_run.last_mode), ('sparse', 'dense'))
+
+    def test_random_births_repeat_with_seed(self):
+        field = np.zeros((32, 32), dtype=np.uint8)
+        runs = [MultiStateAutomaton(brians_brain(random_chance=1), field, seed=9).run(5) for _ in range(2)]
+        np.testing.assert_array_equal(*runs)
+        self.assertGreater(int((runs[0] != BB_OFF).sum()), 0)
+
+    def test_counts_and_entropy(self):
+        field = np.array([[BB_OFF, BB_ON], [BB_OFF, BB_ON]], dtype=np.uint8)
+        automaton = MultiStateAutomaton(brians_brain(), field)
+        self.assertEqual(automaton.counts().tolist(), [2, 2, 0])
+        self.assertAlmostEqual(automaton.entropy(), 1.0)
+
+
+# =============================================================================
+# user-030: нейронный автомат CoDi
+# =============================================================================
+
+class CoDiTests(SimpleTestCase):
+    def test_neighbor_shift_reads_cell_in_direction(self):
+        arr = np.zeros((3, 3, 3), dtype=np.uint8)
+        arr[1, 1, 1] = 1
+        for d, (dz, dy, dx) in enumerate(CODI_DIRECTIONS):
+            self.assertEqual(np.argwhere(codi_neighbor(arr, d)).tolist(), [[1 - dz, 1 - dy, 1 - dx]])
+
+    def test_full_branching_fills_volume_with_gates_to_sources(self):
+        net = CoDi(6, 5, 4, neuron_density=0.05, branch_probability=1.0, seed=2)
+        self.assertGreater(net.seed_neurons(), 0)
+        net.grow()
+        self.assertEqual(net.state_count()[BLANK], 0)
+        grown = np.argwhere(net.type >= AXON)
+        for z, y, x in grown:
+            dz, dy, dx = CODI_DIRECTIONS[net.gate[z, y, x]]
+            self.assertNotEqual(net.type[z + dz, y + dy, x + dx], BLANK)
+
+    def test_seeded_runs_repeat(self):
+        nets = []
+        for _ in range(2):
+            net = CoDi(10, 10, 6, neuron_density=0.02, threshold=2, input_rate=0.2, seed=7)
+            net.grow()
+            nets.append(net.run(15))
+        np.testing.assert_array_equal(nets[0].type, nets[1].type)
+        np.testing.assert_array_equal(nets[0].signal, nets[1].signal)
+        strip = [[{k: v for k, v in e.items() if k != 'time'} for e in net.history] for net in nets]
+        self.assertEqual(strip[0], strip[1])
+        self.assertTrue(any(e['orderParameter'] > 0 for e in strip[0]))
+
+    def test_exports(self):
+        net = CoDi(4, 4, 2, neuron_density=0.2, seed=1)
+        net.grow()
+        net.run(3)
+        with tempfile.TemporaryDirectory() as tmp:
+            net.export_csv(os.path.join(tmp, 'codi.csv'))
+            with open(os.path.join(tmp, 'codi.csv'), encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            self.assertIn('Количество шагов,3', lines)
+            self.assertIn('ФИНАЛЬНАЯ СЕТКА СОСТОЯНИЙ', lines)
+            net.export_npz(os.path.join(tmp, 'codi.npz'))
+            with np.load(os.path.join(tmp, 'codi.npz')) as data:
+                np.testing.assert_array_equal(data['type'], net.type)
+                self.assertEqual(data['history_step'].tolist(), [1, 2, 3])
+
+
+# =============================================================================
+# user-031: разреженный граф с инкрементальными правками
+# =============================================================================
+
+class SparseGraphTests(SimpleTestCase):
+    def test_incremental_edits_match_rebuilt_graph(self):
+        graph = SparseGraph.grid(3, 3)
+        graph.add_edge(0, 8)
+        graph.remove_edge(0, 1)
+        v = graph.add_vertex(state=1)
+        graph.add_edge(v, 4)
+        self.assertEqual(graph.edge_count(), 12 - 1 + 2)
+        self.assertTrue(graph.has_edge(8, 0))
+        self.assertFalse(graph.has_edge(1, 0))
+        rebuilt = graph.copy()
+        np.testing.assert_array_equal(graph.degree(), rebuilt.degree())
+        np.testing.assert_array_equal(graph.matvec(np.arange(graph.n)), rebuilt.matvec(np.arange(graph.n)))
+
+    def test_weighted_counts_ignore_weights_and_follow_edits(self):
+        graph = SparseGraph.from_edges(4, [0, 0, 1], [1, 2, 2], weights=[2.5, 0.5, 3.0], states=[0, 1, 1, 1])
+        np.testing.assert_array_equal(graph.degree(), [2, 2, 2, 0])
+        np.testing.assert_array_equal(graph.count_state(1), [2, 1, 1, 0])
+        graph.add_edge(3, 0, weight=4.0)
+        np.testing.assert_array_equal(graph.degree(), [3, 2, 2, 1])
+        graph.compact()
+        graph.remove_edge(0, 1)
+        np.testing.assert_array_equal(graph.count_state(1), [2, 1, 1, 0])
+        graph.add_vertex()
+        self.assertEqual(graph.degree().tolist(), [2, 1, 2, 1, 0])
+        graph.replace_edges([0], [4], weights=[2.0])
+        self.assertEqual(graph.degree().tolist(), [1, 0, 0, 0, 1])
+
+    def test_outer_totalistic_blinker_on_path(self):
+        # Путь 0-1-2-3-4: B1/S1 из одной живой вершины
+        graph = SparseGraph.from_edges(5, [0, 1, 2, 3], [1, 2, 3, 4], states=[0, 0, 1, 0, 0])
+        automaton = GraphAutomaton(graph, outer_totalistic(1, births={1}, survives={1}))
+        self.assertEqual(automaton.run(1).tolist(), [0, 1, 0, 1, 0])
+        self.assertEqual(automaton.run(1).tolist(), [1, 0, 0, 0, 1])
+
+    def test_json_without_weight_flag_is_weighted(self):
+        data = {'nodes': [{'id': 'a'}, {'id': 'b', 'state': 1}], 'edges': [{'from': 'a', 'to': 'b', 'weight': 3}]}
+        graph = SparseGraph.from_json(data)
+        self.assertTrue(graph.weighted)
+        self.assertEqual(graph.edge_weight(0, 1), 3.0)
+        self.assertEqual(graph.analytics()['largestComponent'], 2)
+
+
+# =============================================================================
+# user-032: DSL правил граф-автоматов и пакетные прогоны
+# =============================================================================
+
+class GraphDSLTests(SimpleTestCase):
+    COMPLETE = 'TOPOLOGY_RULES:\nIF NOT EDGE(u,v) THEN add edge(u,v)'
+
+    def test_first_matching_state_rule_wins(self):
+        rules = RuleSet.from_sections('IF state = 0 AND COUNT(state=1) >= 2 THEN newState = 1\n'
+                                      'IF state = 1 THEN newState = 0\n'
+                                      'IF state = 1 THEN newState = 1')
+        states = np.array([0, 0, 1, 1])
+        counts = {1: np.array([2, 1, 0, 3])}
+        self.assertEqual(rules.next_states(states, counts).tolist(), [1, 0, 0, 0])
+        self.assertEqual(rules.state_counts, [1])
+
+    def test_rules_outside_state_range_are_rejected(self):
+        rules = RuleSet.from_sections('IF state = 0 THEN newState = 5\nIF COUNT(state=9) > 0 THEN newState = 1\n'
+                                      'IF state = 1 THEN newState = 0', states=2)
+        self.assertEqual(len(rules.state_rules), 1)
+        self.assertEqual(len(rules.errors), 2)
+
+    def test_deep_nesting_raises_instead_of_recursion_error(self):
+        for condition in ('NOT ' * 5000 + 'state = 1', '(' * 5000 + 'state = 1' + ')' * 5000,
+                          ' OR '.join(['state = 1'] * 500)):
+            with self.assertRaises(NestingError):
+                RuleSet.from_sections(f'IF {condition} THEN newState = 0')
+        self.assertEqual(len(RuleSet.from_sections('IF NOT NOT (state = 1) THEN newState = 0').state_rules), 1)
+
+    def test_topology_rule_completes_graph_within_caps(self):
+        automaton = DSLAutomaton(SparseGraph(6), self.COMPLETE)
+        automaton.step()
+        self.assertEqual(automaton.graph.edge_count(), 15)
+        for caps in ({'max_new_edges': 14}, {'max_edges': 14}):
+            with self.assertRaises(ValueError):
+                DSLAutomaton(SparseGraph(6), self.COMPLETE, **caps).step()
+
+    def test_stacked_batch_matches_single_runs(self):
+        graph = SparseGraph.random(200, 4, seed=3)
+        variants = ['STATE_RULES:\nIF state = 0 AND COUNT(state=1) >= 2 THEN newState = 1\n'
+                    'IF state = 1 AND COUNT(state=1) < 2 THEN newState = 0']
+        runs = batch_run(graph, variants, seeds=[1, 2], steps=4, record_every=2)
+        for run, seed in zip(runs, [1, 2]):
+            single = graph.copy()
+            single.states = np.random.default_rng(seed).integers(0, 2, graph.n)
+            automaton = DSLAutomaton(single, variants[0])
+            automaton.run(4)
+            self.assertEqual(run['history'][-1]['stateDist'],
+                             {int(s): int(c) for s, c in zip(*np.unique(single.states, return_counts=True))})
+            self.assertEqual([h['step'] for h in run['history']], [2, 4])
+
+    def test_view_runs_and_rejects_inputs_over_caps(self):
+        rules = 'STATE_RULES:\nIF state = 1 THEN newState = 0'
+        status, body = post(views.graph_sweep, {'vertices': 50, 'variants': [rules], 'seeds': [0, 1], 'steps': 3})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body['runs']), 2)
+        for data in (
+            {'vertices': views.SWEEP_MAX_VERTICES + 1},
+            {'meanDegree': views.SWEEP_MAX_MEAN_DEGREE + 1},
+            {'states': views.SWEEP_MAX_STATES + 1},
+            {'steps': views.SWEEP_MAX_STEPS + 1},
+            {'seeds': list(range(views.SWEEP_MAX_RUNS + 1))},
+            {'vertices': 3, 'initial': [0, 1, 2]},
+            {'vertices': 3, 'initial': [0, 1]},
+            {'variants': [{'stateRules': 'IF ' + '(' * 5000 + 'state = 1' + ')' * 5000 + ' THEN newState = 0'}]},
+            {'vertices': 2000, 'meanDegree': 1, 'variants': [{'topoRules': 'IF NOT EDGE(u,v) THEN add edge(u,v)'}]},
+        ):
+            status, _ = post(views.graph_sweep, {'variants': [rules], 'steps': 1, **data})
+            self.assertEqual(status, 400, data)
+
+
+# =============================================================================
+# user-033: минимизация ДКА
+# =============================================================================
+
+def moore_classes(table, accepting):
+    """Эталон: уточнение Мура до неподвижной точки"""
+    block = np.unique(accepting, return_inverse=True)[1].ravel()
+    while True:
+        signature = np.column_stack([block, block[table]])
+        refined = np.unique(signature, axis=0, return_inverse=True)[1].ravel()
+        if refined.max() == block.max():
+            return refined
+        block = refined
+
+
+class DFAMinimizeTests(SimpleTestCase):
+    # a: 0 -> 1 -> 2 -> 3 -> 0, принимаются 0 и 2: остаётся чётность длины
+    CYCLE = {'states': ['0', '1', '2', '3', 'x'], 'alphabet': ['a'], 'startState': '0',
+             'finalStates': ['0', '2'], 'transitions': {'0': {'a': '1'}, '1': {'a': '2'}, '2': {'a': '3'},
+                                                        '3': {'a': '0'}, 'x': {'a': '0'}}}
+
+    def test_hopcroft_matches_moore_refinement(self):
+        rng = np.random.default_rng(7)
+        for n, k in ((1, 1), (12, 2), (200, 3), (500, 2)):
+            table = rng.integers(0, n, (n, k))
+            accepting = rng.random(n) < 0.3
+            hopcroft = DFA(table, 0, accepting, list('abc')[:k]).equivalence_classes()
+            moore = moore_classes(table, accepting)
+            # Разбиения совпадают, если пары (класс Хопкрофта, класс Мура) взаимно однозначны
+            pairs = np.unique(np.column_stack([hopcroft, moore]), axis=0)
+            self.assertEqual(len(pairs), len(np.unique(hopcroft)))
+            self.assertEqual(len(pairs), len(np.unique(moore)))
+
+    def test_known_minimal_automaton(self):
+        dfa = DFA.from_json(self.CYCLE)
+        minimal, classes = dfa.minimize()
+        self.assertEqual(minimal.n, 2)
+        self.assertEqual(sorted(map(sorted, classes)), [['0', '2'], ['1', '3']])
+        for word in ('', 'a', 'aa', 'aaa', 'aaaa'):
+            self.assertEqual(minimal.accepts(word), len(word) % 2 == 0)
+        self.assertTrue(equivalent(dfa, minimal))
+
+    def test_partial_automaton_stays_partial(self):
+        dfa = DFA.from_json({'states': ['p', 'q', 'r'], 'alphabet': ['a', 'b'], 'startState': 'p',
+                             'finalStates': ['q', 'r'], 'transitions': {'p': {'a': 'q', 'b': 'r'}}})
+        minimal, _ = dfa.minimize()
+        self.assertEqual(minimal.n, 2)
+        self.assertFalse(minimal.is_complete)
+
+    def test_view_accepts_bodies_over_global_upload_limit(self):
+        padding = 'x' * (settings.DATA_UPLOAD_MAX_MEMORY_SIZE + 1)
+        status, body = post(views.dfa_minimize, {'dfa': self.CYCLE, 'compare': self.CYCLE, 'pad': padding})
+        self.assertEqual(status, 200)
+        self.assertEqual(body['stats'], {'original': 5, 'reachable': 4, 'minimal': 2})
+        self.assertEqual(body['unreachable'], ['x'])
+        self.assertTrue(body['equivalent'])
+
+    def test_view_rejects_oversized_and_broken_automata(self):
+        with mock.patch.object(views, 'DFA_MAX_BODY', 100):
+            status, body = post(views.dfa_minimize, {'dfa': self.CYCLE})
+        self.assertEqual(status, 400)
+        self.assertIn('100', body['error'])
+        broken = dict(self.CYCLE, transitions={'0': {'b': '1'}})
+        self.assertEqual(post(views.dfa_minimize, {'dfa': broken})[0], 400)
+        self.assertEqual(post(views.dfa_minimize, {'dfa': dict(self.CYCLE, startState='z')})[0], 400)
+
+
+# =============================================================================
+# user-034: построение подмножеств на битовых масках
+# =============================================================================
+
+def nth_from_end(n):
+    """НКА «n-й символ с конца - a» в формате nfa_simulator: ДКА из него - 2^n состояний"""
+    transitions = [['0,a', ['0', '1']], ['0,b', ['0']]]
+    transitions += [[f'{i},{c}', [str(i + 1)]] for i in range(1, n) for c in 'ab']
+    return {'states': [str(i) for i in range(n + 1)], 'alphabet': ['a', 'b'], 'transitions': transitions,
+            'startState': '0', 'acceptStates': [str(n)]}
+
+
+class NFADeterminizeTests(SimpleTestCase):
+    def test_subset_construction_blows_up_to_power_of_two(self):
+        nfa = NFA.from_json(nth_from_end(4))
+        dfa, subsets = nfa.determinize()
+        self.assertEqual(dfa.n, 16)
+        self.assertEqual(dfa.minimize()[0].n, 16)
+        for word in ('abbb', 'babbb', 'bbbb', 'aabba'):
+            self.assertEqual(dfa.accepts(word), word[-4] == 'a')
+            self.assertEqual(LazyDFA(nfa).accepts(word), word[-4] == 'a')
+        with self.assertRaises(BudgetExceeded):
+            nfa.determinize(max_states=15)
+
+    def test_epsilon_closure_in_export_format(self):
+        nfa = NFA.from_json({'alphabet': ['a'], 'states': [{'id': 'p', 'start': True}, {'id': 'q'},
+                                                           {'id': 'r', 'final': True}],
+                             'transitions': [{'from': 'p', 'to': 'q', 'epsilon': True},
+                                             {'from': 'q', 'to': 'r', 'symbols': ['a']}]})
+        self.assertEqual(bits(nfa.start_mask), [0, 1])
+        self.assertTrue(nfa.accepts('a'))
+        self.assertFalse(nfa.accepts('aa'))
+
+    def test_lazy_cache_evicts_least_recent(self):
+        lazy = LazyDFA(NFA.from_json(nth_from_end(3)), cache_size=2)
+        lazy.accepts('abababab')
+        self.assertEqual(lazy.stats()['cached'], 2)
+        self.assertGreater(lazy.stats()['evictions'], 0)
+
+    def test_view_clamps_state_and_cache_budgets(self):
+        data = {'nfa': nth_from_end(4), 'inputs': ['abbb', 'bbbb' * 10], 'maxStates': 10 ** 12, 'cacheSize': 10 ** 12}
+        with mock.patch.object(views, 'NFA_MAX_STATES', 8), mock.patch.object(views, 'NFA_MAX_CACHE', 2):
+            status, body = post(views.nfa_determinize, data)
+        self.assertEqual(status, 200)
+        self.assertIn('budgetExceeded', body)
+        self.assertEqual(body['results'], [True, False])
+        self.assertEqual(body['cache']['cached'], 2)
+        status, body = post(views.nfa_determinize, {'nfa': nth_from_end(2)})
+        self.assertEqual((status, len(body['dfa']['states'])), (200, 4))
+        self.assertEqual(post(views.nfa_determinize, {'nfa': nth_from_end(2), 'maxStates': 'many'})[0], 400)
+
+
+# =============================================================================
+# user-035: массовая проверка слов и сравнение автоматов
+# =============================================================================
+
+class AcceptanceTests(SimpleTestCase):
+    # Чётное число символов a
+    EVEN_A = {'states': ['e', 'o'], 'alphabet': ['a', 'b'], 'startState': 'e', 'finalStates': ['e'],
+              'transitions': {'e': {'a': 'o', 'b': 'e'}, 'o': {'a': 'e', 'b': 'o'}}}
+    # Все слова над {a, b}
+    ALL = {'states': ['s'], 'alphabet': ['a', 'b'], 'startState': 's', 'finalStates': ['s'],
+           'transitions': {'s': {'a': 's', 'b': 's'}}}
+
+    def test_batch_matches_single_word_runs(self):
+        dfa = DFA.from_json(self.EVEN_A)
+        rng = np.random.default_rng(0)
+        words = [''.join(rng.choice(list('abc'), rng.integers(0, 12))) for _ in range(500)]
+        expected = [dfa.accepts(w) for w in words]
+        self.assertEqual(CompiledDFA(dfa).accepts(words).tolist(), expected)
+        self.assertEqual(CompiledDFA(dfa).accepts([list(w) for w in words]).tolist(), expected)
+
+    def test_multi_character_symbols(self):
+        dfa = DFA.from_json({'states': ['p', 'q'], 'alphabet': ['go', 'stop'], 'startState': 'p',
+                             'finalStates': ['q'], 'transitions': {'p': {'go': 'q'}, 'q': {'stop': 'p'}}})
+        self.assertEqual(CompiledDFA(dfa).accepts([['go'], ['go', 'stop'], ['go', 'stop', 'go'], ['x']]).tolist(),
+                         [True, False, True, False])
+
+    def test_shortest_counterexample(self):
+        even, every = DFA.from_json(self.EVEN_A), DFA.from_json(self.ALL)
+        self.assertEqual(product_diff(even, every), 'a')
+        self.assertIsNone(product_diff(even, even.minimize()[0]))
+        self.assertEqual(bounded_diff(even, every, 2), [('a', False, True), ('ab', False, True), ('ba', False, True)])
+        with self.assertRaises(ValueError):
+            bounded_diff(even, every, 40)
+
+    def test_nfa_is_determinized_on_load(self):
+        dfa = load_automaton(dict(nth_from_end(3), epsilonTransitions=[]))
+        self.assertEqual(dfa.n, 8)
+        with self.assertRaises(BudgetExceeded):
+            load_automaton(dict(nth_from_end(3), epsilonTransitions=[]), max_states=7)
+
+    def test_view_checks_words_and_rejects_inputs_over_caps(self):
+        status, body = post(views.automaton_check, {'automaton': self.EVEN_A, 'inputsText': 'aa\nab\n\nbab',
+                                                    'reference': self.ALL, 'maxLength': 1})
+        self.assertEqual(status, 200)
+        self.assertEqual((body['results'], body['accepted']), ([True, False, True, False], 2))
+        self.assertEqual((body['equivalent'], body['counterexample']), (False, 'a'))
+        self.assertEqual(body['mismatches'], [{'word': 'a', 'automaton': False, 'reference': True}])
+        for data in ({'automaton': self.EVEN_A, 'reference': self.ALL, 'maxLength': 40},
+                     {'automaton': dict(nth_from_end(17), epsilonTransitions=[]), 'inputs': ['a']},
+                     {'inputs': ['a']}):
+            self.assertEqual(post(views.automaton_check, data)[0], 400, data)
+
+
+# =============================================================================
+# user-036: автоматы Мили и Мура
+# =============================================================================
+
+class TransducerTests(SimpleTestCase):
+    # Задержка на такт: выход - предыдущий входной символ (сначала 0)
+    DELAY = 'p,0 -> p,0\np,1 -> q,0\nq,0 -> p,1\nq,1 -> q,1'
+
+    def test_delay_machine_and_streaming_agree(self):
+        machine = MealyMachine.from_text(self.DELAY)
+        self.assertEqual(''.join(machine.transduce('0110')), '0011')
+        runner = machine.runner()
+        self.assertEqual(runner.feed('01') + runner.feed('10') + runner.finish(), ['0', '0', '1', '1'])
+        self.assertEqual((runner.steps, machine.names[runner.state]), (4, 'p'))
+        word = ''.join(np.random.default_rng(1).choice(['0', '1'], 5000))
+        target = io.StringIO()
+        runner = transduce_stream(machine, io.StringIO(word), target, chunk_size=7)
+        self.assertEqual(target.getvalue(), '0' + word[:-1])
+        self.assertEqual(runner.steps, len(word))
+        with self.assertRaises(ValueError):
+            machine.runner().feed('02')
+
+    def test_multichar_symbols_carry_over_chunks(self):
+        machine = MealyMachine.from_text('s,ab -> s,X\ns,cd -> s,YY')
+        runner = machine.runner()
+        self.assertEqual(runner.feed('ab,c') + runner.feed('d ab') + runner.finish(), ['X', 'YY', 'X'])
+        self.assertEqual(runner.steps, 3)
+
+    def test_mealy_moore_round_trip_keeps_outputs(self):
+        machine = MealyMachine.from_text(self.DELAY)
+        moore = machine.to_moore()
+        self.assertEqual(moore.n, 4)
+        back = MooreMachine.from_json(moore.to_json()).to_mealy()
+        for word in ('', '1', '0110', '111000101'):
+            self.assertEqual(moore.transduce(word), ['0'] + machine.transduce(word))
+            self.assertEqual(back.transduce(word), machine.transduce(word))
+
+    def test_minimize_merges_equivalent_states(self):
+        machine = MealyMachine.from_text('a,x -> b,0\nb,x -> c,1\nc,x -> b,1\nd,x -> d,0')
+        minimal, classes = machine.minimize()
+        self.assertEqual(minimal.n, 2)
+        self.assertEqual(classes, [['a'], ['b', 'c']])
+        self.assertEqual(minimal.transduce('xxxx'), machine.transduce('xxxx'))
+
+    def test_view_runs_converts_and_rejects_bad_input(self):
+        status, body = post(views.transducer_run, {'machine': {'rules': self.DELAY}, 'input': '0110',
+                                                   'minimize': True, 'convert': True})
+        self.assertEqual(status, 200)
+        self.assertEqual((body['output'], body['steps'], body['finalState']), ('0011', 4, 'p'))
+        self.assertEqual(len(body['converted']['states']), 4)
+        for data in ({'type': 'turing', 'machine': {'rules': self.DELAY}},
+                     {'machine': {'rules': 'p,0 -> p'}},
+                     {'machine': {'rules': self.DELAY}, 'input': '012'},
+                     {'type': 'moore', 'machine': {'states': []}}):
+            self.assertEqual(post(views.transducer_run, data)[0], 400, data)
+
+
+# =============================================================================
+# user-037: вероятностные автоматы и цепи Маркова
+# =============================================================================
+
+class MarkovTests(SimpleTestCase):
+    # Разорение игрока: 0 и 4 поглощают, из 1..3 шаг ±1 с вероятностью 1/2
+    RUIN = {'0': {'0': 1}, '1': {'0': 0.5, '2': 0.5}, '2': {'1': 0.5, '3': 0.5},
+            '3': {'2': 0.5, '4': 0.5}, '4': {'4': 1}}
+    # Монетка: из s по a с вероятностью 0.3 в f
+    COIN = {'states': [{'id': 's', 'isInitial': True}, {'id': 'f', 'isFinal': True}], 'alphabet': ['a'],
+            'transitionMatrices': {'a': {'s': {'s': 0.7, 'f': 0.3}, 'f': {'f': 1}}}}
+
+    def test_exact_absorption_of_gamblers_ruin(self):
+        chain = MarkovChain.from_json(self.RUIN)
+        steps, probabilities = chain.absorption()
+        self.assertEqual(len(chain.classes), 2)
+        np.testing.assert_allclose(steps, [3, 4, 3])
+        np.testing.assert_allclose(probabilities.sum(axis=1), 1)
+        np.testing.assert_allclose(sorted(probabilities[1]), [0.5, 0.5])
+
+    def test_stationary_distribution_of_two_state_chain(self):
+        chain = MarkovChain.from_json({'a': {'a': 0.9, 'b': 0.1}, 'b': {'a': 0.5, 'b': 0.5}})
+        self.assertTrue(chain.ergodic)
+        np.testing.assert_allclose(chain.stationary(), [5 / 6, 1 / 6])
+
+    def test_sampling_in_batches_matches_exact_numbers(self):
+        chain = MarkovChain.from_json(self.RUIN)
+        sample = chain.sample_absorption(walks=3 * SAMPLE_BATCH, seed=1)
+        self.assertEqual(sample['walks'], 3 * SAMPLE_BATCH)
+        self.assertAlmostEqual(sample['steps'], 2.0, delta=0.05)
+        self.assertEqual(sample['unfinished'], 0.0)
+        automaton = StochasticAutomaton.from_json(self.COIN)
+        self.assertAlmostEqual(automaton.acceptance('aa'), 1 - 0.7 ** 2)
+        sample = automaton.sample('aa', walks=2 * SAMPLE_BATCH + 5, seed=2)
+        self.assertAlmostEqual(sample['acceptance'], 0.51, delta=5 * sample['stderr'])
+
+    def test_time_limit_stops_between_batches(self):
+        chain = MarkovChain.from_json(self.RUIN)
+        sample = chain.sample_absorption(walks=10 * SAMPLE_BATCH, seed=1, time_limit=0)
+        self.assertEqual(sample['walks'], SAMPLE_BATCH)
+        sample = StochasticAutomaton.from_json(self.COIN).sample('a', walks=10 * SAMPLE_BATCH, time_limit=0)
+        self.assertEqual(sample['walks'], SAMPLE_BATCH)
+        self.assertAlmostEqual(chain.sample_absorption(walks=SAMPLE_BATCH, max_steps=0)['unfinished'], 0.6, delta=0.02)
+
+    def test_view_caps_walks_steps_and_word_length(self):
+        status, body = post(views.markov_analyze, {'automaton': self.COIN, 'words': ['a', 'aa'], 'walks': 1000})
+        self.assertEqual(status, 200)
+        np.testing.assert_allclose(body['acceptance'], [0.3, 0.51])
+        self.assertEqual(body['sample']['walks'], 1000)
+        with mock.patch.object(views, 'MARKOV_MAX_STEPS', 1):
+            status, body = post(views.markov_analyze, {'matrix': self.RUIN, 'walks': 1000, 'maxSteps': 10 ** 9})
+        self.assertEqual(status, 200)
+        self.assertGreater(body['chain']['sampledAbsorption']['unfinished'], 0.1)
+        for data in ({'matrix': self.RUIN, 'walks': views.MARKOV_MAX_WALKS + 1},
+                     {'automaton': self.COIN, 'words': ['a' * (views.MARKOV_MAX_WORD + 1)], 'walks': 10},
+                     {'matrix': {'a': {'b': 0.5}, 'b': {'b': 1}}}):
+            self.assertEqual(post(views.markov_analyze, data)[0], 400, data)
+
+
+# =============================================================================
+# user-038: многоленточная машина Тьюринга
+# =============================================================================
+
+class TuringMachineTests(SimpleTestCase):
+    # Копирование первой ленты на вторую (формат multitape_tm)
+    COPY = {'tapeCount': 2, 'states': ['q0', 'qf'], 'initialState': 'q0', 'finalStates': ['qf'],
+            'transitions': [{'from': 'q0', 'read': [a, '_'], 'to': 'q0', 'write': [a, a], 'move': ['R', 'R']}
+                            for a in '01'] + [
+                {'from': 'q0', 'read': ['_', '_'], 'to': 'qf', 'write': ['_', '_'], 'move': ['S', 'S']}],
+            'initialTapes': ['1101', '']}
+
+    def test_busy_beavers_match_known_counts(self):
+        results = {r['name']: r for r in benchmark()}
+        self.assertTrue(all(r['ok'] for r in results.values()), results)
+        self.assertEqual((results['bb5']['steps'], results['bb5']['ones']), (47_176_870, 4098))
+        self.assertLess(results['bb5']['macroSteps'], 100_000)
+        slow = benchmark(['bb4', 'bb2x3'], macro=False)
+        self.assertEqual([(r['steps'], r['ones'], r['macroSteps']) for r in slow], [(107, 13, 0), (38, 9, 0)])
+
+    def test_multitape_copy_and_loop_detection(self):
+        machine = TuringMachine.from_json(self.COPY)
+        result = machine.run(TuringMachine.tapes_from_json(self.COPY))
+        self.assertEqual((result['status'], result['accepted'], result['steps']), ('halted', True, 5))
+        self.assertEqual([''.join(t['symbols']) for t in result['tapes']], ['1101', '1101'])
+        result = TuringMachine.from_standard('1RA1RA').run()
+        self.assertEqual(result['status'], 'loop')
+
+    def test_budgets_stop_the_run(self):
+        machine = TuringMachine.from_standard(BENCHMARKS['bb5'][0])
+        self.assertEqual(machine.run(max_steps=1000)['status'], 'steps')
+        self.assertEqual(machine.run(macro=False, time_limit=0)['status'], 'time')
+        self.assertEqual(machine.run(max_memory=64)['status'], 'memory')
+        with self.assertRaises(ValueError):
+            TuringMachine.from_json(dict(self.COPY, tapeCount=MAX_TAPES + 1, transitions=[]))
+
+    def test_view_runs_machine_and_rejects_inputs_over_caps(self):
+        status, body = post(views.tm_run, {'machine': self.COPY})
+        self.assertEqual((status, body['status'], body['tapes'][1]['length']), (200, 'halted', 4))
+        status, body = post(views.tm_run, {'benchmark': ['bb5']})
+        self.assertEqual((status, body['benchmark'][0]['ok']), (200, True))
+        with mock.patch.object(views, 'TM_MAX_SECONDS', 0):
+            status, body = post(views.tm_run, {'benchmark': ['bb5'], 'macro': False, 'timeLimit': 10 ** 6})
+        self.assertEqual((status, body['benchmark'][0]['status']), (200, 'time'))
+        for data in ({'benchmark': ['bb2'] * (views.TM_MAX_BENCHMARKS + 1)},
+                     {'benchmark': ['bb6']},
+                     {'machine': dict(self.COPY, tapeCount=10 ** 9, transitions=[])}):
+            self.assertEqual(post(views.tm_run, data)[0], 400, data)
+
+
+# =============================================================================
+# user-039: поиск пути недетерминированной машины Тьюринга
+# =============================================================================
+
+def ntm_rule(state, symbol, action):
+    return {'from': state, 'symbol': symbol, 'action': action}
+
+
+class NTMExploreTests(SimpleTestCase):
+    # Угадывает слово из 0 и 1 и принимает, записав две единицы подряд
+    GUESS = {'states': 'q0,q1,acc', 'startState': 'q0', 'acceptStates': 'acc', 'alphabet': '0,1',
+             'transitions': [ntm_rule('q0', '_', 'q0,0,R'), ntm_rule('q0', '_', 'q1,1,R'),
+                             ntm_rule('q1', '_', 'q0,0,R'), ntm_rule('q1', '_', 'acc,1,R')]}
+    # Заменяет каждое a на a или b и останавливается на пустой клетке
+    REWRITE = {'states': 'q0', 'startState': 'q0', 'acceptStates': 'acc',
+               'transitions': [ntm_rule('q0', 'a', 'q0,a,R'), ntm_rule('q0', 'a', 'q0,b,R')]}
+    # Бесконечное двоичное дерево без принимающих состояний
+    ENDLESS = {'states': 'q0', 'startState': 'q0',
+               'transitions': [ntm_rule('q0', '_', 'q0,0,R'), ntm_rule('q0', '_', 'q0,1,R')]}
+
+    def test_both_strategies_find_shortest_accepting_path(self):
+        machine = NTM.from_json(self.GUESS)
+        for strategy in ('bfs', 'iddfs'):
+            result, _ = explore(machine, [], strategy, workers=1)
+            self.assertEqual(result['status'], 'accepted')
+            self.assertEqual(result['depth'], 2)
+            self.assertEqual(result['path'][-1]['tape'], ['1', '1'])
+            self.assertEqual([step['rule'] for step in result['path']], [-1, 1, 3])
+
+    def test_finite_tree_is_rejected_after_all_configs(self):
+        machine = NTM.from_json(self.REWRITE)
+        for strategy in ('bfs', 'iddfs'):
+            result, _ = explore(machine, list('aaa'), strategy, workers=1)
+            self.assertEqual((result['status'], result['configs'], result['depth']), ('rejected', 15, 3))
+
+    def test_budgets_stop_endless_tree(self):
+        machine = NTM.from_json(self.ENDLESS)
+        result, _ = explore(machine, [], 'bfs', max_configs=100, workers=1)
+        self.assertEqual((result['status'], result['configs']), ('configs', 100))
+        result, _ = explore(machine, [], 'bfs', max_depth=5, workers=1)
+        self.assertEqual((result['status'], result['configs']), ('depth', 63))
+        self.assertEqual(explore(machine, [], 'iddfs', max_depth=5)[0]['status'], 'depth')
+        self.assertEqual(explore(machine, [], 'bfs', time_limit=-1, workers=1)[0]['status'], 'time')
+
+    def test_process_pool_builds_same_tree(self):
+        machine = NTM.from_json(self.ENDLESS)
+        serial = explore(machine, [], 'bfs', max_depth=8, workers=1)[1].tree()
+        with mock.patch.object(ntm_engine, 'PARALLEL_MIN', 4), mock.patch.object(ntm_engine, 'BATCH', 3):
+            result, explorer = explore(machine, [], 'bfs', max_depth=8, workers=2)
+        self.assertEqual((result['status'], result['configs']), ('depth', 511))
+        for key, value in explorer.tree().items():
+            np.testing.assert_array_equal(value, serial[key])
+
+    def test_view_clamps_budgets_and_rejects_bad_input(self):
+        with mock.patch.object(views, 'explore', wraps=explore) as spy:
+            status, body = post(views.ntm_explore, dict(self.GUESS, maxConfigs=10 ** 12, timeLimit=10 ** 6,
+                                                        workers=10 ** 6))
+        self.assertEqual((status, body['status']), (200, 'accepted'))
+        self.assertEqual(len(body['tree']['parent']), body['configs'])
+        budgets = spy.call_args.kwargs
+        self.assertEqual(budgets['max_configs'], views.NTM_MAX_CONFIGS)
+        self.assertEqual(budgets['time_limit'], views.NTM_MAX_SECONDS)
+        self.assertEqual(budgets['workers'], os.cpu_count() or 1)
+        for data in (dict(self.GUESS, strategy='dfs'), dict(self.GUESS, maxConfigs='many'),
+                     {'transitions': [{'symbol': 'a', 'action': 'q0,a,R'}]}):
+            self.assertEqual(post(views.ntm_explore, data)[0], 400, data)
+
+
+# =============================================================================
+# user-040: байткод RAM-машины и машины Поста
+# =============================================================================
+
+class BytecodeTests(SimpleTestCase):
+    FACTORIAL = '\n'.join([
+        'READ', 'STORE [2]', 'LOAD 1', 'STORE [1]',
+        'loop:', 'LOAD [2]', 'JZ done', 'MULT [1]', 'STORE [1]', 'LOAD [2]', 'SUB 1', 'STORE [2]', 'JUMP loop',
+        'done:', 'LOAD [1]', 'WRITE', 'HALT',
+    ])
+    # Дописать метку справа от блока меток
+    SUCCESSOR = '? 2; 3\nV 4\n> 1\n!'
+
+    def test_factorial_fits_int64_up_to_twenty(self):
+        program = RAMProgram.from_text(self.FACTORIAL)
+        result = program.run([20])
+        self.assertEqual((result['status'], result['output']), ('halted', [2432902008176640000]))
+        self.assertEqual(result['steps'], 9 + 8 * 20)
+        self.assertEqual({row['text']: row['count'] for row in result['profile']}['MULT [1]'], 20)
+        result = program.run([21])
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('int64', result['error'])
+        with self.assertRaises(ValueError):
+            program.run([2 ** 63])
+
+    def test_budgets_stop_ram_loops(self):
+        loop = RAMProgram.from_text('loop:\nJUMP loop')
+        self.assertEqual(loop.run(max_steps=1000)['status'], 'budget')
+        result = loop.run(time_limit=-1)
+        self.assertEqual((result['status'], result['steps']), ('time', TIME_CHECK))
+        store = RAMProgram.from_text('LOAD 5\nSTORE [[1]]')
+        self.assertEqual(store.run(registers={1: 100}, max_registers=50)['status'], 'error')
+        self.assertEqual(store.run(registers={1: 49}, max_registers=50)['registers'], {0: 5, 1: 49, 49: 5})
+        with self.assertRaises(ValueError):
+            store.run(registers={50: 1}, max_registers=50)
+
+    def test_post_machine_appends_mark(self):
+        result = PostProgram.from_text(self.SUCCESSOR).run('111')
+        self.assertEqual((result['status'], result['steps'], result['marks']), ('halted', 9, [0, 1, 2, 3]))
+        self.assertEqual(PostProgram.from_text('> 1').run(max_steps=100)['status'], 'budget')
+        self.assertEqual(PostProgram.from_text('V 3').run()['status'], 'error')
+
+    def test_view_clamps_steps_and_rejects_bad_input(self):
+        status, body = post(views.program_run, {'program': self.FACTORIAL, 'input': '5'})
+        self.assertEqual((status, body['output']), (200, [120]))
+        with mock.patch.object(views, 'PROGRAM_MAX_STEPS', 5):
+            status, body = post(views.program_run, {'type': 'post', 'program': self.SUCCESSOR,
+                                                    'tape': '111', 'maxSteps': 10 ** 12})
+        self.assertEqual((status, body['status'], body['steps']), (200, 'budget', 5))
+        for data in ({'type': 'turing', 'program': 'HALT'},
+                     {'program': 'JUMP nowhere'},
+                     {'program': 'HALT', 'registers': {str(views.PROGRAM_MAX_REGISTERS): 1}},
+                     {'program': 'HALT', 'input': [2 ** 63]},
+                     {'type': 'post', 'program': 'V'}):
+            self.assertEqual(post(views.program_run, data)[0], 400, data)
+
+
+# =============================================================================
+# user-041: нормальные алгорифмы Маркова
+# =============================================================================
+
+def naive_normal(rules, text, max_steps):
+    """Исполнение как в MarkovEngine.js: indexOf по правилам на каждом шаге"""
+    steps = 0
+    while True:
+        for pattern, replacement, final in rules:
+            i = text.find(pattern)
+            if i >= 0:
+                break
+        else:
+            return text, 'halted'
+        if steps >= max_steps:
+            return text, 'steps'
+        text = text[:i] + replacement + text[i + len(pattern):]
+        steps += 1
+        if final:
+            return text, 'final'
+
+
+class NormalAlgorithmTests(SimpleTestCase):
+    # Двоичное число в унарное
+    BINARY = [('1', '0|', False), ('|0', '0||', False), ('0', '', False)]
+
+    def test_binary_to_unary(self):
+        result = NormalAlgorithm(self.BINARY).run('101')
+        self.assertEqual((result['status'], result['string'], result['steps']), ('halted', '|||||', 8))
+        self.assertEqual(result['applied'], [2, 3, 3])
+
+    def test_sorting_takes_one_step_per_inversion(self):
+        word = ''.join(np.random.default_rng(1).choice(['a', 'b'], 300))
+        inversions = sum(word[i + 1:].count('a') for i, c in enumerate(word) if c == 'b')
+        result = NormalAlgorithm([('ba', 'ab', False)]).run(word)
+        self.assertEqual(result['steps'], inversions)
+        self.assertEqual(result['string'], ''.join(sorted(word)))
+        self.assertEqual(result['rescans'], 1)
+
+    def test_windowed_scan_matches_naive_execution(self):
+        rng = np.random.default_rng(2)
+        for _ in range(200):
+            rules = [(''.join(rng.choice(['a', 'b', 'c'], rng.integers(0, 4))),
+                      ''.join(rng.choice(['a', 'b', 'c'], rng.integers(0, 4))), bool(rng.random() < 0.1))
+                     for _ in range(rng.integers(1, 5))]
+            text = ''.join(rng.choice(['a', 'b', 'c'], rng.integers(0, 20)))
+            result = NormalAlgorithm(rules).run(text, max_steps=200)
+            self.assertEqual((result['string'], result['status']), naive_normal(rules, text, 200), (rules, text))
+
+    def test_budgets_stop_growing_string(self):
+        grow = NormalAlgorithm([('a', 'aa', False)])
+        result = grow.run('a', max_length=100)
+        self.assertEqual((result['status'], result['length']), ('length', 100))
+        self.assertEqual(grow.run('a', max_steps=7)['status'], 'steps')
+        self.assertEqual(grow.run('a', time_limit=-1)['status'], 'time')
+        self.assertEqual(NormalAlgorithm([('', 'x', False)]).run('', max_steps=5)['string'], 'xxxxx')
+
+    def test_view_clamps_budgets_and_rejects_bad_input(self):
+        rules = [{'pattern': p, 'replacement': r, 'isFinal': f} for p, r, f in self.BINARY]
+        status, body = post(views.normal_run, {'rules': rules, 'inputString': '110', 'trace': 2})
+        self.assertEqual((status, body['string'], len(body['trace'])), (200, '|' * 6, 2))
+        grow = {'rules': [{'pattern': 'a', 'replacement': 'aa'}], 'inputString': 'a', 'maxLength': 10 ** 12}
+        with mock.patch.object(views, 'NORMAL_MAX_LENGTH', 50):
+            status, body = post(views.normal_run, grow)
+        self.assertEqual((status, body['status'], body['length']), (200, 'length', 50))
+        with mock.patch.object(views, 'NORMAL_STRING_OUTPUT', 10):
+            status, body = post(views.normal_run, dict(grow, maxLength=100))
+        self.assertEqual((len(body['string']), body['length']), (10, 100))
+        for data in ({'rules': []}, {'rules': [{'replacement': 'a'}]}, dict(grow, maxSteps='many')):
+            self.assertEqual(post(views.normal_run, data)[0], 400, data)
+
+
+# =============================================================================
+# user-042: рекурсивные функции и гёделевы номера
+# =============================================================================
+
+class RecursiveFunctionTests(SimpleTestCase):
+    def test_library_functions_give_known_values(self):
+        program = Program('', library=True)
+        for name, args, value in (('ack', (2, 3), 9), ('ack', (3, 3), 61), ('fact', (6,), 720),
+                                  ('primepi', (30,), 10), ('isqrt', (99,), 9), ('monus', (3, 5), 0),
+                                  ('fib', (90,), 2880067194370816120), ('branch', (20, 20), 137846528820)):
+            result = program.evaluate(name, args)
+            self.assertEqual((result['status'], result['value']), ('done', value), name)
+
+    def test_memo_limit_bounds_tables(self):
+        result = Program('', library=True, memo_limit=0).evaluate('fib', (20,))
+        # Без таблиц наивная рекурсия: 2 fib(21) - 2 вызова
+        self.assertEqual((result['value'], result['calls'], result['hits']), (6765, 2 * 10946 - 2, 0))
+        program = Program('', library=True, memo_limit=2)
+        self.assertEqual(program.evaluate('fib', (20,))['value'], 6765)
+        self.assertEqual(len(program.functions[program.index['fib']].memo), 2)
+
+    def test_budgets_and_undefined_values(self):
+        self.assertEqual(Program('', library=True).evaluate('ack', (3, 3), max_steps=100)['status'], 'steps')
+        self.assertEqual(Program('', library=True).evaluate('ack', (3, 5), max_depth=10)['status'], 'depth')
+        self.assertEqual(Program('', library=True).evaluate('ack', (3, 8), time_limit=-1)['status'], 'time')
+        self.assertEqual(Program('never = M(C(1))').evaluate('never', (), max_steps=1000)['status'], 'steps')
+        self.assertEqual(Program('f(0) = 1').evaluate('f', (1,))['status'], 'undefined')
+        with self.assertRaises(ValueError):
+            Program('', library=True).evaluate('ack', (1,))
+
+    def test_godel_numbers_round_trip(self):
+        self.assertEqual(encode([0, 1, 2]), 2 * 3 ** 2 * 5 ** 3)
+        self.assertEqual(decode(encode([5, 0, 0, 7])), [5, 0, 0, 7])
+        text = 'add = R(I(1,1), S(I(3,3)))'
+        self.assertEqual(godel_text(godel_number(text)), text)
+        with self.assertRaises(ValueError):
+            decode(2 * 5)
+        with self.assertRaises(ValueError):
+            encode([10 ** 6], max_digits=4000)
+
+    def test_view_rejects_numbers_over_caps(self):
+        status, body = post(views.recursive_evaluate, {'library': True, 'function': 'fib', 'args': [90],
+                                                       'encode': [1, 2], 'decode': '2250'})
+        self.assertEqual(status, 200)
+        self.assertEqual((body['value'], body['encoded'], body['decoded']), ('2880067194370816120', '108', [0, 1, 2]))
+        with mock.patch.object(views, 'RECURSIVE_MAX_STEPS', 100):
+            status, body = post(views.recursive_evaluate, {'library': True, 'function': 'ack', 'args': [3, 3],
+                                                           'maxSteps': 10 ** 12})
+        self.assertEqual((status, body['status']), (200, 'steps'))
+        for data in ({'encode': [0] * (views.RECURSIVE_MAX_ENCODE + 1)},
+                     {'encode': [views.RECURSIVE_MAX_DIGITS * 4]},
+                     {'decode': '1' * (views.RECURSIVE_MAX_DIGITS + 1)},
+                     {'function': 'ack', 'args': [1, 1]},
+                     {'program': 'f = Q(Z)', 'function': 'f', 'args': []}):
+            self.assertEqual(post(views.recursive_evaluate, data)[0], 400, data)
+
+
+# =============================================================================
+# user-043: анализ сетей Петри
+# =============================================================================
+
+def petri_switches(k, back=False, tokens=1):
+    """Сохранение лабы: k независимых переключателей a_i -> b_i (и обратно при back)"""
+    positions, arcs, transitions = {}, {}, []
+    for i in range(k):
+        positions[f'a{i}'] = {'name': f'a{i}', 'tokens': tokens}
+        positions[f'b{i}'] = {'name': f'b{i}', 'tokens': 0}
+        for name, source, target in [(f't{i}', f'a{i}', f'b{i}')] + ([(f'u{i}', f'b{i}', f'a{i}')] if back else []):
+            arcs[f'{name}in'] = {'positionId': source}
+            arcs[f'{name}out'] = {'positionId': target}
+            transitions.append({'id': name, 'input': [f'{name}in'], 'output': [f'{name}out']})
+    return {'positions': positions, 'arcs': arcs, 'transitions': transitions}
+
+
+class PetriTests(SimpleTestCase):
+    def test_independent_transitions_give_full_cube(self):
+        report, graph = PetriNet.from_json(petri_switches(8)).reachability()
+        self.assertEqual((report['markings'], report['edges'], report['levels']), (256, 1024, 9))
+        self.assertEqual((report['deadlocks'], len(report['deadlockPath'])), (1, 8))
+        self.assertTrue(report['safe'])
+        self.assertFalse(report['live'])
+        self.assertEqual(len(graph['src']), 1024)
+
+    def test_stubborn_sets_keep_deadlock_with_fewer_markings(self):
+        report, _ = PetriNet.from_json(petri_switches(8)).reachability(reduce=True)
+        self.assertEqual((report['markings'], report['deadlocks']), (9, 1))
+        self.assertEqual(report['deadlockPath'], [f't{i}' for i in range(8)])
+        self.assertNotIn('bounded', report)
+
+    def test_reversible_net_is_live(self):
+        report, _ = PetriNet.from_json(petri_switches(6, back=True)).reachability()
+        self.assertEqual((report['markings'], report['deadlocks'], report['bottomComponents']), (64, 0, 1))
+        self.assertTrue(report['live'] and report['reversible'])
+        report, _ = PetriNet.from_json(petri_switches(2, tokens=3)).reachability()
+        self.assertEqual((report['markings'], report['bounds']['a0'], report['safe']), (16, 3, False))
+
+    def test_unbounded_net_needs_coverability(self):
+        source = PetriNet([[0]], [[1]], [[0]], [0], ['p'], ['t'])
+        report, _ = source.reachability(max_markings=100)
+        self.assertEqual((report['markings'], report['complete'], report['bounded']), (100, False, None))
+        report = source.coverability()
+        self.assertEqual((report['complete'], report['bounded'], report['unbounded']), (True, False, ['p']))
+        # Ингибитор: gen срабатывает, пока в p меньше двух фишек
+        capped = PetriNet([[0], [1]], [[1], [0]], [[2], [0]], [0], ['p'], ['gen', 'drop'])
+        report, _ = capped.reachability()
+        self.assertEqual((report['markings'], report['bounds']), (3, {'p': 2}))
+        self.assertEqual(report['liveness'], {'gen': 'live', 'drop': 'live'})
+
+    def test_view_clamps_budgets_and_rejects_bad_input(self):
+        status, body = post(views.petri_analyze, {'network': petri_switches(4), 'reduce': True})
+        self.assertEqual((status, body['markings'], body['deadlocks']), (200, 5, 1))
+        with mock.patch.object(views, 'PETRI_MAX_MARKINGS', 10):
+            status, body = post(views.petri_analyze, {'network': petri_switches(4), 'maxMarkings': 10 ** 12})
+        self.assertEqual((status, body['markings'], body['complete']), (200, 11, False))
+        with mock.patch.object(views, 'PETRI_MAX_NODES', 5):
+            status, body = post(views.petri_analyze, {'network': petri_switches(4), 'mode': 'coverability',
+                                                      'maxNodes': 10 ** 12})
+        self.assertEqual((status, body['nodes'], body['complete']), (200, 5, False))
+        broken = petri_switches(1)
+        broken['arcs']['t0in']['positionId'] = 'missing'
+        for data in ({'network': petri_switches(1), 'mode': 'unfolding'}, {'network': broken},
+                     {'network': petri_switches(1), 'maxMarkings': 'many'}, {'mode': 'reachability'}):
+            self.assertEqual(post(views.petri_analyze, data)[0], 400, data)
+
+
+# =============================================================================
+# user-044: событийная модель бильярдного компьютера
+# =============================================================================
+
+class BilliardTests(SimpleTestCase):
+    def test_head_on_collision_swaps_velocities(self):
+        scene = Scene()
+        scene.add_ball(0, 0, 1, 0)
+        scene.add_ball(10, 0, -1, 0)
+        simulator = Simulator(scene)
+        report = simulator.run(until=10)
+        self.assertEqual((report['status'], report['events']), ('until', 1))
+        _, state = simulator.positions()
+        np.testing.assert_allclose(state, [[-2, 0, -1, 0], [12, 0, 1, 0]])
+
+    def test_gas_in_box_keeps_energy(self):
+        rng = np.random.default_rng(1)
+        scene = Scene(bounds=(0, 0, 100, 100))
+        for _ in range(200):
+            scene.add_ball(*rng.uniform(5, 95, 2), *rng.normal(0, 1, 2), r=0.5)
+        simulator = Simulator(scene)
+        energy = simulator.energy()
+        report = simulator.run(until=50)
+        self.assertEqual(report['status'], 'until')
+        self.assertGreater(report['events'], 1000)
+        self.assertAlmostEqual(simulator.energy(), energy)
+        self.assertEqual(Simulator(scene).run(until=50, max_events=100)['status'], 'events')
+
+    def test_bbm_examples_compute_their_gates(self):
+        table = Circuit(BBM_EXAMPLES['interaction']).truth_table()
+        self.assertEqual([row['outputs'] for row in table], [
+            {'AB': 0, 'BA': 0, 'A_notB': 0, 'B_notA': 0}, {'AB': 0, 'BA': 0, 'A_notB': 0, 'B_notA': 1},
+            {'AB': 0, 'BA': 0, 'A_notB': 1, 'B_notA': 0}, {'AB': 1, 'BA': 1, 'A_notB': 0, 'B_notA': 0}])
+        self.assertEqual([row['outputs']['NOT_A'] for row in Circuit(BBM_EXAMPLES['not']).truth_table()], [1, 0])
+        self.assertEqual([row['outputs']['ABC'] for row in Circuit(BBM_EXAMPLES['and3']).truth_table()],
+                         [0] * 7 + [1])
+        with self.assertRaises(ValueError):
+            Circuit(BBM_EXAMPLES['interaction']).evaluate({'A': 1, 'B': 1}, max_events=1)
+
+    def test_view_runs_scene_and_rejects_bad_input(self):
+        scene = {'balls': [{'x': 100, 'y': 100, 'vx': 50, 'vy': 0}, {'x': 300, 'y': 100, 'vx': -50, 'vy': 0}]}
+        status, body = post(views.billiard_simulate, {'scene': scene, 'until': 4, 'frames': 4})
+        self.assertEqual(status, 200)
+        self.assertEqual((len(body['frames']), body['energy']), (4, 2500.0))
+        self.assertEqual(body['frames'][-1]['balls'], [['b1', 84.0, 100.0], ['b2', 316.0, 100.0]])
+        status, body = post(views.billiard_simulate, {'layout': BBM_EXAMPLES['not'], 'values': {'A': 0}})
+        self.assertEqual((status, list(body['fired'])), (200, ['NOT_A']))
+        wide = '\n'.join(f'input I{i} {i} 0 ne' for i in range(views.BILLIARD_MAX_INPUTS + 1)) + '\noutput X 50 50 ne'
+        for data in ({'layout': wide}, {'layout': 'input A 0 0 ne'}, {'layout': 'gate G 0 0'},
+                     {'layout': BBM_EXAMPLES['interaction'], 'values': {'A': 1, 'B': 1}, 'maxEvents': 1},
+                     {'scene': {'balls': [{'x': 0, 'y': 0, 'vx': 1, 'vy': 0, 'r': 0}]}}):
+            self.assertEqual(post(views.billiard_simulate, data)[0], 400, data)
+
+
+# =============================================================================
+# user-045: статевекторный симулятор
+# =============================================================================
+
+class QuantumMidCircuitMeasureTests(SimpleTestCase):
+    # H(0), измерение q0, X(1), CNOT 0->1, измерение q1: q1 = NOT q0
+    LAYERS = [
+        [{"type": "H", "targets": [0]}],
+        [{"type": "MEASURE", "targets": [0]}],
+        [{"type": "X", "targets": [1]}],
+        [{"type": "CNOT", "control": 0, "targets": [1]}],
+        [{"type": "MEASURE", "targets": [1]}],
+    ]
+
+    def test_register_has_only_measured_qubits(self):
+        result, _ = QuantumCircuit(2, self.LAYERS).run(shots=200, seed=1)
+        self.assertEqual(result["register"], [0, 1])
+        self.assertEqual(set(result["counts"]), {"01", "10"})
+        self.assertEqual(sum(result["counts"].values()), 200)
+
+    def test_view_serializes_mid_circuit_run(self):
+        body = json.dumps({"circuit": {"qubits": 2, "layers": self.LAYERS}, "shots": 50, "seed": 1})
+        response = views.quantum_run(RequestFactory().post('/', body, content_type='application/json'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["register"], [0, 1])
+
+
+class StatevectorTests(SimpleTestCase):
+    def test_presets_give_known_distributions(self):
+        result, _ = QuantumCircuit.from_json(ghz_circuit(5)).run(shots=1000, seed=1)
+        self.assertEqual(set(result['counts']), {'00000', '11111'})
+        self.assertAlmostEqual(result['norm'], 1)
+        # Две итерации Гровера на 3 кубитах: 121/128 на отмеченном состоянии
+        result, _ = QuantumCircuit.from_json(grover_circuit(3, ['101'])).run()
+        self.assertAlmostEqual(result['probabilities'][0b101], 121 / 128)
+        result, _ = QuantumCircuit.from_json(qft_circuit(3, 0)).run()
+        np.testing.assert_allclose(result['probabilities'], [1 / 8] * 8)
+
+    def test_state_over_memory_limit_is_rejected_before_allocation(self):
+        self.assertEqual(Statevector(20).dtype, np.complex128)
+        self.assertEqual(Statevector(20, memory_limit=28 << 20).dtype, np.complex64)
+        with self.assertRaises(ValueError):
+            Statevector(30)
+        with self.assertRaises(ValueError):
+            QuantumCircuit(QUANTUM_MAX_QUBITS + 1, [])
+
+    def test_view_clamps_shots_and_rejects_bad_input(self):
+        with mock.patch.object(views, 'QUANTUM_MAX_SHOTS', 10):
+            status, body = post(views.quantum_run, {'preset': 'ghz', 'n': 3, 'shots': 10 ** 9, 'seed': 1})
+        self.assertEqual((status, body['shots']), (200, 10))
+        status, body = post(views.quantum_run, {'preset': 'grover', 'n': 3, 'marked': ['101'], 'shots': 0,
+                                                'precision': 'single'})
+        self.assertEqual((status, body['dtype'], body['amplitudes'][0]['basis']), (200, 'complex64', '101'))
+        for data in ({'preset': 'ghz', 'n': 30}, {'preset': 'ghz', 'n': QUANTUM_MAX_QUBITS + 1},
+                     {'preset': 'teleport-ish'}, {'preset': 'ghz', 'precision': 'half'},
+                     {'circuit': {'qubits': 2, 'layers': [[{'type': 'CNOT', 'control': 0, 'targets': [5]}]]}}):
+            self.assertEqual(post(views.quantum_run, data)[0], 400, data)
+
+
+# =============================================================================
+# user-046: шумное исполнение квантовых схем
+# =============================================================================
+
+class NoiseTests(SimpleTestCase):
+    X = {'qubits': 1, 'layers': [[{'type': 'X', 'targets': [0]}]]}
+
+    def test_single_qubit_channels_match_closed_forms(self):
+        # После X деполяризация возвращает 0 только через X или Y: 2p/3
+        distribution = simulate_noise(self.X, NoiseModel(depolarizing=0.3))['distribution']
+        self.assertAlmostEqual(distribution['1'], 1 - 2 * 0.3 / 3)
+        distribution = simulate_noise(self.X, NoiseModel(amplitude_damping=0.25))['distribution']
+        self.assertAlmostEqual(distribution['1'], 0.75)
+        distribution = simulate_noise({'qubits': 1, 'layers': []}, NoiseModel(readout=[0.1, 0.2]))['distribution']
+        self.assertAlmostEqual(distribution['1'], 0.1)
+        with self.assertRaises(ValueError):
+            NoiseModel(depolarizing=1.5)
+
+    def test_density_matrix_purity_and_fidelity(self):
+        result = simulate_noise(ghz_circuit(3), NoiseModel())
+        self.assertEqual(result['mode'], 'density')
+        self.assertEqual(set(result['distribution']), {'000', '111'})
+        self.assertAlmostEqual(result['distribution']['000'], 0.5)
+        self.assertAlmostEqual(result['purity'], 1)
+        self.assertAlmostEqual(result['fidelity'], 1)
+        result = simulate_noise(ghz_circuit(3), NoiseModel(depolarizing=0.05))
+        self.assertLess(result['purity'], 0.7)
+        self.assertAlmostEqual(sum(result['distribution'].values()), 1)
+
+    def test_trajectories_do_not_depend_on_workers(self):
+        noise = NoiseModel(depolarizing=0.05)
+        exact = simulate_noise(ghz_circuit(3), noise)
+        runs = [simulate_noise(ghz_circuit(3), noise, mode='trajectories', trajectories=64, shots=2000, seed=5,
+                               workers=workers) for workers in (1, 2)]
+        self.assertEqual(runs[0]['counts'], runs[1]['counts'])
+        self.assertEqual((runs[0]['trajectories'], sum(runs[0]['counts'].values())), (64, 2000))
+        self.assertAlmostEqual(runs[0]['fidelity'], exact['fidelity'], delta=0.05)
+
+    def test_view_clamps_trajectories_and_rejects_bad_input(self):
+        with mock.patch.object(views, 'NOISE_MAX_TRAJECTORIES', 3):
+            status, body = post(views.quantum_noise, {'preset': 'ghz', 'n': 3, 'mode': 'trajectories',
+                                                      'trajectories': 10 ** 9, 'shots': 30, 'seed': 1})
+        self.assertEqual((status, body['trajectories']), (200, 3))
+        status, body = post(views.quantum_noise, {'circuit': self.X, 'noise': {'amplitudeDamping': 0.25}})
+        self.assertEqual((status, body['mode']), (200, 'density'))
+        self.assertAlmostEqual(body['distribution']['1'], 0.75)
+        middle = {'qubits': 2, 'layers': QuantumMidCircuitMeasureTests.LAYERS}
+        for data in ({'circuit': self.X, 'noise': {'depolarizing': 1.5}}, {'circuit': self.X, 'mode': 'exact'},
+                     {'circuit': middle, 'mode': 'density'}, {'circuit': self.X, 'trajectories': 'many'}):
+            self.assertEqual(post(views.quantum_noise, data)[0], 400, data)
+
+
+# =============================================================================
+# user-047: искусственная жизнь
+# =============================================================================
+
+class AlifeTests(SimpleTestCase):
+    def test_world_starts_from_lab_config(self):
+        stats = AlifeWorld(seed=1).stats()
+        self.assertEqual((stats['herbivores'], stats['predators'], stats['obstacles']), (15, 8, 10))
+        self.assertLessEqual(stats['food'], 80)
+        self.assertLessEqual(stats['poison'], 8)
+
+    def test_seeded_runs_repeat_and_respect_limits(self):
+        a, b = AlifeWorld(seed=5), AlifeWorld(seed=5)
+        result = a.run(120, every=60)
+        self.assertEqual(result, dict(b.run(120, every=60), elapsed=result['elapsed'],
+                                      stepsPerSecond=result['stepsPerSecond']))
+        self.assertEqual([h['frame'] for h in result['history']], [60, 120])
+        limits = DEFAULTS['limits']
+        self.assertLessEqual(a.n, a.capacity)
+        self.assertLessEqual(result['stats']['herbivores'], limits['herbivores'] + limits['herbivoreBirths'])
+
+    def test_config_counts_are_bounded(self):
+        with self.assertRaises(ValueError):
+            merge_config({'unknown': 1})
+        for config in ({'food': {'maxCount': ALIFE_MAX + 1}}, {'food': {'maxCount': -1}},
+                       {'obstacles': {'count': ALIFE_MAX + 1}}, {'poison': {'count': ALIFE_MAX + 1}}):
+            with self.assertRaises(ValueError):
+                AlifeWorld(config)
+        self.assertEqual(AlifeWorld({'food': {'maxCount': 0}}, seed=1).stats()['food'], 0)
+
+    def test_view_runs_and_rejects_inputs_over_caps(self):
+        status, body = post(views.alife_run, {'steps': 10, 'every': 5, 'seed': 1, 'snapshot': 3})
+        self.assertEqual((status, body['steps'], len(body['snapshot']['agents']['x'])), (200, 10, 3))
+        with mock.patch.object(views, 'ALIFE_MAX_CAPACITY', 1000):
+            for data in ({'config': {'food': {'maxCount': 1001}}},
+                         {'config': {'limits': {'herbivores': 2000}}}):
+                self.assertEqual(post(views.alife_run, {'steps': 1, **data})[0], 400, data)
+        self.assertEqual(post(views.alife_run, {'config': {'food': {'maxCount': 10 ** 12}}})[0], 400)
+        self.assertEqual(post(views.alife_run, {'config': {'canvas': 5}})[0], 400)
+
+
+# =============================================================================
+# user-048: обучаемая нейронная машина Тьюринга
+# =============================================================================
+
+class NeuralTMTests(SimpleTestCase):
+    def small_model(self):
+        return NeuralTM(5, 4, hidden=6, memory=5, width=3, seed=1)
+
+    def test_addressing_by_content_and_by_location(self):
+        memory = np.eye(5)[None, :, :4] + 0.01
+        w_prev = np.eye(5)[None, 0]
+        key, beta, gamma = memory[:, 3], np.array([[50.0]]), np.array([[1.0]])
+        # Только по содержимому: ключ равен строке 3
+        w, _ = neural_tm_address(memory, w_prev, key, beta, np.ones((1, 1)), np.array([[0, 1, 0]]), gamma)
+        self.assertEqual(int(w.argmax()), 3)
+        self.assertGreater(w[0, 3], 0.9)
+        # Только по положению: прошлые веса, сдвинутые на +1
+        w, _ = neural_tm_address(memory, w_prev, key, beta, np.zeros((1, 1)), np.array([[0, 0, 1]]), gamma)
+        np.testing.assert_allclose(w[0], [0, 1, 0, 0, 0], atol=1e-6)
+
+    def test_backward_matches_finite_differences(self):
+        model = self.small_model()
+        inputs, targets, mask = neural_tm_batch('copy', np.random.default_rng(0), 2, max_len=3, width=4)
+        logits, caches, _ = model.forward(inputs)
+        grads = model.backward(caches, NeuralTM.loss(logits, targets, mask)[1])
+        rng = np.random.default_rng(3)
+        for name, value in model.params.items():
+            for _ in range(3):
+                index = tuple(int(rng.integers(0, size)) for size in value.shape)
+                old = value[index]
+                # Почти пустая память делает потери сильно искривлёнными - шаг мелкий
+                value[index] = old + 1e-7
+                plus = NeuralTM.loss(model.forward(inputs)[0], targets, mask)[0]
+                value[index] = old - 1e-7
+                minus = NeuralTM.loss(model.forward(inputs)[0], targets, mask)[0]
+                value[index] = old
+                self.assertAlmostEqual(grads[name][index], (plus - minus) / 2e-7,
+                                       delta=1e-3 * abs(grads[name][index]) + 1e-8, msg=name)
+
+    def test_training_lowers_loss_and_checkpoint_round_trips(self):
+        model = NeuralTM(9, 8, hidden=20, memory=16, width=8, seed=0)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'copy.npz')
+            report = neural_tm_train(model, 'copy', 120, batch=8, seed=0, log_every=40,
+                                     checkpoint=path, task_options={'max_len': 3})
+            losses = [record['loss'] for record in report['history']]
+            self.assertEqual(len(losses), 3)
+            self.assertLess(losses[-1], losses[0])
+            loaded, optimizer, meta = NeuralTM.load(path)
+        self.assertEqual((optimizer.step, meta['task'], meta['taskOptions']), (120, 'copy', {'max_len': 3}))
+        inputs = neural_tm_batch('copy', np.random.default_rng(1), 1, max_len=3)[0]
+        np.testing.assert_allclose(loaded.forward(inputs)[0], model.forward(inputs)[0])
+
+    def test_view_validates_checkpoint_name_and_sizes(self):
+        model = self.small_model()
+        with tempfile.TemporaryDirectory() as folder:
+            model.save(os.path.join(folder, 'copy.npz'), meta={'task': 'copy', 'taskOptions': {'width': 4}})
+            with mock.patch.object(views, 'NEURAL_TM_CHECKPOINTS', folder), \
+                    mock.patch.dict(views._neural_tm_models, clear=True):
+                status, body = post(views.neural_tm_run, {'checkpoint': 'copy', 'seed': 1,
+                                                          'taskOptions': {'min_len': 3, 'max_len': 3}})
+                self.assertEqual((status, len(body['outputs']), len(body['reads'][0][0])), (200, 7, 5))
+                self.assertIn('bitErrors', body)
+                for data in ({'checkpoint': '../copy'}, {'checkpoint': '.copy'}, {'checkpoint': 'recall'},
+                             {'checkpoint': ''}, {'checkpoint': 'copy', 'inputs': [[0, 1]]},
+                             {'checkpoint': 'copy', 'taskOptions': {'max_len': views.NEURAL_TM_MAX_STEPS + 1}}):
+                    self.assertEqual(post(views.neural_tm_run, data)[0], 400, data)
+
+
+# =============================================================================
+# user-049: статический сервер лабы neural_tm
+# =============================================================================
+
+def load_serve():
+    """serve.py лежит в static, вне пакета - модуль грузится по пути"""
+    path = settings.BASE_DIR / 'static/labs/intelligent_systems/neural_tm/serve.py'
+    spec = importlib.util.spec_from_file_location('neural_tm_serve', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class NeuralTMServeTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.serve = load_serve()
+        cls.folder = tempfile.TemporaryDirectory()
+        with open(os.path.join(cls.folder.name, 'app.js'), 'w') as f:
+            f.write('console.log(1);\n' * 500)
+        with open(os.path.join(cls.folder.name, 'tiny.css'), 'w') as f:
+            f.write('body {}\n')
+        cls.servers = {}
+        for dev in (False, True):
+            handler = type('Handler', (cls.serve.CachingHandler,), {'dev': dev, 'log_message': lambda *a: None})
+            server = http.server.ThreadingHTTPServer(
+                ('127.0.0.1', 0), functools.partial(handler, directory=cls.folder.name))
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            cls.servers[dev] = server
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in cls.servers.values():
+            server.shutdown()
+            server.server_close()
+        cls.folder.cleanup()
+        super().tearDownClass()
+
+    def get(self, path, headers=None, dev=False):
+        connection = http.client.HTTPConnection('127.0.0.1', self.servers[dev].server_address[1])
+        connection.request('GET', path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_text_is_gzipped_only_when_accepted(self):
+        response, body = self.get('/app.js', {'Accept-Encoding': 'br, gzip;q=0.5'})
+        self.assertEqual((response.status, response.getheader('Content-Encoding')), (200, 'gzip'))
+        self.assertEqual(gzip.decompress(body), b'console.log(1);\n' * 500)
+        self.assertEqual(response.getheader('Vary'), 'Accept-Encoding')
+        for headers in ({}, {'Accept-Encoding': 'gzip;q=0'}, {'Accept-Encoding': 'identity'}):
+            response, body = self.get('/app.js', headers)
+            self.assertIsNone(response.getheader('Content-Encoding'), headers)
+            self.assertEqual(len(body), 16 * 500)
+        response, _ = self.get('/tiny.css', {'Accept-Encoding': 'gzip'})
+        self.assertIsNone(response.getheader('Content-Encoding'))
+
+    def test_conditional_requests_get_304(self):
+        response, _ = self.get('/app.js')
+        etag, modified = response.getheader('ETag'), response.getheader('Last-Modified')
+        self.assertEqual(response.getheader('Cache-Control'), 'no-cache')
+        for headers in ({'If-None-Match': etag}, {'If-None-Match': f'"x", W/{etag}'}, {'If-None-Match': '*'},
+                        {'If-Modified-Since': modified}):
+            response, body = self.get('/app.js', headers)
+            self.assertEqual((response.status, body), (304, b''), headers)
+        # If-None-Match важнее If-Modified-Since; ETag сжатой версии другой
+        for headers in ({'If-None-Match': '"other"', 'If-Modified-Since': modified},
+                        {'If-None-Match': etag, 'Accept-Encoding': 'gzip'},
+                        {'If-Modified-Since': 'not a date'}):
+            self.assertEqual(self.get('/app.js', headers)[0].status, 200, headers)
+
+    def test_dev_mode_disables_caching(self):
+        response, body = self.get('/app.js', {'Accept-Encoding': 'gzip'}, dev=True)
+        self.assertEqual(response.status, 200)
+        self.assertIn('no-store', response.getheader('Cache-Control'))
+        self.assertIsNone(response.getheader('ETag'))
+        self.assertEqual(len(body), 16 * 500)
+
+    def test_busy_port_is_skipped(self):
+        self.assertTrue(self.serve.address_in_use(OSError(errno.EADDRINUSE, 'busy')))
+        self.assertFalse(self.serve.address_in_use(OSError(errno.EACCES, 'denied')))
+        busy = self.servers[False].server_address[1]
+        server, port = self.serve.pick_server('127.0.0.1', busy, http.server.BaseHTTPRequestHandler, tries=5)
+        server.server_close()
+        self.assertNotEqual(port, busy)
+
+
+# =============================================================================
+# user-050: потоковые L-системы
+# =============================================================================
+
+def naive_rewrite(axiom, rules, iterations):
+    """Раскрытие как в LSystem.js: строка итерации целиком"""
+    for _ in range(iterations):
+        axiom = ''.join(rules.get(ch, ch) for ch in axiom)
+    return axiom
+
+
+def naive_turtle(text, angle, step):
+    """Parser.js по символу: отрезки x0 y0 x1 y1 depth"""
+    x, y, heading, stack, out = 0.0, 0.0, -90.0, [], []
+    for ch in text:
+        if ch in 'FGA01f':
+            nx = x + step * math.cos(math.radians(heading))
+            ny = y + step * math.sin(math.radians(heading))
+            if ch != 'f':
+                out.append((x, y, nx, ny, len(stack)))
+            x, y = nx, ny
+        elif ch in '+-|':
+            heading += {'+': angle, '-': -angle, '|': 180.0}[ch]
+        elif ch == '[':
+            stack.append((x, y, heading))
+        elif ch == ']' and stack:
+            x, y, heading = stack.pop()
+    return np.array(out).reshape(-1, 5)
+
+
+class LSystemTests(SimpleTestCase):
+    PLANT = {'X': 'F+[[X]-X]-F[-FX]+X', 'F': 'FF'}
+    KOCH = {'F': 'F+F-F-F+F'}
+
+    def test_lazy_expansion_matches_full_rewrite(self):
+        cases = (('X', self.PLANT, 5), ('F', self.KOCH, 4), ('F', {}, 3), ('AB', self.PLANT, 0))
+        for axiom, rules, iterations in cases:
+            system = LSystem(axiom, rules, iterations)
+            text = naive_rewrite(axiom, rules, iterations)
+            self.assertEqual(system.string(), text)
+            self.assertEqual(system.count(LSYSTEM_DRAW), sum(text.count(c) for c in LSYSTEM_DRAW))
+        self.assertEqual(LSystem('F', 'F -> F+F-F-F+F', 30).count('F'), 5 ** 30)
+
+    def test_stochastic_rules_are_seeded(self):
+        rules = {'F': 'F[+F]F [30%] | F[-F] [70%]'}
+        first = LSystem('F', rules, 4, seed=7).string()
+        self.assertEqual(LSystem('F', rules, 4, seed=7).string(), first)
+        self.assertAlmostEqual(LSystem('F', rules, 1).count('F'), 0.3 * 3 + 0.7 * 2)
+        with self.assertRaises(ValueError):
+            LSystem('F', {'FF': 'F'})
+
+    def test_vector_turtle_matches_naive_in_chunks(self):
+        rng = np.random.default_rng(4)
+        for _ in range(50):
+            text = ''.join(rng.choice(list('FFGf+-|[]'), 400))
+            turtle = Turtle(angle=30, step=1)
+            cuts = np.sort(rng.integers(0, len(text), 5))
+            pieces = [turtle.feed(text[a:b]) for a, b in zip([0, *cuts], [*cuts, len(text)])]
+            np.testing.assert_allclose(np.concatenate(pieces), naive_turtle(text, 30, 1), atol=1e-3)
+        # Квадратная кривая Коха: каждое F сдвигает на 3 шага по курсу
+        turtle = Turtle(angle=90, step=1)
+        for chunk in lsystem_stream(LSystem('F', self.KOCH, 5), turtle, chunk=100):
+            pass
+        np.testing.assert_allclose(turtle.position[:2], [0, -3 ** 5], atol=1e-6)
+        self.assertEqual(turtle.segments, 5 ** 5)
+
+    def test_stream_stops_at_segment_budget(self):
+        turtle = Turtle()
+        chunks = list(lsystem_stream(LSystem('X', self.PLANT, 7), turtle, chunk=64, max_segments=1000))
+        self.assertEqual(sum(len(c) for c in chunks), 1000)
+        self.assertTrue(turtle.truncated)
+        with self.assertRaises(ValueError):
+            Turtle(mode='4d')
+
+    def test_view_streams_records_and_rejects_over_caps(self):
+        response = views.lsystem_segments(RequestFactory().post(
+            '/', json.dumps({'axiom': 'F', 'rules': 'F -> F+F-F-F+F', 'iterations': 3, 'angle': 90}),
+            content_type='application/json'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response['X-LSystem-Stride'], response['X-LSystem-Segments']), ('5', '125'))
+        records = np.frombuffer(b''.join(response.streaming_content), '<f4').reshape(-1, 5)
+        np.testing.assert_allclose(records, naive_turtle(naive_rewrite('F', self.KOCH, 3), 90, 10), atol=1e-3)
+        with mock.patch.object(views, 'LSYSTEM_MAX_SEGMENTS', 10):
+            response = views.lsystem_segments(RequestFactory().post(
+                '/', json.dumps({'axiom': 'F', 'rules': self.KOCH, 'iterations': 3, 'maxSegments': 10 ** 9}),
+                content_type='application/json'))
+        self.assertEqual(len(b''.join(response.streaming_content)), 10 * 5 * 4)
+        for data in ({'iterations': views.LSYSTEM_MAX_ITERATIONS + 1},
+                     {'axiom': 'F' * (views.LSYSTEM_MAX_RULE_LENGTH + 1)},
+                     {'rules': 'F -> ' + 'F' * views.LSYSTEM_MAX_RULE_LENGTH},
+                     {'mode': '4d'}, {'rules': {'FF': 'F'}}, {'axiom': ''}):
+            self.assertEqual(post(views.lsystem_segments, data)[0], 400, data)
@@ -3,9 +3,29 @@ import subprocess
 import os
 
 from django.shortcuts import render
-from django.http import JsonResponse, Http404
+from django.http import JsonResponse, Http404, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
+from .engines.acceptance import CompiledDFA, bounded_diff, load_automaton, product_diff
+from .engines.alife import World as AlifeWorld
+from .engines.automata import DFA, equivalent
+from .engines.billiard import Circuit, Scene, Simulator
+from .engines.bytecode import PostProgram, RAMProgram
+from .engines.graph import SparseGraph
+from .engines.graph_dsl import RuleSet, batch_run
+from .engines.lsystem import DRAW_SYMBOLS, LSystem, Turtle, stream as lsystem_stream
+from .engines.markov import MarkovChain, StochasticAutomaton
+from .engines.neural_tm import NTM as NeuralTM, inference as neural_tm_inference
+from .engines.nfa import NFA, LazyDFA, BudgetExceeded, bits
+from .engines.noise import NoiseModel, simulate as simulate_noise
+from .engines.normal_algorithm import NormalAlgorithm
+from .engines.ntm import NTM, explore, parse_tape
+from .engines.petri import PetriNet
+from .engines.quantum import PRESETS as QUANTUM_PRESETS, QuantumCircuit, ghz_circuit, grover_circuit, qft_circuit
+from .engines.recursive import Program, decode, encode, godel_number
+from .engines.transducer import MealyMachine, MooreMachine
+from .engines.turing import TuringMachine, benchmark
+
 
 # Реестр лабораторных работ по разделам
 LABS_REGISTRY = {
@@ -433,3 +453,867 @@ def lab_detail(request, section, lab):
     })
 
 
+# ===== ВЫЧИСЛИТЕЛЬНЫЕ ДВИЖКИ (API) =====
+SWEEP_MAX_RUNS = 256
+SWEEP_MAX_STEPS = 10000
+SWEEP_MAX_VERTICES = 100_000
+SWEEP_MAX_MEAN_DEGREE = 50
+SWEEP_MAX_STATES = 256
+SWEEP_MAX_NEW_EDGES = 1_000_000
+SWEEP_MAX_EDGES = 5_000_000
+
+
+@csrf_exempt
+def graph_sweep(request):
+    """Пакетный прогон правил graph_automata для графиков аналитики"""
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+
+        states = int(data.get('states', 2))
+        if states > SWEEP_MAX_STATES:
+            return JsonResponse({"error": f"Больше {SWEEP_MAX_STATES} состояний"}, status=400)
+        if data.get('graph'):
+            graph = SparseGraph.from_json(data['graph'])
+        else:
+            vertices, mean_degree = int(data.get('vertices', 100)), float(data.get('meanDegree', 4))
+            if vertices > SWEEP_MAX_VERTICES or mean_degree > SWEEP_MAX_MEAN_DEGREE:
+                return JsonResponse({"error": f"Граф больше {SWEEP_MAX_VERTICES} вершин "
+                                              f"или средней степени {SWEEP_MAX_MEAN_DEGREE}"}, status=400)
+            graph = SparseGraph.random(vertices, mean_degree, seed=data.get('graphSeed'))
+        if graph.n > SWEEP_MAX_VERTICES:
+            return JsonResponse({"error": f"Граф больше {SWEEP_MAX_VERTICES} вершин"}, status=400)
+
+        variants = []
+        for variant in data.get('variants') or []:
+            if isinstance(variant, dict):
+                variants.append(RuleSet.from_sections(
+                    variant.get('stateRules', ''), variant.get('topoRules', ''), states=states))
+            else:
+                variants.append(RuleSet(str(variant), states=states))
+        seeds = [int(s) for s in data.get('seeds', [0])]
+        steps = int(data.get('steps', 100))
+
+        if not variants:
+            return JsonResponse({"error": "Нет вариантов правил"}, status=400)
+        if len(variants) * len(seeds) > SWEEP_MAX_RUNS or steps > SWEEP_MAX_STEPS:
+            return JsonResponse({"error": "Слишком большой прогон"}, status=400)
+
+        results = batch_run(
+            graph, variants, seeds=seeds, steps=steps,
+            states=states, initial=data.get('initial'),
+            record_every=int(data.get('recordEvery', 1)),
+            max_new_edges=SWEEP_MAX_NEW_EDGES, max_edges=SWEEP_MAX_EDGES,
+        )
+        return JsonResponse({"runs": results})
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+# JSON автоматов на 10^5 состояний весит десятки мегабайт: больше
+# DATA_UPLOAD_MAX_MEMORY_SIZE, поэтому тело читается в обход request.body
+DFA_MAX_BODY = 64 * 1024 * 1024
+
+
+def _read_body(request, limit):
+    """Тело запроса не длиннее limit байт; None, если оно больше"""
+    if int(request.META.get('CONTENT_LENGTH') or 0) > limit:
+        return None
+    body = request.read(limit + 1)
+    return body if len(body) <= limit else None
+
+
+@csrf_exempt
+def dfa_minimize(request):
+    """Минимизация ДКА (Хопкрофт) в JSON-формате лабы dfa_minimization"""
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        body = _read_body(request, DFA_MAX_BODY)
+        if body is None:
+            return JsonResponse({"error": f"Тело запроса больше {DFA_MAX_BODY} байт"}, status=400)
+        data = json.loads(body.decode('utf-8'))
+        dfa = DFA.from_json(data.get('dfa', data))
+        reachable = dfa.reachable()
+        minimal, classes = dfa.minimize()
+
+        result = {
+            "minimized": minimal.to_json(),
+            "classes": {name: members for name, members in zip(minimal.names, classes)},
+            "unreachable": [name for name, seen in zip(dfa.names, reachable) if not seen],
+            "stats": {
+                "original": dfa.n,
+                "reachable": int(reachable.sum()),
+                "minimal": minimal.n,
+            },
+        }
+        if data.get('compare'):
+            result["equivalent"] = equivalent(dfa, DFA.from_json(data['compare']))
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверный автомат: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+NFA_MAX_STATES = 100_000
+NFA_MAX_CACHE = 65_536
+
+
+@csrf_exempt
+def nfa_determinize(request):
+    """
+    Построение подмножеств для НКА (форматы nfa_to_dfa и nfa_simulator).
+
+    При превышении maxStates ДКА не строится, но входы из inputs всё
+    равно проверяются ленивым ДКА.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        nfa = NFA.from_json(data.get('nfa', data))
+        result = {}
+
+        try:
+            dfa, subsets = nfa.determinize(max_states=min(int(data.get('maxStates', 10000)), NFA_MAX_STATES))
+            result["dfa"] = dfa.to_json()
+            result["subsets"] = {name: [nfa.names[q] for q in bits(mask)]
+                                 for name, mask in zip(dfa.names, subsets)}
+        except BudgetExceeded as e:
+            result["budgetExceeded"] = str(e)
+
+        if 'inputs' in data:
+            lazy = LazyDFA(nfa, cache_size=min(int(data.get('cacheSize', 4096)), NFA_MAX_CACHE))
+            result["results"] = [lazy.accepts(word) for word in data['inputs']]
+            result["cache"] = lazy.stats()
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверный автомат: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+@csrf_exempt
+def automaton_check(request):
+    """
+    Массовая проверка слов и сравнение с эталонным автоматом.
+
+    inputs - список слов (или inputsText - слова по строкам); reference -
+    эталон, с которым автомат сравнивается через произведение и, если
+    задан maxLength, перебором всех слов до этой длины.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        automaton = load_automaton(data['automaton'])
+        result = {}
+
+        words = data.get('inputs')
+        if words is None and 'inputsText' in data:
+            words = data['inputsText'].splitlines()
+        if words is not None:
+            accepted = CompiledDFA(automaton).accepts(words)
+            result["results"] = accepted.tolist()
+            result["accepted"] = int(accepted.sum())
+
+        if data.get('reference'):
+            reference = load_automaton(data['reference'])
+            counterexample = product_diff(automaton, reference)
+            result["equivalent"] = counterexample is None
+            result["counterexample"] = counterexample
+            if 'maxLength' in data:
+                result["mismatches"] = [
+                    {"word": word, "automaton": a, "reference": b}
+                    for word, a, b in bounded_diff(automaton, reference, int(data['maxLength']),
+                                                   limit=int(data.get('limit', 10)))
+                ]
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+@csrf_exempt
+def transducer_run(request):
+    """
+    Прогон автомата Мили (rules - текст правил mealy_machine) или Мура
+    (JSON moore_machine) на длинном входе, преобразование и минимизация.
+
+    type - 'mealy' или 'moore'; input - входная строка; convert=true
+    возвращает эквивалентный автомат другого типа, minimize=true -
+    минимальный автомат того же типа.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        kind = data.get('type', 'mealy')
+        if kind == 'mealy':
+            machine = MealyMachine.from_json(data['machine'])
+        elif kind == 'moore':
+            machine = MooreMachine.from_json(data['machine'])
+        else:
+            raise ValueError(f"Неизвестный тип автомата: {kind}")
+        result = {"states": machine.n}
+
+        if 'input' in data:
+            runner = machine.runner()
+            symbols = machine.initial_output() + runner.feed(data['input']) + runner.finish()
+            separator = '' if all(len(b) == 1 for b in machine.outputs) else ','
+            result["output"] = separator.join(symbols)
+            result["steps"] = runner.steps
+            result["finalState"] = machine.names[runner.state]
+        if data.get('minimize'):
+            minimal, classes = machine.minimize()
+            result["minimized"] = minimal.to_json()
+            result["classes"] = classes
+        if data.get('convert'):
+            other = machine.to_moore(data.get('initialOutput')) if kind == 'mealy' else machine.to_mealy()
+            result["converted"] = other.to_json()
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+MARKOV_MAX_WALKS = 1_000_000
+MARKOV_MAX_STEPS = 100_000
+MARKOV_MAX_WORD = 10_000
+MARKOV_MAX_SECONDS = 30
+
+
+@csrf_exempt
+def markov_analyze(request):
+    """
+    Точный анализ вероятностного автомата (toJSON лабы probabilistic_automata)
+    или цепи {from: {to: p}}: вероятности принятия слов, классы состояний,
+    стационарное распределение и время поглощения; walks > 0 добавляет
+    оценки Монте-Карло для сравнения.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        walks = int(data.get('walks', 0))
+        if not 0 <= walks <= MARKOV_MAX_WALKS:
+            raise ValueError(f"walks должно быть от 0 до {MARKOV_MAX_WALKS}")
+        max_steps = min(int(data.get('maxSteps', 10000)), MARKOV_MAX_STEPS)
+        time_limit = min(float(data.get('timeLimit', MARKOV_MAX_SECONDS)), MARKOV_MAX_SECONDS)
+        seed = data.get('seed')
+        result = {}
+
+        if 'automaton' in data:
+            automaton = StochasticAutomaton.from_json(data['automaton'])
+            words = data.get('words') or []
+            result["acceptance"] = automaton.acceptance_many(words).tolist()
+            if walks and words:
+                if len(words[0]) > MARKOV_MAX_WORD:
+                    return JsonResponse({"error": f"Слово для Монте-Карло длиннее {MARKOV_MAX_WORD} символов"},
+                                        status=400)
+                sample = automaton.sample(words[0], walks=walks, seed=seed, time_limit=time_limit)
+                result["sample"] = {
+                    "word": words[0],
+                    "acceptance": sample['acceptance'],
+                    "stderr": sample['stderr'],
+                    "blocked": sample['blocked'],
+                    "walks": sample['walks'],
+                }
+            chain = automaton.chain(data.get('weights'))
+        else:
+            chain = MarkovChain.from_json(data['matrix'])
+
+        result["chain"] = chain.summary(data.get('method', 'auto'))
+        if walks and chain.transient.size:
+            sample = chain.sample_absorption(walks=walks, max_steps=max_steps, seed=seed, time_limit=time_limit)
+            result["chain"]["sampledAbsorption"] = {
+                "steps": sample['steps'],
+                "classes": sample['classes'].tolist(),
+                "unfinished": sample['unfinished'],
+                "walks": sample['walks'],
+            }
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+TM_MAX_STEPS = 100_000_000
+TM_MAX_MEMORY = 256 * 1024 * 1024
+TM_MAX_SECONDS = 60
+TM_MAX_BENCHMARKS = 16
+TM_TAPE_OUTPUT = 10000
+
+
+@csrf_exempt
+def tm_run(request):
+    """
+    Прогон многоленточной машины Тьюринга (multitape_tm, universal_tm или
+    стандартная запись) с бюджетами шагов и памяти; benchmark - список
+    эталонных машин (или true - все) вместо machine.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        # Эталонам по умолчанию даётся весь бюджет: bb5 делает 47 млн шагов
+        default_steps = TM_MAX_STEPS if data.get('benchmark') else 10_000_000
+        max_steps = min(int(data.get('maxSteps', default_steps)), TM_MAX_STEPS)
+        time_limit = min(float(data.get('timeLimit', TM_MAX_SECONDS)), TM_MAX_SECONDS)
+        macro = bool(data.get('macro', True))
+
+        if data.get('benchmark'):
+            names = data['benchmark'] if isinstance(data['benchmark'], list) else None
+            if names is not None and len(names) > TM_MAX_BENCHMARKS:
+                return JsonResponse({"error": f"Больше {TM_MAX_BENCHMARKS} эталонных машин"}, status=400)
+            return JsonResponse({"benchmark": benchmark(names, macro=macro, max_steps=max_steps,
+                                                        time_limit=time_limit)})
+
+        machine = TuringMachine.from_json(data['machine'])
+        tapes = data.get('tapes', TuringMachine.tapes_from_json(data['machine']))
+        result = machine.run(tapes, max_steps=max_steps, macro=macro, time_limit=time_limit,
+                             max_memory=min(int(data.get('maxMemory', TM_MAX_MEMORY)), TM_MAX_MEMORY))
+        # Длинные ленты отдаются началом, полная длина - отдельно
+        for tape in result['tapes']:
+            tape['length'] = len(tape['symbols'])
+            tape['symbols'] = tape['symbols'][:TM_TAPE_OUTPUT]
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+NTM_MAX_CONFIGS = 5_000_000
+NTM_MAX_SECONDS = 60
+NTM_TREE_OUTPUT = 20000
+
+
+@csrf_exempt
+def ntm_explore(request):
+    """
+    Поиск принимающего пути недетерминированной машины (экспорт лабы
+    nondeterministic_tm): strategy bfs или iddfs, бюджеты конфигураций,
+    глубины и времени; дерево - массивы parent/rule/state.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        machine = NTM.from_json(data)
+        tape = data.get('tape', '')
+        tape = parse_tape(tape) if isinstance(tape, str) else tape
+        max_depth = data.get('maxDepth')
+        result, explorer = explore(
+            machine, tape, data.get('strategy', 'bfs'),
+            max_configs=min(int(data.get('maxConfigs', 1_000_000)), NTM_MAX_CONFIGS),
+            max_depth=None if max_depth is None else int(max_depth),
+            time_limit=min(float(data.get('timeLimit', NTM_MAX_SECONDS)), NTM_MAX_SECONDS),
+            workers=None if data.get('workers') is None else max(1, min(int(data['workers']), os.cpu_count() or 1)),
+        )
+        if data.get('tree', True):
+            tree = explorer.tree(NTM_TREE_OUTPUT)
+            result["tree"] = {key: value.tolist() for key, value in tree.items()}
+            result["tree"]["states"] = machine.states
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+PROGRAM_MAX_STEPS = 50_000_000
+PROGRAM_MAX_REGISTERS = 1 << 20
+PROGRAM_MAX_SECONDS = 60
+
+
+@csrf_exempt
+def program_run(request):
+    """
+    Прогон программы RAM-машины (type=ram, input - числа) или машины Поста
+    (type=post, tape - отмеченные ячейки или строка 0/1) с бюджетами шагов,
+    регистров и времени и профилем исполнений по строкам.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        max_steps = min(int(data.get('maxSteps', 1_000_000)), PROGRAM_MAX_STEPS)
+        time_limit = min(float(data.get('timeLimit', PROGRAM_MAX_SECONDS)), PROGRAM_MAX_SECONDS)
+        kind = data.get('type', 'ram')
+        if kind == 'ram':
+            inputs = data.get('input', [])
+            if isinstance(inputs, str):
+                inputs = inputs.split()
+            program = RAMProgram.from_text(data['program'])
+            result = program.run(inputs, max_steps=max_steps, registers=data.get('registers'),
+                                 max_registers=PROGRAM_MAX_REGISTERS, time_limit=time_limit)
+        elif kind == 'post':
+            program = PostProgram.from_text(data['program'])
+            result = program.run(data.get('tape', ()), position=int(data.get('position', 0)),
+                                 max_steps=max_steps, time_limit=time_limit)
+        else:
+            return JsonResponse({"error": f"Неизвестный тип машины: {kind}"}, status=400)
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+NORMAL_MAX_STEPS = 50_000_000
+NORMAL_MAX_LENGTH = 10_000_000
+NORMAL_MAX_SECONDS = 60
+NORMAL_STRING_OUTPUT = 10000
+
+
+@csrf_exempt
+def normal_run(request):
+    """
+    Исполнение нормального алгорифма Маркова (экспорт лабы
+    markov_algorithms) с бюджетами шагов, длины строки и времени;
+    trace - сколько первых шагов вернуть.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        algorithm = NormalAlgorithm.from_json(data)
+        result = algorithm.run(
+            data.get('inputString', ''),
+            max_steps=min(int(data.get('maxSteps', 1_000_000)), NORMAL_MAX_STEPS),
+            max_length=min(int(data.get('maxLength', NORMAL_MAX_LENGTH)), NORMAL_MAX_LENGTH),
+            time_limit=min(float(data.get('timeLimit', NORMAL_MAX_SECONDS)), NORMAL_MAX_SECONDS),
+            trace=min(int(data.get('trace', 0)), 10000),
+        )
+        # Длинная строка отдаётся началом, полная длина - в length
+        result["string"] = result["string"][:NORMAL_STRING_OUTPUT]
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+RECURSIVE_MAX_STEPS = 200_000_000
+RECURSIVE_MAX_SECONDS = 60
+RECURSIVE_MAX_ENCODE = 1000
+# Номера отдаются строкой, а int -> str в Python ограничен 4300 цифрами
+RECURSIVE_MAX_DIGITS = 4000
+
+
+@csrf_exempt
+def recursive_evaluate(request):
+    """
+    Вычисление рекурсивной функции: program - определения (library -
+    добавить библиотеку примеров), function и args. Гёделевы номера
+    отдаются строками: godel - номер текста программы, encode - номер
+    последовательности, decode - последовательность по номеру.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        result = {}
+        if 'encode' in data:
+            if len(data['encode']) > RECURSIVE_MAX_ENCODE:
+                raise ValueError(f"Больше {RECURSIVE_MAX_ENCODE} чисел для кодирования")
+            result["encoded"] = str(encode(data['encode'], max_digits=RECURSIVE_MAX_DIGITS))
+        if 'decode' in data:
+            if len(str(data['decode'])) > RECURSIVE_MAX_DIGITS:
+                raise ValueError(f"Номер длиннее {RECURSIVE_MAX_DIGITS} цифр")
+            result["decoded"] = decode(int(data['decode']))
+        if 'function' in data:
+            program = Program(data.get('program', ''), library=bool(data.get('library', False)))
+            evaluation = program.evaluate(
+                data['function'], data.get('args', []),
+                max_steps=min(int(data.get('maxSteps', 10_000_000)), RECURSIVE_MAX_STEPS),
+                time_limit=min(float(data.get('timeLimit', RECURSIVE_MAX_SECONDS)), RECURSIVE_MAX_SECONDS),
+            )
+            # Большие значения JSON-клиенты теряют - отдаются строкой
+            if evaluation['value'] is not None:
+                evaluation['value'] = str(evaluation['value'])
+            result.update(evaluation)
+        if data.get('godel'):
+            result["godel"] = str(godel_number(data.get('program', '')))
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+PETRI_MAX_MARKINGS = 5_000_000
+PETRI_MAX_NODES = 200_000
+PETRI_MAX_SECONDS = 120
+
+
+@csrf_exempt
+def petri_analyze(request):
+    """
+    Анализ сети Петри из сохранения лабы (network): mode = reachability
+    (граф достижимости, reduce - редукция упрямыми множествами, только
+    тупики) или coverability (дерево Карпа-Миллера).
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        net = PetriNet.from_json(data['network'])
+        time_limit = min(float(data.get('timeLimit', PETRI_MAX_SECONDS)), PETRI_MAX_SECONDS)
+        mode = data.get('mode', 'reachability')
+        if mode == 'reachability':
+            result, _ = net.reachability(
+                max_markings=min(int(data.get('maxMarkings', 1_000_000)), PETRI_MAX_MARKINGS),
+                reduce=bool(data.get('reduce', False)),
+                time_limit=time_limit,
+            )
+        elif mode == 'coverability':
+            result = net.coverability(
+                max_nodes=min(int(data.get('maxNodes', 50_000)), PETRI_MAX_NODES),
+                time_limit=time_limit,
+            )
+        else:
+            raise ValueError(f"Неизвестный режим: {mode}")
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+BILLIARD_MAX_EVENTS = 20_000_000
+BILLIARD_MAX_SECONDS = 60
+BILLIARD_MAX_FRAMES = 2000
+BILLIARD_MAX_INPUTS = 10
+
+
+@csrf_exempt
+def billiard_simulate(request):
+    """
+    Событийная модель бильярдного компьютера. layout - схема BBM: без
+    values отдаётся таблица истинности, с values - сработавшие детекторы.
+    scene - пресет лабы (inputs - выбранные входы): моделирование до until
+    и frames снимков положений шаров через равные промежутки.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        time_limit = min(float(data.get('timeLimit', BILLIARD_MAX_SECONDS)), BILLIARD_MAX_SECONDS)
+        max_events = min(int(data.get('maxEvents', 1_000_000)), BILLIARD_MAX_EVENTS)
+        if 'layout' in data:
+            circuit = Circuit(data['layout'])
+            until = float(data['until']) if 'until' in data else None
+            if 'values' in data:
+                fired = circuit.evaluate(data['values'], until, max_events=max_events, time_limit=time_limit)
+                return JsonResponse({"fired": fired})
+            table = circuit.truth_table(until, max_events=max_events, time_limit=time_limit,
+                                        max_inputs=BILLIARD_MAX_INPUTS)
+            return JsonResponse({"inputs": circuit.names, "table": table})
+
+        simulator = Simulator(Scene.from_lab(data['scene'], data.get('inputs')))
+        until = float(data.get('until', 10))
+        frames = min(int(data.get('frames', 0)), BILLIARD_MAX_FRAMES)
+        snapshots = []
+        for k in range(1, frames + 1):
+            report = simulator.run(until=until * k / frames, max_events=max_events, time_limit=time_limit)
+            alive, state = simulator.positions()
+            snapshots.append({
+                "t": simulator.now,
+                "balls": [[simulator.labels[i], round(x, 3), round(y, 3)]
+                          for i, (x, y) in zip(alive.tolist(), state[:, :2].tolist())],
+            })
+            if report["status"] in ('events', 'time'):
+                break
+        report = simulator.run(until=until, max_events=max_events, time_limit=time_limit)
+        report["frames"] = snapshots
+        report["energy"] = simulator.energy()
+        return JsonResponse(report)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+QUANTUM_MAX_SHOTS = 1_000_000
+QUANTUM_MAX_SECONDS = 120
+QUANTUM_PRECISION = {'auto': None, 'double': 'complex128', 'single': 'complex64'}
+
+
+def _quantum_circuit(data):
+    """Схема из запроса: circuit или пресет с параметрами"""
+    if 'circuit' in data:
+        return data['circuit']
+    preset = data.get('preset', 'bell')
+    n = int(data.get('n', 2))
+    if preset == 'grover':
+        return grover_circuit(n, data.get('marked', ['1' * n]))
+    if preset == 'ghz':
+        return ghz_circuit(n)
+    if preset == 'qft':
+        return qft_circuit(n, int(data.get('initial', 0)))
+    if preset in QUANTUM_PRESETS:
+        return QUANTUM_PRESETS[preset]()
+    raise ValueError(f"Неизвестный пресет: {preset}")
+
+
+@csrf_exempt
+def quantum_run(request):
+    """
+    Статевекторное исполнение схемы лабы (circuit - Circuit.toJSON) или
+    готовой схемы: preset - пресет лабы, либо grover / ghz / qft с
+    параметрами n, marked, initial. shots - число запусков, seed -
+    воспроизводимость, precision - auto, double или single.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        result, _ = QuantumCircuit.from_json(_quantum_circuit(data)).run(
+            shots=min(int(data.get('shots', 1024)), QUANTUM_MAX_SHOTS),
+            seed=data.get('seed'),
+            time_limit=min(float(data.get('timeLimit', QUANTUM_MAX_SECONDS)), QUANTUM_MAX_SECONDS),
+            dtype=QUANTUM_PRECISION[data.get('precision', 'auto')],
+            top=min(int(data.get('top', 16)), 1024),
+        )
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+NOISE_MAX_SHOTS = 1_000_000
+NOISE_MAX_TRAJECTORIES = 20_000
+NOISE_MAX_SECONDS = 120
+
+
+@csrf_exempt
+def quantum_noise(request):
+    """
+    Шумное исполнение схемы (circuit или пресет, как в quantum_run). noise -
+    {depolarizing, depolarizing2, amplitudeDamping, readout}, mode - auto,
+    density или trajectories, seed - воспроизводимость.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        result = simulate_noise(
+            _quantum_circuit(data),
+            NoiseModel.from_json(data.get('noise', {})),
+            shots=min(int(data.get('shots', 1024)), NOISE_MAX_SHOTS),
+            seed=data.get('seed'),
+            mode=data.get('mode', 'auto'),
+            trajectories=min(int(data.get('trajectories', 200)), NOISE_MAX_TRAJECTORIES),
+            time_limit=min(float(data.get('timeLimit', NOISE_MAX_SECONDS)), NOISE_MAX_SECONDS),
+        )
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+ALIFE_MAX_STEPS = 100_000
+ALIFE_MAX_SECONDS = 120
+ALIFE_MAX_CAPACITY = 500_000
+ALIFE_MAX_SNAPSHOT = 5000
+
+
+@csrf_exempt
+def alife_run(request):
+    """
+    Прогон симуляции искусственной жизни без отрисовки: config - параметры
+    в формате config.js лабы (плюс limits), steps кадров, статистика каждые
+    every кадров. snapshot - сколько агентов вернуть для отрисовки.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        capacity = data.get('capacity')
+        world = AlifeWorld(
+            data.get('config'),
+            capacity=None if capacity is None else min(int(capacity), ALIFE_MAX_CAPACITY),
+            seed=data.get('seed'),
+        )
+        if world.capacity > ALIFE_MAX_CAPACITY:
+            raise ValueError(f"Больше {ALIFE_MAX_CAPACITY} агентов")
+        if world.food_capacity > ALIFE_MAX_CAPACITY:
+            raise ValueError(f"Больше {ALIFE_MAX_CAPACITY} единиц еды")
+        result = world.run(
+            min(int(data.get('steps', 600)), ALIFE_MAX_STEPS),
+            every=max(int(data.get('every', 60)), 0),
+            time_limit=min(float(data.get('timeLimit', ALIFE_MAX_SECONDS)), ALIFE_MAX_SECONDS),
+        )
+        if data.get('snapshot'):
+            result['snapshot'] = world.snapshot(min(int(data['snapshot']), ALIFE_MAX_SNAPSHOT))
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+NEURAL_TM_CHECKPOINTS = os.path.join(os.getcwd(), "other/checkpoints")
+NEURAL_TM_MAX_STEPS = 500
+# Загруженные контрольные точки: путь -> (время изменения, модель, meta)
+_neural_tm_models = {}
+
+
+def _neural_tm_model(name):
+    """Модель из other/checkpoints/<name>.npz с кэшем до изменения файла"""
+    if not name or os.path.basename(name) != name or name.startswith('.'):
+        raise ValueError(f"Неверное имя контрольной точки: {name}")
+    path = os.path.join(NEURAL_TM_CHECKPOINTS, f"{name}.npz")
+    if not os.path.exists(path):
+        available = sorted(f[:-4] for f in os.listdir(NEURAL_TM_CHECKPOINTS) if f.endswith('.npz')) \
+            if os.path.isdir(NEURAL_TM_CHECKPOINTS) else []
+        raise ValueError(f"Нет контрольной точки {name}; доступны: {', '.join(available) or 'нет'}")
+    mtime = os.path.getmtime(path)
+    cached = _neural_tm_models.get(path)
+    if cached is None or cached[0] != mtime:
+        model, _, meta = NeuralTM.load(path)
+        cached = _neural_tm_models[path] = (mtime, model, meta)
+    return cached[1], cached[2]
+
+
+@csrf_exempt
+def neural_tm_run(request):
+    """
+    Исполнение обученной NTM (checkpoint - имя из scripts/train_neural_tm.py)
+    на примере её задачи: taskOptions переопределяют параметры генератора,
+    seed - воспроизводимость, либо inputs - свой вход (шаги x каналы).
+    Возвращает выходы, веса головок чтения/записи по шагам и итоговую память.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        model, meta = _neural_tm_model(data.get('checkpoint', 'copy'))
+        result = neural_tm_inference(
+            model, meta,
+            inputs=data.get('inputs'),
+            seed=data.get('seed'),
+            task_options=data.get('taskOptions'),
+            max_steps=NEURAL_TM_MAX_STEPS,
+        )
+        return JsonResponse(result)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
+
+
+LSYSTEM_MAX_ITERATIONS = 40
+LSYSTEM_MAX_SEGMENTS = 20_000_000
+LSYSTEM_MAX_SECONDS = 120
+LSYSTEM_MAX_RULE_LENGTH = 10_000
+
+
+@csrf_exempt
+def lsystem_segments(request):
+    """
+    Потоковая геометрия L-системы для zeno_machine: axiom, rules (строкой
+    как в лабе или словарём), iterations, angle, stepLength, mode ('2d'/'3d'),
+    seed для стохастических правил, maxSegments. Строка раскрывается лениво,
+    ответ - application/octet-stream из записей float32 (little-endian):
+    x0 y0 x1 y1 depth в 2D, x0 y0 z0 x1 y1 z1 depth в 3D. Длина записи в
+    заголовке X-LSystem-Stride, число отрезков (если известно заранее) -
+    в X-LSystem-Segments. Границы кусков ответа не совпадают с границами
+    записей - клиент копит остаток до следующего куска.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Ожидается POST"}, status=405)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        iterations = int(data.get('iterations', 4))
+        if iterations > LSYSTEM_MAX_ITERATIONS:
+            raise ValueError(f"Больше {LSYSTEM_MAX_ITERATIONS} итераций")
+        axiom, rules = data.get('axiom', 'F'), data.get('rules', {})
+        if len(axiom) > LSYSTEM_MAX_RULE_LENGTH or len(rules) > LSYSTEM_MAX_RULE_LENGTH:
+            raise ValueError(f"Аксиома или правила длиннее {LSYSTEM_MAX_RULE_LENGTH}")
+        system = LSystem(axiom, rules, iterations, seed=data.get('seed'))
+        turtle = Turtle(float(data.get('angle', 25)), float(data.get('stepLength', 10)), data.get('mode', '2d'))
+        max_segments = min(int(data.get('maxSegments', LSYSTEM_MAX_SEGMENTS)), LSYSTEM_MAX_SEGMENTS)
+        expected = system.count(DRAW_SYMBOLS)
+
+        def body():
+            for chunk in lsystem_stream(system, turtle, max_segments=max_segments,
+                                        time_limit=LSYSTEM_MAX_SECONDS):
+                yield chunk.astype('<f4', copy=False).tobytes()
+
+        response = StreamingHttpResponse(body(), content_type='application/octet-stream')
+        response['X-LSystem-Stride'] = str(turtle.stride)
+        response['X-LSystem-Dims'] = str(turtle.dims)
+        if isinstance(expected, int):
+            response['X-LSystem-Segments'] = str(min(expected, max_segments))
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({"error": f"Неверный JSON: {str(e)}"}, status=400)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return JsonResponse({"error": f"Неверные данные: {str(e)}"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": f"Внутренняя ошибка: {str(e)}"}, status=500)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Обучение нейронной машины Тьюринга для лабы neural_tm.
+Сохраняет контрольную точку в other/checkpoints/<имя>.npz, откуда её
+берёт /api/neural_tm/run/.
+
+Запуск: python3 scripts/train_neural_tm.py --task copy --steps 20000
+Продолжение: python3 scripts/train_neural_tm.py --task copy --resume
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_DIR = SCRIPT_DIR.parent
+CHECKPOINTS_DIR = PROJECT_DIR / "other" / "checkpoints"
+
+sys.path.insert(0, str(PROJECT_DIR))
+
+from other.engines.neural_tm import NTM, TASKS, Adam, train  # noqa: E402
+
+
+def task_options(args):
+    """Параметры генератора задачи из аргументов"""
+    if args.task == 'copy':
+        return {'min_len': args.min_len, 'max_len': args.max_len, 'width': args.bits}
+    return {'min_items': args.min_items, 'max_items': args.max_items,
+            'item_len': args.item_len, 'width': args.bits}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Обучение NTM на задаче копирования или вспоминания")
+    parser.add_argument("--task", choices=sorted(TASKS), default="copy")
+    parser.add_argument("--name", help="Имя контрольной точки (по умолчанию - имя задачи)")
+    parser.add_argument("--steps", type=int, default=20000, help="Число батчей")
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=1e-3, help="Шаг Adam")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, help="Остановиться через столько секунд")
+    parser.add_argument("--log-every", type=int, default=500)
+    parser.add_argument("--resume", action="store_true", help="Продолжить с сохранённой контрольной точки")
+    # Модель. Маленький контроллер не может запомнить последовательность сам и учится пользоваться памятью
+    parser.add_argument("--hidden", type=int, default=32, help="Размер LSTM-контроллера")
+    parser.add_argument("--memory", type=int, default=64, help="Число ячеек памяти")
+    parser.add_argument("--width", type=int, default=20, help="Ширина ячейки памяти")
+    parser.add_argument("--read-heads", type=int, default=1)
+    parser.add_argument("--write-heads", type=int, default=1)
+    # Задача
+    parser.add_argument("--bits", type=int, default=8, help="Ширина вектора битов")
+    parser.add_argument("--min-len", type=int, default=1)
+    parser.add_argument("--max-len", type=int, default=10)
+    parser.add_argument("--min-items", type=int, default=2)
+    parser.add_argument("--max-items", type=int, default=6)
+    parser.add_argument("--item-len", type=int, default=3)
+    args = parser.parse_args()
+
+    CHECKPOINTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = CHECKPOINTS_DIR / f"{args.name or args.task}.npz"
+
+    if args.resume:
+        model, optimizer, meta = NTM.load(path)
+        if meta.get('task') != args.task:
+            parser.error(f"Контрольная точка {path.name} обучена на задаче {meta.get('task')}")
+        options, history = meta['taskOptions'], meta.get('history', [])
+        optimizer = optimizer or Adam(rate=args.rate)
+        print(f"Продолжение с шага {optimizer.step}")
+    else:
+        options, history = task_options(args), []
+        inputs, outputs = TASKS[args.task][1](options['width'])
+        model = NTM(inputs, outputs, hidden=args.hidden, memory=args.memory, width=args.width,
+                    read_heads=args.read_heads, write_heads=args.write_heads, seed=args.seed)
+        optimizer = Adam(rate=args.rate)
+
+    def report(record):
+        print(f"шаг {record['step']:>7}  потеря {record['loss']:.4f}  "
+              f"ошибок на последовательность {record['bitErrors']:.2f}  ({record['elapsed']:.0f} с)", flush=True)
+
+    result = train(
+        model, args.task, args.steps, batch=args.batch, optimizer=optimizer,
+        seed=args.seed + optimizer.step, time_limit=args.time_limit, log_every=args.log_every,
+        checkpoint=path, checkpoint_every=max(args.log_every, 1000), task_options=options,
+        history=history, callback=report,
+    )
+    print(f"Готово: {result['steps']} батчей за {result['elapsed']:.0f} с, сохранено в {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,120 @@
 #!/usr/bin/env python3
-import http.server, socketserver, os, argparse
+import http.server, os, argparse, errno, gzip, io, functools, email.utils
+
+# Text assets worth compressing; images/fonts are already compressed
+COMPRESSIBLE = {"text/html", "text/css", "text/plain", "text/javascript", "application/javascript",
+                "application/json", "image/svg+xml", "application/wasm", "text/markdown"}
+GZIP_MIN_SIZE = 1024
+GZIP_MAX_SIZE = 16 * 1024 * 1024
+
+@functools.lru_cache(maxsize=128)
+def gzipped(path: str, mtime_ns: int, size: int) -> bytes:
+    # mtime/size are part of the key, so an edited file is recompressed
+    with open(path, "rb") as f:
+        return gzip.compress(f.read(), compresslevel=6, mtime=0)
+
+class CachingHandler(http.server.SimpleHTTPRequestHandler):
+    """ETag/Last-Modified with 304, gzip on the fly; dev=True restores no-store"""
+    dev = False
 
-class NoCacheHandler(http.server.SimpleHTTPRequestHandler):
     def end_headers(self):
-        self.send_header("Cache-Control", "no-store, no-cache, must-revalidate, max-age=0")
-        self.send_header("Pragma", "no-cache")
-        self.send_header("Expires", "0")
+        if self.dev:
+            self.send_header("Cache-Control", "no-store, no-cache, must-revalidate, max-age=0")
+            self.send_header("Pragma", "no-cache")
+            self.send_header("Expires", "0")
         super().end_headers()
 
-class ReusableTCPServer(socketserver.TCPServer):
-    allow_reuse_address = True
+    def send_head(self):
+        if self.dev:
+            return super().send_head()
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            # Redirects and directory listings stay with the base class
+            if not self.path.split("?", 1)[0].split("#", 1)[0].endswith("/") or not os.path.isfile(index):
+                return super().send_head()
+            path = index
+        if path.endswith("/") or not os.path.isfile(path):
+            return super().send_head()
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            return super().send_head()
+        ctype = self.guess_type(path)
+        use_gzip = (ctype.split(";")[0] in COMPRESSIBLE and GZIP_MIN_SIZE <= st.st_size <= GZIP_MAX_SIZE
+                    and self.accepts_gzip())
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}{"-gz" if use_gzip else ""}"'
+        last_modified = email.utils.formatdate(st.st_mtime, usegmt=True)
+
+        if self.not_modified(etag, st.st_mtime):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return None
+
+        try:
+            if use_gzip:
+                body = io.BytesIO(gzipped(path, st.st_mtime_ns, st.st_size))
+                length = len(body.getbuffer())
+            else:
+                body = open(path, "rb")
+                length = st.st_size
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+
+        self.send_response(200)
+        self.send_header("Content-type", ctype)
+        self.send_header("Content-Length", str(length))
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        # Always revalidate: edits show up at once, unchanged files cost a 304
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return body
+
+    def accepts_gzip(self) -> bool:
+        for part in self.headers.get("Accept-Encoding", "").split(","):
+            name, _, params = part.strip().partition(";")
+            if name.strip().lower() in ("gzip", "*"):
+                return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+        return False
+
+    def not_modified(self, etag: str, mtime: float) -> bool:
+        inm = self.headers.get("If-None-Match")
+        if inm is not None:
+            # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+            tags = [t.strip() for t in inm.split(",")]
+            return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+        ims = self.headers.get("If-Modified-Since")
+        if ims:
+            try:
+                since = email.utils.parsedate_to_datetime(ims)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            if since is None:
+                return False
+            return int(mtime) <= since.timestamp()
+        return False
+
+def address_in_use(e: OSError) -> bool:
+    # errno.EADDRINUSE is 98 on Linux, 48 on macOS; Windows reports WSAEADDRINUSE
+    return e.errno == errno.EADDRINUSE or getattr(e, "winerror", None) == 10048
 
-def pick_server(host: str, start_port: int, tries: int = 20):
+def pick_server(host: str, start_port: int, handler, tries: int = 20):
     for port in range(start_port, start_port + tries):
         try:
-            httpd = ReusableTCPServer((host, port), NoCacheHandler)
+            httpd = http.server.ThreadingHTTPServer((host, port), handler)
             return httpd, port
         except OSError as e:
-            if getattr(e, "errno", None) == 48:  # macOS: Address already in use
+            if address_in_use(e):
                 continue
             raise
     raise OSError(f"No free port in {start_port}-{start_port+tries-1}")
@@ -26,11 +123,15 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--host", default=os.environ.get("HOST", "127.0.0.1"))
     parser.add_argument("--port", "-p", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--dev", action="store_true", default=bool(os.environ.get("DEV")),
+                        help="disable caching and gzip (no-store on every response)")
     args = parser.parse_args()
 
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    httpd, port = pick_server(args.host, args.port)
-    print(f"Serving at http://{args.host}:{port}  (Ctrl+C to stop)")
+    handler = type("Handler", (CachingHandler,), {"dev": args.dev})
+    httpd, port = pick_server(args.host, args.port, handler)
+    mode = "dev, no cache" if args.dev else "ETag + gzip"
+    print(f"Serving at http://{args.host}:{port}  [{mode}]  (Ctrl+C to stop)")
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
@@ -39,4 +140,4 @@ def main():
         httpd.server_close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()